@@ -99,5 +99,41 @@ def dev(
     )
 
 
+@app.command()
+def reindex_chat_search(
+    user_id: Annotated[
+        Optional[str], typer.Option(help="Only rebuild this user's chats")
+    ] = None,
+    batch_size: int = 500,
+):
+    from open_webui.models.chat_search import ChatSearch
+
+    total = ChatSearch.reindex(user_id=user_id, batch_size=batch_size)
+    typer.echo(f"Reindexed {total} chats")
+
+
+@app.command()
+def rebuild_credit_rollups(
+    start_time: Annotated[
+        Optional[int], typer.Option(help="Unix timestamp, defaults to the first log")
+    ] = None,
+    end_time: Annotated[
+        Optional[int], typer.Option(help="Unix timestamp, defaults to the last log")
+    ] = None,
+):
+    from open_webui.models.credits import CreditUsageRollups
+
+    total = CreditUsageRollups.rebuild(start_time=start_time, end_time=end_time)
+    typer.echo(f"Rebuilt credit usage rollups from {total} logs")
+
+
+@app.command()
+def rebuild_chat_message_hourly_counts():
+    from open_webui.models.chat_messages import ChatMessages
+
+    total = ChatMessages.rebuild_hourly_counts()
+    typer.echo(f"Rebuilt {total} chat message hourly counts")
+
+
 if __name__ == "__main__":
     app()
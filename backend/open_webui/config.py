@@ -931,6 +931,31 @@ AZURE_STORAGE_ENDPOINT = os.environ.get("AZURE_STORAGE_ENDPOINT", None)
 AZURE_STORAGE_CONTAINER_NAME = os.environ.get("AZURE_STORAGE_CONTAINER_NAME", None)
 AZURE_STORAGE_KEY = os.environ.get("AZURE_STORAGE_KEY", None)
 
+# Bytes of downloaded remote files kept on local disk, 0 downloads on every read
+try:
+    STORAGE_CACHE_MAX_BYTES = int(
+        os.environ.get("STORAGE_CACHE_MAX_BYTES", str(2 * 1024 * 1024 * 1024))
+    )
+except ValueError:
+    STORAGE_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+# Seconds an evicted copy stays on disk, so responses that were handed its path
+# can still open it
+try:
+    STORAGE_CACHE_EVICTION_GRACE = int(
+        os.environ.get("STORAGE_CACHE_EVICTION_GRACE", "60")
+    )
+except ValueError:
+    STORAGE_CACHE_EVICTION_GRACE = 60
+
+# Bytes read from an upload at a time and sent per multipart upload part
+try:
+    STORAGE_UPLOAD_CHUNK_SIZE = int(
+        os.environ.get("STORAGE_UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024))
+    )
+except ValueError:
+    STORAGE_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
 ####################################
 # File Upload DIR
 ####################################
@@ -73,6 +73,9 @@ class ERROR_MESSAGES(str, Enum):
         lambda err="": f"Invalid format. Please use the correct format{err}"
     )
     RATE_LIMIT_EXCEEDED = "API rate limit exceeded"
+    CHAT_QUOTA_EXCEEDED = (
+        lambda reason="": f"Chat quota exceeded: {reason}. Please try again later."
+    )
 
     MODEL_NOT_FOUND = lambda name="": f"Model '{name}' was not found"
     OPENAI_NOT_FOUND = lambda name="": "OpenAI API was not found"
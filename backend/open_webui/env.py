@@ -412,6 +412,15 @@ if DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL is not None:
     except Exception:
         DATABASE_USER_ACTIVE_STATUS_UPDATE_INTERVAL = 0.0
 
+# Seconds between bulk writes of coalesced user last-active timestamps;
+# 0 writes every request through
+try:
+    USER_LAST_ACTIVE_FLUSH_INTERVAL = float(
+        os.environ.get("USER_LAST_ACTIVE_FLUSH_INTERVAL", "30")
+    )
+except ValueError:
+    USER_LAST_ACTIVE_FLUSH_INTERVAL = 30.0
+
 # When enabled, get_db_context reuses existing sessions; set to False to always create new sessions
 DATABASE_ENABLE_SESSION_SHARING = (
     os.environ.get("DATABASE_ENABLE_SESSION_SHARING", "False").lower() == "true"
@@ -430,6 +439,41 @@ ENABLE_REALTIME_CHAT_SAVE = (
     os.environ.get("ENABLE_REALTIME_CHAT_SAVE", "False").lower() == "true"
 )
 
+# Milliseconds between realtime saves of a streaming message
+try:
+    REALTIME_CHAT_SAVE_INTERVAL = int(
+        os.environ.get("REALTIME_CHAT_SAVE_INTERVAL", "1000")
+    )
+except ValueError:
+    REALTIME_CHAT_SAVE_INTERVAL = 1000
+
+# Streamed characters that trigger a realtime save before the interval is up
+try:
+    REALTIME_CHAT_SAVE_MAX_BYTES = int(
+        os.environ.get("REALTIME_CHAT_SAVE_MAX_BYTES", "16384")
+    )
+except ValueError:
+    REALTIME_CHAT_SAVE_MAX_BYTES = 16384
+
+# Store messages only in the chat_message table; the chat JSON keeps the tree
+# metadata and its message map is assembled from rows when the chat is read
+ENABLE_CHAT_MESSAGE_PRIMARY_STORAGE = (
+    os.environ.get("ENABLE_CHAT_MESSAGE_PRIMARY_STORAGE", "False").lower() == "true"
+)
+
+# Serve chat search from the chat_search full-text index (SQLite FTS5 or
+# PostgreSQL tsvector); rebuild it with `open-webui reindex-chat-search`
+ENABLE_CHAT_SEARCH_INDEX = (
+    os.environ.get("ENABLE_CHAT_SEARCH_INDEX", "True").lower() == "true"
+)
+
+# Serve analytics message counts from the chat_message_hourly_count table for
+# whole hours; the counters are only kept while this is on, rebuild them with
+# `open-webui rebuild-chat-message-hourly-counts` after turning it on
+ENABLE_CHAT_MESSAGE_HOURLY_COUNTS = (
+    os.environ.get("ENABLE_CHAT_MESSAGE_HOURLY_COUNTS", "False").lower() == "true"
+)
+
 ENABLE_QUERIES_CACHE = os.environ.get("ENABLE_QUERIES_CACHE", "False").lower() == "true"
 
 RAG_SYSTEM_CONTEXT = os.environ.get("RAG_SYSTEM_CONTEXT", "False").lower() == "true"
@@ -474,6 +518,14 @@ else:
     except Exception:
         REDIS_RECONNECT_DELAY = None
 
+# Keys counted by the in-memory rate limiter used without Redis
+try:
+    RATE_LIMIT_MEMORY_MAX_KEYS = int(
+        os.environ.get("RATE_LIMIT_MEMORY_MAX_KEYS", "10000")
+    )
+except ValueError:
+    RATE_LIMIT_MEMORY_MAX_KEYS = 10000
+
 ####################################
 # UVICORN WORKERS
 ####################################
@@ -672,6 +724,32 @@ else:
     except Exception:
         MODELS_CACHE_TTL = 1
 
+# Merged model catalogue and per-user filtered lists, invalidated on
+# model/function/group/connection changes; 0 disables the cache.
+try:
+    MODELS_CATALOG_CACHE_TTL = int(os.environ.get("MODELS_CATALOG_CACHE_TTL", "60"))
+except ValueError:
+    MODELS_CATALOG_CACHE_TTL = 60
+
+try:
+    MODELS_VIEW_CACHE_MAX_SIZE = int(
+        os.environ.get("MODELS_VIEW_CACHE_MAX_SIZE", "1000")
+    )
+except ValueError:
+    MODELS_VIEW_CACHE_MAX_SIZE = 1000
+
+# Seconds authenticated users are cached per worker; invalidated across
+# workers over Redis pub/sub on user writes; 0 disables the cache.
+try:
+    USER_CACHE_TTL = int(os.environ.get("USER_CACHE_TTL", "10"))
+except ValueError:
+    USER_CACHE_TTL = 10
+
+try:
+    USER_CACHE_MAX_SIZE = int(os.environ.get("USER_CACHE_MAX_SIZE", "10000"))
+except ValueError:
+    USER_CACHE_MAX_SIZE = 10000
+
 
 ####################################
 # CHAT
@@ -696,6 +774,12 @@ else:
     except Exception:
         CHAT_RESPONSE_STREAM_DELTA_CHUNK_SIZE = 1
 
+# Send streamed content as deltas against what the client already shows
+ENABLE_CHAT_RESPONSE_STREAM_CONTENT_DELTA = (
+    os.environ.get("ENABLE_CHAT_RESPONSE_STREAM_CONTENT_DELTA", "False").lower()
+    == "true"
+)
+
 
 CHAT_RESPONSE_MAX_TOOL_CALL_RETRIES = os.environ.get(
     "CHAT_RESPONSE_MAX_TOOL_CALL_RETRIES", "30"
@@ -725,6 +809,85 @@ else:
         CHAT_STREAM_RESPONSE_CHUNK_MAX_BUFFER_SIZE = None
 
 
+####################################
+# CREDIT
+####################################
+
+# Apply usage deductions in batched transactions off the request path
+ENABLE_CREDIT_LEDGER = os.environ.get("ENABLE_CREDIT_LEDGER", "True").lower() == "true"
+
+# Milliseconds between ledger flushes; 0 applies every change immediately
+try:
+    CREDIT_LEDGER_FLUSH_INTERVAL = int(
+        os.environ.get("CREDIT_LEDGER_FLUSH_INTERVAL", "1000")
+    )
+except ValueError:
+    CREDIT_LEDGER_FLUSH_INTERVAL = 1000
+
+try:
+    CREDIT_LEDGER_BATCH_SIZE = int(os.environ.get("CREDIT_LEDGER_BATCH_SIZE", "500"))
+except ValueError:
+    CREDIT_LEDGER_BATCH_SIZE = 500
+
+# Queued changes above this are written through by the caller instead
+try:
+    CREDIT_LEDGER_MAX_PENDING = int(
+        os.environ.get("CREDIT_LEDGER_MAX_PENDING", "100000")
+    )
+except ValueError:
+    CREDIT_LEDGER_MAX_PENDING = 100000
+
+try:
+    CREDIT_BALANCE_CACHE_TTL = int(os.environ.get("CREDIT_BALANCE_CACHE_TTL", "60"))
+except ValueError:
+    CREDIT_BALANCE_CACHE_TTL = 60
+
+# Threads counting tokens for responses without provider usage
+try:
+    USAGE_TOKENIZER_POOL_SIZE = int(os.environ.get("USAGE_TOKENIZER_POOL_SIZE", "4"))
+except ValueError:
+    USAGE_TOKENIZER_POOL_SIZE = 4
+
+# Chat completion quotas, 0 disables a limit
+try:
+    CHAT_QUOTA_USER_MAX_CONCURRENT = int(
+        os.environ.get("CHAT_QUOTA_USER_MAX_CONCURRENT", "0")
+    )
+except ValueError:
+    CHAT_QUOTA_USER_MAX_CONCURRENT = 0
+
+try:
+    CHAT_QUOTA_USER_TOKENS_PER_MINUTE = int(
+        os.environ.get("CHAT_QUOTA_USER_TOKENS_PER_MINUTE", "0")
+    )
+except ValueError:
+    CHAT_QUOTA_USER_TOKENS_PER_MINUTE = 0
+
+# Limits shared by all users of a model or group, e.g.
+# {"gpt-4o": {"max_concurrent": 20, "tokens_per_minute": 400000}}
+try:
+    CHAT_QUOTA_MODEL_LIMITS = json.loads(
+        os.environ.get("CHAT_QUOTA_MODEL_LIMITS", "{}")
+    )
+except Exception:
+    log.warning("Invalid CHAT_QUOTA_MODEL_LIMITS, defaulting to {}")
+    CHAT_QUOTA_MODEL_LIMITS = {}
+
+try:
+    CHAT_QUOTA_GROUP_LIMITS = json.loads(
+        os.environ.get("CHAT_QUOTA_GROUP_LIMITS", "{}")
+    )
+except Exception:
+    log.warning("Invalid CHAT_QUOTA_GROUP_LIMITS, defaulting to {}")
+    CHAT_QUOTA_GROUP_LIMITS = {}
+
+# Seconds after which a stream of a crashed worker stops counting
+try:
+    CHAT_QUOTA_LEASE_TTL = int(os.environ.get("CHAT_QUOTA_LEASE_TTL", "600"))
+except ValueError:
+    CHAT_QUOTA_LEASE_TTL = 600
+
+
 ####################################
 # WEBSOCKET SUPPORT
 ####################################
@@ -800,6 +963,16 @@ else:
     except ValueError:
         WEBSOCKET_EVENT_CALLER_TIMEOUT = 300
 
+# Coalesce message/status/source/embeds/files event persistence per message;
+# 0 writes every event through to the database immediately.
+WEBSOCKET_EVENT_DB_FLUSH_INTERVAL = os.environ.get(
+    "WEBSOCKET_EVENT_DB_FLUSH_INTERVAL", "500"
+)
+try:
+    WEBSOCKET_EVENT_DB_FLUSH_INTERVAL = int(WEBSOCKET_EVENT_DB_FLUSH_INTERVAL)
+except ValueError:
+    WEBSOCKET_EVENT_DB_FLUSH_INTERVAL = 500
+
 
 REQUESTS_VERIFY = os.environ.get("REQUESTS_VERIFY", "True").lower() == "true"
 
@@ -855,6 +1028,37 @@ AIOHTTP_CLIENT_READ_BUFFER_SIZE = int(
     os.environ.get("AIOHTTP_CLIENT_READ_BUFFER_SIZE", 2**16)
 )
 
+# Shared, application-lifetime aiohttp sessions for upstream connections
+ENABLE_AIOHTTP_CLIENT_SESSION_POOL = (
+    os.environ.get("ENABLE_AIOHTTP_CLIENT_SESSION_POOL", "True").lower() == "true"
+)
+
+try:
+    AIOHTTP_CLIENT_POOL_LIMIT = int(os.environ.get("AIOHTTP_CLIENT_POOL_LIMIT", "0"))
+except ValueError:
+    AIOHTTP_CLIENT_POOL_LIMIT = 0
+
+try:
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST = int(
+        os.environ.get("AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST", "0")
+    )
+except ValueError:
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST = 0
+
+try:
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT = float(
+        os.environ.get("AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT", "30")
+    )
+except ValueError:
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT = 30.0
+
+try:
+    AIOHTTP_CLIENT_DNS_CACHE_TTL = int(
+        os.environ.get("AIOHTTP_CLIENT_DNS_CACHE_TTL", "60")
+    )
+except ValueError:
+    AIOHTTP_CLIENT_DNS_CACHE_TTL = 60
+
 
 RAG_EMBEDDING_TIMEOUT = os.environ.get("RAG_EMBEDDING_TIMEOUT", "")
 
@@ -866,6 +1070,68 @@ else:
     except Exception:
         RAG_EMBEDDING_TIMEOUT = None
 
+# Persistent BM25 index used by hybrid search instead of rebuilding per query
+ENABLE_BM25_INDEX = os.environ.get("ENABLE_BM25_INDEX", "True").lower() == "true"
+BM25_INDEX_DIR = os.environ.get("BM25_INDEX_DIR", f"{DATA_DIR}/cache/bm25")
+
+try:
+    BM25_INDEX_MAX_CACHED = int(os.environ.get("BM25_INDEX_MAX_CACHED", "16"))
+except ValueError:
+    BM25_INDEX_MAX_CACHED = 16
+
+# Logged changes folded into a new index snapshot once they outnumber the index
+try:
+    BM25_INDEX_COMPACT_MIN_ITEMS = int(
+        os.environ.get("BM25_INDEX_COMPACT_MIN_ITEMS", "1000")
+    )
+except ValueError:
+    BM25_INDEX_COMPACT_MIN_ITEMS = 1000
+
+# Query embedding cache, 0 disables it
+try:
+    QUERY_EMBEDDING_CACHE_SIZE = int(
+        os.environ.get("QUERY_EMBEDDING_CACHE_SIZE", "1000")
+    )
+except ValueError:
+    QUERY_EMBEDDING_CACHE_SIZE = 1000
+
+try:
+    QUERY_EMBEDDING_CACHE_TTL = int(os.environ.get("QUERY_EMBEDDING_CACHE_TTL", "3600"))
+except ValueError:
+    QUERY_EMBEDDING_CACHE_TTL = 3600
+
+ENABLE_QUERY_EMBEDDING_CACHE_REDIS = (
+    os.environ.get("ENABLE_QUERY_EMBEDDING_CACHE_REDIS", "True").lower() == "true"
+)
+
+# Content-addressed store of chunk embeddings reused by ingestion and reindexing.
+# Off by default: each entry keeps a full vector on local disk.
+ENABLE_CHUNK_EMBEDDING_STORE = (
+    os.environ.get("ENABLE_CHUNK_EMBEDDING_STORE", "False").lower() == "true"
+)
+CHUNK_EMBEDDING_STORE_PATH = os.environ.get(
+    "CHUNK_EMBEDDING_STORE_PATH", f"{DATA_DIR}/cache/embeddings/chunks.db"
+)
+
+try:
+    CHUNK_EMBEDDING_STORE_MAX_ENTRIES = int(
+        os.environ.get("CHUNK_EMBEDDING_STORE_MAX_ENTRIES", "100000")
+    )
+except ValueError:
+    CHUNK_EMBEDDING_STORE_MAX_ENTRIES = 100000
+
+# Concurrent (collection, query) searches per retrieval request, 0 = unlimited
+try:
+    RAG_QUERY_CONCURRENCY = int(os.environ.get("RAG_QUERY_CONCURRENCY", "16"))
+except ValueError:
+    RAG_QUERY_CONCURRENCY = 16
+
+# Chunks embedded and inserted per window during ingestion, 0 = all at once
+try:
+    RAG_INGESTION_WINDOW_SIZE = int(os.environ.get("RAG_INGESTION_WINDOW_SIZE", "0"))
+except ValueError:
+    RAG_INGESTION_WINDOW_SIZE = 0
+
 
 ####################################
 # SENTENCE TRANSFORMERS
@@ -963,6 +1229,26 @@ try:
 except ValueError:
     MAX_BODY_LOG_SIZE = 2048
 
+# Audit entries waiting for the background writer before new ones are dropped
+try:
+    AUDIT_QUEUE_MAX_SIZE = int(os.environ.get("AUDIT_QUEUE_MAX_SIZE", "10000"))
+except ValueError:
+    AUDIT_QUEUE_MAX_SIZE = 10000
+
+# drop | block: wait for room in a full queue instead of dropping the entry
+AUDIT_QUEUE_FULL_POLICY = os.environ.get("AUDIT_QUEUE_FULL_POLICY", "drop").lower()
+
+# Milliseconds between audit log writes
+try:
+    AUDIT_FLUSH_INTERVAL = int(os.environ.get("AUDIT_FLUSH_INTERVAL", "1000"))
+except ValueError:
+    AUDIT_FLUSH_INTERVAL = 1000
+
+try:
+    AUDIT_BATCH_SIZE = int(os.environ.get("AUDIT_BATCH_SIZE", "500"))
+except ValueError:
+    AUDIT_BATCH_SIZE = 500
+
 # Comma separated list for urls to exclude from audit
 AUDIT_EXCLUDED_PATHS = os.getenv("AUDIT_EXCLUDED_PATHS", "/chats,/chat,/folders").split(
     ","
@@ -300,6 +300,7 @@ async def generate_function_chat_completion(
                             credit_deduct.run(data)
                             yield data
 
+                        await credit_deduct.wait_stream_usage()
                         yield credit_deduct.usage_message
 
                     return
@@ -355,6 +356,7 @@ async def generate_function_chat_completion(
                     yield f"data: {json.dumps(finish_message)}\n\n"
                     yield "data: [DONE]"
 
+                await credit_deduct.wait_stream_usage()
                 yield credit_deduct.usage_message
 
         return StreamingResponse(stream_content(), media_type="text/event-stream")
@@ -378,6 +380,7 @@ async def generate_function_chat_completion(
                     credit_deduct.run(data)
                     yield data
 
+                await credit_deduct.wait_stream_usage()
                 yield credit_deduct.usage_message
 
         if isinstance(res, StreamingResponse):
@@ -50,10 +50,22 @@ from starsessions.stores.redis import RedisStore
 
 from open_webui.models.credits import Credits
 from open_webui.utils import logger
-from open_webui.utils.audit import AuditLevel, AuditLoggingMiddleware
+from open_webui.utils.audit import AUDIT_SINK, AuditLevel, AuditLoggingMiddleware
+from open_webui.utils.credit.ledger import CREDIT_LEDGER
+from open_webui.utils.last_active import LAST_ACTIVE_TRACKER
 from open_webui.utils.credit.utils import is_free_request, check_credit_by_user_id
+from open_webui.utils.quota import CHAT_QUOTAS
 from open_webui.utils.logger import start_logger
+from open_webui.utils.model_cache import (
+    MODELS_CACHE,
+    MODELS_CACHE_INVALIDATION_PATHS,
+    MODELS_VIEW_INVALIDATION_PATHS,
+)
+from open_webui.utils.session_pool import client_session, close_client_sessions
+from open_webui.utils.user_cache import USER_CACHE
 from open_webui.socket.main import (
+    MESSAGE_EVENT_BUFFER,
+    REALTIME_CHAT_SAVER,
     MODELS,
     app as socket_app,
     periodic_usage_pool_cleanup,
@@ -99,6 +111,7 @@ from open_webui.routers.retrieval import (
     get_ef,
     get_rf,
 )
+from open_webui.retrieval.embedding_cache import QUERY_EMBEDDING_CACHE
 
 
 from sqlalchemy.orm import Session
@@ -495,6 +508,7 @@ from open_webui.env import (
     REDIS_URL,
     REDIS_CLUSTER,
     REDIS_KEY_PREFIX,
+    ENABLE_QUERY_EMBEDDING_CACHE_REDIS,
     REDIS_SENTINEL_HOSTS,
     REDIS_SENTINEL_PORT,
     GLOBAL_LOG_LEVEL,
@@ -570,7 +584,7 @@ from open_webui.utils.oauth import (
     OAuthClientInformationFull,
 )
 from open_webui.utils.security_headers import SecurityHeadersMiddleware
-from open_webui.utils.redis import get_redis_connection
+from open_webui.utils.redis import get_redis_client, get_redis_connection
 
 from open_webui.tasks import (
     redis_task_command_listener,
@@ -663,6 +677,18 @@ async def lifespan(app: FastAPI):
         app.state.redis_task_command_listener = asyncio.create_task(
             redis_task_command_listener(app)
         )
+        if MODELS_CACHE.enabled:
+            app.state.redis_models_cache_listener = asyncio.create_task(
+                MODELS_CACHE.listen(app.state.redis)
+            )
+        if USER_CACHE.enabled:
+            # user writes run in threadpool workers, publish with a sync client
+            USER_CACHE.redis = get_redis_client()
+            app.state.redis_user_cache_listener = asyncio.create_task(
+                USER_CACHE.listen(app.state.redis)
+            )
+        if ENABLE_QUERY_EMBEDDING_CACHE_REDIS:
+            QUERY_EMBEDDING_CACHE.redis = app.state.redis
 
     if THREAD_POOL_SIZE and THREAD_POOL_SIZE > 0:
         limiter = anyio.to_thread.current_default_thread_limiter()
@@ -729,6 +755,24 @@ async def lifespan(app: FastAPI):
     if hasattr(app.state, "redis_task_command_listener"):
         app.state.redis_task_command_listener.cancel()
 
+    if hasattr(app.state, "redis_models_cache_listener"):
+        app.state.redis_models_cache_listener.cancel()
+
+    if hasattr(app.state, "redis_user_cache_listener"):
+        app.state.redis_user_cache_listener.cancel()
+
+    # Persist any buffered chat message events before the worker exits
+    await MESSAGE_EVENT_BUFFER.flush_all()
+    await REALTIME_CHAT_SAVER.flush_all()
+
+    await close_client_sessions()
+
+    # Apply queued credit changes, audit entries and last-active timestamps
+    # before the worker exits
+    await asyncio.to_thread(CREDIT_LEDGER.stop)
+    await asyncio.to_thread(AUDIT_SINK.stop)
+    await asyncio.to_thread(LAST_ACTIVE_TRACKER.stop)
+
 
 app = FastAPI(
     title="Open WebUI",
@@ -1185,6 +1229,7 @@ app.state.EMBEDDING_FUNCTION = get_embedding_function(
     ),
     enable_async=app.state.config.ENABLE_ASYNC_EMBEDDING,
     concurrent_requests=app.state.config.RAG_EMBEDDING_CONCURRENT_REQUESTS,
+    cache=QUERY_EMBEDDING_CACHE,
 )
 
 app.state.RERANKING_FUNCTION = get_reranking_function(
@@ -1553,6 +1598,18 @@ async def check_url(request: Request, call_next):
     return response
 
 
+@app.middleware("http")
+async def invalidate_models_cache(request: Request, call_next):
+    response = await call_next(request)
+    if MODELS_CACHE.enabled and request.method != "GET" and response.status_code < 400:
+        path = request.url.path
+        if path.startswith(MODELS_CACHE_INVALIDATION_PATHS):
+            await MODELS_CACHE.invalidate_all_workers(app.state.redis)
+        elif path.startswith(MODELS_VIEW_INVALIDATION_PATHS):
+            await MODELS_CACHE.invalidate_all_workers(app.state.redis, views_only=True)
+    return response
+
+
 @app.middleware("http")
 async def inspect_websocket(request: Request, call_next):
     if (
@@ -1665,6 +1722,13 @@ async def get_models(
             model["info"]["price"] = base_model.price
         return models
 
+    view_key = (user.id, user.role)
+    if not refresh:
+        models = MODELS_CACHE.get_view(view_key)
+        if models is not None:
+            return {"data": models}
+    version = MODELS_CACHE.version
+
     all_models = await get_all_models(request, refresh=refresh, user=user)
 
     models = []
@@ -1709,7 +1773,9 @@ async def get_models(
     log.debug(
         f"/api/models returned filtered models accessible to the user: {json.dumps([model.get('id') for model in models])}"
     )
-    return {"data": change_preset_model_price(models)}
+    models = change_preset_model_price(models)
+    MODELS_CACHE.set_view(view_key, models, version)
+    return {"data": models}
 
 
 @app.get("/api/models/base")
@@ -1918,6 +1984,11 @@ async def chat_completion(
             detail=str(e),
         )
 
+    # Refuse early while the quotas are exhausted, so callers get a 429 rather
+    # than an error message from the background task
+    if not metadata.get("direct"):
+        await asyncio.to_thread(CHAT_QUOTAS.check, user, form_data.get("model"))
+
     async def process_chat(request, form_data, user, metadata, model):
         try:
             form_data["metadata"]["features_for_credit"] = form_data["metadata"][
@@ -2381,7 +2452,7 @@ async def get_app_latest_release_version(user=Depends(get_verified_user)):
         return {"current": VERSION, "latest": VERSION}
     try:
         timeout = aiohttp.ClientTimeout(total=1)
-        async with aiohttp.ClientSession(timeout=timeout, trust_env=True) as session:
+        async with client_session(timeout=timeout, trust_env=True) as session:
             async with session.get(
                 "https://api.github.com/repos/ovinc-cn/openwebui/releases/latest",
                 ssl=AIOHTTP_CLIENT_SESSION_SSL,
@@ -2416,7 +2487,7 @@ async def get_current_usage(user=Depends(get_verified_user)):
             )
 
         return {
-            "model_ids": get_models_in_use(),
+            "model_ids": await get_models_in_use(),
             "user_count": Users.get_active_user_count(),
         }
     except HTTPException:
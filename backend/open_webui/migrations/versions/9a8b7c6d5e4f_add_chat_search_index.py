@@ -0,0 +1,226 @@
+"""Add chat_search full-text index
+
+Revision ID: 9a8b7c6d5e4f
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+import json
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+log = logging.getLogger(__name__)
+
+revision: str = "9a8b7c6d5e4f"
+down_revision: Union[str, None] = "d4e5f6a7b8c9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+SQLITE_DDL = [
+    """
+    CREATE TABLE chat_search (
+        rowid INTEGER PRIMARY KEY,
+        id TEXT NOT NULL UNIQUE,
+        chat_id TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        title TEXT,
+        content TEXT
+    )
+    """,
+    "CREATE INDEX chat_search_chat_id_idx ON chat_search (chat_id)",
+    "CREATE INDEX chat_search_user_id_idx ON chat_search (user_id)",
+    """
+    CREATE VIRTUAL TABLE chat_search_fts USING fts5(
+        title, content,
+        content='chat_search', content_rowid='rowid',
+        tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER chat_search_ai AFTER INSERT ON chat_search BEGIN
+        INSERT INTO chat_search_fts (rowid, title, content)
+        VALUES (new.rowid, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER chat_search_ad AFTER DELETE ON chat_search BEGIN
+        INSERT INTO chat_search_fts (chat_search_fts, rowid, title, content)
+        VALUES ('delete', old.rowid, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER chat_search_au AFTER UPDATE ON chat_search BEGIN
+        INSERT INTO chat_search_fts (chat_search_fts, rowid, title, content)
+        VALUES ('delete', old.rowid, old.title, old.content);
+        INSERT INTO chat_search_fts (rowid, title, content)
+        VALUES (new.rowid, new.title, new.content);
+    END
+    """,
+]
+
+POSTGRES_DDL = [
+    """
+    CREATE TABLE chat_search (
+        id TEXT PRIMARY KEY,
+        chat_id TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        title TEXT,
+        content TEXT,
+        document tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(content, '')), 'B')
+        ) STORED
+    )
+    """,
+    "CREATE INDEX chat_search_chat_id_idx ON chat_search (chat_id)",
+    "CREATE INDEX chat_search_user_id_idx ON chat_search (user_id)",
+    "CREATE INDEX chat_search_document_idx ON chat_search USING GIN (document)",
+]
+
+chat_search_table = sa.table(
+    "chat_search",
+    sa.column("id", sa.Text()),
+    sa.column("chat_id", sa.Text()),
+    sa.column("user_id", sa.Text()),
+    sa.column("title", sa.Text()),
+    sa.column("content", sa.Text()),
+)
+
+
+def _message_text(content) -> str:
+    if isinstance(content, list):
+        content = " ".join(
+            block["text"]
+            for block in content
+            if isinstance(block, dict) and isinstance(block.get("text"), str)
+        )
+    if not isinstance(content, str):
+        return ""
+    return content.replace("\x00", "")
+
+
+def _backfill(conn):
+    chat_table = sa.table(
+        "chat",
+        sa.column("id", sa.Text()),
+        sa.column("user_id", sa.Text()),
+        sa.column("title", sa.Text()),
+        sa.column("chat", sa.JSON()),
+    )
+    chat_message_table = sa.table(
+        "chat_message",
+        sa.column("id", sa.Text()),
+        sa.column("chat_id", sa.Text()),
+        sa.column("content", sa.JSON()),
+    )
+
+    result = conn.execute(
+        sa.select(
+            chat_table.c.id, chat_table.c.user_id, chat_table.c.title, chat_table.c.chat
+        )
+        .where(~chat_table.c.user_id.like("shared-%"))
+        .execution_options(yield_per=1000, stream_results=True)
+    )
+
+    batch = []
+    total = 0
+    for chat_id, user_id, title, chat_data in result:
+        if isinstance(chat_data, str):
+            try:
+                chat_data = json.loads(chat_data)
+            except Exception:
+                chat_data = None
+
+        batch.append(
+            {
+                "id": chat_id,
+                "chat_id": chat_id,
+                "user_id": user_id,
+                "title": (title or "").replace("\x00", ""),
+                "content": "",
+            }
+        )
+
+        messages = {}
+        if isinstance(chat_data, dict):
+            messages = chat_data.get("history", {}).get("messages") or {}
+
+        if messages:
+            documents = [
+                (f"{chat_id}-{message_id}", _message_text(message.get("content")))
+                for message_id, message in messages.items()
+                if isinstance(message, dict)
+            ]
+        else:
+            # Chat stored only in chat_message
+            documents = [
+                (id, _message_text(content))
+                for id, content in conn.execute(
+                    sa.select(
+                        chat_message_table.c.id, chat_message_table.c.content
+                    ).where(chat_message_table.c.chat_id == chat_id)
+                )
+            ]
+
+        for id, content in documents:
+            if content:
+                batch.append(
+                    {
+                        "id": id,
+                        "chat_id": chat_id,
+                        "user_id": user_id,
+                        "title": "",
+                        "content": content,
+                    }
+                )
+
+        if len(batch) >= BATCH_SIZE:
+            conn.execute(sa.insert(chat_search_table), batch)
+            total += len(batch)
+            batch.clear()
+
+    if batch:
+        conn.execute(sa.insert(chat_search_table), batch)
+        total += len(batch)
+
+    log.info(f"Indexed {total} chat search documents")
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    dialect = conn.dialect.name
+
+    if dialect == "sqlite":
+        # FTS5 with the trigram tokenizer needs SQLite 3.34+; without it chat
+        # search keeps using the LIKE/JSON scan
+        savepoint = conn.begin_nested()
+        try:
+            for statement in SQLITE_DDL:
+                conn.execute(sa.text(statement))
+            savepoint.commit()
+        except Exception as e:
+            savepoint.rollback()
+            log.warning(f"Skipping chat search index, FTS5 trigram unavailable: {e}")
+            return
+    elif dialect == "postgresql":
+        for statement in POSTGRES_DDL:
+            conn.execute(sa.text(statement))
+    else:
+        return
+
+    _backfill(conn)
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name == "sqlite":
+        for trigger in ["chat_search_ai", "chat_search_ad", "chat_search_au"]:
+            conn.execute(sa.text(f"DROP TRIGGER IF EXISTS {trigger}"))
+        conn.execute(sa.text("DROP TABLE IF EXISTS chat_search_fts"))
+    conn.execute(sa.text("DROP TABLE IF EXISTS chat_search"))
@@ -0,0 +1,168 @@
+"""Add credit_usage_rollup and backfill it from credit_log
+
+Revision ID: c1d2e3f4a5b6
+Revises: 9a8b7c6d5e4f
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+import json
+import logging
+import time
+from decimal import Decimal
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+log = logging.getLogger(__name__)
+
+revision: str = "c1d2e3f4a5b6"
+down_revision: Union[str, None] = "9a8b7c6d5e4f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+# Keep in sync with open_webui.models.credits.ROLLUP_PERIODS
+ROLLUP_PERIODS = {"hour": 3600, "day": 86400}
+
+
+def _usage_entry(detail):
+    # Keep in sync with open_webui.models.credits.get_usage_rollup_entry
+    if isinstance(detail, str):
+        try:
+            detail = json.loads(detail)
+        except Exception:
+            return None
+    usage = (detail or {}).get("usage") or {}
+    if usage.get("total_price") is None:
+        return None
+    model = (detail.get("api_params") or {}).get("model") or {}
+    model_id = model.get("id") if isinstance(model, dict) else None
+    if not model_id:
+        return None
+    features = ",".join(sorted(str(feature) for feature in usage.get("features") or []))
+    return (
+        model_id,
+        features,
+        {
+            "requests": 1,
+            "prompt_tokens": int(usage.get("prompt_tokens") or 0),
+            "completion_tokens": int(usage.get("completion_tokens") or 0),
+            "total_tokens": int(usage.get("total_tokens") or 0),
+            "total_price": Decimal(str(usage["total_price"])),
+            "feature_price": Decimal(str(usage.get("feature_price") or 0)),
+        },
+    )
+
+
+def _backfill(conn):
+    credit_log_table = sa.table(
+        "credit_log",
+        sa.column("user_id", sa.String()),
+        sa.column("detail", sa.JSON()),
+        sa.column("created_at", sa.BigInteger()),
+    )
+    rollup_table = sa.table(
+        "credit_usage_rollup",
+        sa.column("period", sa.String()),
+        sa.column("bucket", sa.BigInteger()),
+        sa.column("user_id", sa.String()),
+        sa.column("model_id", sa.String()),
+        sa.column("features", sa.String()),
+        sa.column("requests", sa.BigInteger()),
+        sa.column("prompt_tokens", sa.BigInteger()),
+        sa.column("completion_tokens", sa.BigInteger()),
+        sa.column("total_tokens", sa.BigInteger()),
+        sa.column("total_price", sa.Numeric(precision=24, scale=12)),
+        sa.column("feature_price", sa.Numeric(precision=24, scale=12)),
+        sa.column("updated_at", sa.BigInteger()),
+    )
+
+    now = int(time.time())
+    rows = {}
+    total = 0
+
+    def flush():
+        values = [
+            {
+                "period": period,
+                "bucket": bucket,
+                "user_id": user_id,
+                "model_id": model_id,
+                "features": features,
+                **measures,
+                "updated_at": now,
+            }
+            for (period, bucket, user_id, model_id, features), measures in rows.items()
+        ]
+        for idx in range(0, len(values), BATCH_SIZE):
+            conn.execute(sa.insert(rollup_table), values[idx : idx + BATCH_SIZE])
+        rows.clear()
+
+    # Logs arrive in time order, so the buckets of a day are complete once the
+    # next day starts
+    current_day = None
+    result = conn.execute(
+        sa.select(
+            credit_log_table.c.user_id,
+            credit_log_table.c.detail,
+            credit_log_table.c.created_at,
+        )
+        .where(credit_log_table.c.created_at.isnot(None))
+        .order_by(credit_log_table.c.created_at)
+        .execution_options(yield_per=1000, stream_results=True)
+    )
+    for user_id, detail, created_at in result:
+        day = created_at - created_at % ROLLUP_PERIODS["day"]
+        if day != current_day:
+            flush()
+            current_day = day
+
+        entry = _usage_entry(detail)
+        if entry is None:
+            continue
+        model_id, features, measures = entry
+        for period, size in ROLLUP_PERIODS.items():
+            key = (period, created_at - created_at % size, user_id, model_id, features)
+            row = rows.setdefault(key, dict.fromkeys(measures, 0))
+            for name, value in measures.items():
+                row[name] += value
+        total += 1
+    flush()
+
+    log.info(f"Rolled up {total} credit usage logs")
+
+
+def upgrade() -> None:
+    op.create_table(
+        "credit_usage_rollup",
+        sa.Column("period", sa.String(), nullable=False),
+        sa.Column("bucket", sa.BigInteger(), nullable=False),
+        sa.Column("user_id", sa.String(), nullable=False),
+        sa.Column("model_id", sa.String(), nullable=False),
+        sa.Column("features", sa.String(), nullable=False),
+        sa.Column("requests", sa.BigInteger(), nullable=False),
+        sa.Column("prompt_tokens", sa.BigInteger(), nullable=False),
+        sa.Column("completion_tokens", sa.BigInteger(), nullable=False),
+        sa.Column("total_tokens", sa.BigInteger(), nullable=False),
+        sa.Column("total_price", sa.Numeric(precision=24, scale=12), nullable=False),
+        sa.Column("feature_price", sa.Numeric(precision=24, scale=12), nullable=False),
+        sa.Column("updated_at", sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint("period", "bucket", "user_id", "model_id", "features"),
+    )
+    op.create_index(
+        "credit_usage_rollup_period_bucket_idx",
+        "credit_usage_rollup",
+        ["period", "bucket"],
+    )
+
+    _backfill(op.get_bind())
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "credit_usage_rollup_period_bucket_idx", table_name="credit_usage_rollup"
+    )
+    op.drop_table("credit_usage_rollup")
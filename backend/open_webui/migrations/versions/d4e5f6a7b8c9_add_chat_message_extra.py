@@ -0,0 +1,235 @@
+"""Add extra column to chat_message and refresh rows from chat JSON
+
+Revision ID: d4e5f6a7b8c9
+Revises: b2c3d4e5f6a7
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+
+import json
+import logging
+import time
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+log = logging.getLogger(__name__)
+
+revision: str = "d4e5f6a7b8c9"
+down_revision: Union[str, None] = "b2c3d4e5f6a7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+# Keep in sync with open_webui.models.chat_messages.MESSAGE_COLUMN_KEYS
+MESSAGE_COLUMN_KEYS = {
+    "role",
+    "parentId",
+    "parent_id",
+    "content",
+    "output",
+    "model",
+    "model_id",
+    "files",
+    "sources",
+    "embeds",
+    "done",
+    "statusHistory",
+    "status_history",
+    "error",
+}
+
+chat_table = sa.table(
+    "chat",
+    sa.column("id", sa.Text()),
+    sa.column("user_id", sa.Text()),
+    sa.column("chat", sa.JSON()),
+)
+
+chat_message_table = sa.table(
+    "chat_message",
+    sa.column("id", sa.Text()),
+    sa.column("chat_id", sa.Text()),
+    sa.column("user_id", sa.Text()),
+    sa.column("role", sa.Text()),
+    sa.column("parent_id", sa.Text()),
+    sa.column("content", sa.JSON()),
+    sa.column("output", sa.JSON()),
+    sa.column("model_id", sa.Text()),
+    sa.column("files", sa.JSON()),
+    sa.column("sources", sa.JSON()),
+    sa.column("embeds", sa.JSON()),
+    sa.column("done", sa.Boolean()),
+    sa.column("status_history", sa.JSON()),
+    sa.column("error", sa.JSON()),
+    sa.column("usage", sa.JSON()),
+    sa.column("extra", sa.JSON()),
+    sa.column("created_at", sa.BigInteger()),
+    sa.column("updated_at", sa.BigInteger()),
+)
+
+
+def _load_chat(chat_data):
+    if isinstance(chat_data, str):
+        try:
+            return json.loads(chat_data)
+        except Exception:
+            return None
+    return chat_data
+
+
+def _normalize_timestamp(timestamp, now: int) -> int:
+    try:
+        timestamp = int(float(timestamp))
+    except Exception:
+        return now
+
+    if timestamp > 10_000_000_000:
+        timestamp = timestamp // 1000
+    if timestamp < 1577836800 or timestamp > now + 86400:
+        return now
+    return timestamp
+
+
+def _message_row(chat_id: str, user_id: str, message_id: str, message: dict, now):
+    usage = message.get("usage")
+    if not usage:
+        info = message.get("info", {})
+        usage = info.get("usage") if isinstance(info, dict) else None
+
+    timestamp = _normalize_timestamp(message.get("timestamp", now), now)
+    extra = {k: v for k, v in message.items() if k not in MESSAGE_COLUMN_KEYS}
+    return {
+        "id": f"{chat_id}-{message_id}",
+        "chat_id": chat_id,
+        "user_id": user_id,
+        "role": message["role"],
+        "parent_id": message.get("parentId"),
+        "content": message.get("content"),
+        "output": message.get("output"),
+        "model_id": message.get("model"),
+        "files": message.get("files"),
+        "sources": message.get("sources"),
+        "embeds": message.get("embeds"),
+        "done": message.get("done", True),
+        "status_history": message.get("statusHistory"),
+        "error": message.get("error"),
+        "usage": usage,
+        "extra": extra or None,
+        "created_at": timestamp,
+        "updated_at": timestamp,
+    }
+
+
+def _flush(conn, chat_ids: list, batch: list) -> int:
+    """Replace the rows of the given chats with the rebuilt batch."""
+    conn.execute(
+        sa.delete(chat_message_table).where(chat_message_table.c.chat_id.in_(chat_ids))
+    )
+    if batch:
+        conn.execute(sa.insert(chat_message_table), batch)
+    return len(batch)
+
+
+def upgrade() -> None:
+    op.add_column("chat_message", sa.Column("extra", sa.JSON(), nullable=True))
+
+    # Rebuild rows from the inline message maps so that every message key is
+    # kept and rows can serve as the primary storage. Chats without an inline
+    # map are already stored in chat_message and are left untouched.
+    conn = op.get_bind()
+    result = conn.execute(
+        sa.select(chat_table.c.id, chat_table.c.user_id, chat_table.c.chat)
+        .where(~chat_table.c.user_id.like("shared-%"))
+        .execution_options(yield_per=1000, stream_results=True)
+    )
+
+    now = int(time.time())
+    chat_ids = []
+    batch = []
+    total = 0
+
+    for chat_id, user_id, chat_data in result:
+        chat_data = _load_chat(chat_data)
+        if not isinstance(chat_data, dict):
+            continue
+
+        messages = chat_data.get("history", {}).get("messages")
+        if not messages:
+            continue
+
+        chat_ids.append(chat_id)
+        for message_id, message in messages.items():
+            if isinstance(message, dict) and message.get("role"):
+                batch.append(_message_row(chat_id, user_id, message_id, message, now))
+
+        # Only flush between chats so a chat is never half replaced
+        if len(batch) >= BATCH_SIZE or len(chat_ids) >= BATCH_SIZE:
+            total += _flush(conn, chat_ids, batch)
+            chat_ids, batch = [], []
+
+    if chat_ids:
+        total += _flush(conn, chat_ids, batch)
+
+    log.info(f"Refreshed {total} chat_message rows from chat history")
+
+
+def downgrade() -> None:
+    # Inline messages back into chats that were stored only in chat_message,
+    # since the keys kept in ``extra`` are lost with the column
+    conn = op.get_bind()
+    chats = conn.execute(
+        sa.select(chat_table.c.id, chat_table.c.chat).where(
+            ~chat_table.c.user_id.like("shared-%")
+        )
+    ).fetchall()
+
+    for chat_id, chat_data in chats:
+        chat_data = _load_chat(chat_data)
+        if not isinstance(chat_data, dict):
+            continue
+
+        history = chat_data.get("history")
+        if not isinstance(history, dict) or "messages" in history:
+            continue
+
+        rows = conn.execute(
+            sa.select(chat_message_table)
+            .where(chat_message_table.c.chat_id == chat_id)
+            .order_by(chat_message_table.c.created_at)
+        ).mappings()
+
+        messages = {}
+        for row in rows:
+            message_id = row["id"][len(chat_id) + 1 :]
+            message = {
+                **(row["extra"] or {}),
+                "id": message_id,
+                "parentId": row["parent_id"],
+                "role": row["role"],
+                "content": row["content"],
+                "done": row["done"],
+            }
+            for key, column in (
+                ("output", "output"),
+                ("model", "model_id"),
+                ("files", "files"),
+                ("sources", "sources"),
+                ("embeds", "embeds"),
+                ("statusHistory", "status_history"),
+                ("error", "error"),
+            ):
+                if row[column] is not None:
+                    message[key] = row[column]
+            messages[message_id] = message
+
+        chat_data["history"] = {**history, "messages": messages}
+        conn.execute(
+            sa.update(chat_table)
+            .where(chat_table.c.id == chat_id)
+            .values(chat=chat_data)
+        )
+
+    op.drop_column("chat_message", "extra")
@@ -0,0 +1,50 @@
+"""Add chat_message_hourly_count and backfill it from chat_message
+
+Revision ID: e5f6a7b8c9d0
+Revises: c1d2e3f4a5b6
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "e5f6a7b8c9d0"
+down_revision: Union[str, None] = "c1d2e3f4a5b6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Keep in sync with open_webui.models.chat_messages._get_bucket_column
+BUCKET_SQL = "(chat_message.created_at - chat_message.created_at % 3600)"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chat_message_hourly_count",
+        sa.Column("bucket", sa.BigInteger(), nullable=False),
+        sa.Column("model_id", sa.Text(), nullable=False),
+        sa.Column("user_id", sa.Text(), nullable=False),
+        sa.Column("count", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("bucket", "model_id", "user_id"),
+    )
+
+    op.get_bind().execute(
+        sa.text(f"""
+            INSERT INTO chat_message_hourly_count (bucket, model_id, user_id, count)
+            SELECT {BUCKET_SQL}, model_id, user_id, COUNT(*)
+            FROM chat_message
+            WHERE role = 'assistant'
+            AND model_id IS NOT NULL
+            AND user_id IS NOT NULL
+            AND user_id NOT LIKE :shared_pattern
+            AND created_at IS NOT NULL
+            GROUP BY {BUCKET_SQL}, model_id, user_id
+            """),
+        {"shared_pattern": "shared-%"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("chat_message_hourly_count")
@@ -4,6 +4,7 @@ import uuid
 from typing import Any, Optional
 
 from sqlalchemy.orm import Session
+from open_webui.env import ENABLE_CHAT_MESSAGE_HOURLY_COUNTS
 from open_webui.internal.db import Base, get_db_context
 
 from pydantic import BaseModel, ConfigDict
@@ -16,7 +17,12 @@ from sqlalchemy import (
     JSON,
     Index,
     func,
+    literal_column,
+    select,
+    tuple_,
 )
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 ####################
 # Helpers
@@ -41,6 +47,53 @@ def _normalize_timestamp(timestamp: int) -> float:
     return timestamp
 
 
+# Message keys kept in dedicated columns; everything else (childrenIds, info,
+# timestamp, annotations, ...) is stored in ``extra`` so rows can rebuild the
+# message exactly when chat_message is the primary storage
+MESSAGE_COLUMN_KEYS = {
+    "role",
+    "parentId",
+    "parent_id",
+    "content",
+    "output",
+    "model",
+    "model_id",
+    "files",
+    "sources",
+    "embeds",
+    "done",
+    "statusHistory",
+    "status_history",
+    "error",
+}
+
+
+def _message_to_columns(data: dict) -> dict:
+    """Map a chat history message onto chat_message column values."""
+    # Extract usage - check direct field first, then info.usage
+    usage = data.get("usage")
+    if not usage:
+        info = data.get("info", {})
+        usage = info.get("usage") if info else None
+
+    extra = {k: v for k, v in data.items() if k not in MESSAGE_COLUMN_KEYS}
+    return {
+        "role": data.get("role", "user"),
+        "parent_id": data.get("parent_id") or data.get("parentId"),
+        "content": data.get("content"),
+        "output": data.get("output"),
+        "model_id": data.get("model_id") or data.get("model"),
+        "files": data.get("files"),
+        "sources": data.get("sources"),
+        "embeds": data.get("embeds"),
+        "done": data.get("done", True),
+        "status_history": data.get("status_history") or data.get("statusHistory"),
+        "error": data.get("error"),
+        "usage": usage,
+        "extra": extra or None,
+    }
+
+
 ####################
 # ChatMessage DB Schema
 ####################
@@ -80,6 +133,9 @@ class ChatMessage(Base):
     # Usage (tokens, timing, etc.)
     usage = Column(JSON, nullable=True)
 
+    # Remaining message keys (childrenIds, info, timestamp, ...)
+    extra = Column(JSON, nullable=True)
+
     # Timestamps
     created_at = Column(BigInteger, index=True)
     updated_at = Column(BigInteger)
@@ -91,6 +147,123 @@ class ChatMessage(Base):
     )
 
 
+class ChatMessageHourlyCount(Base):
+    """Assistant messages per UTC hour, model and user (for analytics)."""
+
+    __tablename__ = "chat_message_hourly_count"
+
+    bucket = Column(BigInteger, primary_key=True)
+    model_id = Column(Text, primary_key=True)
+    user_id = Column(Text, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+
+
+# Buckets that local hours and days are made of: hours unless the server time
+# zone is offset from UTC by a fraction of an hour
+LOCAL_BUCKET_SIZE = 3600 if time.timezone % 3600 == time.altzone % 3600 == 0 else 900
+
+
+def _get_bucket_column(size: int):
+    # Millisecond timestamps (sent by some clients) fall into buckets of
+    # ``size`` milliseconds instead, e.g. 3.6 seconds for hours. Those still
+    # lie within one hour and _normalize_timestamp converts their start like
+    # the raw values, so they only add result rows
+    return literal_column(
+        f"(chat_message.created_at - chat_message.created_at % {int(size)})"
+    )
+
+
+def _is_counted_message(role, model_id, user_id) -> bool:
+    """Whether a message row is counted by the analytics endpoints."""
+    return (
+        role == "assistant"
+        and model_id is not None
+        and user_id is not None
+        and not user_id.startswith("shared-")
+    )
+
+
+def _get_counted_message_filters() -> list:
+    """``_is_counted_message`` as SQL criteria, for rows with a timestamp."""
+    return [
+        ChatMessage.role == "assistant",
+        ChatMessage.model_id.isnot(None),
+        ChatMessage.user_id.isnot(None),
+        ~ChatMessage.user_id.like("shared-%"),
+        ChatMessage.created_at.isnot(None),
+    ]
+
+
+def _get_hourly_count_key(message) -> Optional[tuple]:
+    """``(bucket, model_id, user_id)`` a message row is counted under, if any."""
+    if message.created_at is None or not _is_counted_message(
+        message.role, message.model_id, message.user_id
+    ):
+        return None
+    return (
+        message.created_at - message.created_at % 3600,
+        message.model_id,
+        message.user_id,
+    )
+
+
+def _update_hourly_counts(db: Session, counts: dict) -> None:
+    """
+    Add ``counts`` (``(bucket, model_id, user_id)`` -> change) to
+    ``chat_message_hourly_count`` in the caller's transaction.
+    """
+    counts = {key: count for key, count in counts.items() if count}
+    if not ENABLE_CHAT_MESSAGE_HOURLY_COUNTS or not counts:
+        return
+
+    values = [
+        {"bucket": bucket, "model_id": model_id, "user_id": user_id, "count": count}
+        for (bucket, model_id, user_id), count in sorted(counts.items())
+    ]
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+        query = insert(ChatMessageHourlyCount)
+        query = query.on_conflict_do_update(
+            index_elements=["bucket", "model_id", "user_id"],
+            set_={"count": ChatMessageHourlyCount.count + query.excluded.count},
+        )
+        db.execute(query, values)
+    else:
+        for value in values:
+            updated = (
+                db.query(ChatMessageHourlyCount)
+                .filter_by(
+                    bucket=value["bucket"],
+                    model_id=value["model_id"],
+                    user_id=value["user_id"],
+                )
+                .update(
+                    {"count": ChatMessageHourlyCount.count + value["count"]},
+                    synchronize_session=False,
+                )
+            )
+            if not updated:
+                db.add(ChatMessageHourlyCount(**value))
+
+    # drop the counters of hours whose messages were all deleted
+    decremented = [key for key, count in counts.items() if count < 0]
+    for idx in range(0, len(decremented), 500):
+        db.query(ChatMessageHourlyCount).filter(
+            tuple_(
+                ChatMessageHourlyCount.bucket,
+                ChatMessageHourlyCount.model_id,
+                ChatMessageHourlyCount.user_id,
+            ).in_(decremented[idx : idx + 500]),
+            ChatMessageHourlyCount.count <= 0,
+        ).delete(synchronize_session=False)
+
+
+def _add_hourly_count(counts: dict, key: Optional[tuple], count: int) -> None:
+    if key is not None:
+        counts[key] = counts.get(key, 0) + count
+
+
 ####################
 # Pydantic Models
 ####################
@@ -114,9 +287,37 @@ class ChatMessageModel(BaseModel):
     status_history: Optional[list] = None
     error: Optional[dict | str] = None
     usage: Optional[dict] = None
+    extra: Optional[dict] = None
     created_at: int
     updated_at: int
 
+    @property
+    def message_id(self) -> str:
+        return self.id[len(self.chat_id) + 1 :]
+
+    def to_message(self) -> dict:
+        """Rebuild the chat history message this row was written from."""
+        message = {
+            **(self.extra or {}),
+            "id": self.message_id,
+            "parentId": self.parent_id,
+            "role": self.role,
+            "content": self.content,
+            "done": self.done,
+        }
+        for key, value in (
+            ("output", self.output),
+            ("model", self.model_id),
+            ("files", self.files),
+            ("sources", self.sources),
+            ("embeds", self.embeds),
+            ("statusHistory", self.status_history),
+            ("error", self.error),
+        ):
+            if value is not None:
+                message[key] = value
+        return message
+
 
 ####################
 # Table Operations
@@ -143,9 +344,10 @@ class ChatMessageTable:
             existing = db.get(ChatMessage, composite_id)
             if existing:
                 # Update existing
+                previous_key = _get_hourly_count_key(existing)
                 if "role" in data:
                     existing.role = data["role"]
-                if "parent_id" in data:
+                if "parent_id" in data or "parentId" in data:
                     existing.parent_id = data.get("parent_id") or data.get("parentId")
                 if "content" in data:
                     existing.content = data.get("content")
@@ -174,38 +376,33 @@ class ChatMessageTable:
                     usage = info.get("usage") if info else None
                 if usage:
                     existing.usage = usage
+                extra = {k: v for k, v in data.items() if k not in MESSAGE_COLUMN_KEYS}
+                if extra:
+                    existing.extra = {**(existing.extra or {}), **extra}
                 existing.updated_at = now
+                key = _get_hourly_count_key(existing)
+                if key != previous_key:
+                    counts = {}
+                    _add_hourly_count(counts, previous_key, -1)
+                    _add_hourly_count(counts, key, 1)
+                    _update_hourly_counts(db, counts)
                 db.commit()
                 db.refresh(existing)
                 return ChatMessageModel.model_validate(existing)
             else:
                 # Insert new
-                # Extract usage - check direct field first, then info.usage
-                usage = data.get("usage")
-                if not usage:
-                    info = data.get("info", {})
-                    usage = info.get("usage") if info else None
                 message = ChatMessage(
                     id=composite_id,
                     chat_id=chat_id,
                     user_id=user_id,
-                    role=data.get("role", "user"),
-                    parent_id=data.get("parent_id") or data.get("parentId"),
-                    content=data.get("content"),
-                    output=data.get("output"),
-                    model_id=data.get("model_id") or data.get("model"),
-                    files=data.get("files"),
-                    sources=data.get("sources"),
-                    embeds=data.get("embeds"),
-                    done=data.get("done", True),
-                    status_history=data.get("status_history")
-                    or data.get("statusHistory"),
-                    error=data.get("error"),
-                    usage=usage,
+                    **_message_to_columns(data),
                     created_at=timestamp,
                     updated_at=now,
                 )
                 db.add(message)
+                key = _get_hourly_count_key(message)
+                if key is not None:
+                    _update_hourly_counts(db, {key: 1})
                 db.commit()
                 db.refresh(message)
                 return ChatMessageModel.model_validate(message)
@@ -229,6 +426,98 @@ class ChatMessageTable:
             )
             return [ChatMessageModel.model_validate(message) for message in messages]
 
+    def get_messages_map_by_chat_ids(
+        self, chat_ids: list[str], db: Optional[Session] = None
+    ) -> dict[str, dict]:
+        """Rebuild ``history.messages`` for each chat in one query."""
+        if not chat_ids:
+            return {}
+        with get_db_context(db) as db:
+            messages = (
+                db.query(ChatMessage)
+                .filter(ChatMessage.chat_id.in_(chat_ids))
+                .order_by(ChatMessage.created_at.asc())
+                .all()
+            )
+            result = {chat_id: {} for chat_id in chat_ids}
+            for message in messages:
+                message = ChatMessageModel.model_validate(message)
+                result[message.chat_id][message.message_id] = message.to_message()
+            return result
+
+    def sync_messages(
+        self,
+        chat_id: str,
+        user_id: str,
+        messages: dict,
+        db: Optional[Session] = None,
+    ) -> None:
+        """
+        Make the chat's rows match a full ``history.messages`` map.
+
+        Only rows whose values changed are written, and rows for messages
+        that are no longer in the map are deleted.
+        """
+        with get_db_context(db) as db:
+            self.write_messages(db, chat_id, user_id, messages)
+            db.commit()
+
+    def write_messages(
+        self, db: Session, chat_id: str, user_id: str, messages: dict
+    ) -> None:
+        """
+        Like ``sync_messages``, but in the caller's transaction, so the rows
+        can be committed together with the chat row.
+        """
+        now = int(time.time())
+        existing = {
+            message.id: message
+            for message in db.query(ChatMessage).filter_by(chat_id=chat_id)
+        }
+
+        counts = {}
+        for message_id, data in messages.items():
+            if not isinstance(data, dict) or not data.get("role"):
+                continue
+
+            composite_id = f"{chat_id}-{message_id}"
+            values = _message_to_columns(data)
+            message = existing.pop(composite_id, None)
+            if message is None:
+                message = ChatMessage(
+                    id=composite_id,
+                    chat_id=chat_id,
+                    user_id=user_id,
+                    **values,
+                    created_at=data.get("timestamp", now),
+                    updated_at=now,
+                )
+                db.add(message)
+                _add_hourly_count(counts, _get_hourly_count_key(message), 1)
+                continue
+
+            previous_key = _get_hourly_count_key(message)
+            changed = False
+            for key, value in values.items():
+                if getattr(message, key) != value:
+                    setattr(message, key, value)
+                    changed = True
+            if changed:
+                message.updated_at = now
+                key = _get_hourly_count_key(message)
+                if key != previous_key:
+                    _add_hourly_count(counts, previous_key, -1)
+                    _add_hourly_count(counts, key, 1)
+
+        for message in existing.values():
+            _add_hourly_count(counts, _get_hourly_count_key(message), -1)
+        _update_hourly_counts(db, counts)
+
+        if existing:
+            db.query(ChatMessage).filter(
+                ChatMessage.id.in_(list(existing.keys()))
+            ).delete(synchronize_session=False)
+
     def get_messages_by_user_id(
         self,
         user_id: str,
@@ -303,14 +592,62 @@ class ChatMessageTable:
             )
             return [chat_id for chat_id, _ in chat_ids]
 
+    def delete_messages(
+        self, db: Session, *criteria, synchronize_session="auto"
+    ) -> int:
+        """
+        Delete the rows matching ``criteria`` in the caller's transaction and
+        take them out of ``chat_message_hourly_count``.
+        """
+        query = db.query(ChatMessage).filter(*criteria)
+        if ENABLE_CHAT_MESSAGE_HOURLY_COUNTS:
+            bucket = _get_bucket_column(3600)
+            rows = (
+                query.filter(*_get_counted_message_filters())
+                .with_entities(
+                    bucket, ChatMessage.model_id, ChatMessage.user_id, func.count()
+                )
+                .group_by(bucket, ChatMessage.model_id, ChatMessage.user_id)
+            )
+            _update_hourly_counts(
+                db,
+                {
+                    (int(bucket), model_id, user_id): -count
+                    for bucket, model_id, user_id, count in rows
+                },
+            )
+        return query.delete(synchronize_session=synchronize_session)
+
     def delete_messages_by_chat_id(
         self, chat_id: str, db: Optional[Session] = None
     ) -> bool:
         with get_db_context(db) as db:
-            db.query(ChatMessage).filter_by(chat_id=chat_id).delete()
+            self.delete_messages(db, ChatMessage.chat_id == chat_id)
             db.commit()
             return True
 
+    def rebuild_hourly_counts(self) -> int:
+        """
+        Recompute ``chat_message_hourly_count`` from ``chat_message``, e.g.
+        after ENABLE_CHAT_MESSAGE_HOURLY_COUNTS was off for a while. Returns
+        the number of counters written.
+        """
+        bucket = _get_bucket_column(3600)
+        counted = (
+            select(bucket, ChatMessage.model_id, ChatMessage.user_id, func.count())
+            .where(*_get_counted_message_filters())
+            .group_by(bucket, ChatMessage.model_id, ChatMessage.user_id)
+        )
+        with get_db_context() as db:
+            db.query(ChatMessageHourlyCount).delete(synchronize_session=False)
+            db.execute(
+                ChatMessageHourlyCount.__table__.insert().from_select(
+                    ["bucket", "model_id", "user_id", "count"], counted
+                )
+            )
+            db.commit()
+            return db.query(ChatMessageHourlyCount).count()
+
     # Analytics methods
     def get_message_count_by_model(
         self,
@@ -546,61 +883,126 @@ class ChatMessageTable:
             results = query.group_by(ChatMessage.chat_id).all()
             return {row.chat_id: row.count for row in results}
 
-    def get_daily_message_counts_by_model(
+    def _get_message_counts_by_bucket(
         self,
+        db: Session,
         start_date: Optional[int] = None,
         end_date: Optional[int] = None,
         group_id: Optional[str] = None,
-        db: Optional[Session] = None,
+    ) -> list[tuple[int, str, int]]:
+        """
+        ``(bucket start, model_id, count)`` of assistant messages in
+        ``LOCAL_BUCKET_SIZE`` buckets, grouped in SQL. With
+        ENABLE_CHAT_MESSAGE_HOURLY_COUNTS whole hours are read from
+        ``chat_message_hourly_count`` and only the partial hours at either end
+        from ``chat_message``.
+        """
+        from open_webui.models.groups import GroupMember
+
+        group_users = (
+            db.query(GroupMember.user_id)
+            .filter(GroupMember.group_id == group_id)
+            .subquery()
+            if group_id
+            else None
+        )
+
+        def count_messages(start: Optional[int], end: Optional[int]):
+            # end is inclusive like the other analytics queries
+            bucket = _get_bucket_column(LOCAL_BUCKET_SIZE)
+            query = db.query(bucket, ChatMessage.model_id, func.count()).filter(
+                *_get_counted_message_filters()
+            )
+            if start:
+                query = query.filter(ChatMessage.created_at >= start)
+            if end:
+                query = query.filter(ChatMessage.created_at <= end)
+            if group_users is not None:
+                query = query.filter(ChatMessage.user_id.in_(group_users))
+            return query.group_by(bucket, ChatMessage.model_id).all()
+
+        if not ENABLE_CHAT_MESSAGE_HOURLY_COUNTS or LOCAL_BUCKET_SIZE != 3600:
+            return count_messages(start_date, end_date)
+
+        hour_start = -(-start_date // 3600) * 3600 if start_date else None
+        hour_end = (end_date + 1) // 3600 * 3600 if end_date else None
+        if hour_start is not None and hour_end is not None and hour_start >= hour_end:
+            return count_messages(start_date, end_date)
+
+        query = db.query(
+            ChatMessageHourlyCount.bucket,
+            ChatMessageHourlyCount.model_id,
+            func.sum(ChatMessageHourlyCount.count),
+        )
+        if hour_start is not None:
+            query = query.filter(ChatMessageHourlyCount.bucket >= hour_start)
+        if hour_end is not None:
+            query = query.filter(ChatMessageHourlyCount.bucket < hour_end)
+        if group_users is not None:
+            query = query.filter(ChatMessageHourlyCount.user_id.in_(group_users))
+        results = query.group_by(
+            ChatMessageHourlyCount.bucket, ChatMessageHourlyCount.model_id
+        ).all()
+
+        if hour_start is not None and start_date < hour_start:
+            results += count_messages(start_date, hour_start - 1)
+        if hour_end is not None and hour_end <= end_date:
+            results += count_messages(hour_end, end_date)
+        return results
+
+    def _get_message_counts_by_period(
+        self,
+        format: str,
+        step: "timedelta",
+        start_date: Optional[int],
+        end_date: Optional[int],
+        group_id: Optional[str],
+        db: Optional[Session],
     ) -> dict[str, dict[str, int]]:
-        """Get message counts grouped by day and model."""
-        with get_db_context(db) as db:
-            from datetime import datetime, timedelta
-            from open_webui.models.groups import GroupMember
+        from datetime import datetime
 
-            query = db.query(ChatMessage.created_at, ChatMessage.model_id).filter(
-                ChatMessage.role == "assistant",
-                ChatMessage.model_id.isnot(None),
-                ~ChatMessage.user_id.like("shared-%"),
+        with get_db_context(db) as db:
+            results = self._get_message_counts_by_bucket(
+                db, start_date=start_date, end_date=end_date, group_id=group_id
             )
 
-            if start_date:
-                query = query.filter(ChatMessage.created_at >= start_date)
-            if end_date:
-                query = query.filter(ChatMessage.created_at <= end_date)
-            if group_id:
-                group_users = (
-                    db.query(GroupMember.user_id)
-                    .filter(GroupMember.group_id == group_id)
-                    .subquery()
-                )
-                query = query.filter(ChatMessage.user_id.in_(group_users))
-
-            results = query.all()
-
-            # Group by date -> model -> count
-            daily_counts: dict[str, dict[str, int]] = {}
-            for timestamp, model_id in results:
-                date_str = datetime.fromtimestamp(
-                    _normalize_timestamp(timestamp)
-                ).strftime("%Y-%m-%d")
-                if date_str not in daily_counts:
-                    daily_counts[date_str] = {}
-                daily_counts[date_str][model_id] = (
-                    daily_counts[date_str].get(model_id, 0) + 1
-                )
+        # Group by period -> model -> count
+        counts: dict[str, dict[str, int]] = {}
+        for bucket, model_id, count in results:
+            key = datetime.fromtimestamp(_normalize_timestamp(int(bucket))).strftime(
+                format
+            )
+            if key not in counts:
+                counts[key] = {}
+            counts[key][model_id] = counts[key].get(model_id, 0) + int(count)
+
+        # Fill in missing periods
+        if start_date and end_date:
+            current = datetime.fromtimestamp(_normalize_timestamp(start_date))
+            if step.days == 0:
+                current = current.replace(minute=0, second=0, microsecond=0)
+            end_dt = datetime.fromtimestamp(_normalize_timestamp(end_date))
+            while current <= end_dt:
+                key = current.strftime(format)
+                if key not in counts:
+                    counts[key] = {}
+                current += step
+
+        return counts
 
-            # Fill in missing days
-            if start_date and end_date:
-                current = datetime.fromtimestamp(_normalize_timestamp(start_date))
-                end_dt = datetime.fromtimestamp(_normalize_timestamp(end_date))
-                while current <= end_dt:
-                    date_str = current.strftime("%Y-%m-%d")
-                    if date_str not in daily_counts:
-                        daily_counts[date_str] = {}
-                    current += timedelta(days=1)
+    def get_daily_message_counts_by_model(
+        self,
+        start_date: Optional[int] = None,
+        end_date: Optional[int] = None,
+        group_id: Optional[str] = None,
+        db: Optional[Session] = None,
+    ) -> dict[str, dict[str, int]]:
+        """Get message counts grouped by day and model."""
+        from datetime import timedelta
 
-            return daily_counts
+        return self._get_message_counts_by_period(
+            "%Y-%m-%d", timedelta(days=1), start_date, end_date, group_id, db
+        )
 
     def get_hourly_message_counts_by_model(
         self,
@@ -609,47 +1011,11 @@ class ChatMessageTable:
         db: Optional[Session] = None,
     ) -> dict[str, dict[str, int]]:
         """Get message counts grouped by hour and model."""
-        with get_db_context(db) as db:
-            from datetime import datetime, timedelta
-
-            query = db.query(ChatMessage.created_at, ChatMessage.model_id).filter(
-                ChatMessage.role == "assistant",
-                ChatMessage.model_id.isnot(None),
-                ~ChatMessage.user_id.like("shared-%"),
-            )
-
-            if start_date:
-                query = query.filter(ChatMessage.created_at >= start_date)
-            if end_date:
-                query = query.filter(ChatMessage.created_at <= end_date)
-
-            results = query.all()
-
-            # Group by hour -> model -> count
-            hourly_counts: dict[str, dict[str, int]] = {}
-            for timestamp, model_id in results:
-                hour_str = datetime.fromtimestamp(
-                    _normalize_timestamp(timestamp)
-                ).strftime("%Y-%m-%d %H:00")
-                if hour_str not in hourly_counts:
-                    hourly_counts[hour_str] = {}
-                hourly_counts[hour_str][model_id] = (
-                    hourly_counts[hour_str].get(model_id, 0) + 1
-                )
+        from datetime import timedelta
 
-            # Fill in missing hours
-            if start_date and end_date:
-                current = datetime.fromtimestamp(
-                    _normalize_timestamp(start_date)
-                ).replace(minute=0, second=0, microsecond=0)
-                end_dt = datetime.fromtimestamp(_normalize_timestamp(end_date))
-                while current <= end_dt:
-                    hour_str = current.strftime("%Y-%m-%d %H:00")
-                    if hour_str not in hourly_counts:
-                        hourly_counts[hour_str] = {}
-                    current += timedelta(hours=1)
-
-            return hourly_counts
+        return self._get_message_counts_by_period(
+            "%Y-%m-%d %H:00", timedelta(hours=1), start_date, end_date, None, db
+        )
 
 
 ChatMessages = ChatMessageTable()
@@ -0,0 +1,330 @@
+import logging
+import re
+from typing import Optional
+
+from sqlalchemy import Float, String, column, delete, inspect, table, text
+from sqlalchemy.orm import Session
+
+from open_webui.env import ENABLE_CHAT_SEARCH_INDEX
+from open_webui.internal.db import get_db_context
+
+log = logging.getLogger(__name__)
+
+####################
+# Chat search index
+#
+# One document per chat title (id = chat_id) and per message
+# (id = {chat_id}-{message_id}), so a message write only touches its own row.
+#   SQLite:     chat_search + external-content FTS5 table chat_search_fts
+#               (trigram tokenizer, substring matching like the LIKE search)
+#   PostgreSQL: chat_search with a generated tsvector column and GIN index
+# Tables are created by migration 9a8b7c6d5e4f.
+####################
+
+chat_search_table = table(
+    "chat_search",
+    column("id", String),
+    column("chat_id", String),
+    column("user_id", String),
+    column("title", String),
+    column("content", String),
+)
+
+UPSERT_DOCUMENT_SQL = text("""
+    INSERT INTO chat_search (id, chat_id, user_id, title, content)
+    VALUES (:id, :chat_id, :user_id, :title, :content)
+    ON CONFLICT (id) DO UPDATE SET
+        user_id = excluded.user_id,
+        title = excluded.title,
+        content = excluded.content
+    """)
+
+# trigram tokens need at least three characters
+SQLITE_MIN_MATCH_LENGTH = 3
+
+# tsvector's simple parser does not split CJK runs into words
+CJK_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af\uf900-\ufaff]")
+
+# words as split by tsvector's default parser (underscores separate words)
+TSQUERY_WORD_PATTERN = re.compile(r"[^\W_]+")
+
+
+def get_prefix_tsquery(search_text: str) -> str:
+    """
+    A to_tsquery() phrase of the words in ``search_text`` where every word
+    also matches as a prefix, so "hel wor" finds "hello world" like the LIKE
+    search did. Empty if there are no words.
+    """
+    return " <-> ".join(
+        f"'{word}':*" for word in TSQUERY_WORD_PATTERN.findall(search_text)
+    )
+
+
+def get_message_text(message: dict) -> str:
+    content = message.get("content")
+    if isinstance(content, list):
+        content = " ".join(
+            block["text"]
+            for block in content
+            if isinstance(block, dict) and isinstance(block.get("text"), str)
+        )
+    if not isinstance(content, str):
+        return ""
+    return content.replace("\x00", "")
+
+
+class ChatSearchTable:
+    def __init__(self):
+        self._available = {}
+
+    def is_available(self, db: Session) -> bool:
+        if not ENABLE_CHAT_SEARCH_INDEX:
+            return False
+
+        bind = db.get_bind()
+        available = self._available.get(bind.url)
+        if available is None:
+            dialect = bind.dialect.name
+            if dialect == "sqlite":
+                available = inspect(bind).has_table("chat_search_fts")
+            elif dialect == "postgresql":
+                available = inspect(bind).has_table("chat_search")
+            else:
+                available = False
+            self._available[bind.url] = available
+        return available
+
+    def _documents(
+        self, chat_id: str, user_id: str, title: str, messages: dict
+    ) -> dict[str, dict]:
+        documents = {
+            chat_id: {
+                "id": chat_id,
+                "chat_id": chat_id,
+                "user_id": user_id,
+                "title": (title or "").replace("\x00", ""),
+                "content": "",
+            }
+        }
+        for message_id, message in (messages or {}).items():
+            if not isinstance(message, dict):
+                continue
+            content = get_message_text(message)
+            if content:
+                documents[f"{chat_id}-{message_id}"] = {
+                    "id": f"{chat_id}-{message_id}",
+                    "chat_id": chat_id,
+                    "user_id": user_id,
+                    "title": "",
+                    "content": content,
+                }
+        return documents
+
+    def index_chat(
+        self,
+        chat_id: str,
+        user_id: str,
+        title: str,
+        messages: Optional[dict],
+        db: Optional[Session] = None,
+    ) -> None:
+        """Make the chat's documents match its title and message map."""
+        with get_db_context(db) as db:
+            if not self.is_available(db):
+                return
+
+            documents = self._documents(chat_id, user_id, title, messages)
+            existing = {
+                row.id: (row.user_id, row.title, row.content)
+                for row in db.execute(
+                    text(
+                        "SELECT id, user_id, title, content FROM chat_search "
+                        "WHERE chat_id = :chat_id"
+                    ),
+                    {"chat_id": chat_id},
+                )
+            }
+
+            changed = [
+                document
+                for id, document in documents.items()
+                if existing.get(id)
+                != (document["user_id"], document["title"], document["content"])
+            ]
+            # without a message map only the title document is updated
+            removed = (
+                [id for id in existing if id not in documents]
+                if messages is not None
+                else []
+            )
+
+            if changed:
+                db.execute(UPSERT_DOCUMENT_SQL, changed)
+            if removed:
+                db.execute(
+                    delete(chat_search_table).where(chat_search_table.c.id.in_(removed))
+                )
+            db.commit()
+
+    def index_message(
+        self,
+        chat_id: str,
+        user_id: str,
+        message_id: str,
+        message: dict,
+        db: Optional[Session] = None,
+    ) -> None:
+        if "content" not in message:
+            return
+
+        with get_db_context(db) as db:
+            if not self.is_available(db):
+                return
+
+            content = get_message_text(message)
+            if content:
+                db.execute(
+                    UPSERT_DOCUMENT_SQL,
+                    {
+                        "id": f"{chat_id}-{message_id}",
+                        "chat_id": chat_id,
+                        "user_id": user_id,
+                        "title": "",
+                        "content": content,
+                    },
+                )
+            else:
+                db.execute(
+                    delete(chat_search_table).where(
+                        chat_search_table.c.id == f"{chat_id}-{message_id}"
+                    )
+                )
+            db.commit()
+
+    def delete_by_chat_ids(
+        self,
+        chat_ids,
+        user_id: Optional[str] = None,
+        db: Optional[Session] = None,
+    ) -> None:
+        """``chat_ids`` may be a list or a subquery of chat ids."""
+        with get_db_context(db) as db:
+            if not self.is_available(db):
+                return
+            query = delete(chat_search_table).where(
+                chat_search_table.c.chat_id.in_(chat_ids)
+            )
+            if user_id:
+                query = query.where(chat_search_table.c.user_id == user_id)
+            db.execute(query)
+            db.commit()
+
+    def delete_by_user_id(self, user_id: str, db: Optional[Session] = None) -> None:
+        with get_db_context(db) as db:
+            if not self.is_available(db):
+                return
+            db.execute(
+                delete(chat_search_table).where(chat_search_table.c.user_id == user_id)
+            )
+            db.commit()
+
+    def get_match_subquery(self, user_id: str, search_text: str, db: Session):
+        """
+        Chats of ``user_id`` whose title or messages contain ``search_text``,
+        as a ``(chat_id, rank)`` subquery where a higher rank is a better match.
+        """
+        dialect = db.bind.dialect.name
+        params = {"search_user_id": user_id}
+        tsquery = (
+            get_prefix_tsquery(search_text)
+            if dialect == "postgresql" and not CJK_PATTERN.search(search_text)
+            else ""
+        )
+
+        if dialect == "sqlite" and len(search_text) >= SQLITE_MIN_MATCH_LENGTH:
+            # The rank column is bm25() (lower is better) with titles weighing
+            # 10x; unlike bm25() itself it can be aggregated
+            sql = """
+                SELECT s.chat_id AS chat_id, -MIN(chat_search_fts.rank) AS rank
+                FROM chat_search_fts
+                JOIN chat_search AS s ON s.rowid = chat_search_fts.rowid
+                WHERE chat_search_fts MATCH :search_query
+                AND chat_search_fts.rank MATCH 'bm25(10.0, 1.0)'
+                AND s.user_id = :search_user_id
+                GROUP BY s.chat_id
+            """
+            # a quoted string is matched as a substring by the trigram tokenizer
+            params["search_query"] = '"' + search_text.replace('"', '""') + '"'
+        elif tsquery:
+            sql = """
+                SELECT s.chat_id AS chat_id,
+                       MAX(ts_rank_cd(s.document, query)) AS rank
+                FROM chat_search AS s,
+                     to_tsquery('simple', :search_query) AS query
+                WHERE s.user_id = :search_user_id
+                AND s.document @@ query
+                GROUP BY s.chat_id
+            """
+            params["search_query"] = tsquery
+        else:
+            # Short, CJK or wordless queries: substring scan of the user's documents
+            sql = """
+                SELECT s.chat_id AS chat_id, MAX(
+                    CASE WHEN LOWER(s.title) LIKE :search_pattern THEN 1.0 ELSE 0.0 END
+                ) AS rank
+                FROM chat_search AS s
+                WHERE s.user_id = :search_user_id
+                AND (
+                    LOWER(s.title) LIKE :search_pattern
+                    OR LOWER(s.content) LIKE :search_pattern
+                )
+                GROUP BY s.chat_id
+            """
+            params["search_pattern"] = f"%{search_text.lower()}%"
+
+        return (
+            text(sql)
+            .bindparams(**params)
+            .columns(column("chat_id", String), column("rank", Float))
+            .subquery("chat_search_match")
+        )
+
+    def reindex(self, user_id: Optional[str] = None, batch_size: int = 500) -> int:
+        """Rebuild the documents of every chat, or of one user's chats."""
+        from open_webui.models.chats import Chat, Chats
+
+        total = 0
+        with get_db_context() as db:
+            if not self.is_available(db):
+                raise RuntimeError("Chat search index is not available")
+
+            query = db.query(Chat.id).filter(~Chat.user_id.like("shared-%"))
+            if user_id:
+                query = query.filter(Chat.user_id == user_id)
+            chat_ids = [chat_id for (chat_id,) in query.order_by(Chat.id)]
+
+            if user_id:
+                self.delete_by_user_id(user_id, db=db)
+            else:
+                db.execute(delete(chat_search_table))
+                db.commit()
+
+            for idx in range(0, len(chat_ids), batch_size):
+                batch = db.query(Chat).filter(
+                    Chat.id.in_(chat_ids[idx : idx + batch_size])
+                )
+                for chat in Chats._to_chat_models(batch.all(), db=db):
+                    self.index_chat(
+                        chat.id,
+                        chat.user_id,
+                        chat.title,
+                        chat.chat.get("history", {}).get("messages", {}),
+                        db=db,
+                    )
+                    total += 1
+                db.expunge_all()
+                log.info(f"Reindexed {total}/{len(chat_ids)} chats")
+        return total
+
+
+ChatSearch = ChatSearchTable()
@@ -5,10 +5,12 @@ import uuid
 from typing import Optional
 
 from sqlalchemy.orm import Session
+from open_webui.env import ENABLE_CHAT_MESSAGE_PRIMARY_STORAGE
 from open_webui.internal.db import Base, JSONField, get_db, get_db_context
 from open_webui.models.tags import TagModel, Tag, Tags
 from open_webui.models.folders import Folders
 from open_webui.models.chat_messages import ChatMessage, ChatMessages
+from open_webui.models.chat_search import ChatSearch
 from open_webui.utils.misc import sanitize_data_for_db, sanitize_text_for_db
 
 from pydantic import BaseModel, ConfigDict
@@ -290,6 +292,79 @@ class ChatTable:
 
         return changed
 
+    def _split_message_map(self, chat: dict) -> tuple[dict, Optional[dict]]:
+        """
+        Split the message map off a chat for primary chat_message storage.
+
+        Returns the chat JSON to store, without ``history.messages`` and the
+        derived ``messages`` list, and the message map (``None`` when the chat
+        carries no message map to sync). The missing ``history.messages`` key
+        marks the chat as stored in rows; an empty map stays an inline chat.
+        """
+        history = chat.get("history")
+        if not isinstance(history, dict) or "messages" not in history:
+            return chat, None
+
+        stored = {k: v for k, v in chat.items() if k != "messages"}
+        stored["history"] = {k: v for k, v in history.items() if k != "messages"}
+        return stored, history["messages"] or {}
+
+    def _is_stored_in_rows(self, chat: Optional[dict]) -> bool:
+        history = (chat or {}).get("history")
+        return isinstance(history, dict) and "messages" not in history
+
+    def _messages_list(self, messages: dict, message_id: Optional[str]) -> list:
+        """Walk from ``message_id`` up to the root, like createMessagesList."""
+        result = []
+        while message_id in messages and len(result) < len(messages):
+            result.append(messages[message_id])
+            message_id = messages[message_id].get("parentId")
+        return result[::-1]
+
+    def _to_chat_models(
+        self, chat_items: list, db: Optional[Session] = None
+    ) -> list[ChatModel]:
+        """
+        Validate chat rows, assembling ``history.messages`` from chat_message
+        for chats stored without an inline message map. Chats whose inline map
+        is empty are left alone, as rows dual-written before it was emptied
+        may still exist.
+        """
+        chats = [ChatModel.model_validate(chat_item) for chat_item in chat_items]
+
+        chat_ids = [chat.id for chat in chats if self._is_stored_in_rows(chat.chat)]
+        if not chat_ids:
+            return chats
+
+        messages_map = ChatMessages.get_messages_map_by_chat_ids(chat_ids, db=db)
+        for chat in chats:
+            if chat.id not in messages_map:
+                continue
+
+            messages = messages_map.get(chat.id, {})
+            history = {**chat.chat["history"], "messages": messages}
+            chat.chat = {
+                "messages": self._messages_list(messages, history.get("currentId")),
+                **chat.chat,
+                "history": history,
+            }
+        return chats
+
+    def _to_chat_model(self, chat_item, db: Optional[Session] = None) -> ChatModel:
+        return self._to_chat_models([chat_item], db=db)[0]
+
+    def _index_chat(self, chat: ChatModel, db: Optional[Session] = None) -> None:
+        try:
+            ChatSearch.index_chat(
+                chat.id,
+                chat.user_id,
+                chat.title,
+                chat.chat.get("history", {}).get("messages"),
+                db=db,
+            )
+        except Exception as e:
+            log.warning(f"Failed to update search index for chat {chat.id}: {e}")
+
     def insert_new_chat(
         self, user_id: str, form_data: ChatForm, db: Optional[Session] = None
     ) -> Optional[ChatModel]:
@@ -312,10 +387,22 @@ class ChatTable:
             )
 
             chat_item = Chat(**chat.model_dump())
+            if ENABLE_CHAT_MESSAGE_PRIMARY_STORAGE:
+                chat_item.chat, messages = self._split_message_map(chat.chat)
+                db.add(chat_item)
+                if messages is not None:
+                    ChatMessages.write_messages(db, id, user_id, messages)
+                db.commit()
+
+                self._index_chat(chat, db=db)
+                return chat
+
             db.add(chat_item)
             db.commit()
             db.refresh(chat_item)
 
+            self._index_chat(chat, db=db)
+
             # Dual-write initial messages to chat_message table
             try:
                 history = form_data.chat.get("history", {})
@@ -368,14 +455,28 @@ class ChatTable:
     ) -> list[ChatModel]:
         with get_db_context(db) as db:
             chats = []
+            chat_models = []
 
             for form_data in chat_import_forms:
                 chat = self._chat_import_form_to_chat_model(user_id, form_data)
-                chats.append(Chat(**chat.model_dump()))
+                chat_item = Chat(**chat.model_dump())
+                if ENABLE_CHAT_MESSAGE_PRIMARY_STORAGE:
+                    chat_item.chat, messages = self._split_message_map(chat.chat)
+                    db.add(chat_item)
+                    if messages is not None:
+                        ChatMessages.write_messages(db, chat.id, user_id, messages)
+                chats.append(chat_item)
+                chat_models.append(chat)
 
             db.add_all(chats)
             db.commit()
 
+            for chat in chat_models:
+                self._index_chat(chat, db=db)
+
+            if ENABLE_CHAT_MESSAGE_PRIMARY_STORAGE:
+                return chat_models
+
             # Dual-write messages to chat_message table
             try:
                 for form_data, chat_obj in zip(chat_import_forms, chats):
@@ -402,7 +503,13 @@ class ChatTable:
         try:
             with get_db_context(db) as db:
                 chat_item = db.get(Chat, id)
-                chat_item.chat = self._clean_null_bytes(chat)
+                chat = self._clean_null_bytes(chat)
+                if ENABLE_CHAT_MESSAGE_PRIMARY_STORAGE:
+                    chat_item.chat, messages = self._split_message_map(chat)
+                    if messages is not None:
+                        ChatMessages.write_messages(db, id, chat_item.user_id, messages)
+                else:
+                    chat_item.chat = chat
                 chat_item.title = (
                     self._clean_null_bytes(chat["title"])
                     if "title" in chat
@@ -414,7 +521,11 @@ class ChatTable:
                 db.commit()
                 db.refresh(chat_item)
 
-                return ChatModel.model_validate(chat_item)
+                chat = ChatModel.model_validate(chat_item).model_copy(
+                    update={"chat": chat}
+                )
+                self._index_chat(chat, db=db)
+                return chat
         except Exception:
             return None
 
@@ -453,7 +564,7 @@ class ChatTable:
             if removed:
                 self.delete_orphan_tags_for_user(list(removed), user.id, db=db)
 
-            return ChatModel.model_validate(chat)
+            return self._to_chat_model(chat, db=db)
 
     def get_chat_title_by_id(self, id: str) -> Optional[str]:
         with get_db_context() as db:
@@ -472,23 +583,90 @@ class ChatTable:
     def get_message_by_id_and_message_id(
         self, id: str, message_id: str
     ) -> Optional[dict]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
-            return None
+        with get_db_context() as db:
+            result = db.query(Chat.chat).filter_by(id=id).first()
+            if result is None:
+                return None
 
-        return chat.chat.get("history", {}).get("messages", {}).get(message_id, {})
+            if not self._is_stored_in_rows(result[0]):
+                messages = (result[0] or {}).get("history", {}).get("messages")
+                return (messages or {}).get(message_id, {})
 
-    def upsert_message_to_chat_by_id_and_message_id(
-        self, id: str, message_id: str, message: dict
+            message = ChatMessages.get_message_by_id(f"{id}-{message_id}", db=db)
+            return message.to_message() if message else {}
+
+    def _upsert_message_row(
+        self,
+        id: str,
+        message_id: str,
+        message: dict,
+        set_current: bool = True,
+        db: Optional[Session] = None,
     ) -> Optional[ChatModel]:
-        chat = self.get_chat_by_id(id)
-        if chat is None:
-            return None
+        """
+        Write a single message to chat_message and only touch
+        ``history.currentId`` on the chat row, so the cost of an update no
+        longer grows with the size of the chat.
+        """
+        with get_db_context(db) as db:
+            chat_item = db.get(Chat, id)
+            if chat_item is None:
+                return None
+
+            chat = chat_item.chat or {}
+            history = chat.get("history", {})
+
+            if not self._is_stored_in_rows(chat):
+                # First write to a chat still stored inline: move it to rows
+                messages = dict(history.get("messages") or {})
+                messages[message_id] = {**messages.get(message_id, {}), **message}
+                history = {**history, "messages": messages}
+                if set_current:
+                    history["currentId"] = message_id
+                return self.update_chat_by_id(id, {**chat, "history": history}, db=db)
+
+            ChatMessages.upsert_message(
+                message_id=message_id,
+                chat_id=id,
+                user_id=chat_item.user_id,
+                data=message,
+                db=db,
+            )
+            try:
+                ChatSearch.index_message(
+                    id, chat_item.user_id, message_id, message, db=db
+                )
+            except Exception as e:
+                log.warning(f"Failed to update search index for chat {id}: {e}")
+
+            if set_current:
+                chat_item.chat = {
+                    **chat,
+                    "history": {**history, "currentId": message_id},
+                }
+            chat_item.updated_at = int(time.time())
+            db.commit()
+            db.refresh(chat_item)
+            return ChatModel.model_validate(chat_item)
 
+    def upsert_message_to_chat_by_id_and_message_id(
+        self, id: str, message_id: str, message: dict, db: Optional[Session] = None
+    ) -> Optional[ChatModel]:
+        """
+        With ENABLE_CHAT_MESSAGE_PRIMARY_STORAGE the returned chat does not
+        include the message map; use get_chat_by_id for the assembled chat.
+        """
         # Sanitize message content for null characters before upserting
         if isinstance(message.get("content"), str):
             message["content"] = sanitize_text_for_db(message["content"])
 
+        if ENABLE_CHAT_MESSAGE_PRIMARY_STORAGE:
+            return self._upsert_message_row(id, message_id, message, db=db)
+
+        chat = self.get_chat_by_id(id, db=db)
+        if chat is None:
+            return None
+
         user_id = chat.user_id
         chat = chat.chat
         history = chat.get("history", {})
@@ -516,11 +694,22 @@ class ChatTable:
         except Exception as e:
             log.warning(f"Failed to write to chat_message table: {e}")
 
-        return self.update_chat_by_id(id, chat)
+        return self.update_chat_by_id(id, chat, db=db)
 
     def add_message_status_to_chat_by_id_and_message_id(
         self, id: str, message_id: str, status: dict
     ) -> Optional[ChatModel]:
+        if ENABLE_CHAT_MESSAGE_PRIMARY_STORAGE:
+            message = self.get_message_by_id_and_message_id(id, message_id)
+            if not message:
+                return None
+            return self._upsert_message_row(
+                id,
+                message_id,
+                {"statusHistory": [*message.get("statusHistory", []), status]},
+                set_current=False,
+            )
+
         chat = self.get_chat_by_id(id)
         if chat is None:
             return None
@@ -539,6 +728,18 @@ class ChatTable:
     def add_message_files_by_id_and_message_id(
         self, id: str, message_id: str, files: list[dict]
     ) -> list[dict]:
+        if ENABLE_CHAT_MESSAGE_PRIMARY_STORAGE:
+            message = self.get_message_by_id_and_message_id(id, message_id)
+            if message is None:
+                return None
+            if not message:
+                return []
+            message_files = message.get("files", []) + files
+            self._upsert_message_row(
+                id, message_id, {"files": message_files}, set_current=False
+            )
+            return message_files
+
         with get_db_context() as db:
             chat = self.get_chat_by_id(id, db=db)
             if chat is None:
@@ -576,7 +777,8 @@ class ChatTable:
                     "id": str(uuid.uuid4()),
                     "user_id": f"shared-{chat_id}",
                     "title": chat.title,
-                    "chat": chat.chat,
+                    # shared snapshots keep their messages inline
+                    "chat": self._to_chat_model(chat, db=db).chat,
                     "meta": chat.meta,
                     "pinned": chat.pinned,
                     "folder_id": chat.folder_id,
@@ -612,7 +814,7 @@ class ChatTable:
                     return self.insert_shared_chat_by_chat_id(chat_id, db=db)
 
                 shared_chat.title = chat.title
-                shared_chat.chat = chat.chat
+                shared_chat.chat = self._to_chat_model(chat, db=db).chat
                 shared_chat.meta = chat.meta
                 shared_chat.pinned = chat.pinned
                 shared_chat.folder_id = chat.folder_id
@@ -635,9 +837,11 @@ class ChatTable:
                     .filter_by(user_id=f"shared-{chat_id}")
                     .scalar_subquery()
                 )
-                db.query(ChatMessage).filter(
-                    ChatMessage.chat_id.in_(shared_chat_id_subquery)
-                ).delete(synchronize_session=False)
+                ChatMessages.delete_messages(
+                    db,
+                    ChatMessage.chat_id.in_(shared_chat_id_subquery),
+                    synchronize_session=False,
+                )
                 db.query(Chat).filter_by(user_id=f"shared-{chat_id}").delete()
                 db.commit()
 
@@ -665,7 +869,7 @@ class ChatTable:
                 chat.share_id = share_id
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(chat, db=db)
         except Exception:
             return None
 
@@ -679,7 +883,7 @@ class ChatTable:
                 chat.updated_at = int(time.time())
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(chat, db=db)
         except Exception:
             return None
 
@@ -694,7 +898,7 @@ class ChatTable:
                 chat.updated_at = int(time.time())
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(chat, db=db)
         except Exception:
             return None
 
@@ -868,7 +1072,7 @@ class ChatTable:
                 query = query.limit(limit)
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(all_chats, db=db)
 
     def get_chat_title_id_list_by_user_id(
         self,
@@ -931,7 +1135,7 @@ class ChatTable:
                 .order_by(Chat.updated_at.desc())
                 .all()
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(all_chats, db=db)
 
     def get_chat_by_id(
         self, id: str, db: Optional[Session] = None
@@ -946,7 +1150,7 @@ class ChatTable:
                     db.commit()
                     db.refresh(chat_item)
 
-                return ChatModel.model_validate(chat_item)
+                return self._to_chat_model(chat_item, db=db)
         except Exception:
             return None
 
@@ -972,7 +1176,7 @@ class ChatTable:
         try:
             with get_db_context(db) as db:
                 chat = db.query(Chat).filter_by(id=id, user_id=user_id).first()
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(chat, db=db)
         except Exception:
             return None
 
@@ -1016,7 +1220,7 @@ class ChatTable:
                 # .limit(limit).offset(skip)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(all_chats, db=db)
 
     def get_chats_by_user_id(
         self,
@@ -1063,7 +1267,7 @@ class ChatTable:
 
             return ChatListResponse(
                 **{
-                    "items": [ChatModel.model_validate(chat) for chat in all_chats],
+                    "items": self._to_chat_models(all_chats, db=db),
                     "total": total,
                 }
             )
@@ -1099,7 +1303,7 @@ class ChatTable:
                 .filter_by(user_id=user_id, archived=True)
                 .order_by(Chat.updated_at.desc())
             )
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(all_chats, db=db)
 
     def get_chats_by_user_id_and_search_text(
         self,
@@ -1196,7 +1400,18 @@ class ChatTable:
 
             # Check if the database dialect is either 'sqlite' or 'postgresql'
             dialect_name = db.bind.dialect.name
-            if dialect_name == "sqlite":
+
+            # Match title and message text through the full-text index
+            match = None
+            if search_text and ChatSearch.is_available(db):
+                match = ChatSearch.get_match_subquery(user_id, search_text, db)
+                query = (
+                    query.join(match, match.c.chat_id == Chat.id)
+                    .order_by(None)
+                    .order_by(match.c.rank.desc(), Chat.updated_at.desc(), Chat.id)
+                )
+
+            if dialect_name == "sqlite" and match is None:
                 # SQLite case: using JSON1 extension for JSON searching
                 sqlite_content_sql = (
                     "EXISTS ("
@@ -1205,6 +1420,16 @@ class ChatTable:
                     "    WHERE LOWER(message.value->>'content') LIKE '%' || :content_key || '%'"
                     ")"
                 )
+                if ENABLE_CHAT_MESSAGE_PRIMARY_STORAGE:
+                    sqlite_content_sql += (
+                        " OR EXISTS ("
+                        "    SELECT 1 "
+                        "    FROM chat_message "
+                        "    WHERE chat_message.chat_id = Chat.id "
+                        "    AND json_type(chat_message.content) = 'text' "
+                        "    AND LOWER(chat_message.content->>'$') LIKE '%' || :content_key || '%'"
+                        ")"
+                    )
                 sqlite_content_clause = text(sqlite_content_sql)
                 query = query.filter(
                     or_(
@@ -1212,31 +1437,7 @@ class ChatTable:
                     ).params(title_key=f"%{search_text}%", content_key=search_text)
                 )
 
-                # Check if there are any tags to filter, it should have all the tags
-                if "none" in tag_ids:
-                    query = query.filter(text("""
-                            NOT EXISTS (
-                                SELECT 1
-                                FROM json_each(Chat.meta, '$.tags') AS tag
-                            )
-                            """))
-                elif tag_ids:
-                    query = query.filter(
-                        and_(
-                            *[
-                                text(f"""
-                                    EXISTS (
-                                        SELECT 1
-                                        FROM json_each(Chat.meta, '$.tags') AS tag
-                                        WHERE tag.value = :tag_id_{tag_idx}
-                                    )
-                                    """).params(**{f"tag_id_{tag_idx}": tag_id})
-                                for tag_idx, tag_id in enumerate(tag_ids)
-                            ]
-                        )
-                    )
-
-            elif dialect_name == "postgresql":
+            if dialect_name == "postgresql" and match is None:
                 # PostgreSQL doesn't allow null bytes in text. We filter those out by checking
                 # the JSON representation for \u0000 before attempting text extraction
 
@@ -1255,6 +1456,17 @@ class ChatTable:
                 )
                 """
 
+                if ENABLE_CHAT_MESSAGE_PRIMARY_STORAGE:
+                    postgres_content_sql += """
+                OR EXISTS (
+                    SELECT 1
+                    FROM chat_message
+                    WHERE chat_message.chat_id = Chat.id
+                    AND json_typeof(chat_message.content) = 'string'
+                    AND LOWER(chat_message.content #>> '{}') LIKE '%' || :content_key || '%'
+                )
+                """
+
                 postgres_content_clause = text(postgres_content_sql)
 
                 query = query.filter(
@@ -1264,6 +1476,32 @@ class ChatTable:
                     )
                 ).params(title_key=f"%{search_text}%", content_key=search_text.lower())
 
+            if dialect_name == "sqlite":
+                # Check if there are any tags to filter, it should have all the tags
+                if "none" in tag_ids:
+                    query = query.filter(text("""
+                            NOT EXISTS (
+                                SELECT 1
+                                FROM json_each(Chat.meta, '$.tags') AS tag
+                            )
+                            """))
+                elif tag_ids:
+                    query = query.filter(
+                        and_(
+                            *[
+                                text(f"""
+                                    EXISTS (
+                                        SELECT 1
+                                        FROM json_each(Chat.meta, '$.tags') AS tag
+                                        WHERE tag.value = :tag_id_{tag_idx}
+                                    )
+                                    """).params(**{f"tag_id_{tag_idx}": tag_id})
+                                for tag_idx, tag_id in enumerate(tag_ids)
+                            ]
+                        )
+                    )
+
+            elif dialect_name == "postgresql":
                 # Check if there are any tags to filter, it should have all the tags
                 if "none" in tag_ids:
                     query = query.filter(text("""
@@ -1298,7 +1536,7 @@ class ChatTable:
             log.info(f"The number of chats: {len(all_chats)}")
 
             # Validate and return chats
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(all_chats, db=db)
 
     def get_chats_by_folder_id_and_user_id(
         self,
@@ -1321,7 +1559,7 @@ class ChatTable:
                 query = query.limit(limit)
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(all_chats, db=db)
 
     def get_chats_by_folder_ids_and_user_id(
         self, folder_ids: list[str], user_id: str, db: Optional[Session] = None
@@ -1336,7 +1574,7 @@ class ChatTable:
             query = query.order_by(Chat.updated_at.desc())
 
             all_chats = query.all()
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(all_chats, db=db)
 
     def update_chat_folder_id_by_id_and_user_id(
         self, id: str, user_id: str, folder_id: str, db: Optional[Session] = None
@@ -1349,7 +1587,7 @@ class ChatTable:
                 chat.pinned = False
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(chat, db=db)
         except Exception:
             return None
 
@@ -1395,7 +1633,7 @@ class ChatTable:
 
             all_chats = query.all()
             log.debug(f"all_chats: {all_chats}")
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(all_chats, db=db)
 
     def add_chat_tag_by_id_and_user_id_and_tag_name(
         self, id: str, user_id: str, tag_name: str, db: Optional[Session] = None
@@ -1412,7 +1650,7 @@ class ChatTable:
                     }
                 db.commit()
                 db.refresh(chat)
-                return ChatModel.model_validate(chat)
+                return self._to_chat_model(chat, db=db)
         except Exception:
             return None
 
@@ -1517,7 +1755,8 @@ class ChatTable:
     def delete_chat_by_id(self, id: str, db: Optional[Session] = None) -> bool:
         try:
             with get_db_context(db) as db:
-                db.query(ChatMessage).filter_by(chat_id=id).delete()
+                ChatSearch.delete_by_chat_ids([id], db=db)
+                ChatMessages.delete_messages(db, ChatMessage.chat_id == id)
                 db.query(Chat).filter_by(id=id).delete()
                 db.commit()
 
@@ -1530,7 +1769,8 @@ class ChatTable:
     ) -> bool:
         try:
             with get_db_context(db) as db:
-                db.query(ChatMessage).filter_by(chat_id=id).delete()
+                ChatSearch.delete_by_chat_ids([id], user_id=user_id, db=db)
+                ChatMessages.delete_messages(db, ChatMessage.chat_id == id)
                 db.query(Chat).filter_by(id=id, user_id=user_id).delete()
                 db.commit()
 
@@ -1544,13 +1784,16 @@ class ChatTable:
         try:
             with get_db_context(db) as db:
                 self.delete_shared_chats_by_user_id(user_id, db=db)
+                ChatSearch.delete_by_user_id(user_id, db=db)
 
                 chat_id_subquery = (
                     db.query(Chat.id).filter_by(user_id=user_id).subquery()
                 )
-                db.query(ChatMessage).filter(
-                    ChatMessage.chat_id.in_(chat_id_subquery)
-                ).delete(synchronize_session=False)
+                ChatMessages.delete_messages(
+                    db,
+                    ChatMessage.chat_id.in_(chat_id_subquery),
+                    synchronize_session=False,
+                )
                 db.query(Chat).filter_by(user_id=user_id).delete()
                 db.commit()
 
@@ -1568,9 +1811,14 @@ class ChatTable:
                     .filter_by(user_id=user_id, folder_id=folder_id)
                     .subquery()
                 )
-                db.query(ChatMessage).filter(
-                    ChatMessage.chat_id.in_(chat_id_subquery)
-                ).delete(synchronize_session=False)
+                ChatSearch.delete_by_chat_ids(
+                    select(chat_id_subquery.c.id), user_id=user_id, db=db
+                )
+                ChatMessages.delete_messages(
+                    db,
+                    ChatMessage.chat_id.in_(chat_id_subquery),
+                    synchronize_session=False,
+                )
                 db.query(Chat).filter_by(user_id=user_id, folder_id=folder_id).delete()
                 db.commit()
 
@@ -1610,9 +1858,11 @@ class ChatTable:
                     .filter(Chat.user_id.in_(shared_chat_ids))
                     .subquery()
                 )
-                db.query(ChatMessage).filter(
-                    ChatMessage.chat_id.in_(shared_id_subq)
-                ).delete(synchronize_session=False)
+                ChatMessages.delete_messages(
+                    db,
+                    ChatMessage.chat_id.in_(shared_id_subq),
+                    synchronize_session=False,
+                )
                 db.query(Chat).filter(Chat.user_id.in_(shared_chat_ids)).delete()
                 db.commit()
 
@@ -1715,7 +1965,7 @@ class ChatTable:
                 .all()
             )
 
-            return [ChatModel.model_validate(chat) for chat in all_chats]
+            return self._to_chat_models(all_chats, db=db)
 
 
 Chats = ChatTable()
@@ -1,20 +1,44 @@
+import logging
+import threading
 import time
 import uuid
 from decimal import Decimal
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from fastapi import HTTPException
 from pydantic import BaseModel, ConfigDict, Field
-from sqlalchemy import JSON, BigInteger, Column, Numeric, String, or_
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Column,
+    Index,
+    Numeric,
+    String,
+    and_,
+    func,
+    or_,
+    text,
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
 
 from open_webui.env import (
+    CREDIT_BALANCE_CACHE_TTL,
+    REDIS_KEY_PREFIX,
     REDIS_URL,
     REDIS_SENTINEL_HOSTS,
     REDIS_SENTINEL_PORT,
     REDIS_CLUSTER,
 )
 from open_webui.internal.db import Base, get_db
-from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
+from open_webui.utils.redis import (
+    get_redis_client,
+    get_redis_connection,
+    get_sentinels_from_env,
+)
+
+log = logging.getLogger(__name__)
 
 ####################
 # User Credit DB Schema
@@ -54,6 +78,34 @@ class TradeTicket(Base):
     created_at = Column(BigInteger, index=True)
 
 
+class CreditUsageRollup(Base):
+    """
+    Usage deductions summed per hour and per day (UTC buckets) by user, model
+    and feature set, maintained with the credit logs they are built from.
+    """
+
+    __tablename__ = "credit_usage_rollup"
+
+    period = Column(String, primary_key=True)  # "hour" or "day"
+    bucket = Column(BigInteger, primary_key=True)  # bucket start timestamp
+    user_id = Column(String, primary_key=True)
+    model_id = Column(String, primary_key=True)
+    features = Column(String, primary_key=True)  # sorted, comma separated
+
+    requests = Column(BigInteger, nullable=False, default=0)
+    prompt_tokens = Column(BigInteger, nullable=False, default=0)
+    completion_tokens = Column(BigInteger, nullable=False, default=0)
+    total_tokens = Column(BigInteger, nullable=False, default=0)
+    total_price = Column(Numeric(precision=24, scale=12), nullable=False, default=0)
+    feature_price = Column(Numeric(precision=24, scale=12), nullable=False, default=0)
+
+    updated_at = Column(BigInteger)
+
+    __table_args__ = (
+        Index("credit_usage_rollup_period_bucket_idx", "period", "bucket"),
+    )
+
+
 class RedemptionCode(Base):
     __tablename__ = "redemption_code"
 
@@ -145,6 +197,14 @@ class SetCreditForm(BaseModel):
     detail: SetCreditFormDetail
 
 
+class CreditLedgerEntry(BaseModel):
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    user_id: str
+    amount: Decimal
+    detail: dict = Field(default_factory=lambda: {})
+    created_at: int = Field(default_factory=lambda: int(time.time()))
+
+
 class TradeTicketModel(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: str = Field(default_factory=lambda: uuid.uuid4().hex)
@@ -165,6 +225,81 @@ class RedemptionCodeModel(BaseModel):
     received_at: Optional[int] = None
 
 
+####################
+# Balance Cache
+####################
+
+
+class CreditBalanceCache:
+    """
+    Committed credit balances for fast admission checks.
+
+    Stored in Redis when configured so all workers share one view, otherwise
+    in process memory. Entries expire after ``ttl`` seconds and are refreshed
+    whenever this module writes a user's credit.
+    """
+
+    def __init__(self, ttl: int = 60):
+        self.ttl = ttl
+        self._local: Dict[str, Tuple[Decimal, float]] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, user_id: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:credit:balance:{user_id}"
+
+    def get(self, user_id: str) -> Optional[Decimal]:
+        if self.ttl <= 0:
+            return None
+        redis = get_redis_client()
+        if redis is not None:
+            try:
+                value = redis.get(self._key(user_id))
+                return Decimal(value) if value is not None else None
+            except Exception as err:
+                log.debug(f"Failed to read cached credit balance: {err}")
+                return None
+        with self._lock:
+            balance, expires_at = self._local.get(user_id, (None, 0))
+            return balance if expires_at > time.time() else None
+
+    def set_many(self, balances: Dict[str, Decimal]) -> None:
+        if self.ttl <= 0 or not balances:
+            return
+        redis = get_redis_client()
+        if redis is not None:
+            try:
+                pipe = redis.pipeline()
+                for user_id, balance in balances.items():
+                    pipe.set(self._key(user_id), str(balance), ex=self.ttl)
+                pipe.execute()
+            except Exception as err:
+                log.debug(f"Failed to cache credit balances: {err}")
+            return
+        now = time.time()
+        with self._lock:
+            self._local = {
+                user_id: value
+                for user_id, value in self._local.items()
+                if value[1] > now
+            }
+            for user_id, balance in balances.items():
+                self._local[user_id] = (balance, now + self.ttl)
+
+    def delete(self, user_id: str) -> None:
+        redis = get_redis_client()
+        if redis is not None:
+            try:
+                redis.delete(self._key(user_id))
+            except Exception as err:
+                log.debug(f"Failed to drop cached credit balance: {err}")
+            return
+        with self._lock:
+            self._local.pop(user_id, None)
+
+
+CreditBalances = CreditBalanceCache(ttl=CREDIT_BALANCE_CACHE_TTL)
+
+
 ####################
 # Tables
 ####################
@@ -222,11 +357,13 @@ class CreditsTable:
         )
         with get_db() as db:
             db.add(CreditLog(**log.model_dump()))
+            CreditUsageRollups.add_logs(db, [log])
             db.query(Credit).filter(Credit.user_id == credit_model.user_id).update(
                 {"credit": form_data.credit, "updated_at": int(time.time())},
                 synchronize_session=False,
             )
             db.commit()
+        CreditBalances.delete(form_data.user_id)
         return self.get_credit_by_user_id(user_id=form_data.user_id)
 
     def add_credit_by_user_id(self, form_data: AddCreditForm) -> Optional[CreditModel]:
@@ -238,6 +375,7 @@ class CreditsTable:
         )
         with get_db() as db:
             db.add(CreditLog(**log.model_dump()))
+            CreditUsageRollups.add_logs(db, [log])
             db.query(Credit).filter(Credit.user_id == form_data.user_id).update(
                 {
                     "credit": Credit.credit + form_data.amount,
@@ -246,8 +384,86 @@ class CreditsTable:
                 synchronize_session=False,
             )
             db.commit()
+        CreditBalances.delete(form_data.user_id)
         return self.get_credit_by_user_id(form_data.user_id)
 
+    def ping(self) -> None:
+        """Raise if the database can't be reached."""
+        with get_db() as db:
+            db.execute(text("SELECT 1"))
+
+    def add_credit_batch(self, entries: List[CreditLedgerEntry]) -> Dict[str, Decimal]:
+        """
+        Apply queued credit changes in one transaction: one UPDATE per user with
+        the summed amount plus a bulk insert of the logs. Entries whose log id is
+        already stored are skipped, so a batch can safely be retried.
+
+        Returns the committed balance of every user in the batch.
+        """
+        from open_webui.config import CREDIT_DEFAULT_CREDIT
+
+        if not entries:
+            return {}
+
+        now = int(time.time())
+        with get_db() as db:
+            applied = {
+                id
+                for (id,) in db.query(CreditLog.id).filter(
+                    CreditLog.id.in_([entry.id for entry in entries])
+                )
+            }
+            entries = [entry for entry in entries if entry.id not in applied]
+
+            user_ids = {entry.user_id for entry in entries}
+            balances = {
+                credit.user_id: Decimal(credit.credit or 0)
+                for credit in db.query(Credit)
+                .filter(Credit.user_id.in_(user_ids))
+                .with_for_update()
+            }
+            new_user_ids = user_ids - balances.keys()
+            for user_id in new_user_ids:
+                balances[user_id] = Decimal(CREDIT_DEFAULT_CREDIT.value)
+
+            totals: Dict[str, Decimal] = {}
+            logs = []
+            for entry in entries:
+                totals[entry.user_id] = totals.get(entry.user_id, 0) + entry.amount
+                balances[entry.user_id] += entry.amount
+                logs.append(
+                    CreditLog(
+                        **CreditLogModel(
+                            id=entry.id,
+                            user_id=entry.user_id,
+                            credit=balances[entry.user_id],
+                            detail=entry.detail,
+                            created_at=entry.created_at,
+                        ).model_dump()
+                    )
+                )
+
+            for user_id, total in totals.items():
+                if user_id in new_user_ids:
+                    db.add(
+                        Credit(
+                            **CreditModel(
+                                user_id=user_id, credit=balances[user_id]
+                            ).model_dump()
+                        )
+                    )
+                    continue
+                db.query(Credit).filter(Credit.user_id == user_id).update(
+                    {"credit": Credit.credit + total, "updated_at": now},
+                    synchronize_session=False,
+                )
+            db.add_all(logs)
+            CreditUsageRollups.add_logs(db, logs)
+            db.commit()
+
+        CreditBalances.set_many(balances)
+        return balances
+
 
 Credits = CreditsTable()
 
@@ -368,6 +584,7 @@ class CreditLogTable:
                 query = db.query(CreditLog).filter(CreditLog.created_at < timestamp)
                 total = query.count()
                 query.delete()
+                CreditUsageRollups.remove_before(db, timestamp)
                 db.commit()
                 return total
         except Exception as err:
@@ -377,6 +594,273 @@ class CreditLogTable:
 CreditLogs = CreditLogTable()
 
 
+ROLLUP_PERIODS = {"hour": 3600, "day": 86400}
+ROLLUP_KEYS = ["period", "bucket", "user_id", "model_id", "features"]
+ROLLUP_MEASURES = [
+    "requests",
+    "prompt_tokens",
+    "completion_tokens",
+    "total_tokens",
+    "total_price",
+    "feature_price",
+]
+
+
+def get_usage_rollup_entry(detail: Optional[dict]) -> Optional[Tuple[str, str, dict]]:
+    """
+    ``(model_id, features, measures)`` of a usage deduction log detail, or None
+    for logs without a price (top-ups, admin changes, payments) or a model.
+    """
+    usage = (detail or {}).get("usage") or {}
+    if usage.get("total_price") is None:
+        return None
+    model = (detail.get("api_params") or {}).get("model") or {}
+    model_id = model.get("id") if isinstance(model, dict) else None
+    if not model_id:
+        return None
+    features = ",".join(sorted(str(feature) for feature in usage.get("features") or []))
+    return (
+        model_id,
+        features,
+        {
+            "requests": 1,
+            "prompt_tokens": int(usage.get("prompt_tokens") or 0),
+            "completion_tokens": int(usage.get("completion_tokens") or 0),
+            "total_tokens": int(usage.get("total_tokens") or 0),
+            "total_price": Decimal(str(usage["total_price"])),
+            "feature_price": Decimal(str(usage.get("feature_price") or 0)),
+        },
+    )
+
+
+def _floor(timestamp: int, size: int) -> int:
+    return timestamp - timestamp % size
+
+
+def _ceil(timestamp: int, size: int) -> int:
+    return -(-timestamp // size) * size
+
+
+class CreditUsageRollupTable:
+    def add_logs(self, db: Session, logs) -> None:
+        """
+        Add credit logs (anything with ``user_id``, ``detail`` and
+        ``created_at``) to the hourly and daily rollups in the caller's
+        transaction.
+        """
+        rows: Dict[tuple, dict] = {}
+        for log in logs:
+            entry = get_usage_rollup_entry(log.detail)
+            if entry is None:
+                continue
+            model_id, features, measures = entry
+            for period, size in ROLLUP_PERIODS.items():
+                key = (
+                    period,
+                    _floor(log.created_at, size),
+                    log.user_id,
+                    model_id,
+                    features,
+                )
+                row = rows.setdefault(key, dict.fromkeys(ROLLUP_MEASURES, 0))
+                for name, value in measures.items():
+                    row[name] += value
+        self._upsert(db, rows)
+
+    def _upsert(self, db: Session, rows: Dict[tuple, dict]) -> None:
+        if not rows:
+            return
+
+        now = int(time.time())
+        # sorted so concurrent writers lock rows in the same order
+        values = [
+            {**dict(zip(ROLLUP_KEYS, key)), **rows[key], "updated_at": now}
+            for key in sorted(rows)
+        ]
+
+        dialect = db.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            insert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+            query = insert(CreditUsageRollup)
+            query = query.on_conflict_do_update(
+                index_elements=ROLLUP_KEYS,
+                set_={
+                    **{
+                        name: getattr(CreditUsageRollup, name)
+                        + getattr(query.excluded, name)
+                        for name in ROLLUP_MEASURES
+                    },
+                    "updated_at": query.excluded.updated_at,
+                },
+            )
+            db.execute(query, values)
+            return
+
+        for value in values:
+            updated = (
+                db.query(CreditUsageRollup)
+                .filter_by(**{name: value[name] for name in ROLLUP_KEYS})
+                .update(
+                    {
+                        **{
+                            name: getattr(CreditUsageRollup, name) + value[name]
+                            for name in ROLLUP_MEASURES
+                        },
+                        "updated_at": now,
+                    },
+                    synchronize_session=False,
+                )
+            )
+            if not updated:
+                db.add(CreditUsageRollup(**value))
+
+    def remove_before(self, db: Session, timestamp: int) -> None:
+        """
+        Drop the usage of logs created before ``timestamp`` in the caller's
+        transaction, after those logs were deleted: rollups entirely before it
+        are removed and the day containing it is recomputed from the logs left.
+        """
+        day = ROLLUP_PERIODS["day"]
+        day_start = _floor(timestamp, day)
+        day_end = _ceil(timestamp, day)
+        db.query(CreditUsageRollup).filter(CreditUsageRollup.bucket < day_end).delete(
+            synchronize_session=False
+        )
+        if day_start < day_end:
+            self.add_logs(
+                db,
+                db.query(CreditLog.user_id, CreditLog.detail, CreditLog.created_at)
+                .filter(CreditLog.created_at >= day_start)
+                .filter(CreditLog.created_at < day_end)
+                .all(),
+            )
+
+    def get_usage_by_user_and_model(
+        self, start_time: int, end_time: int, user_ids: Optional[List[str]] = None
+    ) -> Dict[Tuple[str, str], Tuple[int, Decimal]]:
+        """
+        ``(total_tokens, total_price)`` per ``(user_id, model_id)`` for usage in
+        ``[start_time, end_time)``: whole days and hours come from the rollups,
+        the partial hours at either end from the logs.
+        """
+        totals: Dict[Tuple[str, str], list] = {}
+
+        def add(user_id, model_id, total_tokens, total_price):
+            total = totals.setdefault((user_id, model_id), [0, Decimal(0)])
+            total[0] += int(total_tokens or 0)
+            total[1] += Decimal(total_price or 0)
+
+        hour_start = _ceil(start_time, ROLLUP_PERIODS["hour"])
+        hour_end = _floor(end_time, ROLLUP_PERIODS["hour"])
+        if hour_start < hour_end:
+            day_start = _ceil(hour_start, ROLLUP_PERIODS["day"])
+            day_end = _floor(hour_end, ROLLUP_PERIODS["day"])
+            if day_start < day_end:
+                ranges = [
+                    ("day", day_start, day_end),
+                    ("hour", hour_start, day_start),
+                    ("hour", day_end, hour_end),
+                ]
+            else:
+                ranges = [("hour", hour_start, hour_end)]
+            log_ranges = [(start_time, hour_start), (hour_end, end_time)]
+        else:
+            ranges = []
+            log_ranges = [(start_time, end_time)]
+
+        with get_db() as db:
+            conditions = [
+                and_(
+                    CreditUsageRollup.period == period,
+                    CreditUsageRollup.bucket >= start,
+                    CreditUsageRollup.bucket < end,
+                )
+                for period, start, end in ranges
+                if start < end
+            ]
+            if conditions:
+                query = db.query(
+                    CreditUsageRollup.user_id,
+                    CreditUsageRollup.model_id,
+                    func.sum(CreditUsageRollup.total_tokens),
+                    func.sum(CreditUsageRollup.total_price),
+                ).filter(or_(*conditions))
+                if user_ids:
+                    query = query.filter(CreditUsageRollup.user_id.in_(user_ids))
+                for row in query.group_by(
+                    CreditUsageRollup.user_id, CreditUsageRollup.model_id
+                ):
+                    add(*row)
+
+            for start, end in log_ranges:
+                if start >= end:
+                    continue
+                query = (
+                    db.query(CreditLog.user_id, CreditLog.detail)
+                    .filter(CreditLog.created_at >= start)
+                    .filter(CreditLog.created_at < end)
+                )
+                if user_ids:
+                    query = query.filter(CreditLog.user_id.in_(user_ids))
+                for user_id, detail in query:
+                    entry = get_usage_rollup_entry(detail)
+                    if entry is not None:
+                        add(
+                            user_id,
+                            entry[0],
+                            entry[2]["total_tokens"],
+                            entry[2]["total_price"],
+                        )
+
+        return {key: (total[0], total[1]) for key, total in totals.items()}
+
+    def rebuild(
+        self,
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+    ) -> int:
+        """
+        Recompute the rollups of the whole days covering ``[start_time,
+        end_time)`` (default: all logs) from the credit logs, one day per
+        transaction. Returns the number of logs read.
+        """
+        day = ROLLUP_PERIODS["day"]
+        total = 0
+        with get_db() as db:
+            first, last = db.query(
+                func.min(CreditLog.created_at), func.max(CreditLog.created_at)
+            ).one()
+            if first is None:
+                return 0
+
+            start = _floor(start_time if start_time is not None else first, day)
+            end = _ceil(end_time if end_time is not None else last + 1, day)
+
+            db.query(CreditUsageRollup).filter(
+                CreditUsageRollup.bucket >= start, CreditUsageRollup.bucket < end
+            ).delete(synchronize_session=False)
+            db.commit()
+
+            for day_start in range(
+                max(start, _floor(first, day)), min(end, last + 1), day
+            ):
+                logs = (
+                    db.query(CreditLog.user_id, CreditLog.detail, CreditLog.created_at)
+                    .filter(CreditLog.created_at >= day_start)
+                    .filter(CreditLog.created_at < day_start + day)
+                    .all()
+                )
+                self.add_logs(db, logs)
+                db.commit()
+                total += len(logs)
+                if logs:
+                    log.info(f"Rebuilt credit usage rollups up to {day_start + day}")
+        return total
+
+
+CreditUsageRollups = CreditUsageRollupTable()
+
+
 class RedemptionCodeTable:
     def get_code(self, code: str) -> Optional[RedemptionCodeModel]:
         try:
@@ -11,6 +11,7 @@ from open_webui.models.groups import Groups, GroupMember
 from open_webui.models.channels import ChannelMember
 
 from open_webui.utils.misc import throttle
+from open_webui.utils.user_cache import USER_CACHE
 from open_webui.utils.validate import validate_profile_image_url
 
 from pydantic import BaseModel, ConfigDict, field_validator, model_validator
@@ -596,6 +597,7 @@ class UsersTable:
                     return None
                 user.role = role
                 db.commit()
+                USER_CACHE.invalidate_all_workers(id)
                 db.refresh(user)
                 return UserModel.model_validate(user)
         except Exception:
@@ -612,6 +614,7 @@ class UsersTable:
                 for key, value in form_data.model_dump(exclude_none=True).items():
                     setattr(user, key, value)
                 db.commit()
+                USER_CACHE.invalidate_all_workers(id)
                 db.refresh(user)
                 return UserModel.model_validate(user)
         except Exception:
@@ -627,6 +630,7 @@ class UsersTable:
                     return None
                 user.profile_image_url = profile_image_url
                 db.commit()
+                USER_CACHE.invalidate_all_workers(id)
                 db.refresh(user)
                 return UserModel.model_validate(user)
         except Exception:
@@ -648,6 +652,34 @@ class UsersTable:
         except Exception:
             return None
 
+    def update_last_active_by_ids(
+        self, last_active: dict[str, int], db: Optional[Session] = None
+    ) -> None:
+        """Set last_active_at of many users in one UPDATE per 500 users."""
+        user_ids = list(last_active)
+        with get_db_context(db) as db:
+            for idx in range(0, len(user_ids), 500):
+                chunk = {
+                    user_id: last_active[user_id]
+                    for user_id in user_ids[idx : idx + 500]
+                }
+                db.query(User).filter(User.id.in_(list(chunk))).update(
+                    {User.last_active_at: case(chunk, value=User.id)},
+                    synchronize_session=False,
+                )
+            db.commit()
+
+    def get_last_active_since(
+        self, timestamp: int, db: Optional[Session] = None
+    ) -> dict[str, int]:
+        with get_db_context(db) as db:
+            return {
+                user_id: last_active_at
+                for user_id, last_active_at in db.query(
+                    User.id, User.last_active_at
+                ).filter(User.last_active_at > timestamp)
+            }
+
     def update_user_oauth_by_id(
         self, id: str, provider: str, sub: str, db: Optional[Session] = None
     ) -> Optional[UserModel]:
@@ -674,6 +706,7 @@ class UsersTable:
                 # Persist updated JSON
                 db.query(User).filter_by(id=id).update({"oauth": oauth})
                 db.commit()
+                USER_CACHE.invalidate_all_workers(id)
 
                 return UserModel.model_validate(user)
 
@@ -706,6 +739,7 @@ class UsersTable:
 
                 db.query(User).filter_by(id=id).update({"scim": scim})
                 db.commit()
+                USER_CACHE.invalidate_all_workers(id)
 
                 return UserModel.model_validate(user)
 
@@ -723,6 +757,7 @@ class UsersTable:
                 for key, value in updated.items():
                     setattr(user, key, value)
                 db.commit()
+                USER_CACHE.invalidate_all_workers(id)
                 db.refresh(user)
                 return UserModel.model_validate(user)
         except Exception as e:
@@ -747,6 +782,7 @@ class UsersTable:
 
                 db.query(User).filter_by(id=id).update({"settings": user_settings})
                 db.commit()
+                USER_CACHE.invalidate_all_workers(id)
 
                 user = db.query(User).filter_by(id=id).first()
                 return UserModel.model_validate(user)
@@ -765,6 +801,7 @@ class UsersTable:
                     # Delete User
                     db.query(User).filter_by(id=id).delete()
                     db.commit()
+                    USER_CACHE.invalidate_all_workers(id)
 
                 return True
             else:
@@ -800,6 +837,7 @@ class UsersTable:
                 )
                 db.add(new_api_key)
                 db.commit()
+                USER_CACHE.invalidate_all_workers(id)
 
                 return True
 
@@ -811,6 +849,7 @@ class UsersTable:
             with get_db_context(db) as db:
                 db.query(ApiKey).filter_by(user_id=id).delete()
                 db.commit()
+                USER_CACHE.invalidate_all_workers(id)
                 return True
         except Exception:
             return False
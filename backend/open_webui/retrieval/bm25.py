@@ -0,0 +1,936 @@
+"""
+Persistent, incrementally maintained BM25 index for hybrid search.
+
+Building a ``BM25Retriever`` from a full ``VECTOR_DB_CLIENT.get()`` dump on
+every query is expensive for large collections. Instead, each collection keeps
+a lexical index (postings and document lengths) that is built once and then
+maintained from the inserts and deletes made through the vector DB client.
+
+Changes are appended to a per-collection log rather than rewriting the index:
+each worker applies only the log entries its cached copy has not seen yet, and
+the log is folded into a new snapshot once it holds more items than the index.
+Chunk texts and metadata are stored per document next to the index and read
+only for the returned hits. Everything is persisted in Redis (multi-node
+deployments) or in one SQLite file per collection.
+
+Scoring follows ``rank_bm25.BM25Okapi`` (the implementation used by
+``BM25Retriever``) including whitespace tokenization, so ranking is identical
+to the per-query rebuild it replaces.
+"""
+
+import heapq
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from itertools import chain
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+from open_webui.env import (
+    BM25_INDEX_COMPACT_MIN_ITEMS,
+    BM25_INDEX_DIR,
+    BM25_INDEX_MAX_CACHED,
+    ENABLE_BM25_INDEX,
+    REDIS_KEY_PREFIX,
+)
+from open_webui.retrieval.vector.main import (
+    GetResult,
+    SearchResult,
+    VectorDBBase,
+    VectorItem,
+)
+from open_webui.retrieval.vector.utils import filter_metadata
+from open_webui.utils.redis import get_redis_client
+
+log = logging.getLogger(__name__)
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+BM25_EPSILON = 0.25
+
+# Metadata used to build the enriched texts
+ENRICHMENT_KEYS = ("name", "title", "headings", "source", "snippet")
+# Metadata the index keeps per document to apply deletes by filter
+FILTER_KEYS = ("file_id", "hash")
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshot (
+    id INTEGER PRIMARY KEY CHECK (id = 0), generation TEXT, data TEXT
+);
+CREATE TABLE IF NOT EXISTS log (
+    position INTEGER PRIMARY KEY AUTOINCREMENT, op TEXT, items INTEGER
+);
+CREATE TABLE IF NOT EXISTS docs (id TEXT PRIMARY KEY, text TEXT, metadata TEXT);
+"""
+
+
+def tokenize(text: str) -> list[str]:
+    # Same default preprocessing as langchain's BM25Retriever
+    return text.split()
+
+
+def get_enriched_text_parts(metadata: dict) -> list[str]:
+    """Metadata fragments appended to a chunk when enriched BM25 texts are enabled."""
+    parts = []
+
+    # Add filename (repeat twice for extra weight in BM25 scoring)
+    if metadata.get("name"):
+        filename = metadata["name"]
+        filename_tokens = filename.replace("_", " ").replace("-", " ").replace(".", " ")
+        parts.append(f"Filename: {filename} {filename_tokens} {filename_tokens}")
+
+    # Add title if available
+    if metadata.get("title"):
+        parts.append(f"Title: {metadata['title']}")
+
+    # Add document section headings if available (from markdown splitter)
+    if metadata.get("headings") and isinstance(metadata["headings"], list):
+        headings = " > ".join(str(h) for h in metadata["headings"])
+        parts.append(f"Section: {headings}")
+
+    # Add source URL/path if available
+    if metadata.get("source"):
+        parts.append(f"Source: {metadata['source']}")
+
+    # Add snippet for web search results
+    if metadata.get("snippet"):
+        parts.append(f"Snippet: {metadata['snippet']}")
+
+    return parts
+
+
+def match_metadata_filter(metadata: dict, filter: dict) -> Optional[bool]:
+    """
+    Evaluate a vector DB metadata filter against stored metadata.
+
+    Only equality and ``$eq``/``$in`` operators are understood; returns None for
+    anything else so callers can fall back to dropping the index.
+    """
+    for key, expected in filter.items():
+        value = metadata.get(key)
+        if isinstance(expected, dict):
+            if set(expected.keys()) == {"$eq"}:
+                expected = expected["$eq"]
+            elif set(expected.keys()) == {"$in"}:
+                if value not in expected["$in"]:
+                    return False
+                continue
+            else:
+                return None
+        if value != expected:
+            return False
+    return True
+
+
+def is_supported_filter(filter: dict) -> bool:
+    """Whether ``filter`` can be evaluated against the fields kept in the index."""
+    for key, expected in filter.items():
+        if key not in FILTER_KEYS:
+            return False
+        if isinstance(expected, dict) and set(expected.keys()) not in (
+            {"$eq"},
+            {"$in"},
+        ):
+            return False
+    return True
+
+
+class BM25Index:
+    """
+    Okapi BM25 postings for one collection.
+
+    Chunk text tokens and enrichment (metadata) tokens are kept in separate
+    postings so the same index serves both plain and enriched hybrid search:
+    an enriched document is simply the concatenation of both token lists.
+    Texts and metadata are not kept, except the ``FILTER_KEYS`` fields.
+    """
+
+    def __init__(self):
+        self.postings: dict[str, dict[str, int]] = {}
+        self.meta_postings: dict[str, dict[str, int]] = {}
+        self.doc_lengths: dict[str, int] = {}
+        self.meta_lengths: dict[str, int] = {}
+        self.fields: dict[str, dict] = {}
+        self._average_idf: dict[bool, float] = {}
+        # Log entries are applied while other threads search the same index
+        self.lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def __contains__(self, id: str) -> bool:
+        return id in self.doc_lengths
+
+    def add(self, id: str, text: str, metadata: Optional[dict] = None):
+        if id in self.doc_lengths:
+            self.remove([id])
+
+        metadata = metadata or {}
+        tokens = tokenize(text)
+        meta_tokens = tokenize(" ".join(get_enriched_text_parts(metadata)))
+
+        for term, tf in Counter(tokens).items():
+            self.postings.setdefault(term, {})[id] = tf
+        for term, tf in Counter(meta_tokens).items():
+            self.meta_postings.setdefault(term, {})[id] = tf
+
+        self.doc_lengths[id] = len(tokens)
+        self.meta_lengths[id] = len(meta_tokens)
+        self.fields[id] = {key: metadata[key] for key in FILTER_KEYS if key in metadata}
+        self._average_idf = {}
+
+    def remove(self, ids: list[str]):
+        """Remove documents in a single pass over the postings."""
+        ids = {id for id in ids if id in self.doc_lengths}
+        if not ids:
+            return
+
+        for id in ids:
+            del self.doc_lengths[id]
+            self.meta_lengths.pop(id, None)
+            self.fields.pop(id, None)
+
+        for postings in (self.postings, self.meta_postings):
+            for term in list(postings):
+                docs = postings[term]
+                if len(docs) < len(ids):
+                    for id in [id for id in docs if id in ids]:
+                        del docs[id]
+                else:
+                    for id in ids:
+                        docs.pop(id, None)
+                if not docs:
+                    del postings[term]
+        self._average_idf = {}
+
+    def remove_by_filter(self, filter: dict) -> bool:
+        """Remove documents matching a metadata filter. Returns False if the filter is unsupported."""
+        if not is_supported_filter(filter):
+            return False
+        self.remove(
+            [
+                id
+                for id, fields in self.fields.items()
+                if match_metadata_filter(fields, filter)
+            ]
+        )
+        return True
+
+    def apply(self, op: dict):
+        """Apply an entry of the store's change log."""
+        with self.lock:
+            if "add" in op:
+                # Replaced documents are removed in one pass rather than per add
+                self.remove([id for id, _, _ in op["add"]])
+                for id, text, metadata in op["add"]:
+                    self.add(id, text, metadata)
+            elif "remove" in op:
+                self.remove(op["remove"])
+            elif "filter" in op:
+                self.remove_by_filter(op["filter"])
+
+    def _doc_freq(self, term: str, enriched: bool) -> int:
+        docs = self.postings.get(term, {})
+        if not enriched:
+            return len(docs)
+        meta_docs = self.meta_postings.get(term, {})
+        if not meta_docs:
+            return len(docs)
+        return len(docs.keys() | meta_docs.keys())
+
+    def _idf(self, doc_freq: int) -> float:
+        n = len(self.doc_lengths)
+        return math.log(n - doc_freq + 0.5) - math.log(doc_freq + 0.5)
+
+    def _get_average_idf(self, enriched: bool) -> float:
+        if enriched not in self._average_idf:
+            terms = (
+                self.postings.keys() | self.meta_postings.keys()
+                if enriched
+                else self.postings.keys()
+            )
+            self._average_idf[enriched] = (
+                sum(self._idf(self._doc_freq(term, enriched)) for term in terms)
+                / len(terms)
+                if terms
+                else 0.0
+            )
+        return self._average_idf[enriched]
+
+    def search(
+        self, query: str, k: int, enriched: bool = False
+    ) -> list[tuple[str, float]]:
+        """Return the top ``k`` (id, score) pairs, like ``BM25Okapi.get_top_n``."""
+        with self.lock:
+            return self._search(query, k, enriched)
+
+    def _search(self, query: str, k: int, enriched: bool) -> list[tuple[str, float]]:
+        if not self.doc_lengths:
+            return []
+
+        total_length = sum(self.doc_lengths.values())
+        if enriched:
+            total_length += sum(self.meta_lengths.values())
+        avgdl = total_length / len(self.doc_lengths) or 1.0
+
+        scores: dict[str, float] = {}
+        for term in tokenize(query):
+            doc_freq = self._doc_freq(term, enriched)
+            if doc_freq == 0:
+                continue
+
+            idf = self._idf(doc_freq)
+            if idf < 0:
+                idf = BM25_EPSILON * self._get_average_idf(enriched)
+
+            candidates = self.postings.get(term, {})
+            if enriched and term in self.meta_postings:
+                candidates = {
+                    id: candidates.get(id, 0) + self.meta_postings[term].get(id, 0)
+                    for id in candidates.keys() | self.meta_postings[term].keys()
+                }
+
+            for id, tf in candidates.items():
+                doc_length = self.doc_lengths[id]
+                if enriched:
+                    doc_length += self.meta_lengths[id]
+                scores[id] = scores.get(id, 0.0) + idf * (
+                    tf
+                    * (BM25_K1 + 1)
+                    / (tf + BM25_K1 * (1 - BM25_B + BM25_B * doc_length / avgdl))
+                )
+
+        top = heapq.nlargest(k, scores.items(), key=lambda x: x[1])
+        if len(scores) < len(self.doc_lengths) and (len(top) < k or top[-1][1] < 0):
+            # Documents without any query term score 0 and still rank
+            top = heapq.nlargest(
+                k,
+                chain(
+                    scores.items(),
+                    (
+                        (id, 0.0)
+                        for id in reversed(self.doc_lengths)
+                        if id not in scores
+                    ),
+                ),
+                key=lambda x: x[1],
+            )
+        return top
+
+    def to_dict(self) -> dict:
+        return {
+            "postings": self.postings,
+            "meta_postings": self.meta_postings,
+            "doc_lengths": self.doc_lengths,
+            "meta_lengths": self.meta_lengths,
+            "fields": self.fields,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BM25Index":
+        index = cls()
+        index.postings = data.get("postings", {})
+        index.meta_postings = data.get("meta_postings", {})
+        index.doc_lengths = data.get("doc_lengths", {})
+        index.meta_lengths = data.get("meta_lengths", {})
+        index.fields = data.get("fields", {})
+        return index
+
+
+class _FileLock:
+    """Cross-process lock based on exclusive file creation (portable, no fcntl)."""
+
+    def __init__(self, path: Path, timeout: float = 30.0, stale_after: float = 120.0):
+        self.path = path
+        self.timeout = timeout
+        self.stale_after = stale_after
+
+    def __enter__(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.close(fd)
+                return self
+            except FileExistsError:
+                try:
+                    if time.time() - self.path.stat().st_mtime > self.stale_after:
+                        self.path.unlink(missing_ok=True)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Timed out waiting for lock {self.path}")
+                time.sleep(0.05)
+
+    def __exit__(self, *args):
+        self.path.unlink(missing_ok=True)
+
+
+@dataclass
+class _CachedIndex:
+    generation: Optional[str] = None
+    position: int = 0
+    index: Optional[BM25Index] = None
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class BM25IndexStore:
+    """
+    Persistence and per-process caching for collection BM25 indexes.
+
+    A collection is stored as a snapshot of its index, a log of the changes
+    made since, and the texts and metadata of its documents. Each worker keeps
+    a bounded LRU of indexes and brings an entry up to date by applying only
+    the log entries added since it last read it. Writers append to the log
+    under the collection lock and write a new snapshot once the log holds more
+    items than the index (and at least ``compact_min_items``), so maintaining
+    the index costs time linear in the number of items added.
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        directory: Optional[Union[str, Path]] = None,
+        max_cached: int = 16,
+        compact_min_items: int = 1000,
+    ):
+        self.redis = redis_client
+        self.directory = Path(directory) if directory else None
+        self.max_cached = max_cached
+        self.compact_min_items = compact_min_items
+
+        self._cache: "OrderedDict[str, _CachedIndex]" = OrderedDict()
+        self._lock = threading.RLock()
+
+        if self.redis is None and self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    # Persistence helpers
+
+    def _redis_key(self, collection_name: str) -> str:
+        # The hash tag keeps a collection's keys in one cluster slot
+        return f"{REDIS_KEY_PREFIX}:bm25:{{{collection_name}}}"
+
+    def _path(self, collection_name: str) -> Path:
+        safe_name = "".join(
+            c if c.isalnum() or c in "-_" else "_" for c in collection_name
+        )
+        return self.directory / f"{safe_name}.db"
+
+    @contextmanager
+    def _sqlite(self, collection_name: str, write: bool = False, create=False):
+        """Transaction on the collection's database, or None if it doesn't exist."""
+        path = self._path(collection_name)
+        if not create and not path.exists():
+            yield None
+            return
+
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        try:
+            if create:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(SQLITE_SCHEMA)
+            conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def _exists(self, collection_name: str) -> bool:
+        if self.redis is not None:
+            key = self._redis_key(collection_name)
+            return bool(self.redis.exists(f"{key}:version"))
+        with self._sqlite(collection_name) as conn:
+            return (
+                conn is not None
+                and conn.execute("SELECT 1 FROM snapshot").fetchone() is not None
+            )
+
+    def _read(self, collection_name: str, generation: Optional[str], position: int):
+        """
+        Read the log entries after ``position``, and the snapshot as well when
+        ``generation`` is not the current one. Returns (generation, position,
+        snapshot or None, entries), or None if the collection has no index.
+        """
+        if self.redis is not None:
+            key = self._redis_key(collection_name)
+            pipe = self.redis.pipeline()
+            pipe.get(f"{key}:version")
+            pipe.lrange(f"{key}:log", position, -1)
+            current, entries = pipe.execute()
+
+            snapshot = None
+            if current is not None and current != generation:
+                pipe = self.redis.pipeline()
+                pipe.get(f"{key}:version")
+                pipe.get(key)
+                pipe.lrange(f"{key}:log", 0, -1)
+                current, snapshot, entries = pipe.execute()
+                position = 0
+            if current is None or (current != generation and snapshot is None):
+                return None
+            return (
+                current,
+                position + len(entries),
+                snapshot,
+                [json.loads(entry) for entry in entries],
+            )
+
+        with self._sqlite(collection_name) as conn:
+            if conn is None:
+                return None
+            row = conn.execute("SELECT generation FROM snapshot").fetchone()
+            if row is None:
+                return None
+
+            snapshot = None
+            if row[0] != generation:
+                snapshot = conn.execute("SELECT data FROM snapshot").fetchone()[0]
+                position = 0
+            entries = conn.execute(
+                "SELECT position, op FROM log WHERE position > ? ORDER BY position",
+                (position,),
+            ).fetchall()
+            if entries:
+                position = entries[-1][0]
+            return row[0], position, snapshot, [json.loads(op) for _, op in entries]
+
+    def _append(
+        self,
+        collection_name: str,
+        op: dict,
+        items: int,
+        documents: Optional[dict] = None,
+        deleted: Optional[list[str]] = None,
+    ) -> int:
+        """Log ``op`` and return the number of items logged since the snapshot."""
+        data = json.dumps(op, ensure_ascii=False, default=str)
+        documents = documents or {}
+
+        if self.redis is not None:
+            key = self._redis_key(collection_name)
+            pipe = self.redis.pipeline()
+            pipe.rpush(f"{key}:log", data)
+            pipe.incrby(f"{key}:log_items", items)
+            if documents:
+                pipe.hset(
+                    f"{key}:docs",
+                    mapping={
+                        id: json.dumps(document, ensure_ascii=False, default=str)
+                        for id, document in documents.items()
+                    },
+                )
+            if deleted:
+                pipe.hdel(f"{key}:docs", *deleted)
+            return int(pipe.execute()[1])
+
+        with self._sqlite(collection_name, write=True) as conn:
+            conn.execute("INSERT INTO log (op, items) VALUES (?, ?)", (data, items))
+            conn.executemany(
+                "INSERT OR REPLACE INTO docs (id, text, metadata) VALUES (?, ?, ?)",
+                [
+                    (id, text, json.dumps(metadata, ensure_ascii=False, default=str))
+                    for id, (text, metadata) in documents.items()
+                ],
+            )
+            conn.executemany(
+                "DELETE FROM docs WHERE id = ?", [(id,) for id in deleted or []]
+            )
+            return conn.execute("SELECT SUM(items) FROM log").fetchone()[0]
+
+    def _write_snapshot(
+        self,
+        collection_name: str,
+        index: BM25Index,
+        documents: Optional[dict] = None,
+    ) -> str:
+        """
+        Replace the snapshot with ``index`` and clear the log. ``documents``
+        replaces every stored document; when omitted, documents that are no
+        longer indexed (deleted by filter) are dropped. Returns the generation.
+        """
+        with index.lock:
+            data = json.dumps(index.to_dict(), ensure_ascii=False, default=str)
+        generation = uuid.uuid4().hex
+
+        if self.redis is not None:
+            key = self._redis_key(collection_name)
+            stale = []
+            if documents is None:
+                stale = [
+                    id for id in self.redis.hkeys(f"{key}:docs") if id not in index
+                ]
+
+            pipe = self.redis.pipeline()
+            pipe.set(key, data)
+            pipe.set(f"{key}:version", generation)
+            pipe.delete(f"{key}:log", f"{key}:log_items")
+            if documents is not None:
+                pipe.delete(f"{key}:docs")
+                if documents:
+                    pipe.hset(
+                        f"{key}:docs",
+                        mapping={
+                            id: json.dumps(document, ensure_ascii=False, default=str)
+                            for id, document in documents.items()
+                        },
+                    )
+            elif stale:
+                pipe.hdel(f"{key}:docs", *stale)
+            pipe.execute()
+            return generation
+
+        with self._sqlite(collection_name, write=True, create=True) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshot (id, generation, data) VALUES (0, ?, ?)",
+                (generation, data),
+            )
+            conn.execute("DELETE FROM log")
+            if documents is not None:
+                conn.execute("DELETE FROM docs")
+                conn.executemany(
+                    "INSERT INTO docs (id, text, metadata) VALUES (?, ?, ?)",
+                    [
+                        (
+                            id,
+                            text,
+                            json.dumps(metadata, ensure_ascii=False, default=str),
+                        )
+                        for id, (text, metadata) in documents.items()
+                    ],
+                )
+            else:
+                conn.executemany(
+                    "DELETE FROM docs WHERE id = ?",
+                    [
+                        (id,)
+                        for (id,) in conn.execute("SELECT id FROM docs").fetchall()
+                        if id not in index
+                    ],
+                )
+        return generation
+
+    def _remove(self, collection_name: str):
+        if self.redis is not None:
+            key = self._redis_key(collection_name)
+            self.redis.delete(
+                key,
+                f"{key}:version",
+                f"{key}:log",
+                f"{key}:log_items",
+                f"{key}:docs",
+            )
+        else:
+            path = self._path(collection_name)
+            for suffix in ("", "-wal", "-shm"):
+                Path(f"{path}{suffix}").unlink(missing_ok=True)
+
+    def _mutex(self, collection_name: str):
+        if self.redis is not None:
+            return self.redis.lock(
+                f"{self._redis_key(collection_name)}:lock", timeout=60
+            )
+        return _FileLock(self._path(collection_name).with_suffix(".lock"))
+
+    def _cache_entry(self, collection_name: str) -> _CachedIndex:
+        with self._lock:
+            entry = self._cache.get(collection_name)
+            if entry is None:
+                entry = self._cache[collection_name] = _CachedIndex()
+            self._cache.move_to_end(collection_name)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+            return entry
+
+    def _compact(self, collection_name: str, logged: int):
+        """Fold the log into a new snapshot once it outgrows the index. Needs the collection lock."""
+        if logged < self.compact_min_items:
+            return
+
+        index = self.get(collection_name)
+        if index is None or logged < len(index):
+            return
+
+        entry = self._cache_entry(collection_name)
+        with entry.lock:
+            if entry.index is not index:
+                return
+            start = time.perf_counter()
+            entry.generation = self._write_snapshot(collection_name, index)
+            entry.position = 0
+        log.debug(
+            f"Compacted BM25 index for {collection_name} "
+            f"({logged} logged items, {time.perf_counter() - start:.2f}s)"
+        )
+
+    # Public API
+
+    def get(self, collection_name: str) -> Optional[BM25Index]:
+        entry = self._cache_entry(collection_name)
+        with entry.lock:
+            state = self._read(collection_name, entry.generation, entry.position)
+            if state is None:
+                entry.generation, entry.position, entry.index = None, 0, None
+                return None
+
+            generation, position, snapshot, entries = state
+            index = (
+                BM25Index.from_dict(json.loads(snapshot))
+                if snapshot is not None
+                else entry.index
+            )
+            for op in entries:
+                index.apply(op)
+
+            entry.generation, entry.position, entry.index = generation, position, index
+            return index
+
+    def get_documents(
+        self, collection_name: str, ids: list[str]
+    ) -> list[Optional[tuple[str, dict]]]:
+        """Texts and metadata of ``ids``, None for documents no longer stored."""
+        if not ids:
+            return []
+
+        if self.redis is not None:
+            key = self._redis_key(collection_name)
+            return [
+                tuple(json.loads(document)) if document is not None else None
+                for document in self.redis.hmget(f"{key}:docs", ids)
+            ]
+
+        with self._sqlite(collection_name) as conn:
+            if conn is None:
+                return [None] * len(ids)
+            rows = {
+                id: (text, json.loads(metadata))
+                for id, text, metadata in conn.execute(
+                    f"SELECT id, text, metadata FROM docs WHERE id IN ({', '.join('?' * len(ids))})",
+                    ids,
+                )
+            }
+        return [rows.get(id) for id in ids]
+
+    def get_or_build(
+        self, collection_name: str, loader: Callable[[], Optional[GetResult]]
+    ) -> BM25Index:
+        index = self.get(collection_name)
+        if index is not None:
+            return index
+
+        with self._mutex(collection_name):
+            # Another worker may have built it while we waited for the lock
+            index = self.get(collection_name)
+            if index is not None:
+                return index
+
+            start = time.perf_counter()
+            index, documents = BM25Index(), {}
+            result = loader()
+            if result and result.ids and result.documents and result.metadatas:
+                for id, text, metadata in zip(
+                    result.ids[0], result.documents[0], result.metadatas[0]
+                ):
+                    index.add(str(id), text, metadata)
+                    documents[str(id)] = (text, filter_metadata(metadata or {}))
+            self._write_snapshot(collection_name, index, documents)
+            log.info(
+                f"Built BM25 index for {collection_name} "
+                f"({len(index)} chunks, {time.perf_counter() - start:.2f}s)"
+            )
+
+        return self.get(collection_name)
+
+    def add(self, collection_name: str, items: list[dict], create: bool = False):
+        """
+        Index ``items`` (``VectorItem`` dicts), replacing documents with the same
+        id. Without an index the items are only indexed when ``create`` is set;
+        otherwise the index is built from the vector DB on the next query.
+        """
+        entries, documents = [], {}
+        for item in items:
+            id, metadata = str(item["id"]), item.get("metadata") or {}
+            entries.append(
+                [
+                    id,
+                    item["text"],
+                    {
+                        key: metadata[key]
+                        for key in (*ENRICHMENT_KEYS, *FILTER_KEYS)
+                        if key in metadata
+                    },
+                ]
+            )
+            documents[id] = (item["text"], filter_metadata(metadata))
+
+        with self._mutex(collection_name):
+            if not self._exists(collection_name):
+                if not create:
+                    return
+                self._write_snapshot(collection_name, BM25Index(), {})
+            logged = self._append(
+                collection_name, {"add": entries}, len(entries), documents=documents
+            )
+            self._compact(collection_name, logged)
+
+    def remove(self, collection_name: str, ids: list[str]):
+        ids = [str(id) for id in ids]
+        with self._mutex(collection_name):
+            if not self._exists(collection_name):
+                return
+            logged = self._append(
+                collection_name, {"remove": ids}, len(ids), deleted=ids
+            )
+            self._compact(collection_name, logged)
+
+    def remove_by_filter(self, collection_name: str, filter: dict):
+        if not is_supported_filter(filter):
+            # Rebuilt from the vector DB on the next query
+            self.delete(collection_name)
+            return
+
+        with self._mutex(collection_name):
+            if not self._exists(collection_name):
+                return
+            logged = self._append(collection_name, {"filter": filter}, 1)
+            self._compact(collection_name, logged)
+
+    def delete(self, collection_name: str):
+        with self._lock:
+            self._cache.pop(collection_name, None)
+        self._remove(collection_name)
+
+    def reset(self):
+        with self._lock:
+            self._cache.clear()
+        if self.redis is not None:
+            for key in self.redis.scan_iter(match=f"{REDIS_KEY_PREFIX}:bm25:*"):
+                self.redis.delete(key)
+        elif self.directory is not None:
+            for path in self.directory.glob("*.db*"):
+                path.unlink(missing_ok=True)
+
+
+class BM25IndexedVectorDB(VectorDBBase):
+    """
+    Vector DB client wrapper that keeps the BM25 index store in sync with
+    every insert, upsert and delete, whichever router performs them.
+    """
+
+    def __init__(self, client: VectorDBBase, store: BM25IndexStore):
+        self.client = client
+        self.store = store
+
+    def __getattr__(self, item):
+        # Backend-specific attributes (e.g. the raw SDK client) pass through
+        return getattr(self.client, item)
+
+    def _index_items(self, collection_name: str, items: List[VectorItem], new: bool):
+        try:
+            self.store.add(
+                collection_name,
+                [
+                    item if isinstance(item, dict) else item.model_dump()
+                    for item in items
+                ],
+                create=new,
+            )
+        except Exception as e:
+            log.warning(f"Failed to update BM25 index for {collection_name}: {e}")
+            self.store.delete(collection_name)
+
+    def has_collection(self, collection_name: str) -> bool:
+        return self.client.has_collection(collection_name=collection_name)
+
+    def delete_collection(self, collection_name: str) -> None:
+        self.store.delete(collection_name)
+        return self.client.delete_collection(collection_name=collection_name)
+
+    def insert(self, collection_name: str, items: List[VectorItem]) -> None:
+        # A collection that does not exist yet can be indexed from the inserted
+        # items alone; an existing unindexed one is built lazily on first query.
+        new = not self.client.has_collection(collection_name=collection_name)
+        result = self.client.insert(collection_name=collection_name, items=items)
+        self._index_items(collection_name, items, new)
+        return result
+
+    def upsert(self, collection_name: str, items: List[VectorItem]) -> None:
+        new = not self.client.has_collection(collection_name=collection_name)
+        result = self.client.upsert(collection_name=collection_name, items=items)
+        self._index_items(collection_name, items, new)
+        return result
+
+    def search(
+        self,
+        collection_name: str,
+        vectors: List[List[Union[float, int]]],
+        filter: Optional[Dict] = None,
+        limit: int = 10,
+    ) -> Optional[SearchResult]:
+        return self.client.search(
+            collection_name=collection_name,
+            vectors=vectors,
+            filter=filter,
+            limit=limit,
+        )
+
+    def query(
+        self, collection_name: str, filter: Dict, limit: Optional[int] = None
+    ) -> Optional[GetResult]:
+        return self.client.query(
+            collection_name=collection_name, filter=filter, limit=limit
+        )
+
+    def get(self, collection_name: str) -> Optional[GetResult]:
+        return self.client.get(collection_name=collection_name)
+
+    def delete(
+        self,
+        collection_name: str,
+        ids: Optional[List[str]] = None,
+        filter: Optional[Dict] = None,
+    ) -> None:
+        result = self.client.delete(
+            collection_name=collection_name, ids=ids, filter=filter
+        )
+
+        try:
+            if ids:
+                self.store.remove(collection_name, ids)
+            elif filter:
+                self.store.remove_by_filter(collection_name, filter)
+            else:
+                self.store.delete(collection_name)
+        except Exception as e:
+            log.warning(f"Failed to update BM25 index for {collection_name}: {e}")
+            self.store.delete(collection_name)
+        return result
+
+    def reset(self) -> None:
+        self.store.reset()
+        return self.client.reset()
+
+
+BM25_INDEX_STORE = (
+    BM25IndexStore(
+        redis_client=get_redis_client(),
+        directory=BM25_INDEX_DIR,
+        max_cached=BM25_INDEX_MAX_CACHED,
+        compact_min_items=BM25_INDEX_COMPACT_MIN_ITEMS,
+    )
+    if ENABLE_BM25_INDEX
+    else None
+)
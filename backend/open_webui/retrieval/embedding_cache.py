@@ -0,0 +1,203 @@
+"""
+Cache for query-time embeddings.
+
+Retrieval embeds the same queries again and again (regenerated answers, the
+same question asked in several chats, every query variant of a multi-query
+search). Embeddings are keyed by a hash of the engine, model, prefix and text,
+kept in a bounded per-process LRU and optionally shared between workers
+through Redis, so a repeated text is embedded by the provider only once per
+TTL.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Union
+
+from open_webui.env import (
+    QUERY_EMBEDDING_CACHE_SIZE,
+    QUERY_EMBEDDING_CACHE_TTL,
+    REDIS_KEY_PREFIX,
+)
+
+log = logging.getLogger(__name__)
+
+
+def get_embedding_namespace(
+    engine: str,
+    model: str,
+    url: Optional[str] = None,
+    azure_api_version: Optional[str] = None,
+) -> str:
+    """
+    Identify the embedding space of cached vectors. The same model name served
+    from another endpoint or Azure API version may return different vectors.
+    """
+    namespace = f"{engine}:{model}:{url or ''}"
+    if azure_api_version:
+        namespace += f":{azure_api_version}"
+    return namespace
+
+
+def get_cache_key(namespace: str, prefix: Optional[str], text: str) -> str:
+    return hashlib.sha256(
+        "\x00".join([namespace, prefix or "", text]).encode("utf-8", "replace")
+    ).hexdigest()
+
+
+class QueryEmbeddingCache:
+    def __init__(self, max_size: int = 1000, ttl: int = 3600, redis=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        # async client, set in the app lifespan when the Redis tier is enabled
+        self.redis = redis
+
+        # embeddings are stored as double arrays, a quarter of the size of a
+        # list of floats
+        self._entries: "OrderedDict[str, tuple[array, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "redis_hits": 0,
+            "saved_calls": 0,
+            "evictions": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    @property
+    def size(self) -> int:
+        return len(self._entries)
+
+    def _redis_key(self, key: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:embedding:{key}"
+
+    def _get_local(self, key: str) -> Optional[list[float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            embedding, expires_at = entry
+            if expires_at and expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return embedding.tolist()
+
+    def _set_local(self, key: str, embedding: list[float]) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl > 0 else 0.0
+        with self._lock:
+            self._entries[key] = (array("d", embedding), expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    async def get_many(self, keys: list[str]) -> list[Optional[list[float]]]:
+        results = [self._get_local(key) for key in keys]
+
+        missing = [idx for idx, result in enumerate(results) if result is None]
+        if missing and self.redis is not None:
+            try:
+                values = await self.redis.mget(
+                    [self._redis_key(keys[idx]) for idx in missing]
+                )
+            except Exception as e:
+                log.warning(f"Failed to read embeddings from Redis: {e}")
+                values = []
+
+            for idx, value in zip(missing, values):
+                if value:
+                    results[idx] = json.loads(value)
+                    self._set_local(keys[idx], results[idx])
+                    self.stats["redis_hits"] += 1
+
+        hits = sum(result is not None for result in results)
+        self.stats["hits"] += hits
+        self.stats["misses"] += len(keys) - hits
+        return results
+
+    async def set_many(self, items: dict[str, list[float]]) -> None:
+        for key, embedding in items.items():
+            self._set_local(key, embedding)
+
+        if items and self.redis is not None:
+            try:
+                pipe = self.redis.pipeline()
+                for key, embedding in items.items():
+                    pipe.set(
+                        self._redis_key(key),
+                        json.dumps(embedding),
+                        ex=self.ttl if self.ttl > 0 else None,
+                    )
+                await pipe.execute()
+            except Exception as e:
+                log.warning(f"Failed to write embeddings to Redis: {e}")
+
+    async def embed(
+        self,
+        namespace: str,
+        query: Union[str, list[str]],
+        prefix: Optional[str],
+        embedding_function: Callable[[Union[str, list[str]]], Awaitable],
+    ):
+        """
+        Embed ``query`` (a text or a list of texts) like ``embedding_function``
+        would, calling it only for the texts that are not cached.
+        """
+        texts = query if isinstance(query, list) else [query]
+        if not texts:
+            return await embedding_function(query)
+
+        keys = [get_cache_key(namespace, prefix, text) for text in texts]
+        embeddings = await self.get_many(keys)
+
+        # duplicate texts in one request are embedded once
+        missing = list(
+            dict.fromkeys(
+                key for key, embedding in zip(keys, embeddings) if embedding is None
+            )
+        )
+        if not missing:
+            self.stats["saved_calls"] += 1
+            return embeddings if isinstance(query, list) else embeddings[0]
+
+        missing_texts = [texts[keys.index(key)] for key in missing]
+        if isinstance(query, list):
+            result = await embedding_function(missing_texts)
+        else:
+            result = await embedding_function(query)
+            result = [result] if result is not None else None
+
+        if not isinstance(result, list) or len(result) != len(missing):
+            # failed or partial response: leave the error handling to the
+            # caller, as without the cache
+            if len(missing) == len(texts):
+                return result if isinstance(query, list) else None
+            return await embedding_function(query)
+
+        await self.set_many(dict(zip(missing, result)))
+
+        generated = dict(zip(missing, result))
+        embeddings = [
+            embedding if embedding is not None else generated[key]
+            for key, embedding in zip(keys, embeddings)
+        ]
+        return embeddings if isinstance(query, list) else embeddings[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+QUERY_EMBEDDING_CACHE = QueryEmbeddingCache(
+    max_size=QUERY_EMBEDDING_CACHE_SIZE, ttl=QUERY_EMBEDDING_CACHE_TTL
+)
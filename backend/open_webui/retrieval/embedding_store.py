@@ -0,0 +1,226 @@
+"""
+Content-addressed store for chunk embeddings.
+
+Reindexing a knowledge base, re-adding a file or uploading the same document
+twice produces chunks that were embedded before. Embeddings are keyed by a hash
+of the embedding namespace (engine, model and endpoint), prefix and chunk text and kept in a local
+SQLite file, so ``save_docs_to_vector_db`` only sends unseen chunks to the
+provider. The least recently used entries are evicted once the store holds
+more than ``max_entries``.
+
+Vectors are stored as float32, the precision vector databases keep anyway.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Optional
+
+from open_webui.env import (
+    CHUNK_EMBEDDING_STORE_MAX_ENTRIES,
+    CHUNK_EMBEDDING_STORE_PATH,
+    ENABLE_CHUNK_EMBEDDING_STORE,
+)
+from open_webui.retrieval.embedding_cache import get_cache_key
+
+log = logging.getLogger(__name__)
+
+# Evict a little more than needed, so the next inserts do not evict again
+EVICTION_SLACK = 0.1
+
+SQLITE_MAX_VARIABLES = 500
+
+
+class ChunkEmbeddingLookup:
+    """Cached embeddings for a list of texts and the texts still to embed."""
+
+    def __init__(
+        self,
+        store: "ChunkEmbeddingStore",
+        keys: list[str],
+        embeddings: list[Optional[list[float]]],
+        texts: list[str],
+    ):
+        self.store = store
+        self.keys = keys
+        self.embeddings = embeddings
+
+        # duplicate chunks in one batch are embedded once
+        missing = {
+            key: text
+            for key, text, embedding in zip(keys, texts, embeddings)
+            if embedding is None
+        }
+        self.missing_keys = list(missing)
+        self.missing = list(missing.values())
+
+    def resolve(self, generated: Optional[list]) -> list[list[float]]:
+        """Combine the cached embeddings with ``generated`` for ``missing``."""
+        if not self.missing_keys:
+            return self.embeddings
+
+        if not isinstance(generated, list) or len(generated) != len(self.missing):
+            raise RuntimeError(
+                f"Expected {len(self.missing)} embeddings, got "
+                f"{len(generated) if isinstance(generated, list) else generated}"
+            )
+
+        generated = dict(zip(self.missing_keys, generated))
+        self.store.set_many(generated)
+        return [
+            embedding if embedding is not None else generated[key]
+            for key, embedding in zip(self.keys, self.embeddings)
+        ]
+
+
+class ChunkEmbeddingStore:
+    def __init__(self, path: str, max_entries: int = 100000, enabled: bool = True):
+        self.path = path
+        self.max_entries = max_entries
+        self._enabled = enabled
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._count: Optional[int] = None
+        self._lock = threading.Lock()
+
+        self.stats = {
+            "lookups": 0,
+            "hits": 0,
+            "stored": 0,
+            "evictions": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled and self.max_entries > 0
+
+    @property
+    def saved_ratio(self) -> float:
+        """Share of chunk embeddings served without a provider call."""
+        lookups = self.stats["lookups"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            # WAL lets the workers of one node read while another one writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunk_embedding ("
+                "key TEXT PRIMARY KEY, vector BLOB NOT NULL, used_at INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS chunk_embedding_used_at_idx "
+                "ON chunk_embedding (used_at)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get_many(self, keys: list[str]) -> list[Optional[list[float]]]:
+        results: list[Optional[list[float]]] = [None] * len(keys)
+        if not self.enabled or not keys:
+            return results
+
+        found = {}
+        try:
+            with self._lock:
+                conn = self._connect()
+                unique_keys = list(dict.fromkeys(keys))
+                for idx in range(0, len(unique_keys), SQLITE_MAX_VARIABLES):
+                    batch = unique_keys[idx : idx + SQLITE_MAX_VARIABLES]
+                    placeholders = ",".join("?" * len(batch))
+                    found.update(
+                        conn.execute(
+                            f"SELECT key, vector FROM chunk_embedding WHERE key IN ({placeholders})",
+                            batch,
+                        ).fetchall()
+                    )
+                    conn.execute(
+                        f"UPDATE chunk_embedding SET used_at = ? WHERE key IN ({placeholders})",
+                        [int(time.time()), *batch],
+                    )
+                conn.commit()
+        except Exception as e:
+            log.warning(f"Failed to read chunk embeddings: {e}")
+
+        for idx, key in enumerate(keys):
+            if key in found:
+                vector = array("f")
+                vector.frombytes(found[key])
+                results[idx] = vector.tolist()
+
+        self.stats["lookups"] += len(keys)
+        self.stats["hits"] += sum(result is not None for result in results)
+        return results
+
+    def set_many(self, items: dict[str, list[float]]) -> None:
+        if not self.enabled or not items:
+            return
+
+        now = int(time.time())
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.executemany(
+                    "INSERT OR REPLACE INTO chunk_embedding (key, vector, used_at) "
+                    "VALUES (?, ?, ?)",
+                    [
+                        (key, array("f", embedding).tobytes(), now)
+                        for key, embedding in items.items()
+                    ],
+                )
+                conn.commit()
+                self.stats["stored"] += len(items)
+
+                if self._count is None:
+                    self._count = conn.execute(
+                        "SELECT COUNT(*) FROM chunk_embedding"
+                    ).fetchone()[0]
+                else:
+                    self._count += len(items)
+                if self._count > self.max_entries:
+                    self._evict(conn)
+        except Exception as e:
+            log.warning(f"Failed to store chunk embeddings: {e}")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        # Other workers write to the same file, so recount before evicting
+        count = conn.execute("SELECT COUNT(*) FROM chunk_embedding").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            excess += int(self.max_entries * EVICTION_SLACK)
+            deleted = conn.execute(
+                "DELETE FROM chunk_embedding WHERE key IN ("
+                "SELECT key FROM chunk_embedding ORDER BY used_at LIMIT ?)",
+                (excess,),
+            ).rowcount
+            conn.commit()
+            self.stats["evictions"] += deleted
+            count -= deleted
+        self._count = max(count, 0)
+
+    def lookup(
+        self, namespace: str, prefix: Optional[str], texts: list[str]
+    ) -> ChunkEmbeddingLookup:
+        keys = [get_cache_key(namespace, prefix, text) for text in texts]
+        return ChunkEmbeddingLookup(self, keys, self.get_many(keys), texts)
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM chunk_embedding")
+            conn.commit()
+            self._count = 0
+
+
+CHUNK_EMBEDDING_STORE = ChunkEmbeddingStore(
+    CHUNK_EMBEDDING_STORE_PATH,
+    max_entries=CHUNK_EMBEDDING_STORE_MAX_ENTRIES,
+    enabled=ENABLE_CHUNK_EMBEDDING_STORE,
+)
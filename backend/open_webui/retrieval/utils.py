@@ -6,7 +6,7 @@ import requests
 import aiohttp
 import asyncio
 import hashlib
-from concurrent.futures import ThreadPoolExecutor
+import heapq
 import time
 import re
 
@@ -31,7 +31,17 @@ from open_webui.models.notes import Notes
 from open_webui.models.access_grants import AccessGrants
 
 from open_webui.retrieval.vector.main import GetResult
+from open_webui.retrieval.embedding_cache import (
+    QueryEmbeddingCache,
+    get_embedding_namespace,
+)
+from open_webui.retrieval.bm25 import (
+    BM25_INDEX_STORE,
+    BM25Index,
+    get_enriched_text_parts,
+)
 from open_webui.utils.headers import include_user_info_headers
+from open_webui.utils.session_pool import client_session
 from open_webui.utils.misc import get_message_list
 
 from open_webui.retrieval.web.utils import get_web_loader
@@ -42,6 +52,7 @@ from open_webui.env import (
     OFFLINE_MODE,
     ENABLE_FORWARD_USER_INFO_HEADERS,
     AIOHTTP_CLIENT_SESSION_SSL,
+    RAG_QUERY_CONCURRENCY,
 )
 from open_webui.config import (
     RAG_EMBEDDING_QUERY_PREFIX,
@@ -121,7 +132,9 @@ class VectorSearchRetriever(BaseRetriever):
         run_manager: CallbackManagerForRetrieverRun,
     ) -> list[Document]:
         embedding = await self.embedding_function(query, RAG_EMBEDDING_QUERY_PREFIX)
-        result = VECTOR_DB_CLIENT.search(
+        # off the event loop so other collections are searched meanwhile
+        result = await asyncio.to_thread(
+            VECTOR_DB_CLIENT.search,
             collection_name=self.collection_name,
             vectors=[embedding],
             limit=self.top_k,
@@ -182,38 +195,93 @@ def get_enriched_texts(collection_result: GetResult) -> list[str]:
     enriched_texts = []
     for idx, text in enumerate(collection_result.documents[0]):
         metadata = collection_result.metadatas[0][idx]
-        metadata_parts = [text]
+        enriched_texts.append(" ".join([text, *get_enriched_text_parts(metadata)]))
 
-        # Add filename (repeat twice for extra weight in BM25 scoring)
-        if metadata.get("name"):
-            filename = metadata["name"]
-            filename_tokens = (
-                filename.replace("_", " ").replace("-", " ").replace(".", " ")
-            )
-            metadata_parts.append(
-                f"Filename: {filename} {filename_tokens} {filename_tokens}"
+    return enriched_texts
+
+
+class BM25IndexRetriever(BaseRetriever):
+    index: Any
+    store: Any
+    collection_name: str
+    top_k: int
+    enable_enriched_texts: bool = False
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        hits = self.index.search(query, self.top_k, enriched=self.enable_enriched_texts)
+        results = []
+        for document in self.store.get_documents(
+            self.collection_name, [id for id, _ in hits]
+        ):
+            # Deleted since this worker last read the index
+            if document is None:
+                continue
+            text, metadata = document
+            results.append(
+                Document(
+                    metadata={**metadata, CHUNK_HASH_KEY: _content_hash(text)},
+                    page_content=text,
+                )
             )
+        return results
 
-        # Add title if available
-        if metadata.get("title"):
-            metadata_parts.append(f"Title: {metadata['title']}")
 
-        # Add document section headings if available (from markdown splitter)
-        if metadata.get("headings") and isinstance(metadata["headings"], list):
-            headings = " > ".join(str(h) for h in metadata["headings"])
-            metadata_parts.append(f"Section: {headings}")
+async def get_bm25_index(collection_name: str) -> BM25Index:
+    """Load the persisted BM25 index of a collection, building it on first use."""
+    return await asyncio.to_thread(
+        BM25_INDEX_STORE.get_or_build,
+        collection_name,
+        lambda: VECTOR_DB_CLIENT.get(collection_name=collection_name),
+    )
 
-        # Add source URL/path if available
-        if metadata.get("source"):
-            metadata_parts.append(f"Source: {metadata['source']}")
 
-        # Add snippet for web search results
-        if metadata.get("snippet"):
-            metadata_parts.append(f"Snippet: {metadata['snippet']}")
+def get_bm25_retriever(
+    collection_name: str,
+    collection_result: GetResult,
+    k: int,
+    enable_enriched_texts: bool = False,
+) -> Optional[BM25Retriever]:
+    """Build an in-memory BM25 retriever from a full collection dump."""
+    # First check if collection_result has the required attributes
+    if (
+        not collection_result
+        or not hasattr(collection_result, "documents")
+        or not hasattr(collection_result, "metadatas")
+    ):
+        log.warning(f"query_doc_with_hybrid_search:no_docs {collection_name}")
+        return None
+
+    # Now safely check the documents content after confirming attributes exist
+    if (
+        not collection_result.documents
+        or len(collection_result.documents) == 0
+        or not collection_result.documents[0]
+    ):
+        log.warning(f"query_doc_with_hybrid_search:no_docs {collection_name}")
+        return None
 
-        enriched_texts.append(" ".join(metadata_parts))
+    log.debug(f"query_doc_with_hybrid_search:doc {collection_name}")
 
-    return enriched_texts
+    original_texts = collection_result.documents[0]
+    bm25_metadatas = [
+        {**meta, CHUNK_HASH_KEY: _content_hash(original_texts[idx])}
+        for idx, meta in enumerate(collection_result.metadatas[0])
+    ]
+
+    bm25_texts = (
+        get_enriched_texts(collection_result)
+        if enable_enriched_texts
+        else original_texts
+    )
+
+    bm25_retriever = BM25Retriever.from_texts(
+        texts=bm25_texts,
+        metadatas=bm25_metadatas,
+    )
+    bm25_retriever.k = k
+    return bm25_retriever
 
 
 async def query_doc_with_hybrid_search(
@@ -229,43 +297,26 @@ async def query_doc_with_hybrid_search(
     enable_enriched_texts: bool = False,
 ) -> dict:
     try:
-        # First check if collection_result has the required attributes
-        if (
-            not collection_result
-            or not hasattr(collection_result, "documents")
-            or not hasattr(collection_result, "metadatas")
-        ):
-            log.warning(f"query_doc_with_hybrid_search:no_docs {collection_name}")
-            return {"documents": [], "metadatas": [], "distances": []}
-
-        # Now safely check the documents content after confirming attributes exist
-        if (
-            not collection_result.documents
-            or len(collection_result.documents) == 0
-            or not collection_result.documents[0]
-        ):
-            log.warning(f"query_doc_with_hybrid_search:no_docs {collection_name}")
-            return {"documents": [], "metadatas": [], "distances": []}
-
-        log.debug(f"query_doc_with_hybrid_search:doc {collection_name}")
-
-        original_texts = collection_result.documents[0]
-        bm25_metadatas = [
-            {**meta, CHUNK_HASH_KEY: _content_hash(original_texts[idx])}
-            for idx, meta in enumerate(collection_result.metadatas[0])
-        ]
-
-        bm25_texts = (
-            get_enriched_texts(collection_result)
-            if enable_enriched_texts
-            else original_texts
-        )
-
-        bm25_retriever = BM25Retriever.from_texts(
-            texts=bm25_texts,
-            metadatas=bm25_metadatas,
-        )
-        bm25_retriever.k = k
+        if BM25_INDEX_STORE is not None:
+            bm25_index = await get_bm25_index(collection_name)
+            if len(bm25_index) == 0:
+                log.warning(f"query_doc_with_hybrid_search:no_docs {collection_name}")
+                return {"documents": [], "metadatas": [], "distances": []}
+
+            log.debug(f"query_doc_with_hybrid_search:bm25_index {collection_name}")
+            bm25_retriever = BM25IndexRetriever(
+                index=bm25_index,
+                store=BM25_INDEX_STORE,
+                collection_name=collection_name,
+                top_k=k,
+                enable_enriched_texts=enable_enriched_texts,
+            )
+        else:
+            bm25_retriever = get_bm25_retriever(
+                collection_name, collection_result, k, enable_enriched_texts
+            )
+            if bm25_retriever is None:
+                return {"documents": [], "metadatas": [], "distances": []}
 
         vector_search_retriever = VectorSearchRetriever(
             collection_name=collection_name,
@@ -359,9 +410,18 @@ def merge_get_results(get_results: list[dict]) -> dict:
     return result
 
 
+def get_chunk_key(document: str, metadata: Optional[dict]):
+    """Dedup key of a result chunk: the hash stored by the hybrid retrievers,
+    otherwise the text itself (compared by Python's cached str hash)."""
+    if metadata and metadata.get(CHUNK_HASH_KEY):
+        return metadata[CHUNK_HASH_KEY]
+    return document
+
+
 def merge_and_sort_query_results(query_results: list[dict], k: int) -> dict:
-    # Initialize lists to store combined data
-    combined = dict()  # To store documents with unique document hashes
+    # Best (distance, order, document, metadata) per unique chunk
+    combined = dict()
+    order = 0
 
     for data in query_results:
         if (
@@ -376,36 +436,61 @@ def merge_and_sort_query_results(query_results: list[dict], k: int) -> dict:
         metadatas = data["metadatas"][0]
 
         for distance, document, metadata in zip(distances, documents, metadatas):
-            if isinstance(document, str):
-                doc_hash = hashlib.sha256(
-                    document.encode()
-                ).hexdigest()  # Compute a hash for uniqueness
-
-                if doc_hash not in combined.keys():
-                    combined[doc_hash] = (distance, document, metadata)
-                    continue  # if doc is new, no further comparison is needed
-
-                # if doc is alredy in, but new distance is better, update
-                if distance > combined[doc_hash][0]:
-                    combined[doc_hash] = (distance, document, metadata)
-
-    combined = list(combined.values())
-    # Sort the list based on distances
-    combined.sort(key=lambda x: x[0], reverse=True)
-
-    # Slice to keep only the top k elements
-    sorted_distances, sorted_documents, sorted_metadatas = (
-        zip(*combined[:k]) if combined else ([], [], [])
-    )
+            if not isinstance(document, str):
+                continue
+
+            key = get_chunk_key(document, metadata)
+            existing = combined.get(key)
+            if existing is None:
+                combined[key] = (distance, order, document, metadata)
+                order += 1
+            # if doc is already in, but new distance is better, update
+            elif distance > existing[0]:
+                combined[key] = (distance, existing[1], document, metadata)
+
+    # Top k by distance, ties in first-seen order
+    top = heapq.nsmallest(k, combined.values(), key=lambda item: (-item[0], item[1]))
 
-    # Create and return the output dictionary
     return {
-        "distances": [list(sorted_distances)],
-        "documents": [list(sorted_documents)],
-        "metadatas": [list(sorted_metadatas)],
+        "distances": [[item[0] for item in top]],
+        "documents": [[item[2] for item in top]],
+        "metadatas": [[item[3] for item in top]],
     }
 
 
+async def run_collection_queries(tasks: list[tuple], run, concurrency: int) -> list:
+    """
+    Await ``run(collection_name, query)`` for every task with at most
+    ``concurrency`` running at once (0 = unlimited), in task order, and log the
+    time spent per collection.
+    """
+    semaphore = asyncio.Semaphore(concurrency) if concurrency > 0 else None
+    latencies = {}
+
+    async def run_task(collection_name, query):
+        if semaphore is not None:
+            await semaphore.acquire()
+        start = time.perf_counter()
+        try:
+            return await run(collection_name, query)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            if semaphore is not None:
+                semaphore.release()
+            latencies.setdefault(collection_name, []).append(elapsed)
+
+    results = await asyncio.gather(
+        *[run_task(collection_name, query) for collection_name, query in tasks]
+    )
+
+    for collection_name, elapsed in latencies.items():
+        log.info(
+            f"collection query {collection_name}: {len(elapsed)} queries, "
+            f"max {max(elapsed):.1f}ms, total {sum(elapsed):.1f}ms"
+        )
+    return results
+
+
 def get_all_items_from_collections(collection_names: list[str]) -> dict:
     results = []
 
@@ -432,10 +517,11 @@ async def query_collection(
     results = []
     error = False
 
-    def process_query_collection(collection_name, query_embedding):
+    async def process_query_collection(collection_name, query_embedding):
         try:
             if collection_name:
-                result = query_doc(
+                result = await asyncio.to_thread(
+                    query_doc,
                     collection_name=collection_name,
                     k=k,
                     query_embedding=query_embedding,
@@ -455,15 +541,15 @@ async def query_collection(
         f"query_collection: processing {len(queries)} queries across {len(collection_names)} collections"
     )
 
-    with ThreadPoolExecutor() as executor:
-        future_results = []
-        for query_embedding in query_embeddings:
-            for collection_name in collection_names:
-                result = executor.submit(
-                    process_query_collection, collection_name, query_embedding
-                )
-                future_results.append(result)
-        task_results = [future.result() for future in future_results]
+    task_results = await run_collection_queries(
+        [
+            (collection_name, query_embedding)
+            for query_embedding in query_embeddings
+            for collection_name in collection_names
+        ],
+        process_query_collection,
+        RAG_QUERY_CONCURRENCY,
+    )
 
     for result, err in task_results:
         if err is not None:
@@ -490,21 +576,30 @@ async def query_collection_with_hybrid_search(
 ) -> dict:
     results = []
     error = False
-    # Fetch collection data once per collection sequentially
+    # Fetch collection data once per collection
     # Avoid fetching the same data multiple times later
+    # Not needed when BM25 is served from the persistent index
     collection_results = {}
-    for collection_name in collection_names:
+
+    async def fetch_collection(collection_name, _):
         try:
             log.debug(
                 f"query_collection_with_hybrid_search:VECTOR_DB_CLIENT.get:collection {collection_name}"
             )
-            collection_results[collection_name] = VECTOR_DB_CLIENT.get(
-                collection_name=collection_name
+            collection_results[collection_name] = await asyncio.to_thread(
+                VECTOR_DB_CLIENT.get, collection_name=collection_name
             )
         except Exception as e:
             log.exception(f"Failed to fetch collection {collection_name}: {e}")
             collection_results[collection_name] = None
 
+    if BM25_INDEX_STORE is None:
+        await run_collection_queries(
+            [(collection_name, None) for collection_name in collection_names],
+            fetch_collection,
+            RAG_QUERY_CONCURRENCY,
+        )
+
     log.info(
         f"Starting hybrid search for {len(queries)} queries in {len(collection_names)} collections..."
     )
@@ -513,7 +608,7 @@ async def query_collection_with_hybrid_search(
         try:
             result = await query_doc_with_hybrid_search(
                 collection_name=collection_name,
-                collection_result=collection_results[collection_name],
+                collection_result=collection_results.get(collection_name),
                 query=query,
                 embedding_function=embedding_function,
                 k=k,
@@ -533,13 +628,14 @@ async def query_collection_with_hybrid_search(
     tasks = [
         (collection_name, query)
         for collection_name in collection_names
-        if collection_results[collection_name] is not None
+        if BM25_INDEX_STORE is not None
+        or collection_results[collection_name] is not None
         for query in queries
     ]
 
-    # Run all queries in parallel using asyncio.gather
-    task_results = await asyncio.gather(
-        *[process_query(collection_name, query) for collection_name, query in tasks]
+    # Run all queries in parallel, bounded by RAG_QUERY_CONCURRENCY
+    task_results = await run_collection_queries(
+        tasks, process_query, RAG_QUERY_CONCURRENCY
     )
 
     for result, err in task_results:
@@ -583,7 +679,7 @@ async def agenerate_openai_batch_embeddings(
         if ENABLE_FORWARD_USER_INFO_HEADERS and user:
             headers = include_user_info_headers(headers, user)
 
-        async with aiohttp.ClientSession(
+        async with client_session(
             trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
         ) as session:
             async with session.post(
@@ -654,7 +750,7 @@ async def agenerate_azure_openai_batch_embeddings(
         if ENABLE_FORWARD_USER_INFO_HEADERS and user:
             headers = include_user_info_headers(headers, user)
 
-        async with aiohttp.ClientSession(
+        async with client_session(
             trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
         ) as session:
             async with session.post(
@@ -718,7 +814,7 @@ async def agenerate_ollama_batch_embeddings(
         if ENABLE_FORWARD_USER_INFO_HEADERS and user:
             headers = include_user_info_headers(headers, user)
 
-        async with aiohttp.ClientSession(
+        async with client_session(
             trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
         ) as session:
             async with session.post(
@@ -759,6 +855,47 @@ def get_embedding_function(
     azure_api_version=None,
     enable_async=True,
     concurrent_requests=0,
+    cache: Optional[QueryEmbeddingCache] = None,
+) -> Awaitable:
+    async_embedding_function = _get_embedding_function(
+        embedding_engine,
+        embedding_model,
+        embedding_function,
+        url,
+        key,
+        embedding_batch_size,
+        azure_api_version=azure_api_version,
+        enable_async=enable_async,
+        concurrent_requests=concurrent_requests,
+    )
+    if cache is None or not cache.enabled:
+        return async_embedding_function
+
+    namespace = get_embedding_namespace(
+        embedding_engine, embedding_model, url, azure_api_version
+    )
+
+    async def cached_embedding_function(query, prefix=None, user=None):
+        return await cache.embed(
+            namespace,
+            query,
+            prefix,
+            lambda texts: async_embedding_function(texts, prefix=prefix, user=user),
+        )
+
+    return cached_embedding_function
+
+
+def _get_embedding_function(
+    embedding_engine,
+    embedding_model,
+    embedding_function,
+    url,
+    key,
+    embedding_batch_size,
+    azure_api_version=None,
+    enable_async=True,
+    concurrent_requests=0,
 ) -> Awaitable:
     if embedding_engine == "":
         # Sentence transformers: CPU-bound sync operation
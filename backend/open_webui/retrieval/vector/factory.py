@@ -1,5 +1,6 @@
 from open_webui.retrieval.vector.main import VectorDBBase
 from open_webui.retrieval.vector.type import VectorType
+from open_webui.env import ENABLE_BM25_INDEX
 from open_webui.config import (
     VECTOR_DB,
     ENABLE_QDRANT_MULTITENANCY_MODE,
@@ -86,3 +87,8 @@ class Vector:
 
 
 VECTOR_DB_CLIENT = Vector.get_vector(VECTOR_DB)
+
+if ENABLE_BM25_INDEX:
+    from open_webui.retrieval.bm25 import BM25_INDEX_STORE, BM25IndexedVectorDB
+
+    VECTOR_DB_CLIENT = BM25IndexedVectorDB(VECTOR_DB_CLIENT, BM25_INDEX_STORE)
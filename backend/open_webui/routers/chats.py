@@ -1018,7 +1018,7 @@ async def update_chat_message_by_id(
             detail=ERROR_MESSAGES.ACCESS_PROHIBITED,
         )
 
-    chat = Chats.upsert_message_to_chat_by_id_and_message_id(
+    Chats.upsert_message_to_chat_by_id_and_message_id(
         id,
         message_id,
         {
@@ -1026,6 +1026,7 @@ async def update_chat_message_by_id(
         },
         db=db,
     )
+    chat = Chats.get_chat_by_id(id, db=db)
 
     event_emitter = get_event_emitter(
         {
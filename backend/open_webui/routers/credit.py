@@ -25,6 +25,7 @@ from open_webui.models.credits import (
     TradeTickets,
     CreditLogSimpleModel,
     CreditLogs,
+    CreditUsageRollups,
     RedemptionCodes,
     RedemptionCodeModel,
 )
@@ -246,17 +247,19 @@ async def get_statistics(
                 "user_payment_stats_x": [],
                 "user_payment_stats_y": [],
             }
-    else:
-        users = Users.get_users()["users"]
-        user_map = {user.id: user.name for user in users}
 
     # load credit data
-    logs = CreditLogs.get_log_by_time(
+    usage = CreditUsageRollups.get_usage_by_user_and_model(
         form_data.start_time, form_data.end_time, user_ids
     )
     trade_logs = TradeTickets.get_ticket_by_time(
         form_data.start_time, form_data.end_time, user_ids
     )
+    if not form_data.query:
+        users = Users.get_users_by_user_ids(
+            user_ids=list({user_id for user_id, _ in usage})
+        )
+        user_map = {user.id: user.name for user in users}
 
     # build graph data
     total_tokens = 0
@@ -265,24 +268,16 @@ async def get_statistics(
     model_token_pie = defaultdict(int)
     user_cost_pie = defaultdict(int)
     user_token_pie = defaultdict(int)
-    for log in logs:
-        if not log.detail.usage or log.detail.usage.total_price is None:
-            continue
-
-        model = log.detail.api_params.model
-        if not model:
-            continue
-
-        total_tokens += log.detail.usage.total_tokens
-        total_credit += log.detail.usage.total_price
+    for (user_id, model_key), (tokens, price) in usage.items():
+        total_tokens += tokens
+        total_credit += price
 
-        model_key = log.detail.api_params.model.id
-        model_cost_pie[model_key] += log.detail.usage.total_price
-        model_token_pie[model_key] += log.detail.usage.total_tokens
+        model_cost_pie[model_key] += price
+        model_token_pie[model_key] += tokens
 
-        user_key = f"{log.user_id}:{user_map.get(log.user_id, log.user_id)}"
-        user_cost_pie[user_key] += log.detail.usage.total_price
-        user_token_pie[user_key] += log.detail.usage.total_tokens
+        user_key = f"{user_id}:{user_map.get(user_id, user_id)}"
+        user_cost_pie[user_key] += price
+        user_token_pie[user_key] += tokens
 
     # build trade data
     total_payment = 0
@@ -234,7 +234,7 @@ def upload_file_handler(
         id = str(uuid.uuid4())
         name = filename
         filename = f"{id}_{filename}"
-        contents, file_path = Storage.upload_file(
+        uploaded, file_path = Storage.upload_file(
             file.file,
             filename,
             {
@@ -262,7 +262,8 @@ def upload_file_handler(
                             if isinstance(file.content_type, str)
                             else None
                         ),
-                        "size": len(contents),
+                        "size": uploaded.size,
+                        "sha256": uploaded.sha256,
                         "data": file_metadata,
                     },
                 }
@@ -455,6 +456,15 @@ async def get_file_by_id(
         )
 
 
+def get_process_progress(data: dict) -> dict:
+    # Windowed ingestion progress written by save_docs_to_vector_db
+    progress = data.get("progress") or {}
+    return {
+        key: progress.get(key)
+        for key in ["windows", "chunks", "docs", "total_docs", "completed"]
+    }
+
+
 @router.get("/{id}/process/status")
 async def get_file_process_status(
     id: str,
@@ -490,6 +500,8 @@ async def get_file_process_status(
 
                         if status:
                             event = {"status": status}
+                            if data.get("progress"):
+                                event["progress"] = get_process_progress(data)
                             if status == "failed":
                                 event["error"] = data.get("error")
 
@@ -510,7 +522,11 @@ async def get_file_process_status(
                 media_type="text/event-stream",
             )
         else:
-            return {"status": file.data.get("status", "pending")}
+            data = file.data or {}
+            response = {"status": data.get("status", "pending")}
+            if data.get("progress"):
+                response["progress"] = get_process_progress(data)
+            return response
     else:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
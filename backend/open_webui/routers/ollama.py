@@ -18,6 +18,7 @@ from aiocache import cached
 import requests
 
 from open_webui.utils.headers import include_user_info_headers
+from open_webui.utils.session_pool import client_session, get_client_session
 from open_webui.models.chats import Chats
 from open_webui.models.users import UserModel
 
@@ -86,7 +87,7 @@ log = logging.getLogger(__name__)
 async def send_get_request(url, key=None, user: UserModel = None):
     timeout = aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST)
     try:
-        async with aiohttp.ClientSession(timeout=timeout, trust_env=True) as session:
+        async with client_session(timeout=timeout, trust_env=True) as session:
             headers = {
                 "Content-Type": "application/json",
                 **({"Authorization": f"Bearer {key}"} if key else {}),
@@ -120,7 +121,7 @@ async def send_post_request(
     r = None
     streaming = False
     try:
-        session = aiohttp.ClientSession(
+        session = get_client_session(
             trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
         )
 
@@ -222,7 +223,7 @@ async def verify_connection(
     url = form_data.url
     key = form_data.key
 
-    async with aiohttp.ClientSession(
+    async with client_session(
         trust_env=True,
         timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT_MODEL_LIST),
     ) as session:
@@ -1733,7 +1734,7 @@ async def download_file_stream(
 
     timeout = aiohttp.ClientTimeout(total=600)  # Set the timeout
 
-    async with aiohttp.ClientSession(timeout=timeout, trust_env=True) as session:
+    async with client_session(timeout=timeout, trust_env=True) as session:
         async with session.get(
             file_url, headers=headers, ssl=AIOHTTP_CLIENT_SESSION_SSL
         ) as response:
@@ -4,12 +4,13 @@ import mimetypes
 import os
 import shutil
 import asyncio
+import itertools
 
 import re
 import uuid
 from datetime import datetime
 from pathlib import Path
-from typing import Iterator, List, Optional, Sequence, Union
+from typing import Iterable, Iterator, List, Optional, Sequence, Union
 
 from fastapi import (
     Depends,
@@ -91,8 +92,15 @@ from open_webui.retrieval.utils import (
     query_doc_with_hybrid_search,
 )
 from open_webui.retrieval.vector.utils import filter_metadata
+from open_webui.retrieval.bm25 import BM25_INDEX_STORE
+from open_webui.retrieval.embedding_cache import (
+    QUERY_EMBEDDING_CACHE,
+    get_embedding_namespace,
+)
+from open_webui.retrieval.embedding_store import CHUNK_EMBEDDING_STORE
 from open_webui.utils.misc import (
     calculate_sha256_string,
+    is_token_boundary,
     sanitize_text_for_db,
 )
 from open_webui.utils.auth import get_admin_user, get_verified_user
@@ -113,6 +121,7 @@ from open_webui.env import (
     DEVICE_TYPE,
     DOCKER,
     RAG_EMBEDDING_TIMEOUT,
+    RAG_INGESTION_WINDOW_SIZE,
     SENTENCE_TRANSFORMERS_BACKEND,
     SENTENCE_TRANSFORMERS_MODEL_KWARGS,
     SENTENCE_TRANSFORMERS_CROSS_ENCODER_BACKEND,
@@ -431,7 +440,9 @@ async def update_embedding_config(
             ),
             enable_async=request.app.state.config.ENABLE_ASYNC_EMBEDDING,
             concurrent_requests=request.app.state.config.RAG_EMBEDDING_CONCURRENT_REQUESTS,
+            cache=QUERY_EMBEDDING_CACHE,
         )
+        QUERY_EMBEDDING_CACHE.clear()
 
         return {
             "status": True,
@@ -1384,59 +1395,226 @@ def merge_docs_to_target_size(
     without exceeding the maximum size or crossing source/file
     boundaries.
     """
+    return list(iter_docs_merged_to_target_size(request, chunks))
+
+
+CHUNK_MERGE_SEPARATOR = "\n\n"
+
+
+def _last_token_boundary(text: str) -> int:
+    """Offset of the last token boundary in a chunk joined after a newline, or -1."""
+    idx = text.rfind("\n")
+    while idx != -1:
+        if idx + 1 < len(text) and is_token_boundary(text, idx + 1):
+            return idx + 1
+        idx = text.rfind("\n", 0, idx)
+
+    if text and not text[0].isspace() and text[0] != "/":
+        return 0
+    return -1
+
+
+def iter_docs_merged_to_target_size(
+    request: Request,
+    chunks: Iterable[Document],
+) -> Iterator[Document]:
+    """
+    Lazy variant of merge_docs_to_target_size, only holds the chunk being grown.
+
+    The size of the merged chunk is tracked instead of measuring it again for
+    every next chunk. In token mode only the text after the last token boundary
+    of the merged chunk is encoded again together with the separator and the
+    next chunk, which gives exactly the token count of the merged text.
+    """
     min_chunk_size_target = request.app.state.config.CHUNK_MIN_SIZE_TARGET
     max_chunk_size = request.app.state.config.CHUNK_SIZE
 
     if min_chunk_size_target <= 0:
-        return chunks
+        yield from chunks
+        return
 
+    token_mode = request.app.state.config.TEXT_SPLITTER == "token"
     measure_chunk_size = len
-    if request.app.state.config.TEXT_SPLITTER == "token":
+    if token_mode:
         encoding = tiktoken.get_encoding(
             str(request.app.state.config.TIKTOKEN_ENCODING_NAME)
         )
         measure_chunk_size = lambda text: len(encoding.encode(text))
 
-    processed_chunks: list[Document] = []
+    def start_chunk(content: str) -> tuple[int, str, int]:
+        size = measure_chunk_size(content)
+        if not token_mode:
+            return size, "", 0
+
+        idx = _last_token_boundary(content)
+        if idx <= 0:
+            return size, content, size
+        return size, content[idx:], measure_chunk_size(content[idx:])
 
     current_chunk: Document | None = None
-    current_content: str = ""
+    current_parts: list[str] = []
+    current_size = 0
+    # Token mode: text after the last token boundary of the merged chunk
+    current_tail, current_tail_size = "", 0
 
     for next_chunk in chunks:
+        next_content = next_chunk.page_content
+
         if current_chunk is None:
             current_chunk = next_chunk
-            current_content = next_chunk.page_content
+            current_parts = [next_content]
+            current_size, current_tail, current_tail_size = start_chunk(next_content)
             continue  # First chunk initialization
 
-        proposed_content = f"{current_content}\n\n{next_chunk.page_content}"
-
         can_merge = (
             can_merge_chunks(current_chunk, next_chunk)
-            and measure_chunk_size(current_content) < min_chunk_size_target
-            and measure_chunk_size(proposed_content) <= max_chunk_size
+            and current_size < min_chunk_size_target
         )
+        if can_merge:
+            if token_mode:
+                joint = f"{current_tail}{CHUNK_MERGE_SEPARATOR}{next_content}"
+                joint_size = measure_chunk_size(joint)
+                proposed_size = current_size - current_tail_size + joint_size
+            else:
+                proposed_size = (
+                    current_size + len(CHUNK_MERGE_SEPARATOR) + len(next_content)
+                )
+            can_merge = proposed_size <= max_chunk_size
 
         if can_merge:
-            current_content = proposed_content
+            current_parts.append(next_content)
+            current_size = proposed_size
+            if token_mode:
+                idx = _last_token_boundary(next_content)
+                if idx == -1:
+                    # No boundary in the next chunk, the joint is the new tail
+                    current_tail, current_tail_size = joint, joint_size
+                else:
+                    current_tail = next_content[idx:]
+                    current_tail_size = measure_chunk_size(current_tail)
         else:
-            processed_chunks.append(
-                Document(
-                    page_content=current_content,
-                    metadata={**current_chunk.metadata},
-                )
+            yield Document(
+                page_content=CHUNK_MERGE_SEPARATOR.join(current_parts),
+                metadata={**current_chunk.metadata},
             )
             current_chunk = next_chunk
-            current_content = next_chunk.page_content
+            current_parts = [next_content]
+            current_size, current_tail, current_tail_size = start_chunk(next_content)
 
     if current_chunk is not None:
-        processed_chunks.append(
+        yield Document(
+            page_content=CHUNK_MERGE_SEPARATOR.join(current_parts),
+            metadata={**current_chunk.metadata},
+        )
+
+
+def split_docs(request: Request, docs: Iterable[Document]) -> Iterator[Document]:
+    """
+    Split documents with the configured text splitters.
+
+    Chunks are produced lazily, one source document at a time, so windowed
+    ingestion only holds the chunks of the windows in flight.
+    """
+    if request.app.state.config.ENABLE_MARKDOWN_HEADER_TEXT_SPLITTER:
+        log.info("Using markdown header text splitter")
+        # Define headers to split on - covering most common markdown header levels
+        markdown_splitter = MarkdownHeaderTextSplitter(
+            headers_to_split_on=[
+                ("#", "Header 1"),
+                ("##", "Header 2"),
+                ("###", "Header 3"),
+                ("####", "Header 4"),
+                ("#####", "Header 5"),
+                ("######", "Header 6"),
+            ],
+            strip_headers=False,  # Keep headers in content for context
+        )
+
+        docs = (
             Document(
-                page_content=current_content,
-                metadata={**current_chunk.metadata},
+                page_content=split_chunk.page_content,
+                metadata={**doc.metadata},
             )
+            for doc in docs
+            for split_chunk in markdown_splitter.split_text(doc.page_content)
         )
+        if request.app.state.config.CHUNK_MIN_SIZE_TARGET > 0:
+            docs = iter_docs_merged_to_target_size(request, docs)
 
-    return processed_chunks
+    if request.app.state.config.TEXT_SPLITTER in ["", "character"]:
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=request.app.state.config.CHUNK_SIZE,
+            chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
+            add_start_index=True,
+        )
+    elif request.app.state.config.TEXT_SPLITTER == "token":
+        log.info(
+            f"Using token text splitter: {request.app.state.config.TIKTOKEN_ENCODING_NAME}"
+        )
+
+        tiktoken.get_encoding(str(request.app.state.config.TIKTOKEN_ENCODING_NAME))
+        text_splitter = TokenTextSplitter(
+            encoding_name=str(request.app.state.config.TIKTOKEN_ENCODING_NAME),
+            chunk_size=request.app.state.config.CHUNK_SIZE,
+            chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
+            add_start_index=True,
+        )
+    else:
+        raise ValueError(ERROR_MESSAGES.DEFAULT("Invalid text splitter"))
+
+    for doc in docs:
+        yield from text_splitter.split_documents([doc])
+
+
+def get_ingestion_chunk_id(collection_name: str, hash: str, index: int) -> str:
+    # Stable across retries, so a resumed window overwrites a partial insert
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{collection_name}/{hash}/{index}"))
+
+
+def get_splitter_fingerprint(request: Request, split: bool) -> str:
+    """
+    Hash of the settings that decide how documents are cut into chunks, so a
+    checkpoint is only resumed when the remaining chunks line up with the
+    ones already committed.
+    """
+    config = request.app.state.config
+    splitter = (
+        {
+            "text_splitter": config.TEXT_SPLITTER,
+            "tiktoken_encoding_name": str(config.TIKTOKEN_ENCODING_NAME),
+            "chunk_size": config.CHUNK_SIZE,
+            "chunk_overlap": config.CHUNK_OVERLAP,
+            "markdown_header_text_splitter": config.ENABLE_MARKDOWN_HEADER_TEXT_SPLITTER,
+            "chunk_min_size_target": config.CHUNK_MIN_SIZE_TARGET,
+        }
+        if split
+        else {}
+    )
+    return calculate_sha256_string(json.dumps(splitter, sort_keys=True))
+
+
+def get_ingestion_checkpoint(
+    collection_name: str, metadata: Optional[dict]
+) -> Optional[dict]:
+    """
+    Progress of an interrupted windowed ingestion of the same file content into
+    the same collection, or None if there is nothing to resume. The caller
+    checks the window size and splitter fingerprint against its own.
+    """
+    if not metadata or not metadata.get("file_id") or not metadata.get("hash"):
+        return None
+
+    file = Files.get_file_by_id(metadata["file_id"])
+    progress = (file.data or {}).get("progress") if file else None
+    if (
+        not progress
+        or progress.get("completed")
+        or not progress.get("windows")
+        or progress.get("collection_name") != collection_name
+        or progress.get("hash") != metadata["hash"]
+    ):
+        return None
+    return progress
 
 
 def save_docs_to_vector_db(
@@ -1490,69 +1668,35 @@ def save_docs_to_vector_db(
                     log.info(f"Document with hash {metadata['hash']} already exists")
                     raise ValueError(ERROR_MESSAGES.DUPLICATE_CONTENT)
 
-    if split:
-        if request.app.state.config.ENABLE_MARKDOWN_HEADER_TEXT_SPLITTER:
-            log.info("Using markdown header text splitter")
-            # Define headers to split on - covering most common markdown header levels
-            markdown_splitter = MarkdownHeaderTextSplitter(
-                headers_to_split_on=[
-                    ("#", "Header 1"),
-                    ("##", "Header 2"),
-                    ("###", "Header 3"),
-                    ("####", "Header 4"),
-                    ("#####", "Header 5"),
-                    ("######", "Header 6"),
-                ],
-                strip_headers=False,  # Keep headers in content for context
-            )
-
-            split_docs = []
-            for doc in docs:
-                split_docs.extend(
-                    [
-                        Document(
-                            page_content=split_chunk.page_content,
-                            metadata={**doc.metadata},
-                        )
-                        for split_chunk in markdown_splitter.split_text(
-                            doc.page_content
-                        )
-                    ]
-                )
+    window_size = RAG_INGESTION_WINDOW_SIZE
+    total_docs = len(docs) if isinstance(docs, list) else None
+    consumed_docs = 0
 
-            docs = split_docs
-            if request.app.state.config.CHUNK_MIN_SIZE_TARGET > 0:
-                docs = merge_docs_to_target_size(request, docs)
-
-        if request.app.state.config.TEXT_SPLITTER in ["", "character"]:
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=request.app.state.config.CHUNK_SIZE,
-                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                add_start_index=True,
-            )
-            docs = text_splitter.split_documents(docs)
-        elif request.app.state.config.TEXT_SPLITTER == "token":
-            log.info(
-                f"Using token text splitter: {request.app.state.config.TIKTOKEN_ENCODING_NAME}"
-            )
-
-            tiktoken.get_encoding(str(request.app.state.config.TIKTOKEN_ENCODING_NAME))
-            text_splitter = TokenTextSplitter(
-                encoding_name=str(request.app.state.config.TIKTOKEN_ENCODING_NAME),
-                chunk_size=request.app.state.config.CHUNK_SIZE,
-                chunk_overlap=request.app.state.config.CHUNK_OVERLAP,
-                add_start_index=True,
-            )
-            docs = text_splitter.split_documents(docs)
-        else:
-            raise ValueError(ERROR_MESSAGES.DEFAULT("Invalid text splitter"))
+    def _count_docs(docs):
+        nonlocal consumed_docs
+        for doc in docs:
+            consumed_docs += 1
+            yield doc
 
-    if len(docs) == 0:
-        raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+    if window_size > 0:
+        docs = _count_docs(docs)
+    if split:
+        docs = split_docs(request, docs)
+
+    if window_size > 0:
+        # Peek at the first chunk so empty content is still rejected up front
+        docs = iter(docs)
+        first_doc = next(docs, None)
+        if first_doc is None:
+            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+        docs = itertools.chain([first_doc], docs)
+    else:
+        docs = list(docs)
+        if len(docs) == 0:
+            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
 
-    texts = [sanitize_text_for_db(doc.page_content) for doc in docs]
-    metadatas = [
-        {
+    def _get_chunk_metadata(doc: Document) -> dict:
+        return {
             **doc.metadata,
             **(metadata if metadata else {}),
             "embedding_config": {
@@ -1560,8 +1704,23 @@ def save_docs_to_vector_db(
                 "model": request.app.state.config.RAG_EMBEDDING_MODEL,
             },
         }
-        for doc in docs
-    ]
+
+    splitter = get_splitter_fingerprint(request, split)
+    checkpoint = None
+    discard_partial = False
+    if window_size > 0 and not overwrite:
+        checkpoint = get_ingestion_checkpoint(collection_name, metadata)
+        if checkpoint is not None and (
+            checkpoint.get("window_size") != window_size
+            or checkpoint.get("splitter") != splitter
+        ):
+            # Chunks cut with other settings would not line up with the ones
+            # already committed, so start over instead of resuming
+            log.info(
+                f"chunking settings changed since the interrupted ingestion into {collection_name}, starting over"
+            )
+            checkpoint = None
+            discard_partial = True
 
     try:
         if VECTOR_DB_CLIENT.has_collection(collection_name=collection_name):
@@ -1570,26 +1729,43 @@ def save_docs_to_vector_db(
             if overwrite:
                 VECTOR_DB_CLIENT.delete_collection(collection_name=collection_name)
                 log.info(f"deleting existing collection {collection_name}")
+            elif checkpoint is not None:
+                log.info(
+                    f"resuming ingestion into {collection_name} after {checkpoint['windows']} windows"
+                )
+            elif discard_partial:
+                VECTOR_DB_CLIENT.delete(
+                    collection_name=collection_name,
+                    filter={"file_id": metadata["file_id"]},
+                )
             elif add is False:
                 log.info(
                     f"collection {collection_name} already exists, overwrite is False and add is False"
                 )
                 return True
+        else:
+            checkpoint = None
 
         log.info(f"generating embeddings for {collection_name}")
+        embedding_url = (
+            request.app.state.config.RAG_OPENAI_API_BASE_URL
+            if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
+            else (
+                request.app.state.config.RAG_OLLAMA_BASE_URL
+                if request.app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
+                else request.app.state.config.RAG_AZURE_OPENAI_BASE_URL
+            )
+        )
+        azure_api_version = (
+            request.app.state.config.RAG_AZURE_OPENAI_API_VERSION
+            if request.app.state.config.RAG_EMBEDDING_ENGINE == "azure_openai"
+            else None
+        )
         embedding_function = get_embedding_function(
             request.app.state.config.RAG_EMBEDDING_ENGINE,
             request.app.state.config.RAG_EMBEDDING_MODEL,
             request.app.state.ef,
-            (
-                request.app.state.config.RAG_OPENAI_API_BASE_URL
-                if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
-                else (
-                    request.app.state.config.RAG_OLLAMA_BASE_URL
-                    if request.app.state.config.RAG_EMBEDDING_ENGINE == "ollama"
-                    else request.app.state.config.RAG_AZURE_OPENAI_BASE_URL
-                )
-            ),
+            embedding_url,
             (
                 request.app.state.config.RAG_OPENAI_API_KEY
                 if request.app.state.config.RAG_EMBEDDING_ENGINE == "openai"
@@ -1600,47 +1776,153 @@ def save_docs_to_vector_db(
                 )
             ),
             request.app.state.config.RAG_EMBEDDING_BATCH_SIZE,
-            azure_api_version=(
-                request.app.state.config.RAG_AZURE_OPENAI_API_VERSION
-                if request.app.state.config.RAG_EMBEDDING_ENGINE == "azure_openai"
-                else None
-            ),
+            azure_api_version=azure_api_version,
             enable_async=request.app.state.config.ENABLE_ASYNC_EMBEDDING,
             concurrent_requests=request.app.state.config.RAG_EMBEDDING_CONCURRENT_REQUESTS,
         )
 
-        # Run async embedding in sync context using the main event loop
-        # This allows the main loop to stay responsive to health checks during long operations
-        embedding_timeout = RAG_EMBEDDING_TIMEOUT
+        namespace = get_embedding_namespace(
+            request.app.state.config.RAG_EMBEDDING_ENGINE,
+            request.app.state.config.RAG_EMBEDDING_MODEL,
+            embedding_url,
+            azure_api_version,
+        )
 
-        future = asyncio.run_coroutine_threadsafe(
-            embedding_function(
+        def _embed(texts: list[str]):
+            # Only chunks that are not in the embedding store go to the provider
+            lookup = CHUNK_EMBEDDING_STORE.lookup(
+                namespace,
+                RAG_EMBEDDING_CONTENT_PREFIX,
                 list(map(lambda x: x.replace("\n", " "), texts)),
-                prefix=RAG_EMBEDDING_CONTENT_PREFIX,
-                user=user,
-            ),
-            request.app.state.main_loop,
-        )
-        embeddings = future.result(timeout=embedding_timeout)
-        log.info(f"embeddings generated {len(embeddings)} for {len(texts)} items")
+            )
+            future = None
+            if lookup.missing:
+                # Run async embedding in sync context using the main event loop
+                # This allows the main loop to stay responsive to health checks during long operations
+                future = asyncio.run_coroutine_threadsafe(
+                    embedding_function(
+                        lookup.missing,
+                        prefix=RAG_EMBEDDING_CONTENT_PREFIX,
+                        user=user,
+                    ),
+                    request.app.state.main_loop,
+                )
+            return lookup, future
 
-        items = [
-            {
-                "id": str(uuid.uuid4()),
-                "text": text,
-                "vector": embeddings[idx],
-                "metadata": metadatas[idx],
-            }
-            for idx, text in enumerate(texts)
-        ]
+        def _get_embeddings(embedding) -> list:
+            lookup, future = embedding
+            embeddings = lookup.resolve(
+                future.result(timeout=RAG_EMBEDDING_TIMEOUT) if future else None
+            )
+            log.info(
+                f"embeddings generated {len(lookup.missing)}, reused {len(embeddings) - len(lookup.missing)} for {len(embeddings)} items"
+            )
+            return embeddings
 
-        log.info(f"adding to collection {collection_name}")
-        VECTOR_DB_CLIENT.insert(
-            collection_name=collection_name,
-            items=items,
-        )
+        if window_size <= 0:
+            texts = [sanitize_text_for_db(doc.page_content) for doc in docs]
+            metadatas = [_get_chunk_metadata(doc) for doc in docs]
+
+            embeddings = _get_embeddings(_embed(texts))
+
+            items = [
+                {
+                    "id": str(uuid.uuid4()),
+                    "text": text,
+                    "vector": embeddings[idx],
+                    "metadata": metadatas[idx],
+                }
+                for idx, text in enumerate(texts)
+            ]
+
+            log.info(f"adding to collection {collection_name}")
+            VECTOR_DB_CLIENT.insert(
+                collection_name=collection_name,
+                items=items,
+            )
 
-        log.info(f"added {len(items)} items to collection {collection_name}")
+            log.info(f"added {len(items)} items to collection {collection_name}")
+            return True
+
+        # Windowed ingestion: split -> embed -> insert window_size chunks at a
+        # time. Window n + 1 is embedded on the main loop while window n is
+        # inserted, and nothing further is split until that insert is done, so
+        # at most two windows are held in memory.
+        file_id = metadata.get("file_id") if metadata else None
+        hash = metadata.get("hash") if metadata else None
+        resumed_windows = checkpoint["windows"] if checkpoint else 0
+        progress = {
+            "collection_name": collection_name,
+            "hash": hash,
+            "window_size": window_size,
+            "splitter": splitter,
+            "windows": resumed_windows,
+            "chunks": resumed_windows * window_size,
+            "docs": 0,
+            "total_docs": total_docs,
+            "completed": False,
+        }
+
+        def _commit(texts: list[str], metadatas: list[dict], embedding) -> None:
+            embeddings = _get_embeddings(embedding)
+            items = [
+                {
+                    "id": (
+                        get_ingestion_chunk_id(
+                            collection_name, hash, progress["chunks"] + idx
+                        )
+                        if hash
+                        else str(uuid.uuid4())
+                    ),
+                    "text": text,
+                    "vector": embeddings[idx],
+                    "metadata": metadatas[idx],
+                }
+                for idx, text in enumerate(texts)
+            ]
+
+            # The first window after a resume may already be partially stored
+            if resumed_windows and progress["windows"] == resumed_windows:
+                VECTOR_DB_CLIENT.upsert(collection_name=collection_name, items=items)
+            else:
+                VECTOR_DB_CLIENT.insert(collection_name=collection_name, items=items)
+
+            progress["windows"] += 1
+            progress["chunks"] += len(items)
+            progress["docs"] = consumed_docs
+            log.info(
+                f"added window {progress['windows']} ({progress['chunks']} items) to collection {collection_name}"
+            )
+            if file_id:
+                Files.update_file_data_by_id(file_id, {"progress": progress})
+
+        pending = None
+        try:
+            windows = iter(lambda: list(itertools.islice(docs, window_size)), [])
+            for idx, window in enumerate(windows):
+                if idx < resumed_windows:
+                    # Already committed before the previous attempt failed
+                    continue
+
+                texts = [sanitize_text_for_db(doc.page_content) for doc in window]
+                metadatas = [_get_chunk_metadata(doc) for doc in window]
+                previous, pending = pending, (texts, metadatas, _embed(texts))
+                if previous:
+                    _commit(*previous)
+
+            if pending:
+                previous, pending = pending, None
+                _commit(*previous)
+        except Exception:
+            if pending and pending[2][1]:
+                pending[2][1].cancel()
+            raise
+
+        progress["completed"] = True
+        if file_id:
+            Files.update_file_data_by_id(file_id, {"progress": progress})
+
+        log.info(f"added {progress['chunks']} items to collection {collection_name}")
         return True
     except Exception as e:
         log.exception(e)
@@ -2543,13 +2825,13 @@ async def query_doc_handler(
         if request.app.state.config.ENABLE_RAG_HYBRID_SEARCH and (
             form_data.hybrid is None or form_data.hybrid
         ):
-            collection_results = {}
-            collection_results[form_data.collection_name] = VECTOR_DB_CLIENT.get(
-                collection_name=form_data.collection_name
-            )
             return await query_doc_with_hybrid_search(
                 collection_name=form_data.collection_name,
-                collection_result=collection_results[form_data.collection_name],
+                collection_result=(
+                    VECTOR_DB_CLIENT.get(collection_name=form_data.collection_name)
+                    if BM25_INDEX_STORE is None
+                    else None
+                ),
                 query=form_data.query,
                 embedding_function=lambda query, prefix: request.app.state.EMBEDDING_FUNCTION(
                     query, prefix=prefix, user=user
@@ -48,6 +48,7 @@ from open_webui.utils.auth import (
     validate_password,
 )
 from open_webui.utils.access_control import get_permissions, has_permission
+from open_webui.utils.credit.ledger import CREDIT_LEDGER
 
 log = logging.getLogger(__name__)
 
@@ -675,6 +676,8 @@ async def update_user_by_id(
         )
 
         if form_data.credit is not None:
+            # apply queued usage first so it is not deducted from the new value
+            CREDIT_LEDGER.flush()
             credit = Credits.set_credit_by_user_id(
                 SetCreditForm(
                     user_id=user_id,
@@ -738,6 +741,7 @@ async def update_credit_by_user_id(
 
     if form_data.credit is not None:
         params["credit"] = Decimal(form_data.credit)
+        CREDIT_LEDGER.flush()
         Credits.set_credit_by_user_id(form_data=SetCreditForm(**params))
     elif form_data.amount is not None:
         params["amount"] = Decimal(form_data.amount)
@@ -4,7 +4,6 @@ import random
 import socketio
 import logging
 import sys
-import time
 from typing import Dict, Set
 from redis import asyncio as aioredis
 import pycrdt as Y
@@ -38,9 +37,21 @@ from open_webui.env import (
     WEBSOCKET_SERVER_LOGGING,
     WEBSOCKET_SERVER_ENGINEIO_LOGGING,
     WEBSOCKET_EVENT_CALLER_TIMEOUT,
+    WEBSOCKET_EVENT_DB_FLUSH_INTERVAL,
+    REALTIME_CHAT_SAVE_INTERVAL,
+    REALTIME_CHAT_SAVE_MAX_BYTES,
 )
 from open_webui.utils.auth import decode_token
-from open_webui.socket.utils import RedisDict, RedisLock, YdocManager
+from open_webui.utils.last_active import LAST_ACTIVE_TRACKER
+from open_webui.socket.utils import (
+    ExpiringPool,
+    MessageEventBuffer,
+    RealtimeChatSaver,
+    RedisDict,
+    RedisLock,
+    UsagePool,
+    YdocManager,
+)
 from open_webui.tasks import create_task, stop_item_tasks
 from open_webui.utils.redis import get_redis_connection
 from open_webui.utils.access_control import has_permission
@@ -126,18 +137,18 @@ if WEBSOCKET_MANAGER == "redis":
         redis_cluster=WEBSOCKET_REDIS_CLUSTER,
     )
 
-    SESSION_POOL = RedisDict(
-        f"{REDIS_KEY_PREFIX}:session_pool",
-        redis_url=WEBSOCKET_REDIS_URL,
-        redis_sentinels=redis_sentinels,
-        redis_cluster=WEBSOCKET_REDIS_CLUSTER,
+    # The pools moved off the hashes of the old RedisDict pools, which use
+    # different fields; those are deleted by the session cleanup
+    SESSION_POOL = ExpiringPool(
+        f"{REDIS_KEY_PREFIX}:session_pool:v2", SESSION_POOL_TIMEOUT, redis=REDIS
     )
-    USAGE_POOL = RedisDict(
-        f"{REDIS_KEY_PREFIX}:usage_pool",
-        redis_url=WEBSOCKET_REDIS_URL,
-        redis_sentinels=redis_sentinels,
-        redis_cluster=WEBSOCKET_REDIS_CLUSTER,
+    USAGE_POOL = UsagePool(
+        f"{REDIS_KEY_PREFIX}:usage_pool:v2", TIMEOUT_DURATION, redis=REDIS
     )
+    LEGACY_POOL_KEYS = [
+        f"{REDIS_KEY_PREFIX}:session_pool",
+        f"{REDIS_KEY_PREFIX}:usage_pool",
+    ]
 
     clean_up_lock = RedisLock(
         redis_url=WEBSOCKET_REDIS_URL,
@@ -163,13 +174,23 @@ if WEBSOCKET_MANAGER == "redis":
 else:
     MODELS = {}
 
-    SESSION_POOL = {}
-    USAGE_POOL = {}
+    SESSION_POOL = ExpiringPool("session_pool", SESSION_POOL_TIMEOUT)
+    USAGE_POOL = UsagePool("usage_pool", TIMEOUT_DURATION)
+    LEGACY_POOL_KEYS = []
 
     aquire_func = release_func = renew_func = lambda: True
     session_aquire_func = session_release_func = session_renew_func = lambda: True
 
 
+MESSAGE_EVENT_BUFFER = MessageEventBuffer(
+    flush_interval=WEBSOCKET_EVENT_DB_FLUSH_INTERVAL / 1000
+)
+
+REALTIME_CHAT_SAVER = RealtimeChatSaver(
+    interval=REALTIME_CHAT_SAVE_INTERVAL / 1000,
+    max_bytes=REALTIME_CHAT_SAVE_MAX_BYTES,
+)
+
 YDOC_MANAGER = YdocManager(
     redis=REDIS,
     redis_key_prefix=f"{REDIS_KEY_PREFIX}:ydoc:documents",
@@ -183,19 +204,18 @@ async def periodic_session_pool_cleanup():
         return
 
     try:
+        for key in LEGACY_POOL_KEYS:
+            # one key per call, the keys may live on different cluster nodes
+            if await REDIS.delete(key):
+                log.info(f"Deleted legacy websocket pool {key}")
+
         while True:
             if not session_renew_func():
                 log.error("Unable to renew session cleanup lock. Exiting.")
                 return
 
-            now = int(time.time())
-            for sid in list(SESSION_POOL.keys()):
-                entry = SESSION_POOL.get(sid)
-                if entry and now - entry.get("last_seen_at", 0) > SESSION_POOL_TIMEOUT:
-                    log.warning(
-                        f"Reaping orphaned session {sid} (user {entry.get('id')})"
-                    )
-                    del SESSION_POOL[sid]
+            for sid in await SESSION_POOL.expire():
+                log.warning(f"Reaped orphaned session {sid}")
             await asyncio.sleep(SESSION_POOL_TIMEOUT)
     finally:
         session_release_func()
@@ -228,26 +248,8 @@ async def periodic_usage_pool_cleanup():
                 log.error(f"Unable to renew cleanup lock. Exiting usage pool cleanup.")
                 raise Exception("Unable to renew usage pool cleanup lock.")
 
-            now = int(time.time())
-            send_usage = False
-            for model_id, connections in list(USAGE_POOL.items()):
-                # Creating a list of sids to remove if they have timed out
-                expired_sids = [
-                    sid
-                    for sid, details in connections.items()
-                    if now - details["updated_at"] > TIMEOUT_DURATION
-                ]
-
-                for sid in expired_sids:
-                    del connections[sid]
-
-                if not connections:
-                    log.debug(f"Cleaning up model {model_id} from usage pool")
-                    del USAGE_POOL[model_id]
-                else:
-                    USAGE_POOL[model_id] = connections
-
-                send_usage = True
+            for key in await USAGE_POOL.expire():
+                log.debug(f"Cleaning up {key} from usage pool")
             await asyncio.sleep(TIMEOUT_DURATION)
     finally:
         release_func()
@@ -259,14 +261,13 @@ app = socketio.ASGIApp(
 )
 
 
-def get_models_in_use():
+async def get_models_in_use():
     # List models that are currently in use
-    models_in_use = list(USAGE_POOL.keys())
-    return models_in_use
+    return await USAGE_POOL.get_models()
 
 
-def get_user_id_from_session_pool(sid):
-    user = SESSION_POOL.get(sid)
+async def get_user_id_from_session_pool(sid):
+    user = await SESSION_POOL.get(sid)
     if user:
         return user["id"]
     return None
@@ -281,19 +282,11 @@ def get_session_ids_from_room(room):
     return [session_id[0] for session_id in active_session_ids]
 
 
-def get_user_ids_from_room(room):
+async def get_user_ids_from_room(room):
     active_session_ids = get_session_ids_from_room(room)
 
-    active_user_ids = list(
-        set(
-            [
-                SESSION_POOL.get(session_id)["id"]
-                for session_id in active_session_ids
-                if SESSION_POOL.get(session_id) is not None
-            ]
-        )
-    )
-    return active_user_ids
+    users = await SESSION_POOL.get_many(active_session_ids)
+    return list({user["id"] for user in users if user is not None})
 
 
 async def emit_to_users(event: str, data: dict, user_ids: list[str]):
@@ -330,16 +323,8 @@ async def enter_room_for_users(room: str, user_ids: list[str]):
 
 @sio.on("usage")
 async def usage(sid, data):
-    if sid in SESSION_POOL:
-        model_id = data["model"]
-        # Record the timestamp for the last update
-        current_time = int(time.time())
-
-        # Store the new usage data and task
-        USAGE_POOL[model_id] = {
-            **(USAGE_POOL[model_id] if model_id in USAGE_POOL else {}),
-            sid: {"updated_at": current_time},
-        }
+    if await SESSION_POOL.contains(sid):
+        await USAGE_POOL.add(sid, data["model"])
 
 
 @sio.event
@@ -352,8 +337,9 @@ async def connect(sid, environ, auth):
             user = Users.get_user_by_id(data["id"])
 
         if user:
-            SESSION_POOL[sid] = {
-                **user.model_dump(
+            await SESSION_POOL.set(
+                sid,
+                user.model_dump(
                     exclude=[
                         "profile_image_url",
                         "profile_banner_image_url",
@@ -362,8 +348,7 @@ async def connect(sid, environ, auth):
                         "gender",
                     ]
                 ),
-                "last_seen_at": int(time.time()),
-            }
+            )
             await sio.enter_room(sid, f"user:{user.id}")
 
 
@@ -382,8 +367,9 @@ async def user_join(sid, data):
     if not user:
         return
 
-    SESSION_POOL[sid] = {
-        **user.model_dump(
+    await SESSION_POOL.set(
+        sid,
+        user.model_dump(
             exclude=[
                 "profile_image_url",
                 "profile_banner_image_url",
@@ -392,8 +378,7 @@ async def user_join(sid, data):
                 "gender",
             ]
         ),
-        "last_seen_at": int(time.time()),
-    }
+    )
 
     await sio.enter_room(sid, f"user:{user.id}")
 
@@ -409,10 +394,9 @@ async def user_join(sid, data):
 
 @sio.on("heartbeat")
 async def heartbeat(sid, data):
-    user = SESSION_POOL.get(sid)
+    user = await SESSION_POOL.touch(sid)
     if user:
-        SESSION_POOL[sid] = {**user, "last_seen_at": int(time.time())}
-        Users.update_last_active_by_id(user["id"])
+        LAST_ACTIVE_TRACKER.touch(user["id"])
 
 
 @sio.on("join-channels")
@@ -488,7 +472,7 @@ async def channel_events(sid, data):
     event_data = data["data"]
     event_type = event_data["type"]
 
-    user = SESSION_POOL.get(sid)
+    user = await SESSION_POOL.get(sid)
 
     if not user:
         return
@@ -511,7 +495,7 @@ async def channel_events(sid, data):
 @sio.on("ydoc:document:join")
 async def ydoc_document_join(sid, data):
     """Handle user joining a document"""
-    user = SESSION_POOL.get(sid)
+    user = await SESSION_POOL.get(sid)
     if not user:
         return
 
@@ -686,7 +670,7 @@ async def yjs_document_update(sid, data):
             skip_sid=sid,
         )
 
-        user = SESSION_POOL.get(sid)
+        user = await SESSION_POOL.get(sid)
         if not user:
             return
 
@@ -756,19 +740,11 @@ async def yjs_awareness_update(sid, data):
 
 @sio.event
 async def disconnect(sid):
-    if sid in SESSION_POOL:
-        user = SESSION_POOL[sid]
-        del SESSION_POOL[sid]
+    if await SESSION_POOL.contains(sid):
+        await SESSION_POOL.delete(sid)
 
         # Clean up USAGE_POOL entries for this session
-        for model_id in list(USAGE_POOL.keys()):
-            connections = USAGE_POOL.get(model_id)
-            if connections and sid in connections:
-                del connections[sid]
-                if not connections:
-                    del USAGE_POOL[model_id]
-                else:
-                    USAGE_POOL[model_id] = connections
+        await USAGE_POOL.remove_session(sid)
 
         await YDOC_MANAGER.remove_user_from_all_documents(sid)
     else:
@@ -799,105 +775,12 @@ def get_event_emitter(request_info, update_db=True):
         ):
 
             event_type = event_data.get("type")
+            data = event_data.get("data", {})
 
-            if event_type == "status":
-                await asyncio.to_thread(
-                    Chats.add_message_status_to_chat_by_id_and_message_id,
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                    event_data.get("data", {}),
-                )
-
-            elif event_type == "message":
-                message = await asyncio.to_thread(
-                    Chats.get_message_by_id_and_message_id,
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                )
-
-                if message:
-                    content = message.get("content", "")
-                    content += event_data.get("data", {}).get("content", "")
-
-                    await asyncio.to_thread(
-                        Chats.upsert_message_to_chat_by_id_and_message_id,
-                        request_info["chat_id"],
-                        request_info["message_id"],
-                        {
-                            "content": content,
-                        },
-                    )
-
-            elif event_type == "replace":
-                content = event_data.get("data", {}).get("content", "")
-
-                await asyncio.to_thread(
-                    Chats.upsert_message_to_chat_by_id_and_message_id,
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                    {
-                        "content": content,
-                    },
-                )
-
-            elif event_type == "embeds":
-                message = await asyncio.to_thread(
-                    Chats.get_message_by_id_and_message_id,
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                )
-
-                embeds = event_data.get("data", {}).get("embeds", [])
-                embeds.extend(message.get("embeds", []))
-
-                await asyncio.to_thread(
-                    Chats.upsert_message_to_chat_by_id_and_message_id,
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                    {
-                        "embeds": embeds,
-                    },
-                )
-
-            elif event_type == "files":
-                message = await asyncio.to_thread(
-                    Chats.get_message_by_id_and_message_id,
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                )
-
-                files = event_data.get("data", {}).get("files", [])
-                files.extend(message.get("files", []))
-
-                await asyncio.to_thread(
-                    Chats.upsert_message_to_chat_by_id_and_message_id,
-                    request_info["chat_id"],
-                    request_info["message_id"],
-                    {
-                        "files": files,
-                    },
-                )
+            if event_type in ("source", "citation") and data.get("type") is not None:
+                return
 
-            elif event_type in ("source", "citation"):
-                data = event_data.get("data", {})
-                if data.get("type") is None:
-                    message = await asyncio.to_thread(
-                        Chats.get_message_by_id_and_message_id,
-                        request_info["chat_id"],
-                        request_info["message_id"],
-                    )
-
-                    sources = message.get("sources", [])
-                    sources.append(data)
-
-                    await asyncio.to_thread(
-                        Chats.upsert_message_to_chat_by_id_and_message_id,
-                        request_info["chat_id"],
-                        request_info["message_id"],
-                        {
-                            "sources": sources,
-                        },
-                    )
+            await MESSAGE_EVENT_BUFFER.add(chat_id, message_id, event_type, data)
 
     if (
         "user_id" in request_info
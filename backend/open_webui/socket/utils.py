@@ -1,10 +1,19 @@
+import asyncio
+import copy
 import json
+import logging
+import time
 import uuid
+import weakref
+from collections import OrderedDict
+from open_webui.models.chats import Chats
 from open_webui.utils.redis import get_redis_connection
 from open_webui.env import REDIS_KEY_PREFIX
-from typing import Optional, List, Tuple
+from typing import Callable, Optional, List, Tuple
 import pycrdt as Y
 
+log = logging.getLogger(__name__)
+
 
 class RedisLock:
     def __init__(
@@ -117,6 +126,402 @@ class RedisDict:
         return self[key]
 
 
+class ExpiringPool:
+    """
+    Async pool of entries that expire when not refreshed for ``timeout``
+    seconds, e.g. websocket sessions.
+
+    With Redis the values are kept in the ``name`` hash and the last-seen
+    times in the ``{name}:last_seen`` sorted set, so refreshing an entry only
+    updates its score and ``expire`` reads just the expired members instead of
+    every entry. Without Redis the entries live in a dict ordered by last-seen
+    time, oldest first. Every call goes through the async Redis connection so
+    the websocket handlers don't block the event loop.
+    """
+
+    def __init__(self, name: str, timeout: float, redis=None):
+        self.name = name
+        self.timeout = timeout
+        self.redis = redis
+        self.last_seen_key = f"{name}:last_seen"
+
+        # key -> (value, last seen), without Redis
+        self._entries: "OrderedDict[str, tuple[Optional[dict], float]]" = OrderedDict()
+
+    async def set(self, key: str, value: Optional[dict] = None, now=None):
+        now = now or time.time()
+        if self.redis is None:
+            self._entries[key] = (value, now)
+            self._entries.move_to_end(key)
+            return
+
+        pipe = self.redis.pipeline()
+        if value is not None:
+            pipe.hset(self.name, key, json.dumps(value))
+        pipe.zadd(self.last_seen_key, {key: now})
+        await pipe.execute()
+
+    async def touch(self, key: str, now=None) -> Optional[dict]:
+        """Refresh ``key`` and return its value, or None if it isn't pooled."""
+        now = now or time.time()
+        if self.redis is None:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries[key] = (entry[0], now)
+            self._entries.move_to_end(key)
+            return entry[0]
+
+        pipe = self.redis.pipeline()
+        pipe.hget(self.name, key)
+        pipe.zadd(self.last_seen_key, {key: now}, xx=True)
+        value, _ = await pipe.execute()
+        return json.loads(value) if value is not None else None
+
+    async def get(self, key: str) -> Optional[dict]:
+        if self.redis is None:
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None else None
+
+        value = await self.redis.hget(self.name, key)
+        return json.loads(value) if value is not None else None
+
+    async def get_many(self, keys: List[str]) -> List[Optional[dict]]:
+        """Values of ``keys`` in order, loaded in one round trip."""
+        if not keys:
+            return []
+        if self.redis is None:
+            return [await self.get(key) for key in keys]
+
+        values = await self.redis.hmget(self.name, keys)
+        return [json.loads(value) if value is not None else None for value in values]
+
+    async def contains(self, key: str) -> bool:
+        if self.redis is None:
+            return key in self._entries
+        return await self.redis.zscore(self.last_seen_key, key) is not None
+
+    async def delete(self, *keys: str):
+        if not keys:
+            return
+        if self.redis is None:
+            for key in keys:
+                self._entries.pop(key, None)
+            return
+
+        pipe = self.redis.pipeline()
+        pipe.hdel(self.name, *keys)
+        pipe.zrem(self.last_seen_key, *keys)
+        await pipe.execute()
+
+    async def keys(self, since=None) -> List[str]:
+        """Pooled keys, only those seen at ``since`` or later if given."""
+        if self.redis is None:
+            return [
+                key
+                for key, (_, last_seen) in self._entries.items()
+                if since is None or last_seen >= since
+            ]
+        return await self.redis.zrangebyscore(
+            self.last_seen_key, "-inf" if since is None else since, "+inf"
+        )
+
+    async def size(self) -> int:
+        if self.redis is None:
+            return len(self._entries)
+        return await self.redis.zcard(self.last_seen_key)
+
+    async def expire(self, now=None) -> List[str]:
+        """Remove and return the keys not seen for more than ``timeout`` seconds."""
+        cutoff = (now or time.time()) - self.timeout
+        if self.redis is None:
+            expired = []
+            for key, (_, last_seen) in self._entries.items():
+                if last_seen >= cutoff:
+                    break
+                expired.append(key)
+            for key in expired:
+                del self._entries[key]
+            return expired
+
+        expired = await self.redis.zrangebyscore(
+            self.last_seen_key, "-inf", f"({cutoff}"
+        )
+        await self.delete(*expired)
+        return expired
+
+
+class UsagePool(ExpiringPool):
+    """
+    Models in use, pooled as one ``{sid}:{model_id}`` entry per session and
+    model. Socket.IO session ids contain no colon.
+    """
+
+    def __init__(self, name: str, timeout: float, redis=None):
+        super().__init__(name, timeout, redis=redis)
+        # sid -> reported models, for the sessions connected to this worker
+        self._models_by_sid: dict[str, set[str]] = {}
+
+    async def add(self, sid: str, model_id: str, now=None):
+        self._models_by_sid.setdefault(sid, set()).add(model_id)
+        await self.set(f"{sid}:{model_id}", now=now)
+
+    async def remove_session(self, sid: str):
+        models = self._models_by_sid.pop(sid, set())
+        await self.delete(*[f"{sid}:{model_id}" for model_id in models])
+
+    async def get_models(self, now=None) -> List[str]:
+        since = (now or time.time()) - self.timeout
+        model_ids = {}
+        for key in await self.keys(since=since):
+            model_ids[key.split(":", 1)[1]] = True
+        return list(model_ids)
+
+    async def expire(self, now=None) -> List[str]:
+        expired = await super().expire(now=now)
+        for key in expired:
+            sid, model_id = key.split(":", 1)
+            models = self._models_by_sid.get(sid)
+            if models is not None:
+                models.discard(model_id)
+                if not models:
+                    del self._models_by_sid[sid]
+        return expired
+
+
+class MessageEventBuffer:
+    """
+    Write-behind buffer for chat message updates coming from emitted events.
+
+    Each persisted event used to re-read and rewrite the whole chat JSON.
+    Events are now merged per (chat_id, message_id) in memory and written in a
+    single upsert at most once per ``flush_interval`` seconds, or earlier when
+    ``flush`` is awaited (e.g. before the response handler saves the final
+    message). ``flush_all`` drains everything on shutdown.
+    """
+
+    def __init__(self, flush_interval: float = 0.5):
+        self.flush_interval = flush_interval
+        self.stats = {"events": 0, "flushes": 0, "bytes_written": 0}
+
+        self._pending: dict[tuple[str, str], dict] = {}
+        self._timers: dict[tuple[str, str], asyncio.Task] = {}
+        self._locks = weakref.WeakValueDictionary()
+
+    def _get_pending(self, key: tuple[str, str]) -> dict:
+        if key not in self._pending:
+            self._pending[key] = {
+                "content": None,
+                "append": "",
+                "embeds": [],
+                "files": [],
+                "sources": [],
+                "statuses": [],
+            }
+        return self._pending[key]
+
+    async def add(self, chat_id: str, message_id: str, event_type: str, data: dict):
+        key = (chat_id, message_id)
+        pending = self._get_pending(key)
+
+        if event_type == "status":
+            pending["statuses"].append(data)
+        elif event_type == "message":
+            pending["append"] += data.get("content", "")
+        elif event_type == "replace":
+            pending["content"] = data.get("content", "")
+            pending["append"] = ""
+        elif event_type == "embeds":
+            # Newer embeds come first, matching the previous per-event writes
+            pending["embeds"] = [*data.get("embeds", []), *pending["embeds"]]
+        elif event_type == "files":
+            pending["files"] = [*data.get("files", []), *pending["files"]]
+        elif event_type in ("source", "citation"):
+            pending["sources"].append(data)
+        else:
+            return
+
+        self.stats["events"] += 1
+
+        if self.flush_interval <= 0:
+            await self.flush(chat_id, message_id)
+        elif key not in self._timers:
+            self._timers[key] = asyncio.create_task(self._flush_later(key))
+
+    async def _flush_later(self, key: tuple[str, str]):
+        try:
+            await asyncio.sleep(self.flush_interval)
+        finally:
+            self._timers.pop(key, None)
+        await self.flush(*key)
+
+    async def flush(self, chat_id: str, message_id: str):
+        key = (chat_id, message_id)
+
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[key] = lock
+
+        async with lock:
+            pending = self._pending.pop(key, None)
+            if pending is None:
+                return
+
+            try:
+                await asyncio.to_thread(self._write, chat_id, message_id, pending)
+            except Exception as e:
+                log.exception(f"Failed to persist events for message {message_id}: {e}")
+
+    async def flush_all(self):
+        for task in list(self._timers.values()):
+            task.cancel()
+        self._timers.clear()
+
+        for chat_id, message_id in list(self._pending.keys()):
+            await self.flush(chat_id, message_id)
+
+    def _write(self, chat_id: str, message_id: str, pending: dict):
+        message = Chats.get_message_by_id_and_message_id(chat_id, message_id)
+        if message is None:
+            return
+
+        update = {}
+        if pending["content"] is not None:
+            update["content"] = pending["content"] + pending["append"]
+        elif pending["append"] and message:
+            update["content"] = message.get("content", "") + pending["append"]
+
+        if pending["embeds"]:
+            update["embeds"] = [*pending["embeds"], *message.get("embeds", [])]
+        if pending["files"]:
+            update["files"] = [*pending["files"], *message.get("files", [])]
+        if pending["sources"]:
+            update["sources"] = [*message.get("sources", []), *pending["sources"]]
+        if pending["statuses"] and message:
+            update["statusHistory"] = [
+                *message.get("statusHistory", []),
+                *pending["statuses"],
+            ]
+
+        if not update:
+            return
+
+        Chats.upsert_message_to_chat_by_id_and_message_id(chat_id, message_id, update)
+
+        self.stats["flushes"] += 1
+        self.stats["bytes_written"] += len(
+            json.dumps(update, ensure_ascii=False, default=str).encode()
+        )
+
+
+class RealtimeChatSaver:
+    """
+    Throttled persistence of streaming messages for ENABLE_REALTIME_CHAT_SAVE.
+
+    The response handler hands over a callable building the message update on
+    every delta. It is called at most once per ``interval`` seconds per
+    message, or as soon as ``max_bytes`` of new content have streamed in, and
+    the snapshot is written from a worker thread. ``finish`` replaces any
+    pending save with the final state of the message and always writes it.
+    """
+
+    def __init__(self, interval: float = 1.0, max_bytes: int = 16384):
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.stats = {
+            "saves": 0,
+            "writes": 0,
+            "completions": 0,
+            "bytes_written": 0,
+            "failures": 0,
+        }
+
+        # (chat_id, message_id) -> latest update builder and bytes since a write
+        self._pending: dict[tuple[str, str], dict] = {}
+        self._timers: dict[tuple[str, str], asyncio.Task] = {}
+        self._locks = weakref.WeakValueDictionary()
+
+    async def save(
+        self,
+        chat_id: str,
+        message_id: str,
+        get_update: Callable[[], dict],
+        size: int = 0,
+    ):
+        key = (chat_id, message_id)
+        pending = self._pending.setdefault(key, {"get_update": None, "bytes": 0})
+        pending["get_update"] = get_update
+        pending["bytes"] += size
+        self.stats["saves"] += 1
+
+        if self.interval <= 0 or pending["bytes"] >= self.max_bytes:
+            self._cancel_timer(key)
+            await self.flush(chat_id, message_id)
+        elif key not in self._timers:
+            self._timers[key] = asyncio.create_task(self._flush_later(key))
+
+    async def finish(self, chat_id: str, message_id: str, update: dict):
+        self._cancel_timer((chat_id, message_id))
+        await self.flush(chat_id, message_id, update)
+        self.stats["completions"] += 1
+
+    def _cancel_timer(self, key: tuple[str, str]):
+        # Timers are only registered while sleeping, running writes finish
+        task = self._timers.pop(key, None)
+        if task is not None:
+            task.cancel()
+
+    async def _flush_later(self, key: tuple[str, str]):
+        try:
+            await asyncio.sleep(self.interval)
+        finally:
+            self._timers.pop(key, None)
+        await self.flush(*key)
+
+    async def flush(self, chat_id: str, message_id: str, update: Optional[dict] = None):
+        key = (chat_id, message_id)
+
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[key] = lock
+
+        async with lock:
+            pending = self._pending.pop(key, None)
+            if update is None:
+                if pending is None:
+                    return
+                update = pending["get_update"]()
+
+            try:
+                # The stream keeps mutating the output while the thread writes
+                update = copy.deepcopy(update)
+                await asyncio.to_thread(
+                    Chats.upsert_message_to_chat_by_id_and_message_id,
+                    chat_id,
+                    message_id,
+                    update,
+                )
+            except Exception as e:
+                self.stats["failures"] += 1
+                log.exception(f"Failed to save message {message_id}: {e}")
+                return
+
+            self.stats["writes"] += 1
+            self.stats["bytes_written"] += len(
+                json.dumps(update, ensure_ascii=False, default=str).encode()
+            )
+
+    async def flush_all(self):
+        for task in list(self._timers.values()):
+            task.cancel()
+        self._timers.clear()
+
+        for chat_id, message_id in list(self._pending.keys()):
+            await self.flush(chat_id, message_id)
+
+
 class YdocManager:
     COMPACTION_THRESHOLD = 500
 
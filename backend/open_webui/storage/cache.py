@@ -0,0 +1,170 @@
+"""
+Read-through cache for files of remote storage providers.
+
+Remote providers used to download an object to the upload directory on every
+``get_file``. The local copies are now tracked with the object version they
+were downloaded at (S3/Azure ETag, GCS generation): a read that finds a copy
+of the current version only pays for the metadata request. Concurrent reads of
+the same file wait for a single download, and the least recently used copies
+are evicted once they take more than ``max_bytes`` on disk. ``get`` hands out
+paths that are opened later (e.g. by a FileResponse), so an evicted copy is
+only deleted ``eviction_grace`` seconds after its eviction.
+
+Each process keeps its own index. Copies it has not downloaded or uploaded
+itself, e.g. after a restart, are downloaded again on their first read.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from open_webui.config import STORAGE_CACHE_EVICTION_GRACE, STORAGE_CACHE_MAX_BYTES
+
+log = logging.getLogger(__name__)
+
+
+class StorageFileCache:
+    def __init__(self, max_bytes: int, eviction_grace: float = 0):
+        self.max_bytes = max_bytes
+        self.eviction_grace = eviction_grace
+
+        # local path -> (version, size), least recently used first
+        self._entries: "OrderedDict[str, tuple[Optional[str], int]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._path_locks: dict[str, list] = {}
+        # evicted local path -> monotonic time it may be deleted at
+        self._evicted: dict[str, float] = {}
+
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @contextmanager
+    def _single_flight(self, path: str):
+        with self._lock:
+            path_lock = self._path_locks.setdefault(path, [threading.Lock(), 0])
+            path_lock[1] += 1
+        try:
+            with path_lock[0]:
+                yield
+        finally:
+            with self._lock:
+                path_lock[1] -= 1
+                if path_lock[1] == 0:
+                    del self._path_locks[path]
+
+    def _set(self, path: str, version: Optional[str], size: int) -> None:
+        with self._lock:
+            previous = self._entries.pop(path, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[path] = (version, size)
+            self._size += size
+            self._evicted.pop(path, None)
+
+            delete_at = time.monotonic() + self.eviction_grace
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                evicted_path, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self._evicted[evicted_path] = delete_at
+                self.stats["evictions"] += 1
+
+        self._delete_evicted()
+
+    def _delete_evicted(self) -> None:
+        """Delete the evicted copies whose grace period is over."""
+        now = time.monotonic()
+        with self._lock:
+            for path, delete_at in list(self._evicted.items()):
+                # a path being read is downloaded and tracked again, or retried
+                if delete_at > now or path in self._path_locks:
+                    continue
+                del self._evicted[path]
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    log.warning(f"Failed to evict cached file {path}: {e}")
+
+    def get(
+        self,
+        path: str,
+        get_version: Callable[[], Optional[str]],
+        download: Callable[[str], None],
+    ) -> str:
+        """
+        Return ``path`` holding the current version of a remote file, calling
+        ``download`` with a temporary path unless the cached copy is current.
+        """
+        if not self.enabled:
+            download(path)
+            return path
+
+        with self._single_flight(path):
+            version = get_version()
+            with self._lock:
+                entry = self._entries.get(path)
+                if (
+                    entry is not None
+                    and version is not None
+                    and entry[0] == version
+                    and os.path.exists(path)
+                ):
+                    self._entries.move_to_end(path)
+                    self.stats["hits"] += 1
+                    return path
+
+            self.stats["misses"] += 1
+            # Download next to the target and move it in place, so no reader
+            # in this or another process sees a partial file
+            temp_path = f"{path}.{uuid.uuid4().hex}.part"
+            try:
+                download(temp_path)
+                os.replace(temp_path, path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+            self._set(path, version, os.path.getsize(path))
+            return path
+
+    def put(self, path: str, version: Optional[str]) -> None:
+        """Track a local copy written by an upload."""
+        if self.enabled and os.path.exists(path):
+            self._set(path, version, os.path.getsize(path))
+
+    def invalidate(self, path: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(path, None)
+            if entry is not None:
+                self._size -= entry[1]
+                self.stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.stats["invalidations"] += len(self._entries)
+            self._entries.clear()
+            self._size = 0
+
+
+STORAGE_FILE_CACHE = StorageFileCache(
+    max_bytes=STORAGE_CACHE_MAX_BYTES, eviction_grace=STORAGE_CACHE_EVICTION_GRACE
+)
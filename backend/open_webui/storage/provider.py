@@ -1,12 +1,15 @@
 import os
 import shutil
 import json
+import hashlib
 import logging
 import re
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from typing import BinaryIO, Tuple, Dict
 
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.config import Config
 from botocore.exceptions import ClientError
 from open_webui.config import (
@@ -25,17 +28,34 @@ from open_webui.config import (
     AZURE_STORAGE_CONTAINER_NAME,
     AZURE_STORAGE_KEY,
     STORAGE_PROVIDER,
+    STORAGE_UPLOAD_CHUNK_SIZE,
     UPLOAD_DIR,
 )
 from google.cloud import storage
 from google.cloud.exceptions import GoogleCloudError, NotFound
 from open_webui.constants import ERROR_MESSAGES
+from open_webui.storage.cache import STORAGE_FILE_CACHE
 from azure.identity import DefaultAzureCredential
 from azure.storage.blob import BlobServiceClient
 from azure.core.exceptions import ResourceNotFoundError
 
 log = logging.getLogger(__name__)
 
+# S3 rejects multipart uploads with parts below 5 MiB
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+
+# GCS resumable uploads send chunks in multiples of 256 KiB
+GCS_CHUNK_ALIGNMENT = 256 * 1024
+
+
+@dataclass
+class UploadedFile:
+    """Local copy of an uploaded file, measured while it was written."""
+
+    path: str
+    size: int
+    sha256: str
+
 
 class StorageProvider(ABC):
     @abstractmethod
@@ -45,7 +65,7 @@ class StorageProvider(ABC):
     @abstractmethod
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[UploadedFile, str]:
         pass
 
     @abstractmethod
@@ -61,14 +81,21 @@ class LocalStorageProvider(StorageProvider):
     @staticmethod
     def upload_file(
         file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
-        contents = file.read()
-        if not contents:
-            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+    ) -> Tuple[UploadedFile, str]:
+        """Streams the file to local storage in chunks, hashing it on the way."""
         file_path = f"{UPLOAD_DIR}/{filename}"
+        sha256 = hashlib.sha256()
+        size = 0
         with open(file_path, "wb") as f:
-            f.write(contents)
-        return contents, file_path
+            while chunk := file.read(STORAGE_UPLOAD_CHUNK_SIZE):
+                sha256.update(chunk)
+                f.write(chunk)
+                size += len(chunk)
+
+        if not size:
+            os.remove(file_path)
+            raise ValueError(ERROR_MESSAGES.EMPTY_CONTENT)
+        return UploadedFile(file_path, size, sha256.hexdigest()), file_path
 
     @staticmethod
     def get_file(file_path: str) -> str:
@@ -144,12 +171,21 @@ class S3StorageProvider(StorageProvider):
 
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[UploadedFile, str]:
         """Handles uploading of the file to S3 storage."""
-        _, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        uploaded, file_path = LocalStorageProvider.upload_file(file, filename, tags)
         s3_key = os.path.join(self.key_prefix, filename)
         try:
-            self.s3_client.upload_file(file_path, self.bucket_name, s3_key)
+            # Files above one part are sent as a multipart upload
+            part_size = max(STORAGE_UPLOAD_CHUNK_SIZE, S3_MIN_PART_SIZE)
+            self.s3_client.upload_file(
+                file_path,
+                self.bucket_name,
+                s3_key,
+                Config=TransferConfig(
+                    multipart_threshold=part_size, multipart_chunksize=part_size
+                ),
+            )
             if S3_ENABLE_TAGGING and tags:
                 sanitized_tags = {
                     self.sanitize_tag_value(k): self.sanitize_tag_value(v)
@@ -165,10 +201,9 @@ class S3StorageProvider(StorageProvider):
                     Key=s3_key,
                     Tagging=tagging,
                 )
-            return (
-                open(file_path, "rb").read(),
-                f"s3://{self.bucket_name}/{s3_key}",
-            )
+            if STORAGE_FILE_CACHE.enabled:
+                STORAGE_FILE_CACHE.put(file_path, self._get_etag(s3_key))
+            return uploaded, f"s3://{self.bucket_name}/{s3_key}"
         except ClientError as e:
             raise RuntimeError(f"Error uploading file to S3: {e}")
 
@@ -177,8 +212,13 @@ class S3StorageProvider(StorageProvider):
         try:
             s3_key = self._extract_s3_key(file_path)
             local_file_path = self._get_local_file_path(s3_key)
-            self.s3_client.download_file(self.bucket_name, s3_key, local_file_path)
-            return local_file_path
+            return STORAGE_FILE_CACHE.get(
+                local_file_path,
+                lambda: self._get_etag(s3_key),
+                lambda path: self.s3_client.download_file(
+                    self.bucket_name, s3_key, path
+                ),
+            )
         except ClientError as e:
             raise RuntimeError(f"Error downloading file from S3: {e}")
 
@@ -191,6 +231,7 @@ class S3StorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting file from S3: {e}")
 
         # Always delete from local storage
+        STORAGE_FILE_CACHE.invalidate(self._get_local_file_path(s3_key))
         LocalStorageProvider.delete_file(file_path)
 
     def delete_all_files(self) -> None:
@@ -210,6 +251,7 @@ class S3StorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting all files from S3: {e}")
 
         # Always delete from local storage
+        STORAGE_FILE_CACHE.clear()
         LocalStorageProvider.delete_all_files()
 
     # The s3 key is the name assigned to an object. It excludes the bucket name, but includes the internal path and the file name.
@@ -219,6 +261,9 @@ class S3StorageProvider(StorageProvider):
     def _get_local_file_path(self, s3_key: str) -> str:
         return f"{UPLOAD_DIR}/{s3_key.split('/')[-1]}"
 
+    def _get_etag(self, s3_key: str) -> str:
+        return self.s3_client.head_object(Bucket=self.bucket_name, Key=s3_key)["ETag"]
+
 
 class GCSStorageProvider(StorageProvider):
     def __init__(self):
@@ -237,13 +282,18 @@ class GCSStorageProvider(StorageProvider):
 
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[UploadedFile, str]:
         """Handles uploading of the file to GCS storage."""
-        contents, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        uploaded, file_path = LocalStorageProvider.upload_file(file, filename, tags)
         try:
-            blob = self.bucket.blob(filename)
+            # A chunk size makes the client use a resumable upload sent in chunks
+            chunk_size = -(-STORAGE_UPLOAD_CHUNK_SIZE // GCS_CHUNK_ALIGNMENT)
+            blob = self.bucket.blob(
+                filename, chunk_size=max(chunk_size, 1) * GCS_CHUNK_ALIGNMENT
+            )
             blob.upload_from_filename(file_path)
-            return contents, "gs://" + self.bucket_name + "/" + filename
+            STORAGE_FILE_CACHE.put(file_path, str(blob.generation))
+            return uploaded, "gs://" + self.bucket_name + "/" + filename
         except GoogleCloudError as e:
             raise RuntimeError(f"Error uploading file to GCS: {e}")
 
@@ -252,10 +302,14 @@ class GCSStorageProvider(StorageProvider):
         try:
             filename = file_path.removeprefix("gs://").split("/")[1]
             local_file_path = f"{UPLOAD_DIR}/{filename}"
+            # get_blob loads the metadata, including the generation
             blob = self.bucket.get_blob(filename)
-            blob.download_to_filename(local_file_path)
 
-            return local_file_path
+            return STORAGE_FILE_CACHE.get(
+                local_file_path,
+                lambda: str(blob.generation),
+                blob.download_to_filename,
+            )
         except NotFound as e:
             raise RuntimeError(f"Error downloading file from GCS: {e}")
 
@@ -269,6 +323,7 @@ class GCSStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting file from GCS: {e}")
 
         # Always delete from local storage
+        STORAGE_FILE_CACHE.invalidate(f"{UPLOAD_DIR}/{filename}")
         LocalStorageProvider.delete_file(file_path)
 
     def delete_all_files(self) -> None:
@@ -283,6 +338,7 @@ class GCSStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting all files from GCS: {e}")
 
         # Always delete from local storage
+        STORAGE_FILE_CACHE.clear()
         LocalStorageProvider.delete_all_files()
 
 
@@ -295,13 +351,19 @@ class AzureStorageProvider(StorageProvider):
         if storage_key:
             # Configure using the Azure Storage Account Endpoint and Key
             self.blob_service_client = BlobServiceClient(
-                account_url=self.endpoint, credential=storage_key
+                account_url=self.endpoint,
+                credential=storage_key,
+                max_single_put_size=STORAGE_UPLOAD_CHUNK_SIZE,
+                max_block_size=STORAGE_UPLOAD_CHUNK_SIZE,
             )
         else:
             # Configure using the Azure Storage Account Endpoint and DefaultAzureCredential
             # If the key is not configured, then the DefaultAzureCredential will be used to support Managed Identity authentication
             self.blob_service_client = BlobServiceClient(
-                account_url=self.endpoint, credential=DefaultAzureCredential()
+                account_url=self.endpoint,
+                credential=DefaultAzureCredential(),
+                max_single_put_size=STORAGE_UPLOAD_CHUNK_SIZE,
+                max_block_size=STORAGE_UPLOAD_CHUNK_SIZE,
             )
         self.container_client = self.blob_service_client.get_container_client(
             self.container_name
@@ -309,13 +371,18 @@ class AzureStorageProvider(StorageProvider):
 
     def upload_file(
         self, file: BinaryIO, filename: str, tags: Dict[str, str]
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[UploadedFile, str]:
         """Handles uploading of the file to Azure Blob Storage."""
-        contents, file_path = LocalStorageProvider.upload_file(file, filename, tags)
+        uploaded, file_path = LocalStorageProvider.upload_file(file, filename, tags)
         try:
             blob_client = self.container_client.get_blob_client(filename)
-            blob_client.upload_blob(contents, overwrite=True)
-            return contents, f"{self.endpoint}/{self.container_name}/{filename}"
+            # Streams above one block are staged block by block and committed
+            with open(file_path, "rb") as f:
+                result = blob_client.upload_blob(
+                    f, length=uploaded.size, overwrite=True
+                )
+            STORAGE_FILE_CACHE.put(file_path, result.get("etag"))
+            return uploaded, f"{self.endpoint}/{self.container_name}/{filename}"
         except Exception as e:
             raise RuntimeError(f"Error uploading file to Azure Blob Storage: {e}")
 
@@ -325,9 +392,16 @@ class AzureStorageProvider(StorageProvider):
             filename = file_path.split("/")[-1]
             local_file_path = f"{UPLOAD_DIR}/{filename}"
             blob_client = self.container_client.get_blob_client(filename)
-            with open(local_file_path, "wb") as download_file:
-                download_file.write(blob_client.download_blob().readall())
-            return local_file_path
+
+            def download(path: str) -> None:
+                with open(path, "wb") as download_file:
+                    download_file.write(blob_client.download_blob().readall())
+
+            return STORAGE_FILE_CACHE.get(
+                local_file_path,
+                lambda: blob_client.get_blob_properties().etag,
+                download,
+            )
         except ResourceNotFoundError as e:
             raise RuntimeError(f"Error downloading file from Azure Blob Storage: {e}")
 
@@ -341,6 +415,7 @@ class AzureStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting file from Azure Blob Storage: {e}")
 
         # Always delete from local storage
+        STORAGE_FILE_CACHE.invalidate(f"{UPLOAD_DIR}/{filename}")
         LocalStorageProvider.delete_file(file_path)
 
     def delete_all_files(self) -> None:
@@ -353,6 +428,7 @@ class AzureStorageProvider(StorageProvider):
             raise RuntimeError(f"Error deleting all files from Azure Blob Storage: {e}")
 
         # Always delete from local storage
+        STORAGE_FILE_CACHE.clear()
         LocalStorageProvider.delete_all_files()
 
 
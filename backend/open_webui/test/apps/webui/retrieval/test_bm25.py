@@ -0,0 +1,118 @@
+import pytest
+from rank_bm25 import BM25Okapi
+
+from open_webui.retrieval.bm25 import BM25Index, BM25IndexStore
+
+TEXTS = [
+    "the quick brown fox jumps over the lazy dog",
+    "a quick brown dog outpaces a quick red fox",
+    "lorem ipsum dolor sit amet",
+    "the dog sleeps all day long",
+    "foxes and dogs are not natural friends",
+]
+
+
+def build_index(texts, metadatas=None):
+    index = BM25Index()
+    for idx, text in enumerate(texts):
+        index.add(str(idx), text, (metadatas or [{}] * len(texts))[idx])
+    return index
+
+
+def test_scores_match_rank_bm25():
+    index = build_index(TEXTS)
+    reference = BM25Okapi([text.split() for text in TEXTS])
+
+    for query in ["quick fox", "dog", "lorem amet", "the"]:
+        expected = reference.get_scores(query.split())
+        for id, score in index.search(query, k=len(TEXTS)):
+            assert score == pytest.approx(expected[int(id)])
+
+
+def test_enriched_search_matches_concatenated_texts():
+    metadatas = [
+        {"name": f"file_{idx}.md", "source": "kb"} for idx in range(len(TEXTS))
+    ]
+    index = build_index(TEXTS, metadatas)
+    reference = BM25Okapi(
+        [
+            f"{text} Filename: {m['name']} {m['name'].replace('_', ' ').replace('.', ' ')} "
+            f"{m['name'].replace('_', ' ').replace('.', ' ')} Source: {m['source']}".split()
+            for text, m in zip(TEXTS, metadatas)
+        ]
+    )
+
+    expected = reference.get_scores("file_3.md dog".split())
+    for id, score in index.search("file_3.md dog", k=len(TEXTS), enriched=True):
+        assert score == pytest.approx(expected[int(id)])
+
+
+def test_remove_matches_fresh_build():
+    index = build_index(TEXTS, [{"file_id": str(idx % 2)} for idx in range(len(TEXTS))])
+    assert index.remove_by_filter({"file_id": "1"})
+
+    remaining = [text for idx, text in enumerate(TEXTS) if idx % 2 == 0]
+    fresh = build_index(remaining)
+
+    assert len(index) == len(remaining)
+    assert [score for _, score in index.search("quick dog", k=5)] == pytest.approx(
+        [score for _, score in fresh.search("quick dog", k=5)]
+    )
+
+
+def test_unsupported_filter_is_reported():
+    index = build_index(TEXTS, [{"file_id": "1"}] * len(TEXTS))
+    assert index.remove_by_filter({"file_id": {"$ne": "1"}}) is False
+
+
+def test_documents_without_query_terms_still_rank():
+    index = build_index(TEXTS)
+    reference = BM25Okapi([text.split() for text in TEXTS])
+
+    results = index.search("lorem", k=3)
+    assert len(results) == 3
+    assert results[0][0] == "2"
+    assert [score for _, score in results] == pytest.approx(
+        sorted(reference.get_scores(["lorem"]), reverse=True)[:3]
+    )
+
+
+def test_store_roundtrip_and_update(tmp_path):
+    store = BM25IndexStore(directory=tmp_path)
+    built = store.get_or_build("kb", lambda: None)
+    assert len(built) == 0
+
+    store.add("kb", [{"id": "a", "text": "hello world", "metadata": {"file_id": "f"}}])
+    assert "a" in store.get("kb")
+    assert store.get_documents("kb", ["a", "b"]) == [
+        ("hello world", {"file_id": "f"}),
+        None,
+    ]
+
+    store.remove_by_filter("kb", {"file_id": "f"})
+    assert len(store.get("kb")) == 0
+
+    store.remove_by_filter("kb", {"name": "x"})
+    assert store.get("kb") is None
+
+
+def test_workers_apply_logged_changes_and_compact(tmp_path):
+    writer = BM25IndexStore(directory=tmp_path, compact_min_items=5)
+    reader = BM25IndexStore(directory=tmp_path)
+    writer.add("kb", [{"id": "0", "text": TEXTS[0]}], create=True)
+    cached = reader.get("kb")
+
+    writer.add("kb", [{"id": str(idx), "text": TEXTS[idx]} for idx in (1, 2)])
+    writer.remove("kb", ["0"])
+    # the reader catches up on its cached index from the log
+    assert reader.get("kb") is cached
+    assert sorted(cached.doc_lengths) == ["1", "2"]
+
+    writer.add("kb", [{"id": str(idx), "text": TEXTS[idx]} for idx in (3, 4)])
+    assert reader.get("kb") is not cached
+    assert [score for _, score in reader.get("kb").search("quick dog", k=4)] == (
+        pytest.approx(
+            [score for _, score in build_index(TEXTS[1:]).search("quick dog", k=4)]
+        )
+    )
+    assert reader.get_documents("kb", ["0", "3"]) == [None, (TEXTS[3], {})]
@@ -0,0 +1,87 @@
+import asyncio
+
+from open_webui.retrieval.embedding_cache import QueryEmbeddingCache
+
+
+class FakeEmbeddingFunction:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, query):
+        self.calls.append(query)
+        if isinstance(query, list):
+            return [[float(len(text)), 1.0] for text in query]
+        return [float(len(query)), 1.0]
+
+
+def embed(cache, embedding_function, query, prefix=None, namespace="openai:model"):
+    return asyncio.run(cache.embed(namespace, query, prefix, embedding_function))
+
+
+def test_repeated_query_is_served_from_cache():
+    cache = QueryEmbeddingCache(max_size=10, ttl=60)
+    embedding_function = FakeEmbeddingFunction()
+
+    assert embed(cache, embedding_function, "hello") == [5.0, 1.0]
+    assert embed(cache, embedding_function, "hello") == [5.0, 1.0]
+
+    assert embedding_function.calls == ["hello"]
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 1
+    assert cache.stats["saved_calls"] == 1
+
+
+def test_list_query_embeds_only_missing_texts_in_order():
+    cache = QueryEmbeddingCache(max_size=10, ttl=60)
+    embedding_function = FakeEmbeddingFunction()
+
+    embed(cache, embedding_function, "ab")
+    result = embed(cache, embedding_function, ["abc", "ab", "abcd", "abc"])
+
+    assert result == [[3.0, 1.0], [2.0, 1.0], [4.0, 1.0], [3.0, 1.0]]
+    assert embedding_function.calls == ["ab", ["abc", "abcd"]]
+
+
+def test_prefix_and_namespace_are_part_of_the_key():
+    cache = QueryEmbeddingCache(max_size=10, ttl=60)
+    embedding_function = FakeEmbeddingFunction()
+
+    embed(cache, embedding_function, "hello")
+    embed(cache, embedding_function, "hello", prefix="query: ")
+    embed(cache, embedding_function, "hello", namespace="ollama:model")
+
+    assert len(embedding_function.calls) == 3
+
+
+def test_lru_eviction_and_ttl():
+    cache = QueryEmbeddingCache(max_size=2, ttl=60)
+    embedding_function = FakeEmbeddingFunction()
+
+    for text in ["a", "b", "a", "c"]:
+        embed(cache, embedding_function, text)
+    assert cache.size == 2
+    assert cache.stats["evictions"] == 1
+
+    # "b" was least recently used
+    embed(cache, embedding_function, "a")
+    embed(cache, embedding_function, "b")
+    assert embedding_function.calls == ["a", "b", "c", "b"]
+
+    # entries past their TTL are dropped on read
+    key = next(iter(cache._entries))
+    cache._entries[key] = (cache._entries[key][0], 1.0)
+    assert cache._get_local(key) is None
+
+
+def test_failed_embedding_is_not_cached():
+    cache = QueryEmbeddingCache(max_size=10, ttl=60)
+    calls = []
+
+    async def failing_embedding_function(query):
+        calls.append(query)
+        return None
+
+    assert embed(cache, failing_embedding_function, "hello") is None
+    assert embed(cache, failing_embedding_function, "hello") is None
+    assert len(calls) == 2
+    assert cache.size == 0
@@ -0,0 +1,61 @@
+import pytest
+
+from open_webui.retrieval.embedding_store import ChunkEmbeddingStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ChunkEmbeddingStore(str(tmp_path / "chunks.db"), max_entries=10)
+
+
+def embed(texts):
+    return [[float(len(text)), 0.5] for text in texts]
+
+
+def test_only_unseen_chunks_are_embedded(store):
+    lookup = store.lookup("openai:model", None, ["a", "bb", "a"])
+    assert lookup.missing == ["a", "bb"]
+    assert lookup.resolve(embed(lookup.missing)) == [
+        [1.0, 0.5],
+        [2.0, 0.5],
+        [1.0, 0.5],
+    ]
+
+    lookup = store.lookup("openai:model", None, ["bb", "ccc"])
+    assert lookup.missing == ["ccc"]
+    assert lookup.resolve(embed(lookup.missing)) == [[2.0, 0.5], [3.0, 0.5]]
+
+    assert store.stats["lookups"] == 5
+    assert store.stats["hits"] == 1
+    assert store.saved_ratio == pytest.approx(0.2)
+
+
+def test_model_and_prefix_are_part_of_the_key(store):
+    lookup = store.lookup("openai:model", None, ["a"])
+    lookup.resolve(embed(lookup.missing))
+
+    assert store.lookup("openai:other", None, ["a"]).missing == ["a"]
+    assert store.lookup("openai:model", "passage: ", ["a"]).missing == ["a"]
+    assert store.lookup("openai:model", None, ["a"]).missing == []
+
+
+def test_least_recently_used_chunks_are_evicted(store):
+    texts = [f"text-{idx}" for idx in range(10)]
+    lookup = store.lookup("openai:model", None, texts)
+    lookup.resolve(embed(lookup.missing))
+
+    lookup = store.lookup("openai:model", None, ["new"])
+    lookup.resolve(embed(lookup.missing))
+
+    assert store.stats["evictions"] == 2
+    assert store.lookup("openai:model", None, ["new"]).missing == []
+
+
+def test_failed_embedding_is_not_stored(store):
+    lookup = store.lookup("openai:model", None, ["a", "b"])
+    with pytest.raises(RuntimeError):
+        lookup.resolve(None)
+    with pytest.raises(RuntimeError):
+        lookup.resolve(embed(["a"]))
+
+    assert store.lookup("openai:model", None, ["a", "b"]).missing == ["a", "b"]
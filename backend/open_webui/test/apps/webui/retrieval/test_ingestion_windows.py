@@ -0,0 +1,183 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.documents import Document
+
+from open_webui.retrieval.embedding_store import ChunkEmbeddingStore
+from open_webui.routers import retrieval
+
+
+class FakeVectorDB:
+    def __init__(self):
+        self.collections = {}
+        self.calls = []
+
+    def query(self, collection_name, filter):
+        return None
+
+    def has_collection(self, collection_name):
+        return collection_name in self.collections
+
+    def delete_collection(self, collection_name):
+        self.collections.pop(collection_name, None)
+
+    def delete(self, collection_name, ids=None, filter=None):
+        self.calls.append(("delete", filter))
+        collection = self.collections.get(collection_name, {})
+        for id, item in list(collection.items()):
+            if all(item["metadata"].get(k) == v for k, v in filter.items()):
+                del collection[id]
+
+    def insert(self, collection_name, items):
+        self.calls.append(("insert", len(items)))
+        collection = self.collections.setdefault(collection_name, {})
+        for item in items:
+            assert item["id"] not in collection
+            collection[item["id"]] = item
+
+    def upsert(self, collection_name, items):
+        self.calls.append(("upsert", len(items)))
+        collection = self.collections.setdefault(collection_name, {})
+        for item in items:
+            collection[item["id"]] = item
+
+
+class FakeFiles:
+    def __init__(self):
+        self.data = {}
+
+    def get_file_by_id(self, id, db=None):
+        return SimpleNamespace(data=dict(self.data))
+
+    def update_file_data_by_id(self, id, data, db=None):
+        self.data.update(data)
+
+
+@pytest.fixture
+def ingestion(monkeypatch, tmp_path):
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+
+    state = {"calls": 0, "fail_at": None}
+
+    async def embedding_function(texts, prefix=None, user=None):
+        state["calls"] += 1
+        if state["calls"] == state["fail_at"]:
+            raise RuntimeError("embedding failed")
+        return [[float(len(text))] for text in texts]
+
+    config = SimpleNamespace(
+        ENABLE_MARKDOWN_HEADER_TEXT_SPLITTER=False,
+        CHUNK_MIN_SIZE_TARGET=0,
+        TEXT_SPLITTER="character",
+        CHUNK_SIZE=10,
+        CHUNK_OVERLAP=0,
+        TIKTOKEN_ENCODING_NAME="cl100k_base",
+        RAG_EMBEDDING_ENGINE="openai",
+        RAG_EMBEDDING_MODEL="model",
+        RAG_OPENAI_API_BASE_URL="",
+        RAG_OPENAI_API_KEY="",
+        RAG_EMBEDDING_BATCH_SIZE=1,
+        ENABLE_ASYNC_EMBEDDING=True,
+        RAG_EMBEDDING_CONCURRENT_REQUESTS=0,
+    )
+    request = SimpleNamespace(
+        app=SimpleNamespace(
+            state=SimpleNamespace(config=config, ef=None, main_loop=loop)
+        )
+    )
+    monkeypatch.setattr(
+        retrieval,
+        "get_embedding_function",
+        lambda *args, **kwargs: embedding_function,
+    )
+    monkeypatch.setattr(retrieval, "Files", FakeFiles())
+    monkeypatch.setattr(
+        retrieval,
+        "CHUNK_EMBEDDING_STORE",
+        ChunkEmbeddingStore(str(tmp_path / "chunks.db"), enabled=False),
+    )
+
+    def save(window_size, vector_db):
+        monkeypatch.setattr(retrieval, "RAG_INGESTION_WINDOW_SIZE", window_size)
+        monkeypatch.setattr(retrieval, "VECTOR_DB_CLIENT", vector_db)
+        docs = [
+            Document(page_content=" ".join(["word"] * 30), metadata={"page": page})
+            for page in range(4)
+        ]
+        return retrieval.save_docs_to_vector_db(
+            request,
+            docs,
+            "file-1",
+            metadata={"file_id": "1", "hash": "hash"},
+        )
+
+    yield SimpleNamespace(save=save, state=state, files=retrieval.Files, config=config)
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def stored_chunks(vector_db):
+    return sorted(
+        (item["text"], item["metadata"]["page"], item["metadata"]["start_index"])
+        for item in vector_db.collections["file-1"].values()
+    )
+
+
+def test_windows_store_the_same_chunks_as_a_single_batch(ingestion):
+    single, windowed = FakeVectorDB(), FakeVectorDB()
+    ingestion.save(0, single)
+    ingestion.save(7, windowed)
+
+    assert stored_chunks(windowed) == stored_chunks(single)
+    assert all(size <= 7 for _, size in windowed.calls)
+    assert len(windowed.calls) > 1
+    assert ingestion.files.data["progress"]["completed"] is True
+
+
+def test_failed_ingestion_resumes_from_last_committed_window(ingestion):
+    expected = FakeVectorDB()
+    ingestion.save(7, expected)
+    ingestion.files.data.clear()
+
+    vector_db = FakeVectorDB()
+    ingestion.state.update(calls=0, fail_at=3)
+    with pytest.raises(RuntimeError):
+        ingestion.save(7, vector_db)
+
+    progress = ingestion.files.data["progress"]
+    assert progress["windows"] == 2
+    assert progress["completed"] is False
+
+    ingestion.state.update(calls=0, fail_at=None)
+    ingestion.save(7, vector_db)
+
+    # committed windows are neither embedded nor inserted again
+    assert ingestion.state["calls"] == len(expected.calls) - 2
+    assert vector_db.calls[2][0] == "upsert"
+    assert set(vector_db.collections["file-1"]) == set(expected.collections["file-1"])
+
+
+def test_changed_chunking_settings_start_over_instead_of_resuming(ingestion):
+    ingestion.config.CHUNK_SIZE = 20
+    expected = FakeVectorDB()
+    ingestion.save(7, expected)
+    ingestion.files.data.clear()
+
+    ingestion.config.CHUNK_SIZE = 10
+    vector_db = FakeVectorDB()
+    ingestion.state.update(calls=0, fail_at=3)
+    with pytest.raises(RuntimeError):
+        ingestion.save(7, vector_db)
+    assert ingestion.files.data["progress"]["windows"] == 2
+
+    ingestion.config.CHUNK_SIZE = 20
+    ingestion.state.update(calls=0, fail_at=None)
+    ingestion.save(7, vector_db)
+
+    # the partial chunks of the old settings are dropped, nothing is skipped
+    assert ("delete", {"file_id": "1"}) in vector_db.calls
+    assert ingestion.state["calls"] == len(expected.calls)
+    assert stored_chunks(vector_db) == stored_chunks(expected)
+    assert ingestion.files.data["progress"]["completed"] is True
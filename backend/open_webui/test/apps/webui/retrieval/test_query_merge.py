@@ -0,0 +1,64 @@
+import asyncio
+
+from open_webui.retrieval.utils import (
+    CHUNK_HASH_KEY,
+    merge_and_sort_query_results,
+    run_collection_queries,
+)
+
+
+def query_result(*items):
+    return {
+        "distances": [[distance for distance, _, _ in items]],
+        "documents": [[document for _, document, _ in items]],
+        "metadatas": [[metadata for _, _, metadata in items]],
+    }
+
+
+def test_merge_keeps_best_distance_per_chunk():
+    result = merge_and_sort_query_results(
+        [
+            query_result((0.5, "a", {"n": 1}), (0.4, "b", {})),
+            query_result((0.9, "a", {"n": 2}), (0.1, "c", {})),
+            {"distances": [], "documents": [], "metadatas": []},
+        ],
+        k=2,
+    )
+
+    assert result["documents"] == [["a", "b"]]
+    assert result["distances"] == [[0.9, 0.4]]
+    assert result["metadatas"] == [[{"n": 2}, {}]]
+
+
+def test_merge_uses_stored_chunk_hash_and_keeps_tie_order():
+    result = merge_and_sort_query_results(
+        [
+            query_result(
+                (0.5, "first", {CHUNK_HASH_KEY: "x"}),
+                (0.5, "second", {CHUNK_HASH_KEY: "y"}),
+            ),
+            query_result((0.5, "first again", {CHUNK_HASH_KEY: "x"})),
+        ],
+        k=5,
+    )
+
+    assert result["documents"] == [["first", "second"]]
+
+
+def test_run_collection_queries_limits_concurrency():
+    running = 0
+    peak = 0
+
+    async def run(collection_name, query):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return collection_name, query
+
+    tasks = [(f"collection-{idx % 3}", idx) for idx in range(10)]
+    results = asyncio.run(run_collection_queries(tasks, run, concurrency=2))
+
+    assert results == tasks
+    assert peak == 2
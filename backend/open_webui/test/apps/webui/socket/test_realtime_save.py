@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from open_webui.socket import utils
+from open_webui.socket.utils import RealtimeChatSaver
+
+
+class RecordingChats:
+    def __init__(self):
+        self.writes = []
+
+    def upsert_message_to_chat_by_id_and_message_id(self, chat_id, message_id, update):
+        self.writes.append(update)
+
+
+@pytest.fixture
+def chats(monkeypatch):
+    chats = RecordingChats()
+    monkeypatch.setattr(utils, "Chats", chats)
+    return chats
+
+
+def test_saves_are_throttled_and_the_final_state_is_written(chats):
+    saver = RealtimeChatSaver(interval=0.05, max_bytes=1000)
+    output = []
+
+    async def stream():
+        for idx in range(20):
+            output.append(idx)
+            await saver.save("chat", "msg", lambda: {"output": output}, size=1)
+        await asyncio.sleep(0.1)
+        await saver.save("chat", "msg", lambda: {"output": output}, size=1)
+        await saver.finish("chat", "msg", {"output": output, "done": True})
+
+    asyncio.run(stream())
+
+    assert chats.writes == [
+        {"output": list(range(20))},
+        {"output": list(range(20)), "done": True},
+    ]
+    assert saver.stats["saves"] == 21
+    assert saver.stats["writes"] == 2
+    assert saver.stats["completions"] == 1
+
+
+def test_byte_threshold_writes_before_the_interval(chats):
+    saver = RealtimeChatSaver(interval=60, max_bytes=10)
+
+    async def stream():
+        for idx in range(4):
+            await saver.save("chat", "msg", lambda: {"content": "x" * idx}, size=4)
+        await saver.flush_all()
+
+    asyncio.run(stream())
+
+    assert chats.writes == [{"content": "xx"}, {"content": "xxx"}]
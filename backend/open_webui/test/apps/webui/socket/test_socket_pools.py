@@ -0,0 +1,44 @@
+import asyncio
+
+from open_webui.socket.utils import ExpiringPool, UsagePool
+
+
+def test_expire_removes_only_stale_sessions():
+    pool = ExpiringPool("session_pool", timeout=120)
+
+    async def run():
+        await pool.set("a", {"id": "user-1"}, now=100)
+        await pool.set("b", {"id": "user-2"}, now=150)
+        await pool.set("c", {"id": "user-1"}, now=200)
+        # a heartbeat moves the session behind the newer ones
+        assert await pool.touch("a", now=250) == {"id": "user-1"}
+        assert await pool.touch("missing", now=250) is None
+
+        assert await pool.expire(now=300) == ["b"]
+        assert await pool.get_many(["a", "b", "c"]) == [
+            {"id": "user-1"},
+            None,
+            {"id": "user-1"},
+        ]
+        assert await pool.expire(now=330) == ["c"]
+        assert await pool.size() == 1
+
+    asyncio.run(run())
+
+
+def test_usage_pool_lists_live_models_and_drops_sessions():
+    pool = UsagePool("usage_pool", timeout=3)
+
+    async def run():
+        await pool.add("sid-1", "gpt:4o", now=10)
+        await pool.add("sid-2", "gpt:4o", now=10)
+        await pool.add("sid-2", "llama", now=12)
+        assert await pool.get_models(now=12) == ["gpt:4o", "llama"]
+        assert await pool.get_models(now=14) == ["llama"]
+
+        await pool.remove_session("sid-2")
+        assert await pool.get_models(now=12) == ["gpt:4o"]
+        assert await pool.expire(now=14) == ["sid-1:gpt:4o"]
+        assert await pool.size() == 0
+
+    asyncio.run(run())
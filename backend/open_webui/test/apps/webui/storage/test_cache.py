@@ -0,0 +1,110 @@
+import threading
+import time
+
+from open_webui.storage.cache import StorageFileCache
+
+
+class FakeRemote:
+    def __init__(self, content=b"content", version="v1"):
+        self.content = content
+        self.version = version
+        self.downloads = 0
+
+    def get_version(self):
+        return self.version
+
+    def download(self, path):
+        self.downloads += 1
+        time.sleep(0.01)
+        with open(path, "wb") as f:
+            f.write(self.content)
+
+
+def get(cache, path, remote):
+    return cache.get(str(path), remote.get_version, remote.download)
+
+
+def test_current_copy_is_not_downloaded_again(tmp_path):
+    cache = StorageFileCache(max_bytes=1024)
+    remote = FakeRemote()
+    path = tmp_path / "file.txt"
+
+    assert get(cache, path, remote) == str(path)
+    assert get(cache, path, remote) == str(path)
+    assert remote.downloads == 1
+    assert cache.stats["hits"] == 1
+
+    remote.content, remote.version = b"changed", "v2"
+    get(cache, path, remote)
+    assert remote.downloads == 2
+    assert path.read_bytes() == b"changed"
+
+
+def test_uploaded_copy_is_served_and_invalidated(tmp_path):
+    cache = StorageFileCache(max_bytes=1024)
+    remote = FakeRemote()
+    path = tmp_path / "file.txt"
+    path.write_bytes(remote.content)
+
+    cache.put(str(path), "v1")
+    get(cache, path, remote)
+    assert remote.downloads == 0
+
+    cache.invalidate(str(path))
+    get(cache, path, remote)
+    assert remote.downloads == 1
+
+
+def test_concurrent_reads_download_once(tmp_path):
+    cache = StorageFileCache(max_bytes=1024)
+    remote = FakeRemote()
+    path = tmp_path / "file.txt"
+
+    threads = [
+        threading.Thread(target=get, args=(cache, path, remote)) for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert remote.downloads == 1
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_least_recently_used_copies_are_evicted(tmp_path):
+    cache = StorageFileCache(max_bytes=20)
+    remotes = {name: FakeRemote(content=b"x" * 8) for name in ["a", "b", "c"]}
+
+    get(cache, tmp_path / "a", remotes["a"])
+    get(cache, tmp_path / "b", remotes["b"])
+    get(cache, tmp_path / "a", remotes["a"])
+    get(cache, tmp_path / "c", remotes["c"])
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["a", "c"]
+    assert cache.stats["evictions"] == 1
+    assert cache.size == 16
+
+
+def test_evicted_copies_are_deleted_after_grace_period(tmp_path):
+    cache = StorageFileCache(max_bytes=10, eviction_grace=0.05)
+    remotes = {name: FakeRemote(content=b"x" * 8) for name in ["a", "b", "c"]}
+
+    get(cache, tmp_path / "a", remotes["a"])
+    get(cache, tmp_path / "b", remotes["b"])
+    # "a" may still be opened by a response that was handed its path
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["a", "b"]
+    assert cache.stats["evictions"] == 1
+
+    time.sleep(0.1)
+    get(cache, tmp_path / "c", remotes["c"])
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["b", "c"]
+
+
+def test_disabled_cache_always_downloads(tmp_path):
+    cache = StorageFileCache(max_bytes=0)
+    remote = FakeRemote()
+
+    get(cache, tmp_path / "file.txt", remote)
+    get(cache, tmp_path / "file.txt", remote)
+    assert remote.downloads == 2
@@ -0,0 +1,63 @@
+import asyncio
+
+from open_webui.utils.audit import AuditSink, PendingAuditEntry
+
+
+class RecordingLogger:
+    def __init__(self):
+        self.entries = []
+
+    def write(self, entry):
+        self.entries.append(entry)
+
+
+def pending(uri: str) -> PendingAuditEntry:
+    return PendingAuditEntry(
+        audit_level="REQUEST",
+        verb="POST",
+        request_uri=uri,
+        timestamp=1700000000,
+        request_body=bytearray(b'{"email": "a@b.c", "password": "secret"}'),
+    )
+
+
+def test_entries_are_written_in_batches_on_stop():
+    audit_logger = RecordingLogger()
+    sink = AuditSink(audit_logger, flush_interval=60, batch_size=2)
+
+    for idx in range(5):
+        assert asyncio.run(sink.put(pending(f"/api/{idx}")))
+    sink.stop()
+
+    assert [entry.request_uri for entry in audit_logger.entries] == [
+        f"/api/{idx}" for idx in range(5)
+    ]
+    assert audit_logger.entries[0].timestamp == 1700000000
+    assert "secret" not in audit_logger.entries[0].request_object
+    assert sink.stats["written"] == 5
+    assert sink.pending == 0
+
+
+def test_full_queue_drops_new_entries():
+    audit_logger = RecordingLogger()
+    sink = AuditSink(audit_logger, max_size=2, flush_interval=60)
+    sink._stopped.set()
+
+    results = [asyncio.run(sink.put(pending(f"/api/{idx}"))) for idx in range(3)]
+    sink.flush()
+
+    assert results == [True, True, False]
+    assert sink.stats == {"enqueued": 2, "written": 2, "dropped": 1, "failures": 0}
+
+
+def test_block_policy_waits_for_room():
+    audit_logger = RecordingLogger()
+    sink = AuditSink(audit_logger, max_size=1, flush_interval=60, policy="block")
+
+    async def put_both():
+        return [await sink.put(pending("/api/0")), await sink.put(pending("/api/1"))]
+
+    assert asyncio.run(put_both()) == [True, True]
+    sink.stop()
+    assert len(audit_logger.entries) == 2
+    assert sink.stats["dropped"] == 0
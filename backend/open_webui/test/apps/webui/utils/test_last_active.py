@@ -0,0 +1,104 @@
+import time
+
+import pytest
+
+from open_webui.utils import last_active
+from open_webui.utils.last_active import LastActiveTracker
+
+
+class RecordingUsers:
+    def __init__(self, last_active=None):
+        self.last_active = last_active or {}
+        self.updates = []
+
+    def update_last_active_by_ids(self, last_active):
+        self.updates.append(dict(last_active))
+        self.last_active.update(last_active)
+
+    def get_last_active_since(self, timestamp):
+        return {
+            user_id: value
+            for user_id, value in self.last_active.items()
+            if value > timestamp
+        }
+
+    def get_active_user_count(self):
+        since = int(time.time()) - last_active.ACTIVE_WINDOW
+        return sum(1 for value in self.last_active.values() if value >= since)
+
+    def get_num_users_active_today(self):
+        return len(self.get_last_active_since(last_active._today_start(time.time())))
+
+
+class FakeRedis:
+    def __init__(self):
+        self.zsets = {}
+
+    def pipeline(self):
+        return self
+
+    def zadd(self, key, mapping, gt=False):
+        zset = self.zsets.setdefault(key, {})
+        for member, score in mapping.items():
+            if not gt or score > zset.get(member, float("-inf")):
+                zset[member] = score
+
+    def zremrangebyscore(self, key, low, high):
+        zset = self.zsets.get(key, {})
+        for member in [m for m, score in zset.items() if score <= high]:
+            del zset[member]
+
+    def zcount(self, key, low, high):
+        return sum(1 for score in self.zsets.get(key, {}).values() if score >= low)
+
+    def execute(self):
+        pass
+
+
+@pytest.fixture
+def users(monkeypatch):
+    now = int(time.time())
+    users = RecordingUsers({"earlier-today": now - now % 86400 + 1, "old": 1})
+    monkeypatch.setattr(last_active, "Users", users)
+    return users
+
+
+def test_touches_are_written_in_one_update(users):
+    tracker = LastActiveTracker(flush_interval=60)
+    now = int(time.time())
+
+    for idx in range(100):
+        tracker.touch(f"user-{idx % 3}", now - idx)
+    assert tracker.pending == 3
+    tracker.stop()
+
+    assert users.updates == [{"user-0": now, "user-1": now - 1, "user-2": now - 2}]
+    assert tracker.stats["touches"] == 100
+    assert tracker.stats["flushes"] == 1
+
+
+def test_active_counts_read_the_table_without_redis(users):
+    tracker = LastActiveTracker(flush_interval=60)
+    now = int(time.time())
+    tracker.touch("user-1", now)
+    tracker.touch("user-2", now - 600)
+    tracker.stop()
+
+    assert tracker.get_active_user_count() == 1
+    today = 3 if now % 86400 >= 600 else 2
+    assert tracker.get_num_users_active_today() == today
+
+
+def test_active_counts_come_from_redis(users):
+    tracker = LastActiveTracker(flush_interval=60, redis=FakeRedis())
+    now = int(time.time())
+    tracker.touch("user-1", now)
+    tracker.touch("user-2", now - 600)
+    tracker.stop()
+
+    today = 3 if now % 86400 >= 600 else 2
+    assert tracker.get_num_users_active_today() == today
+    # seeded from the table once, then counted from the sorted set
+    users.last_active.clear()
+    assert tracker.get_active_user_count() == 1
+    assert tracker.get_num_users_active_today() == today
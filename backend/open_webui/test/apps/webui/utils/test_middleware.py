@@ -0,0 +1,91 @@
+from open_webui.utils.middleware import (
+    ContentDeltaEncoder,
+    OutputSerializer,
+    serialize_output,
+)
+
+
+def message(text: str) -> dict:
+    return {
+        "type": "message",
+        "status": "in_progress",
+        "content": [{"type": "output_text", "text": text}],
+    }
+
+
+def apply_delta(content: str, data: dict) -> str:
+    if "content_delta" not in data:
+        return data["content"]
+    delta = data["content_delta"]
+    # trim counts UTF-16 code units like the frontend
+    units = content.encode("utf-16-le")
+    if len(units) != delta["length"] * 2:
+        # the frontend ignores deltas against content it does not have
+        return content
+    kept = units[: len(units) - delta["trim"] * 2].decode("utf-16-le")
+    return kept + delta["text"]
+
+
+def stream_output():
+    """Yield the output of a response after every streamed change."""
+    output = []
+    reasoning = {"type": "reasoning", "status": "in_progress", "content": []}
+    output.append(reasoning)
+    for chunk in ["Let me ", "think <about> ", "this 🤔\nsecond line"]:
+        reasoning["content"] = [
+            {"type": "output_text", "text": _text(reasoning) + chunk}
+        ]
+        yield output
+
+    reasoning.update(status="completed", duration=3)
+    output.append(message(""))
+    for chunk in ["Calling", " a tool."]:
+        output[-1]["content"][0]["text"] += chunk
+        yield output
+
+    call = {"type": "function_call", "call_id": "c1", "name": "f", "arguments": "{}"}
+    output.append(call)
+    yield output
+    output.append(
+        {
+            "type": "function_call_output",
+            "call_id": "c1",
+            "output": [{"type": "input_text", "text": "42"}],
+        }
+    )
+    yield output
+
+    output.append(message(""))
+    for chunk in ["The answer ", "is 42.", " 🎉"]:
+        output[-1]["content"][0]["text"] += chunk
+        yield output
+    yield output + [{"type": "function_call", "call_id": "c2", "name": "g"}]
+
+    output.pop(0)
+    yield output
+
+
+def _text(item: dict) -> str:
+    return "".join(part["text"] for part in item["content"])
+
+
+def test_incremental_serializer_matches_serialize_output():
+    serializer = OutputSerializer()
+    for output in stream_output():
+        assert serializer.serialize(output) == serialize_output(output)
+
+
+def test_content_deltas_rebuild_the_content():
+    serializer = OutputSerializer()
+    encoder = ContentDeltaEncoder(max_trim=64)
+
+    client, deltas = "", 0
+    for output in stream_output():
+        data = encoder.encode({"content": serializer.serialize(output)})
+        deltas += "content_delta" in data
+        client = apply_delta(client, data)
+        assert client == serialize_output(output)
+
+    assert deltas >= 8
+    assert apply_delta("stale", encoder.encode({"content": client + "!"})) == "stale"
+    assert "content_delta" not in encoder.encode({"content": client, "done": True})
@@ -0,0 +1,73 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from open_webui.utils import rate_limit
+from open_webui.utils.quota import ChatQuotas
+from open_webui.utils.rate_limit import MemoryBucketStore
+
+USER = SimpleNamespace(id="user-1")
+
+
+@pytest.fixture(autouse=True)
+def memory_store(monkeypatch):
+    monkeypatch.setattr(rate_limit, "MEMORY_STORE", MemoryBucketStore(max_keys=100))
+
+
+async def consume(response):
+    return [chunk async for chunk in response.body_iterator]
+
+
+async def stream():
+    yield "data: {}\n\n"
+
+
+def test_concurrent_streams_are_limited_until_consumed():
+    quotas = ChatQuotas(None, user_max_concurrent=2)
+
+    responses = [
+        quotas.acquire(USER, "model").hold(StreamingResponse(stream()))
+        for _ in range(2)
+    ]
+    with pytest.raises(HTTPException) as exc:
+        quotas.acquire(USER, "model")
+    assert exc.value.status_code == 429
+    with pytest.raises(HTTPException):
+        quotas.check(USER, "model")
+
+    asyncio.run(consume(responses[0]))
+    assert quotas.active == 1
+    quotas.acquire(USER, "model").hold({"choices": []})
+    assert quotas.stats["acquired"] == 3
+    assert quotas.stats["rejected_concurrency"] == 2
+
+
+def test_model_limit_is_shared_by_users():
+    quotas = ChatQuotas(None, model_limits={"model": {"max_concurrent": 1}})
+
+    lease = quotas.acquire(USER, "model")
+    with pytest.raises(HTTPException):
+        quotas.acquire(SimpleNamespace(id="user-2"), "model")
+    quotas.acquire(SimpleNamespace(id="user-2"), "other").release()
+
+    lease.release()
+    lease.release()
+    quotas.acquire(SimpleNamespace(id="user-2"), "model").release()
+    assert quotas.active == 0
+
+
+def test_tokens_per_minute_refuse_after_the_limit():
+    quotas = ChatQuotas(None, user_tokens_per_minute=1000)
+
+    quotas.acquire(USER, "model").release()
+    quotas.record_tokens(USER.id, "model", 600)
+    quotas.check(USER, "model")
+    quotas.record_tokens(USER.id, "model", 400)
+
+    with pytest.raises(HTTPException) as exc:
+        quotas.acquire(USER, "model")
+    assert exc.value.headers["Retry-After"] == "10"
+    quotas.acquire(SimpleNamespace(id="user-2"), "model").release()
@@ -0,0 +1,87 @@
+from types import SimpleNamespace
+
+import pytest
+
+from open_webui.utils import rate_limit
+from open_webui.utils.rate_limit import (
+    MemoryBucketStore,
+    RateLimiter,
+    get_exhausted_limit,
+    is_rate_limited,
+)
+
+
+class FailingRedis:
+    def evalsha(self, *args):
+        raise ConnectionError("redis is down")
+
+    def mget(self, keys):
+        raise ConnectionError("redis is down")
+
+
+@pytest.fixture(autouse=True)
+def memory_store(monkeypatch):
+    store = MemoryBucketStore(max_keys=100)
+    monkeypatch.setattr(rate_limit, "MEMORY_STORE", store)
+    return store
+
+
+def test_limit_is_reached_after_limit_events():
+    limiter = RateLimiter(None, limit=3, window=60, bucket_size=10)
+
+    assert [limiter.is_limited("User@example.com") for _ in range(4)] == [
+        False,
+        False,
+        False,
+        True,
+    ]
+    assert limiter.get_count("user@example.com") == 4
+    assert limiter.remaining("user@example.com") == 0
+
+
+def test_refused_checks_extend_the_limit():
+    limiter = RateLimiter(None, limit=2, window=60, bucket_size=10)
+    for _ in range(5):
+        limiter.is_limited("key")
+    assert limiter.get_count("key") == 5
+
+    not_counted = RateLimiter(None, limit=2, window=60, count_refused=False)
+    for _ in range(5):
+        not_counted.is_limited("other")
+    assert not_counted.get_count("other") == 2
+
+
+def test_exhausted_check_does_not_count_the_others():
+    per_user = RateLimiter(None, limit=5, window=60, count_refused=False)
+    per_ip = RateLimiter(None, limit=2, window=60)
+    checks = [(per_user, "user:1"), (per_ip, "ip:10.0.0.1")]
+
+    assert not is_rate_limited(checks)
+    assert not is_rate_limited(checks)
+    assert get_exhausted_limit(checks) == (per_ip, "ip:10.0.0.1")
+    assert per_user.get_count("user:1") == 2
+    assert per_ip.get_count("ip:10.0.0.1") == 3
+
+    disabled = RateLimiter(None, limit=0, window=60, enabled=False)
+    assert not is_rate_limited([(disabled, "user:1")])
+
+
+def test_memory_store_is_bounded_and_expires(memory_store, monkeypatch):
+    limiter = RateLimiter(None, limit=1, window=60)
+    for idx in range(150):
+        limiter.is_limited(f"key-{idx}")
+    assert len(memory_store) == 100
+    assert limiter.get_count("key-0") == 0
+    assert limiter.is_limited("key-149")
+
+    now = rate_limit.time.time()
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(time=lambda: now + 121))
+    assert not limiter.is_limited("key-149")
+
+
+def test_failing_redis_falls_back_to_memory():
+    limiter = RateLimiter(FailingRedis(), limit=1, window=60)
+
+    assert not limiter.is_limited("key")
+    assert limiter.is_limited("key")
+    assert limiter.get_count("key") == 2
@@ -0,0 +1,75 @@
+import json
+from types import SimpleNamespace
+
+from open_webui.utils.user_cache import REDIS_USER_CACHE_CHANNEL, UserCache
+
+
+class User(SimpleNamespace):
+    def model_copy(self):
+        return User(**vars(self))
+
+
+class Loader:
+    def __init__(self, users):
+        self.users = users
+        self.calls = 0
+
+    def __call__(self, key):
+        self.calls += 1
+        return self.users.get(key)
+
+
+class RecordingRedis:
+    def __init__(self):
+        self.messages = []
+
+    def publish(self, channel, message):
+        self.messages.append((channel, json.loads(message)))
+
+
+def test_users_are_cached_until_invalidated():
+    cache = UserCache(ttl=60)
+    load = Loader({"u1": User(id="u1", role="user")})
+
+    assert cache.get_user_by_id("u1", load).role == "user"
+    cache.get_user_by_id("u1", load).role = "admin"
+    assert cache.get_user_by_id("u1", load).role == "user"
+    assert load.calls == 1
+    assert cache.get_user_by_id("missing", load) is None
+
+    load.users["u1"] = User(id="u1", role="pending")
+    cache.invalidate("u1")
+    assert cache.get_user_by_id("u1", load).role == "pending"
+    assert cache.stats == {"hits": 2, "misses": 3, "invalidations": 1}
+
+
+def test_api_keys_are_cached_by_hash_and_dropped_with_their_user():
+    cache = UserCache(ttl=60)
+    load = Loader({"sk-secret": User(id="u1", role="user")})
+
+    assert cache.get_user_by_api_key("sk-secret", load).id == "u1"
+    assert cache.get_user_by_api_key("sk-secret", load).id == "u1"
+    assert load.calls == 1
+    assert "sk-secret" not in repr(cache._api_keys)
+
+    cache.invalidate("u1")
+    del load.users["sk-secret"]
+    assert cache.get_user_by_api_key("sk-secret", load) is None
+
+
+def test_invalidations_are_broadcast_to_other_workers():
+    redis = RecordingRedis()
+    worker, other = UserCache(ttl=60), UserCache(ttl=60)
+    worker.redis = redis
+    load = Loader({"u1": User(id="u1", role="user")})
+    other.get_user_by_id("u1", load)
+
+    worker.invalidate_all_workers("u1")
+
+    channel, message = redis.messages[0]
+    assert channel == REDIS_USER_CACHE_CHANNEL
+    assert message == {"source": worker.id, "user_id": "u1"}
+    # what listen() does with a message from another worker
+    other.invalidate(message["user_id"])
+    other.get_user_by_id("u1", load)
+    assert load.calls == 2
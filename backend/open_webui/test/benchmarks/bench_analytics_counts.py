@@ -0,0 +1,193 @@
+"""
+Analytics message count benchmark: Python bucketing vs. SQL GROUP BY vs. the
+chat_message_hourly_count table.
+
+Fills a fresh SQLite database (DATABASE_URL can point at PostgreSQL instead)
+with synthetic assistant messages spread over --days, then times the daily and
+hourly counts. "python" is the previous implementation (fetch every row and
+bucket it with datetime.fromtimestamp); "sql" and "counters" run with
+ENABLE_CHAT_MESSAGE_HOURLY_COUNTS off and on, each in its own subprocess since
+the flag is read from the environment.
+
+    python -m open_webui.test.benchmarks.bench_analytics_counts --messages 1000000 --days 90
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+MODELS = [f"bench-model-{idx}" for idx in range(8)]
+END = 1_760_000_000
+
+
+def populate(messages: int, days: int, batch_size: int = 20000) -> None:
+    from open_webui.migrate import run_migrations
+
+    run_migrations()
+
+    from sqlalchemy import insert, text
+
+    from open_webui.internal.db import get_db
+    from open_webui.models.chat_messages import ChatMessage, _get_bucket_column
+
+    rng = random.Random(0)
+    start = END - days * 86400
+    with get_db() as db:
+        db.execute(
+            text(
+                "INSERT INTO chat (id, user_id, title, chat, created_at, updated_at, "
+                "archived, pinned, meta) VALUES ('bench-chat', 'bench-user-0', "
+                "'bench', '{}', 0, 0, false, false, '{}')"
+            )
+        )
+        for offset in range(0, messages, batch_size):
+            db.execute(
+                insert(ChatMessage),
+                [
+                    {
+                        "id": f"bench-{idx}",
+                        "chat_id": "bench-chat",
+                        "user_id": f"bench-user-{rng.randrange(200)}",
+                        "role": "assistant" if idx % 2 else "user",
+                        "model_id": rng.choice(MODELS) if idx % 2 else None,
+                        "created_at": rng.randrange(start, END),
+                        "updated_at": END,
+                    }
+                    for idx in range(offset, min(offset + batch_size, messages))
+                ],
+            )
+            db.commit()
+
+        bucket = _get_bucket_column(3600)
+        db.execute(text("DELETE FROM chat_message_hourly_count"))
+        db.execute(
+            text(
+                "INSERT INTO chat_message_hourly_count (bucket, model_id, user_id, count) "
+                f"SELECT {bucket}, model_id, user_id, COUNT(*) FROM chat_message "
+                "WHERE role = 'assistant' AND model_id IS NOT NULL "
+                f"GROUP BY {bucket}, model_id, user_id"
+            )
+        )
+        db.commit()
+
+
+def count_in_python(start_date: int, end_date: int, format: str) -> dict:
+    from datetime import datetime
+
+    from open_webui.internal.db import get_db
+    from open_webui.models.chat_messages import ChatMessage, _normalize_timestamp
+
+    with get_db() as db:
+        results = (
+            db.query(ChatMessage.created_at, ChatMessage.model_id)
+            .filter(
+                ChatMessage.role == "assistant",
+                ChatMessage.model_id.isnot(None),
+                ~ChatMessage.user_id.like("shared-%"),
+                ChatMessage.created_at >= start_date,
+                ChatMessage.created_at <= end_date,
+            )
+            .all()
+        )
+    counts = {}
+    for timestamp, model_id in results:
+        key = datetime.fromtimestamp(_normalize_timestamp(timestamp)).strftime(format)
+        counts.setdefault(key, {})
+        counts[key][model_id] = counts[key].get(model_id, 0) + 1
+    return counts
+
+
+def run(mode: str, days: int, runs: int) -> dict:
+    from open_webui.models.chat_messages import ChatMessages
+
+    results = {}
+    for granularity in ["daily", "hourly"]:
+        for window in sorted({7, days}):
+            # an end that is not on an hour boundary, like a "now" from the UI
+            end_date = END - 1234
+            start_date = end_date - window * 86400
+            latencies = []
+            for _ in range(runs):
+                started = time.perf_counter()
+                if mode == "python":
+                    counts = count_in_python(
+                        start_date,
+                        end_date,
+                        "%Y-%m-%d" if granularity == "daily" else "%Y-%m-%d %H:00",
+                    )
+                elif granularity == "daily":
+                    counts = ChatMessages.get_daily_message_counts_by_model(
+                        start_date=start_date, end_date=end_date
+                    )
+                else:
+                    counts = ChatMessages.get_hourly_message_counts_by_model(
+                        start_date=start_date, end_date=end_date
+                    )
+                latencies.append(time.perf_counter() - started)
+            results[f"{granularity} {window}d"] = {
+                "latencies": latencies,
+                "messages": sum(sum(models.values()) for models in counts.values()),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--mode", choices=["populate", "python", "sql", "counters"])
+    args = parser.parse_args()
+
+    if args.mode == "populate":
+        populate(args.messages, args.days)
+        return
+    if args.mode:
+        print(json.dumps(run(args.mode, args.days, args.runs)))
+        return
+
+    print(f"{args.messages} messages over {args.days} days, {args.runs} runs/query")
+    with tempfile.TemporaryDirectory() as directory:
+        env = {
+            "DATA_DIR": directory,
+            "DATABASE_URL": f"sqlite:///{directory}/webui.db",
+            **os.environ,
+        }
+        for mode in ["populate", "python", "sql", "counters"]:
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "open_webui.test.benchmarks.bench_analytics_counts",
+                    f"--messages={args.messages}",
+                    f"--days={args.days}",
+                    f"--runs={args.runs}",
+                    f"--mode={mode}",
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+                env={
+                    **env,
+                    "ENABLE_CHAT_MESSAGE_HOURLY_COUNTS": str(mode == "counters"),
+                },
+            ).stdout
+            if mode == "populate":
+                continue
+
+            for query, result in json.loads(output.strip().splitlines()[-1]).items():
+                latencies = sorted(result["latencies"])
+                p50 = latencies[len(latencies) // 2] * 1000
+                print(
+                    f"{mode:<9} {query:<12} p50={p50:9.2f}ms "
+                    f"max={latencies[-1] * 1000:9.2f}ms messages={result['messages']}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Authentication overhead benchmark: database lookups vs. the per-process user
+cache.
+
+Creates --users users with an API key each on a fresh SQLite database
+(DATABASE_URL can point at PostgreSQL instead), then times the per-request
+work of get_current_user for random users: decoding the JWT and loading the
+user, or resolving an API key. "db" runs with USER_CACHE_TTL=0, i.e. one
+database query per request as before; "cache" uses the default TTL. Each mode
+runs in its own subprocess since the TTL is read from the environment.
+
+    python -m open_webui.test.benchmarks.bench_auth --requests 20000 --users 200
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def run(requests: int, users: int) -> dict:
+    from open_webui.internal.db import Base, engine
+    from open_webui.models.auths import Auths
+    from open_webui.models.users import Users
+    from open_webui.utils.auth import create_api_key, create_token, decode_token
+    from open_webui.utils.user_cache import USER_CACHE
+
+    Base.metadata.create_all(bind=engine)
+
+    tokens, api_keys = [], []
+    for idx in range(users):
+        user = Auths.insert_new_auth(
+            email=f"bench-{idx}@example.com",
+            password="bench",
+            name=f"bench {idx}",
+            role="user",
+        )
+        api_key = create_api_key()
+        Users.update_user_api_key_by_id(user.id, api_key)
+        tokens.append(create_token({"id": user.id}))
+        api_keys.append(api_key)
+
+    def auth_jwt(token: str):
+        data = decode_token(token)
+        return USER_CACHE.get_user_by_id(data["id"], Users.get_user_by_id)
+
+    def auth_api_key(api_key: str):
+        return USER_CACHE.get_user_by_api_key(api_key, Users.get_user_by_api_key)
+
+    results = {}
+    for kind, auth, credentials in [
+        ("jwt", auth_jwt, tokens),
+        ("api_key", auth_api_key, api_keys),
+    ]:
+        USER_CACHE.invalidate()
+        USER_CACHE.stats.update(hits=0, misses=0)
+        rng = random.Random(0)
+        latencies = []
+        for _ in range(requests):
+            credential = rng.choice(credentials)
+            start = time.perf_counter()
+            assert auth(credential) is not None
+            latencies.append(time.perf_counter() - start)
+        results[kind] = {"latencies": latencies, "hits": USER_CACHE.stats["hits"]}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--mode", choices=["db", "cache"])
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run(args.requests, args.users)))
+        return
+
+    print(f"{args.requests} authenticated requests over {args.users} users")
+    for mode in ["db", "cache"]:
+        with tempfile.TemporaryDirectory() as directory:
+            env = {
+                **os.environ,
+                "DATA_DIR": directory,
+                "DATABASE_URL": f"sqlite:///{directory}/webui.db",
+                **({"USER_CACHE_TTL": "0"} if mode == "db" else {}),
+            }
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "open_webui.test.benchmarks.bench_auth",
+                    f"--requests={args.requests}",
+                    f"--users={args.users}",
+                    f"--mode={mode}",
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+                env=env,
+            ).stdout
+        results = json.loads(output.strip().splitlines()[-1])
+        for kind, result in results.items():
+            latencies = sorted(result["latencies"])
+            p50 = latencies[len(latencies) // 2] * 1e6
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e6
+            print(
+                f"{mode:<6} {kind:<8} p50={p50:8.1f}us p99={p99:8.1f}us "
+                f"{len(latencies) / sum(latencies):10.0f} req/s "
+                f"hits={result['hits']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
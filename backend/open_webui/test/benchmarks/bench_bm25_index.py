@@ -0,0 +1,159 @@
+"""
+Hybrid search BM25 benchmark: per-query rebuild vs. persistent index.
+
+Each mode runs in its own subprocess so peak RSS is measured independently.
+The index mode also times ingesting --windows further batches of 100 chunks
+into the built index, as windowed file ingestion does.
+
+    python -m open_webui.test.benchmarks.bench_bm25_index --chunks 50000 --queries 20
+"""
+
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+WORDS = [f"term{i}" for i in range(20000)]
+
+
+def make_corpus(chunks: int, words_per_chunk: int = 120) -> list[str]:
+    rng = random.Random(42)
+    return [" ".join(rng.choices(WORDS, k=words_per_chunk)) for _ in range(chunks)]
+
+
+def make_queries(queries: int) -> list[str]:
+    rng = random.Random(7)
+    return [" ".join(rng.choices(WORDS, k=6)) for _ in range(queries)]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_rebuild(chunks: int, queries: int, k: int) -> dict:
+    from langchain_community.retrievers import BM25Retriever
+
+    texts = make_corpus(chunks)
+    metadatas = [{"file_id": str(idx)} for idx in range(chunks)]
+
+    latencies = []
+    for query in make_queries(queries):
+        start = time.perf_counter()
+        retriever = BM25Retriever.from_texts(texts=texts, metadatas=metadatas)
+        retriever.k = k
+        retriever.invoke(query)
+        latencies.append(time.perf_counter() - start)
+    return {"latencies": latencies, "peak_rss_mb": peak_rss_mb()}
+
+
+def run_index(chunks: int, queries: int, k: int, directory: str, windows: int) -> dict:
+    from open_webui.retrieval.bm25 import BM25IndexStore
+
+    store = BM25IndexStore(directory=directory)
+    texts = make_corpus(chunks)
+
+    def loader():
+        from open_webui.retrieval.vector.main import GetResult
+
+        return GetResult(
+            ids=[[str(idx) for idx in range(chunks)]],
+            documents=[texts],
+            metadatas=[[{"file_id": str(idx)} for idx in range(chunks)]],
+        )
+
+    start = time.perf_counter()
+    store.get_or_build("bench", loader)
+    build_time = time.perf_counter() - start
+    del texts
+
+    extra = make_corpus(windows * 100)
+    start = time.perf_counter()
+    for window in range(windows):
+        store.add(
+            "bench",
+            [
+                {"id": f"w{window}-{idx}", "text": text, "metadata": {}}
+                for idx, text in enumerate(extra[window * 100 : (window + 1) * 100])
+            ],
+        )
+    ingest_time = time.perf_counter() - start
+
+    latencies = []
+    for query in make_queries(queries):
+        start = time.perf_counter()
+        store.get("bench").search(query, k)
+        latencies.append(time.perf_counter() - start)
+    return {
+        "latencies": latencies,
+        "build_time": build_time,
+        "ingest_time": ingest_time,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def summarize(name: str, result: dict):
+    latencies = sorted(result["latencies"])
+    p50 = latencies[len(latencies) // 2] * 1000
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+    line = f"{name:<8} p50={p50:9.2f}ms p95={p95:9.2f}ms peak_rss={result['peak_rss_mb']:8.1f}MB"
+    if "build_time" in result:
+        line += (
+            f" (one-time build {result['build_time']:.2f}s,"
+            f" ingest {result['ingest_time']:.2f}s)"
+        )
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--windows", type=int, default=50)
+    parser.add_argument("--mode", choices=["rebuild", "index"])
+    parser.add_argument("--directory")
+    args = parser.parse_args()
+
+    if args.mode == "rebuild":
+        print(json.dumps(run_rebuild(args.chunks, args.queries, args.k)))
+        return
+    if args.mode == "index":
+        print(
+            json.dumps(
+                run_index(
+                    args.chunks, args.queries, args.k, args.directory, args.windows
+                )
+            )
+        )
+        return
+
+    print(f"{args.chunks} chunks, {args.queries} queries, k={args.k}")
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in ["rebuild", "index"]:
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "open_webui.test.benchmarks.bench_bm25_index",
+                    f"--chunks={args.chunks}",
+                    f"--queries={args.queries}",
+                    f"--k={args.k}",
+                    f"--windows={args.windows}",
+                    f"--mode={mode}",
+                    f"--directory={directory}",
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            summarize(mode, json.loads(output.strip().splitlines()[-1]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Chat message upsert benchmark: inline chat JSON vs. primary chat_message rows.
+
+Builds chats of increasing length and times single-message upserts (as sent
+while a reply streams) against each. Each mode runs in its own subprocess on a
+fresh SQLite database since the storage mode is read from the environment.
+
+    python -m open_webui.test.benchmarks.bench_chat_message_upsert --lengths 100,1000,5000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+
+def make_history(length: int, output_size: int) -> dict:
+    messages = {}
+    parent_id = None
+    for idx in range(length):
+        message_id = str(uuid.uuid4())
+        role = "user" if idx % 2 == 0 else "assistant"
+        message = {
+            "id": message_id,
+            "parentId": parent_id,
+            "childrenIds": [],
+            "role": role,
+            "content": f"message {idx} " * 20,
+            "timestamp": int(time.time()),
+        }
+        if role == "assistant":
+            message["model"] = "bench-model"
+            message["output"] = [{"type": "text", "text": "x" * output_size}]
+        if parent_id:
+            messages[parent_id]["childrenIds"].append(message_id)
+        messages[message_id] = message
+        parent_id = message_id
+    return {"currentId": parent_id, "messages": messages}
+
+
+def run(lengths: list[int], upserts: int, output_size: int) -> dict:
+    from open_webui.internal.db import Base, engine
+    from open_webui.models.chats import ChatForm, Chats
+
+    Base.metadata.create_all(bind=engine)
+
+    results = {}
+    for length in lengths:
+        history = make_history(length, output_size)
+        chat = Chats.insert_new_chat(
+            "bench-user", ChatForm(chat={"title": "bench", "history": history})
+        )
+
+        message_id = history["currentId"]
+        latencies = []
+        for idx in range(upserts):
+            start = time.perf_counter()
+            Chats.upsert_message_to_chat_by_id_and_message_id(
+                chat.id,
+                message_id,
+                {"content": f"streamed reply {idx} " * 10, "done": False},
+            )
+            latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        assembled = Chats.get_chat_by_id(chat.id)
+        read_time = time.perf_counter() - start
+        assert len(assembled.chat["history"]["messages"]) == length
+
+        results[length] = {"latencies": latencies, "read_time": read_time}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lengths", default="100,1000,5000")
+    parser.add_argument("--upserts", type=int, default=50)
+    parser.add_argument("--output-size", type=int, default=2000)
+    parser.add_argument("--mode", choices=["inline", "rows"])
+    args = parser.parse_args()
+    lengths = [int(length) for length in args.lengths.split(",")]
+
+    if args.mode:
+        print(json.dumps(run(lengths, args.upserts, args.output_size)))
+        return
+
+    print(f"{args.upserts} upserts per chat, {args.output_size} byte tool outputs")
+    for mode in ["inline", "rows"]:
+        with tempfile.TemporaryDirectory() as directory:
+            env = {
+                **os.environ,
+                "DATA_DIR": directory,
+                "DATABASE_URL": f"sqlite:///{directory}/webui.db",
+                "ENABLE_CHAT_MESSAGE_PRIMARY_STORAGE": str(mode == "rows"),
+            }
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "open_webui.test.benchmarks.bench_chat_message_upsert",
+                    f"--lengths={args.lengths}",
+                    f"--upserts={args.upserts}",
+                    f"--output-size={args.output_size}",
+                    f"--mode={mode}",
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+                env=env,
+            ).stdout
+        results = json.loads(output.strip().splitlines()[-1])
+        for length, result in results.items():
+            latencies = sorted(result["latencies"])
+            p50 = latencies[len(latencies) // 2] * 1000
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            print(
+                f"{mode:<7} messages={length:>6} upsert p50={p50:8.2f}ms "
+                f"p95={p95 * 1000:8.2f}ms full read={result['read_time'] * 1000:8.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
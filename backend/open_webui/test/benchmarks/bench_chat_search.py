@@ -0,0 +1,131 @@
+"""
+Chat search benchmark: LIKE/JSON scan vs. the chat_search full-text index.
+
+Populates one user's chats in a fresh SQLite database (DATABASE_URL can point
+at PostgreSQL instead), then times the same queries with
+ENABLE_CHAT_SEARCH_INDEX off and on, each in its own subprocess since the flag
+is read from the environment.
+
+    python -m open_webui.test.benchmarks.bench_chat_search --chats 20000 --messages 20
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+WORDS = [f"word{i}" for i in range(5000)]
+QUERIES = ["word42", "word4242 word17", "tag:bench word7", "pinned:true word99"]
+
+
+def populate(chats: int, messages: int) -> None:
+    from open_webui.migrate import run_migrations
+
+    run_migrations()
+
+    from open_webui.internal.db import get_db
+    from open_webui.models.chats import Chat, ChatForm, Chats
+
+    rng = random.Random(0)
+    for idx in range(chats):
+        history, parent_id = {}, None
+        for message_idx in range(messages):
+            message_id = f"{idx}-{message_idx}"
+            history[message_id] = {
+                "id": message_id,
+                "parentId": parent_id,
+                "role": "user" if message_idx % 2 == 0 else "assistant",
+                "content": " ".join(rng.choices(WORDS, k=60)),
+            }
+            parent_id = message_id
+        chat = Chats.insert_new_chat(
+            "bench-user",
+            ChatForm(
+                chat={
+                    "title": " ".join(rng.choices(WORDS, k=4)),
+                    "history": {"currentId": parent_id, "messages": history},
+                    "messages": list(history.values()),
+                }
+            ),
+        )
+        if idx % 10 == 0:
+            with get_db() as db:
+                db.query(Chat).filter_by(id=chat.id).update(
+                    {"pinned": True, "meta": {"tags": ["bench"]}}
+                )
+                db.commit()
+
+
+def run(queries: int) -> dict:
+    from open_webui.models.chats import Chats
+
+    results = {}
+    for query in QUERIES:
+        latencies = []
+        for _ in range(queries):
+            start = time.perf_counter()
+            chats = Chats.get_chats_by_user_id_and_search_text(
+                "bench-user", query, skip=0, limit=60
+            )
+            latencies.append(time.perf_counter() - start)
+        results[query] = {"latencies": latencies, "results": len(chats)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chats", type=int, default=20000)
+    parser.add_argument("--messages", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--mode", choices=["populate", "like", "index"])
+    args = parser.parse_args()
+
+    if args.mode == "populate":
+        populate(args.chats, args.messages)
+        return
+    if args.mode:
+        print(json.dumps(run(args.queries)))
+        return
+
+    print(f"{args.chats} chats x {args.messages} messages, {args.queries} runs/query")
+    with tempfile.TemporaryDirectory() as directory:
+        env = {
+            "DATA_DIR": directory,
+            "DATABASE_URL": f"sqlite:///{directory}/webui.db",
+            **os.environ,
+        }
+        for mode in ["populate", "like", "index"]:
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "open_webui.test.benchmarks.bench_chat_search",
+                    f"--chats={args.chats}",
+                    f"--messages={args.messages}",
+                    f"--queries={args.queries}",
+                    f"--mode={mode}",
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+                env={**env, "ENABLE_CHAT_SEARCH_INDEX": str(mode != "like")},
+            ).stdout
+            if mode == "populate":
+                continue
+
+            for query, result in json.loads(output.strip().splitlines()[-1]).items():
+                latencies = sorted(result["latencies"])
+                p50 = latencies[len(latencies) // 2] * 1000
+                p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+                print(
+                    f"{mode:<6} {query!r:<24} p50={p50:9.2f}ms "
+                    f"p95={p95 * 1000:9.2f}ms results={result['results']}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Chunk merging benchmark: re-measuring the growing chunk vs. tracked sizes.
+
+Builds a markdown document with thousands of tiny header sections, splits it on
+headers like save_docs_to_vector_db does and merges the sections up to
+CHUNK_MIN_SIZE_TARGET. "remeasure" is the previous merge_docs_to_target_size,
+which encoded the whole merged chunk and its concatenation with the next
+section again for every section.
+
+    python -m open_webui.test.benchmarks.bench_chunk_merge --sections 5000 --splitter token
+"""
+
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+WORDS = [f"word{i}" for i in range(500)]
+
+
+def make_document(sections: int) -> str:
+    rng = random.Random(42)
+    parts = []
+    for idx in range(sections):
+        level = "#" * rng.randint(1, 4)
+        body = " ".join(rng.choices(WORDS, k=rng.randint(0, 12)))
+        parts.append(f"{level} Section {idx}\n{body}\n")
+    return "\n".join(parts)
+
+
+def merge_remeasure(request, chunks):
+    import tiktoken
+    from langchain_core.documents import Document
+
+    from open_webui.routers.retrieval import can_merge_chunks
+
+    min_chunk_size_target = request.app.state.config.CHUNK_MIN_SIZE_TARGET
+    max_chunk_size = request.app.state.config.CHUNK_SIZE
+
+    measure_chunk_size = len
+    if request.app.state.config.TEXT_SPLITTER == "token":
+        encoding = tiktoken.get_encoding(
+            str(request.app.state.config.TIKTOKEN_ENCODING_NAME)
+        )
+        measure_chunk_size = lambda text: len(encoding.encode(text))
+
+    processed_chunks = []
+    current_chunk = None
+    current_content = ""
+    for next_chunk in chunks:
+        if current_chunk is None:
+            current_chunk = next_chunk
+            current_content = next_chunk.page_content
+            continue
+
+        proposed_content = f"{current_content}\n\n{next_chunk.page_content}"
+        if (
+            can_merge_chunks(current_chunk, next_chunk)
+            and measure_chunk_size(current_content) < min_chunk_size_target
+            and measure_chunk_size(proposed_content) <= max_chunk_size
+        ):
+            current_content = proposed_content
+        else:
+            processed_chunks.append(
+                Document(
+                    page_content=current_content,
+                    metadata={**current_chunk.metadata},
+                )
+            )
+            current_chunk = next_chunk
+            current_content = next_chunk.page_content
+
+    if current_chunk is not None:
+        processed_chunks.append(
+            Document(
+                page_content=current_content,
+                metadata={**current_chunk.metadata},
+            )
+        )
+    return processed_chunks
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sections", type=int, default=5000)
+    parser.add_argument("--splitter", choices=["token", "character"], default="token")
+    parser.add_argument("--min-size", type=int, default=1000)
+    parser.add_argument("--max-size", type=int, default=4000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    from langchain_core.documents import Document
+    from langchain_text_splitters import MarkdownHeaderTextSplitter
+
+    from open_webui.routers.retrieval import merge_docs_to_target_size
+
+    request = SimpleNamespace(
+        app=SimpleNamespace(
+            state=SimpleNamespace(
+                config=SimpleNamespace(
+                    CHUNK_MIN_SIZE_TARGET=args.min_size,
+                    CHUNK_SIZE=args.max_size,
+                    TEXT_SPLITTER=args.splitter,
+                    TIKTOKEN_ENCODING_NAME="cl100k_base",
+                )
+            )
+        )
+    )
+
+    splitter = MarkdownHeaderTextSplitter(
+        headers_to_split_on=[("#" * level, f"Header {level}") for level in range(1, 7)],
+        strip_headers=False,
+    )
+    chunks = [
+        Document(page_content=chunk.page_content, metadata={"source": "bench.md"})
+        for chunk in splitter.split_text(make_document(args.sections))
+    ]
+    print(
+        f"{len(chunks)} sections, {args.splitter} sizes, "
+        f"target {args.min_size}-{args.max_size}, {args.runs} runs"
+    )
+
+    results = {}
+    for mode, merge in [
+        ("remeasure", merge_remeasure),
+        ("tracked", merge_docs_to_target_size),
+    ]:
+        latencies = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            merged = merge(request, chunks)
+            latencies.append(time.perf_counter() - start)
+        results[mode] = [doc.page_content for doc in merged]
+        print(
+            f"{mode:<10} best={min(latencies) * 1000:9.2f}ms "
+            f"merged_chunks={len(merged)}"
+        )
+
+    assert results["remeasure"] == results["tracked"], "merged chunks differ"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Rate limiter load test: per-limit round-trips vs. one scripted multi-key check.
+
+Runs checks against a per-user, a per-IP and a per-model limit from several
+threads and reports throughput and per-check latency. "legacy" is the previous
+RateLimiter check (INCR, EXPIRE and MGET for every limit), "script" checks all
+limits with one call of the Lua script. Without --redis-url only the in-memory
+fallback is measured.
+
+    python -m open_webui.test.benchmarks.bench_rate_limit --checks 50000 --threads 8
+    python -m open_webui.test.benchmarks.bench_rate_limit --redis-url redis://localhost:6379/0
+"""
+
+import argparse
+import random
+import statistics
+import threading
+import time
+
+from open_webui.utils.rate_limit import MEMORY_STORE, RateLimiter, is_rate_limited
+
+
+def is_limited_legacy(limiter: RateLimiter, key: str) -> bool:
+    now_bucket = int(time.time()) // limiter.bucket_size
+    bucket_key = limiter._bucket_key(key, now_bucket)
+
+    attempts = limiter.r.incr(bucket_key)
+    if attempts == 1:
+        limiter.r.expire(bucket_key, limiter.window + limiter.bucket_size)
+
+    buckets = [
+        limiter._bucket_key(key, now_bucket - i) for i in range(limiter.num_buckets + 1)
+    ]
+    counts = limiter.r.mget(buckets)
+    return sum(int(c) for c in counts if c) > limiter.limit
+
+
+def run(check, checks: int, threads: int, users: int) -> list[float]:
+    latencies: list[float] = []
+    lock = threading.Lock()
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        local = []
+        for _ in range(checks // threads):
+            user = rng.randrange(users)
+            start = time.perf_counter()
+            check(f"user:{user}", f"ip:10.0.{user % 256}.{user % 7}", "model:gpt")
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return latencies
+
+
+def report(mode: str, latencies: list[float], elapsed: float):
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{mode:<8} {len(latencies) / elapsed:10.0f} checks/s "
+        f"p50={statistics.median(latencies) * 1e6:8.1f}us "
+        f"p99={p99 * 1e6:8.1f}us"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--checks", type=int, default=50000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--redis-url", default=None)
+    args = parser.parse_args()
+
+    redis_client = None
+    if args.redis_url:
+        import redis
+
+        redis_client = redis.Redis.from_url(args.redis_url, decode_responses=True)
+
+    # limits high enough that every check is counted
+    per_user = RateLimiter(redis_client, limit=10**6, window=60, bucket_size=10)
+    per_ip = RateLimiter(redis_client, limit=10**6, window=60, bucket_size=10)
+    per_model = RateLimiter(redis_client, limit=10**9, window=60, bucket_size=10)
+
+    def check_script(user: str, ip: str, model: str):
+        is_rate_limited([(per_user, user), (per_ip, ip), (per_model, model)])
+
+    def check_legacy(user: str, ip: str, model: str):
+        for limiter, key in [(per_user, user), (per_ip, ip), (per_model, model)]:
+            is_limited_legacy(limiter, key)
+
+    modes = [("script" if redis_client else "memory", check_script)]
+    if redis_client is not None:
+        modes.insert(0, ("legacy", check_legacy))
+
+    print(
+        f"{args.checks} checks of 3 limits, {args.threads} threads, "
+        f"{args.users} users, {'redis' if redis_client else 'in-memory'}"
+    )
+    for mode, check in modes:
+        MEMORY_STORE.clear()
+        start = time.perf_counter()
+        latencies = run(check, args.checks, args.threads, args.users)
+        report(mode, latencies, time.perf_counter() - start)
+    print(f"in-memory keys: {len(MEMORY_STORE)} (max {MEMORY_STORE.max_keys})")
+
+
+if __name__ == "__main__":
+    main()
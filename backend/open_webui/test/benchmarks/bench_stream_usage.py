@@ -0,0 +1,103 @@
+"""
+Streamed usage counting benchmark: per-chunk re-encoding vs. incremental counter.
+
+Simulates long streamed replies without provider usage and reports the time
+spent on the caller (event loop) thread per stream, the total time until the
+usage is known, and the completion token error against encoding the full reply.
+
+    python -m open_webui.test.benchmarks.bench_stream_usage --streams 20 --chunks 4000
+"""
+
+import argparse
+import random
+import time
+
+from open_webui.utils.credit.models import ChatCompletionChunk, CompletionUsage
+from open_webui.utils.credit.usage import calculator
+
+WORDS = ["the", "model", "streams", "tokens", "quickly,", "and", "counts", "\n"]
+WORDS += ["数据", "处理", "12345", "don't", "(example)", "naïve", "🙂"]
+
+
+def make_stream(chunks: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    text = " ".join(rng.choice(WORDS) for _ in range(chunks * 2))
+    deltas, idx = [], 0
+    while idx < len(text):
+        size = rng.randint(1, 8)
+        deltas.append(text[idx : idx + size])
+        idx += size
+    return deltas
+
+
+def make_messages(prompt_words: int) -> list[dict]:
+    rng = random.Random(0)
+    return [
+        {"role": "system", "content": "You are a helpful assistant."},
+        {"role": "user", "content": " ".join(rng.choices(WORDS, k=prompt_words))},
+    ]
+
+
+def run_legacy(model_id: str, messages: list[dict], deltas: list[str]) -> tuple:
+    start = time.perf_counter()
+    usage = CompletionUsage(prompt_tokens=0, completion_tokens=0, total_tokens=0)
+    for delta in deltas:
+        chunk = ChatCompletionChunk.model_validate(
+            {"choices": [{"delta": {"content": delta}}]}
+        )
+        _, chunk_usage = calculator.calculate_usage(
+            cached_usage=usage, model_id=model_id, messages=messages, response=chunk
+        )
+        usage.prompt_tokens = chunk_usage.prompt_tokens
+        usage.completion_tokens += chunk_usage.completion_tokens
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed, usage.completion_tokens
+
+
+def run_incremental(model_id: str, messages: list[dict], deltas: list[str]) -> tuple:
+    start = time.perf_counter()
+    counter = calculator.stream_counter(model_id=model_id, messages=messages)
+    for delta in deltas:
+        chunk = ChatCompletionChunk.model_validate(
+            {"choices": [{"delta": {"content": delta}}]}
+        )
+        counter.add(chunk.choices[0].delta.content or "")
+    caller = time.perf_counter() - start
+    completion_tokens = counter.completion_tokens
+    counter.prompt_tokens
+    return caller, time.perf_counter() - start, completion_tokens
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--streams", type=int, default=20)
+    parser.add_argument("--chunks", type=int, default=4000)
+    parser.add_argument("--prompt-words", type=int, default=20000)
+    parser.add_argument("--model", default="gpt-4o")
+    args = parser.parse_args()
+
+    messages = make_messages(args.prompt_words)
+    encoder = calculator.get_encoder(args.model)
+    streams = [make_stream(args.chunks, seed) for seed in range(args.streams)]
+    exact = [len(encoder.encode_ordinary("".join(deltas))) for deltas in streams]
+
+    print(
+        f"{args.streams} streams, ~{args.chunks} words each, "
+        f"{args.prompt_words} prompt words"
+    )
+    for name, runner in [("legacy", run_legacy), ("incremental", run_incremental)]:
+        caller_total = wall_total = error = 0
+        for deltas, expected in zip(streams, exact):
+            caller, wall, tokens = runner(args.model, messages, deltas)
+            caller_total += caller
+            wall_total += wall
+            error += abs(tokens - expected) / expected
+        print(
+            f"{name:<12} caller={caller_total / args.streams * 1000:8.2f}ms/stream "
+            f"total={wall_total / args.streams * 1000:8.2f}ms/stream "
+            f"token_error={error / args.streams * 100:6.2f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
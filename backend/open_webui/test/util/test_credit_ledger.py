@@ -0,0 +1,108 @@
+from decimal import Decimal
+
+import pytest
+
+from open_webui.models.credits import AddCreditForm, SetCreditFormDetail
+from open_webui.utils.credit import ledger as ledger_module
+from open_webui.utils.credit.ledger import CreditLedger
+
+
+def deduct(user_id: str, amount: str) -> AddCreditForm:
+    return AddCreditForm(
+        user_id=user_id,
+        amount=Decimal(amount),
+        detail=SetCreditFormDetail(desc="test"),
+    )
+
+
+class FakeCredits:
+    def __init__(self):
+        self.balances = {"u1": Decimal("10"), "u2": Decimal("5")}
+        self.batches = []
+        self.fail = False
+        self.poison = set()
+
+    def ping(self):
+        if self.fail:
+            raise RuntimeError("database unavailable")
+
+    def add_credit_batch(self, entries):
+        self.ping()
+        if any(entry.user_id in self.poison for entry in entries):
+            raise ValueError("invalid entry")
+        self.batches.append(list(entries))
+        for entry in entries:
+            self.balances[entry.user_id] += entry.amount
+        return dict(self.balances)
+
+
+@pytest.fixture
+def credits(monkeypatch):
+    credits = FakeCredits()
+    monkeypatch.setattr(ledger_module, "Credits", credits)
+    monkeypatch.setattr(
+        ledger_module.CreditBalances,
+        "get",
+        lambda user_id: credits.balances.get(user_id),
+    )
+    return credits
+
+
+class TestCreditLedger:
+    def test_pending_deductions_are_visible_before_flush(self, credits):
+        ledger = CreditLedger(flush_interval=60, batch_size=100)
+        ledger.add(deduct("u1", "-1.5"))
+        ledger.add(deduct("u1", "-2"))
+
+        assert ledger.get_balance("u1") == Decimal("6.5")
+        assert credits.batches == []
+
+        ledger.stop()
+        assert len(credits.batches) == 1
+        assert ledger.get_balance("u1") == Decimal("6.5")
+        assert ledger.pending == 0
+
+    def test_flush_splits_batches(self, credits):
+        ledger = CreditLedger(flush_interval=60, batch_size=2)
+        for user_id in ["u1", "u2", "u1", "u2", "u1"]:
+            ledger.add(deduct(user_id, "-1"))
+        ledger.stop()
+
+        assert [len(batch) for batch in credits.batches] == [2, 2, 1]
+        assert credits.balances == {"u1": Decimal("7"), "u2": Decimal("3")}
+
+    def test_failed_batch_stays_queued(self, credits):
+        ledger = CreditLedger(flush_interval=60, batch_size=100)
+        credits.fail = True
+        ledger.add(deduct("u2", "-1"))
+        ledger.flush()
+
+        assert ledger.pending == 1
+        assert ledger.stats["failures"] == 1
+
+        credits.fail = False
+        ledger.stop()
+        assert ledger.pending == 0
+        assert credits.balances["u2"] == Decimal("4")
+
+    def test_failing_entry_is_dead_lettered(self, credits):
+        ledger = CreditLedger(flush_interval=60, batch_size=100)
+        credits.poison = {"u3"}
+        for user_id in ["u1", "u3", "u2"]:
+            ledger.add(deduct(user_id, "-1"))
+        ledger.flush()
+
+        assert ledger.pending == 0
+        assert ledger.stats["dead_lettered"] == 1
+        assert credits.balances == {"u1": Decimal("9"), "u2": Decimal("4")}
+        assert ledger.get_balance("u1") == Decimal("9")
+
+    def test_full_queue_writes_through(self, credits):
+        ledger = CreditLedger(flush_interval=60, batch_size=100, max_pending=1)
+        ledger.add(deduct("u1", "-1"))
+        ledger.add(deduct("u2", "-1"))
+
+        assert ledger.pending == 1
+        assert credits.balances["u2"] == Decimal("4")
+        ledger.stop()
+        assert credits.balances["u1"] == Decimal("9")
@@ -0,0 +1,36 @@
+from open_webui.utils.model_cache import ModelListCache
+
+
+class TestModelListCache:
+    def test_catalog_and_views(self):
+        cache = ModelListCache(ttl=60, max_views=2)
+        assert cache.get_models() is None
+
+        cache.set_models([{"id": "a"}], cache.version)
+        assert cache.get_models() == [{"id": "a"}]
+
+        for user_id in ["u1", "u2", "u3"]:
+            cache.set_view((user_id, "user"), [user_id], cache.version)
+        assert cache.get_view(("u1", "user")) is None
+        assert cache.get_view(("u3", "user")) == ["u3"]
+
+        assert cache.stats["catalog_hits"] == 1
+        assert cache.stats["view_misses"] == 1
+
+    def test_invalidation_drops_stale_builds(self):
+        cache = ModelListCache(ttl=60)
+        version = cache.version
+        cache.invalidate()
+        cache.set_models([{"id": "stale"}], version)
+        assert cache.get_models() is None
+
+        cache.set_models([{"id": "a"}], cache.version)
+        cache.set_view("u1", ["a"], cache.version)
+        cache.invalidate(views_only=True)
+        assert cache.get_view("u1") is None
+        assert cache.get_models() == [{"id": "a"}]
+
+    def test_disabled(self):
+        cache = ModelListCache(ttl=0)
+        cache.set_models([{"id": "a"}], cache.version)
+        assert cache.get_models() is None
@@ -0,0 +1,66 @@
+import aiohttp
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from open_webui.utils.session_pool import ClientSessionPool
+
+
+@pytest_asyncio.fixture
+async def server():
+    async def handler(request):
+        return web.Response(text="ok", headers={"Set-Cookie": "a=b"})
+
+    app = web.Application()
+    app.router.add_get("/", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}/"
+    await runner.cleanup()
+
+
+class TestClientSessionPool:
+    @pytest.mark.asyncio
+    async def test_sessions_and_connections_are_reused(self, server):
+        pool = ClientSessionPool()
+        timeout = aiohttp.ClientTimeout(total=5)
+
+        for _ in range(3):
+            session = pool.get(timeout=timeout)
+            async with session.get(server) as r:
+                assert await r.text() == "ok"
+
+        assert pool.get(timeout=aiohttp.ClientTimeout(total=5)) is session
+        assert pool.is_shared(session)
+        assert pool.stats["connections_created"] == 1
+        assert pool.stats["connections_reused"] == 2
+        # Upstream cookies must not leak between users of the shared session
+        assert len(session.cookie_jar) == 0
+
+        await pool.close()
+        assert session.closed
+
+    @pytest.mark.asyncio
+    async def test_sessions_are_keyed_by_config(self):
+        pool = ClientSessionPool()
+        a = pool.get(timeout=aiohttp.ClientTimeout(total=5))
+        b = pool.get(timeout=aiohttp.ClientTimeout(total=10))
+        c = pool.get(timeout=aiohttp.ClientTimeout(total=5), read_bufsize=2**20)
+
+        assert len({id(a), id(b), id(c)}) == 3
+        assert a.connector is b.connector is c.connector
+
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_sessions_default_to_aiohttp_timeout(self):
+        pool = ClientSessionPool()
+        session = pool.get()
+
+        assert session.timeout == aiohttp.ClientTimeout(total=300, sock_connect=30)
+        assert pool.get(timeout=session.timeout) is session
+
+        await pool.close()
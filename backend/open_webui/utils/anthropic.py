@@ -10,6 +10,7 @@ from open_webui.env import (
 )
 from open_webui.models.users import UserModel
 from open_webui.utils.headers import include_user_info_headers
+from open_webui.utils.session_pool import client_session
 
 log = logging.getLogger(__name__)
 
@@ -29,7 +30,7 @@ async def get_anthropic_models(url: str, key: str, user: UserModel = None) -> di
     after_id = None
 
     try:
-        async with aiohttp.ClientSession(timeout=timeout, trust_env=True) as session:
+        async with client_session(timeout=timeout, trust_env=True) as session:
             headers = {
                 "x-api-key": key,
                 "anthropic-version": "2023-06-01",
@@ -1,12 +1,15 @@
+import asyncio
 from contextlib import asynccontextmanager
 from dataclasses import asdict, dataclass
 from enum import Enum
 import re
+import time
 from typing import (
     TYPE_CHECKING,
     Any,
     AsyncGenerator,
     Dict,
+    List,
     MutableMapping,
     Optional,
     cast,
@@ -24,9 +27,17 @@ from asgiref.typing import (
 from loguru import logger
 from starlette.requests import Request
 
-from open_webui.env import AUDIT_LOG_LEVEL, MAX_BODY_LOG_SIZE
-from open_webui.utils.auth import get_current_user, get_http_authorization_cred
-from open_webui.models.users import UserModel
+from open_webui.env import (
+    AUDIT_BATCH_SIZE,
+    AUDIT_FLUSH_INTERVAL,
+    AUDIT_LOG_LEVEL,
+    AUDIT_QUEUE_FULL_POLICY,
+    AUDIT_QUEUE_MAX_SIZE,
+    MAX_BODY_LOG_SIZE,
+)
+from open_webui.utils.auth import decode_token, get_http_authorization_cred
+from open_webui.utils.background import BackgroundFlusher
+from open_webui.models.users import Users
 
 if TYPE_CHECKING:
     from loguru import Logger
@@ -47,6 +58,24 @@ class AuditLogEntry:
     # `Request Response` level
     response_object: Any = None
     response_status_code: Optional[int] = None
+    # epoch seconds of the request, entries are written later
+    timestamp: Optional[int] = None
+
+
+@dataclass
+class PendingAuditEntry:
+    """Raw request data of an audit entry, turned into one off the request path."""
+
+    audit_level: str
+    verb: str
+    request_uri: str
+    timestamp: int
+    token: Optional[str] = None
+    user_agent: Optional[str] = None
+    source_ip: Optional[str] = None
+    request_body: Optional[bytearray] = None
+    response_body: Optional[bytearray] = None
+    response_status_code: Optional[int] = None
 
 
 class AuditLevel(str, Enum):
@@ -87,6 +116,157 @@ class AuditLogger:
         )
 
 
+def _get_audit_user(token: Optional[str]) -> dict:
+    if not token:
+        return {}
+    try:
+        if token.startswith("sk-"):
+            user = Users.get_user_by_api_key(token)
+        else:
+            data = decode_token(token)
+            user = Users.get_user_by_id(data["id"]) if data and "id" in data else None
+        return user.model_dump(include={"id", "name", "email", "role"}) if user else {}
+    except Exception as e:
+        logger.debug(f"Failed to get audited user: {str(e)}")
+        return {}
+
+
+def build_audit_entry(
+    pending: PendingAuditEntry, users: Optional[Dict[str, dict]] = None
+) -> AuditLogEntry:
+    """
+    Resolve the user and decode the bodies of ``pending``. ``users`` caches the
+    users of the tokens seen in one batch.
+    """
+    if users is None:
+        users = {}
+    if pending.token not in users:
+        users[pending.token] = _get_audit_user(pending.token)
+
+    request_body = (pending.request_body or b"").decode("utf-8", errors="replace")
+    response_body = (pending.response_body or b"").decode("utf-8", errors="replace")
+
+    # Redact sensitive information
+    if "password" in request_body:
+        request_body = re.sub(
+            r'"password":\s*"(.*?)"',
+            '"password": "********"',
+            request_body,
+        )
+
+    return AuditLogEntry(
+        id=str(uuid.uuid4()),
+        user=users[pending.token],
+        audit_level=pending.audit_level,
+        verb=pending.verb,
+        request_uri=pending.request_uri,
+        response_status_code=pending.response_status_code,
+        source_ip=pending.source_ip,
+        user_agent=pending.user_agent,
+        request_object=request_body,
+        response_object=response_body,
+        timestamp=pending.timestamp,
+    )
+
+
+class AuditSink(BackgroundFlusher):
+    """
+    Audit Sink
+
+    Holds pending audit entries in a bounded in-memory queue and writes them
+    from a background thread in batches, so audited requests only pay for
+    copying their data. User lookups, body decoding and the log write happen on
+    the worker. When the queue is full new entries are dropped, or with the
+    ``block`` policy the request waits for room for up to ``block_timeout``
+    seconds first. Queued entries are written on shutdown.
+    """
+
+    worker_name = "audit-sink"
+
+    def __init__(
+        self,
+        audit_logger: AuditLogger,
+        max_size: int = 10000,
+        flush_interval: float = 1.0,
+        batch_size: int = 500,
+        policy: str = "drop",
+        block_timeout: float = 5.0,
+    ) -> None:
+        super().__init__(flush_interval)
+        self.audit_logger = audit_logger
+        self.max_size = max(max_size, 1)
+        self.batch_size = max(batch_size, 1)
+        self.policy = policy
+        self.block_timeout = block_timeout
+
+        self._pending: List[PendingAuditEntry] = []
+
+        self.stats = {"enqueued": 0, "written": 0, "dropped": 0, "failures": 0}
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def _try_add(self, entry: PendingAuditEntry) -> bool:
+        with self._lock:
+            if len(self._pending) >= self.max_size:
+                return False
+            self._pending.append(entry)
+            self.stats["enqueued"] += 1
+            pending = len(self._pending)
+
+        if self.flush_interval <= 0:
+            self.flush()
+            return True
+
+        self._ensure_worker()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    async def put(self, entry: PendingAuditEntry) -> bool:
+        if self._try_add(entry):
+            return True
+
+        if self.policy == "block":
+            deadline = time.monotonic() + self.block_timeout
+            while time.monotonic() < deadline:
+                self._wakeup.set()
+                await asyncio.sleep(0.01)
+                if self._try_add(entry):
+                    return True
+
+        self.stats["dropped"] += 1
+        return False
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = self._pending[: self.batch_size]
+                    del self._pending[: len(batch)]
+                if not batch:
+                    return
+
+                users: Dict[str, dict] = {}
+                for pending in batch:
+                    try:
+                        self.audit_logger.write(build_audit_entry(pending, users))
+                        self.stats["written"] += 1
+                    except Exception as e:
+                        self.stats["failures"] += 1
+                        logger.error(f"Failed to log audit entry: {str(e)}")
+
+
+AUDIT_SINK = AuditSink(
+    AuditLogger(logger),
+    max_size=AUDIT_QUEUE_MAX_SIZE,
+    flush_interval=AUDIT_FLUSH_INTERVAL / 1000,
+    batch_size=AUDIT_BATCH_SIZE,
+    policy=AUDIT_QUEUE_FULL_POLICY,
+)
+
+
 class AuditContext:
     """
     Captures and aggregates the HTTP request and response bodies during the processing of a request. It ensures that only a configurable maximum amount of data is stored to prevent excessive memory usage.
@@ -131,9 +311,10 @@ class AuditLoggingMiddleware:
         excluded_paths: Optional[list[str]] = None,
         max_body_size: int = MAX_BODY_LOG_SIZE,
         audit_level: AuditLevel = AuditLevel.NONE,
+        sink: Optional[AuditSink] = None,
     ) -> None:
         self.app = app
-        self.audit_logger = AuditLogger(logger)
+        self.sink = sink or AUDIT_SINK
         self.excluded_paths = excluded_paths or []
         self.max_body_size = max_body_size
         self.audit_level = audit_level
@@ -189,18 +370,17 @@ class AuditLoggingMiddleware:
         finally:
             await self._log_audit_entry(request, context)
 
-    async def _get_authenticated_user(self, request: Request) -> Optional[UserModel]:
-        auth_header = request.headers.get("Authorization")
+    def _get_token(self, request: Request) -> Optional[str]:
+        auth_token = get_http_authorization_cred(request.headers.get("Authorization"))
+        if auth_token is not None:
+            return auth_token.credentials
 
-        try:
-            user = await get_current_user(
-                request, None, None, get_http_authorization_cred(auth_header)
-            )
-            return user
-        except Exception as e:
-            logger.debug(f"Failed to get authenticated user: {str(e)}")
+        if "token" in request.cookies:
+            return request.cookies.get("token")
 
-        return None
+        # set by middleware, e.g. for x-api-key
+        state_token = getattr(request.state, "token", None)
+        return state_token.credentials if state_token else None
 
     def _should_skip_auditing(self, request: Request) -> bool:
         if (
@@ -250,36 +430,21 @@ class AuditLoggingMiddleware:
 
     async def _log_audit_entry(self, request: Request, context: AuditContext):
         try:
-            user = await self._get_authenticated_user(request)
-
-            user = (
-                user.model_dump(include={"id", "name", "email", "role"}) if user else {}
-            )
-
-            request_body = context.request_body.decode("utf-8", errors="replace")
-            response_body = context.response_body.decode("utf-8", errors="replace")
-
-            # Redact sensitive information
-            if "password" in request_body:
-                request_body = re.sub(
-                    r'"password":\s*"(.*?)"',
-                    '"password": "********"',
-                    request_body,
+            await self.sink.put(
+                PendingAuditEntry(
+                    audit_level=self.audit_level.value,
+                    verb=request.method,
+                    request_uri=str(request.url),
+                    timestamp=int(time.time()),
+                    token=self._get_token(request),
+                    user_agent=request.headers.get("user-agent"),
+                    source_ip=request.client.host if request.client else None,
+                    request_body=context.request_body,
+                    response_body=context.response_body,
+                    response_status_code=context.metadata.get(
+                        "response_status_code", None
+                    ),
                 )
-
-            entry = AuditLogEntry(
-                id=str(uuid.uuid4()),
-                user=user,
-                audit_level=self.audit_level.value,
-                verb=request.method,
-                request_uri=str(request.url),
-                response_status_code=context.metadata.get("response_status_code", None),
-                source_ip=request.client.host if request.client else None,
-                user_agent=request.headers.get("user-agent"),
-                request_object=request_body,
-                response_object=response_body,
             )
-
-            self.audit_logger.write(entry)
         except Exception as e:
-            logger.error(f"Failed to log audit entry: {str(e)}")
+            logger.error(f"Failed to queue audit entry: {str(e)}")
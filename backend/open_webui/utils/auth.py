@@ -27,6 +27,8 @@ from open_webui.utils.smtp import send_email
 
 from open_webui.utils.access_control import has_permission
 from open_webui.models.users import Users
+from open_webui.utils.last_active import LAST_ACTIVE_TRACKER
+from open_webui.utils.user_cache import USER_CACHE
 from open_webui.models.auths import Auths
 
 
@@ -52,7 +54,7 @@ from open_webui.env import (
     REDIS_CLUSTER,
 )
 
-from fastapi import BackgroundTasks, Depends, HTTPException, Request, Response, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from open_webui.utils.redis import get_redis_connection, get_sentinels_from_env
@@ -294,7 +296,6 @@ def get_http_authorization_cred(auth_header: Optional[str]):
 async def get_current_user(
     request: Request,
     response: Response,
-    background_tasks: BackgroundTasks,
     auth_token: HTTPAuthorizationCredentials = Depends(bearer_security),
     # NOTE: We intentionally do NOT use Depends(get_session) here.
     # Sessions are managed internally with short-lived context managers.
@@ -347,7 +348,7 @@ async def get_current_user(
                     detail="Invalid token",
                 )
 
-            user = Users.get_user_by_id(data["id"])
+            user = USER_CACHE.get_user_by_id(data["id"], Users.get_user_by_id)
             if user is None:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
@@ -372,10 +373,9 @@ async def get_current_user(
                     current_span.set_attribute("client.user.role", user.role)
                     current_span.set_attribute("client.auth.type", "jwt")
 
-                # Refresh the user's last active timestamp asynchronously
-                # to prevent blocking the request
-                if background_tasks:
-                    background_tasks.add_task(Users.update_last_active_by_id, user.id)
+                # Refresh the user's last active timestamp, written in bulk
+                # from a background thread
+                LAST_ACTIVE_TRACKER.touch(user.id)
             return user
         else:
             raise HTTPException(
@@ -399,7 +399,7 @@ async def get_current_user(
 
 def get_current_user_by_api_key(request, api_key: str):
     # Each function call manages its own short-lived session internally
-    user = Users.get_user_by_api_key(api_key)
+    user = USER_CACHE.get_user_by_api_key(api_key, Users.get_user_by_api_key)
 
     if user is None:
         raise HTTPException(
@@ -427,7 +427,7 @@ def get_current_user_by_api_key(request, api_key: str):
         current_span.set_attribute("client.user.role", user.role)
         current_span.set_attribute("client.auth.type", "api_key")
 
-    Users.update_last_active_by_id(user.id)
+    LAST_ACTIVE_TRACKER.touch(user.id)
     return user
 
 
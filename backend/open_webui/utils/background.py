@@ -0,0 +1,57 @@
+import atexit
+import threading
+
+
+class BackgroundFlusher:
+    """
+    Background Flusher
+
+    Base of the in-memory queues that are written from a daemon thread instead
+    of the request path (audit entries, credit changes, last-active times).
+    Subclasses queue under ``_lock``, call ``_ensure_worker`` once something is
+    queued and implement ``flush``. The worker flushes every
+    ``flush_interval`` seconds, or earlier once ``_wakeup`` is set.
+
+    ``stop`` joins the worker and flushes what is left. It is called from the
+    app lifespan and, as a last resort for processes that exit without running
+    it, at interpreter exit.
+    """
+
+    worker_name = "background-flusher"
+
+    def __init__(self, flush_interval: float) -> None:
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._worker = None
+
+    def flush(self) -> None:
+        raise NotImplementedError
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wakeup.set()
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
+            atexit.unregister(self.stop)
+        self.flush()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None or self._stopped.is_set():
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._run, name=self.worker_name, daemon=True
+                )
+                self._worker.start()
+                atexit.register(self.stop)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
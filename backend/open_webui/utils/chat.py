@@ -41,6 +41,7 @@ from open_webui.models.functions import Functions
 from open_webui.models.models import Models
 from open_webui.utils.credit.usage import CreditDeduct
 from open_webui.utils.credit.utils import check_credit_by_user_id
+from open_webui.utils.quota import CHAT_QUOTAS, QuotaLease
 
 from open_webui.utils.plugin import (
     load_function_module_by_id,
@@ -266,49 +267,61 @@ async def generate_chat_completion(
                     "selected_model_id": selected_model_id,
                 }
 
-        if model.get("pipe"):
-            # Below does not require bypass_filter because this is the only route the uses this function and it is already bypassing the filter
-            return await generate_function_chat_completion(
-                request, form_data, user=user, models=models
-            )
-        if model.get("owned_by") == "ollama":
-            # Using /ollama/api/chat endpoint
-            payload = copy.deepcopy(form_data)
-            form_data = convert_payload_openai_to_ollama(form_data)
-            response = await generate_ollama_chat_completion(
-                request=request,
-                form_data=form_data,
-                user=user,
-                bypass_filter=bypass_filter,
-                bypass_system_prompt=bypass_system_prompt,
-            )
-            if form_data.get("stream"):
-                response.headers["content-type"] = "text/event-stream"
-                return StreamingResponse(
-                    convert_streaming_response_ollama_to_openai(
-                        user, model_id, payload, response
-                    ),
-                    headers=dict(response.headers),
-                    background=response.background,
+        # Background tasks (titles, tags, ...) are not held to the chat quotas
+        if (form_data.get("metadata") or {}).get("task"):
+            quota_lease = QuotaLease(CHAT_QUOTAS, [])
+        else:
+            quota_lease = await asyncio.to_thread(CHAT_QUOTAS.acquire, user, model_id)
+
+        try:
+            if model.get("pipe"):
+                # Below does not require bypass_filter because this is the only route the uses this function and it is already bypassing the filter
+                response = await generate_function_chat_completion(
+                    request, form_data, user=user, models=models
                 )
+            elif model.get("owned_by") == "ollama":
+                # Using /ollama/api/chat endpoint
+                payload = copy.deepcopy(form_data)
+                form_data = convert_payload_openai_to_ollama(form_data)
+                response = await generate_ollama_chat_completion(
+                    request=request,
+                    form_data=form_data,
+                    user=user,
+                    bypass_filter=bypass_filter,
+                    bypass_system_prompt=bypass_system_prompt,
+                )
+                if form_data.get("stream"):
+                    response.headers["content-type"] = "text/event-stream"
+                    response = StreamingResponse(
+                        convert_streaming_response_ollama_to_openai(
+                            user, model_id, payload, response
+                        ),
+                        headers=dict(response.headers),
+                        background=response.background,
+                    )
+                else:
+                    with CreditDeduct(
+                        user=user,
+                        model_id=model_id,
+                        body=payload,
+                        is_stream=False,
+                    ) as credit_deduct:
+                        response = convert_response_ollama_to_openai(response)
+                        credit_deduct.run(response)
+                        response = credit_deduct.add_usage_to_resp(response)
             else:
-                with CreditDeduct(
+                response = await generate_openai_chat_completion(
+                    request=request,
+                    form_data=form_data,
                     user=user,
-                    model_id=model_id,
-                    body=payload,
-                    is_stream=False,
-                ) as credit_deduct:
-                    response = convert_response_ollama_to_openai(response)
-                    credit_deduct.run(response)
-                    return credit_deduct.add_usage_to_resp(response)
-        else:
-            return await generate_openai_chat_completion(
-                request=request,
-                form_data=form_data,
-                user=user,
-                bypass_filter=bypass_filter,
-                bypass_system_prompt=bypass_system_prompt,
-            )
+                    bypass_filter=bypass_filter,
+                    bypass_system_prompt=bypass_system_prompt,
+                )
+        except BaseException:
+            await asyncio.to_thread(quota_lease.release)
+            raise
+
+        return await asyncio.to_thread(quota_lease.hold, response)
 
 
 chat_completion = generate_chat_completion
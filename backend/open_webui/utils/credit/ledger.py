@@ -0,0 +1,210 @@
+import logging
+from decimal import Decimal
+from typing import Dict, List
+
+from open_webui.env import (
+    CREDIT_LEDGER_BATCH_SIZE,
+    CREDIT_LEDGER_FLUSH_INTERVAL,
+    CREDIT_LEDGER_MAX_PENDING,
+    ENABLE_CREDIT_LEDGER,
+    GLOBAL_LOG_LEVEL,
+)
+from open_webui.models.credits import (
+    AddCreditForm,
+    CreditBalances,
+    CreditLedgerEntry,
+    Credits,
+)
+from open_webui.utils.background import BackgroundFlusher
+
+logger = logging.getLogger(__name__)
+logger.setLevel(GLOBAL_LOG_LEVEL)
+
+
+class CreditLedger(BackgroundFlusher):
+    """
+    Credit Ledger
+
+    Queues usage deductions in memory and applies them from a background thread
+    in batched transactions (see ``CreditsTable.add_credit_batch``), so the
+    request path never waits on the ``credit`` row. Entries stay queued until
+    their batch commits and are flushed on shutdown.
+
+    When a batch fails while the database is reachable, its entries are
+    applied one by one and those that still fail are dead-lettered: logged in
+    full and dropped, so one bad entry can't block every later deduction.
+    Past ``max_pending`` queued entries (e.g. during a database outage),
+    changes are written through by the caller.
+    """
+
+    worker_name = "credit-ledger"
+
+    def __init__(
+        self,
+        flush_interval: float = 1.0,
+        batch_size: int = 500,
+        max_pending: int = 100000,
+    ) -> None:
+        super().__init__(flush_interval)
+        self.batch_size = max(batch_size, 1)
+        self.max_pending = max(max_pending, 1)
+
+        self._pending: List[CreditLedgerEntry] = []
+        # queued, not yet committed amounts per user
+        self._pending_amounts: Dict[str, Decimal] = {}
+
+        self.stats = {
+            "enqueued": 0,
+            "applied": 0,
+            "batches": 0,
+            "failures": 0,
+            "dead_lettered": 0,
+            "written_through": 0,
+        }
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def add(self, form_data: AddCreditForm) -> None:
+        entry = CreditLedgerEntry(
+            user_id=form_data.user_id,
+            amount=form_data.amount,
+            detail=form_data.detail.model_dump(),
+        )
+        with self._lock:
+            full = len(self._pending) >= self.max_pending
+            if not full:
+                self._pending.append(entry)
+                self._pending_amounts[entry.user_id] = (
+                    self._pending_amounts.get(entry.user_id, 0) + entry.amount
+                )
+                self.stats["enqueued"] += 1
+            pending = len(self._pending)
+
+        if full:
+            self.stats["written_through"] += 1
+            try:
+                Credits.add_credit_batch([entry])
+            except Exception as err:
+                self._dead_letter(entry, err)
+            return
+
+        if self.flush_interval <= 0:
+            self.flush()
+            return
+
+        self._ensure_worker()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def get_balance(self, user_id: str) -> Decimal:
+        """
+        Committed balance (cached) minus deductions still waiting in this
+        worker's queue.
+        """
+        balance = CreditBalances.get(user_id)
+        if balance is None:
+            balance = Credits.init_credit_by_user_id(user_id=user_id).credit
+            CreditBalances.set_many({user_id: balance})
+        with self._lock:
+            return balance + self._pending_amounts.get(user_id, 0)
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = self._pending[: self.batch_size]
+                if not batch:
+                    return
+
+                try:
+                    Credits.add_credit_batch(batch)
+                    done = len(batch)
+                    self.stats["applied"] += done
+                    self.stats["batches"] += 1
+                except Exception as err:
+                    self.stats["failures"] += 1
+                    logger.exception("[credit_ledger] flush failed: %s", err)
+                    done = self._apply_each(batch)
+
+                with self._lock:
+                    del self._pending[:done]
+                    for entry in batch[:done]:
+                        amount = self._pending_amounts.get(entry.user_id, 0)
+                        amount -= entry.amount
+                        if amount:
+                            self._pending_amounts[entry.user_id] = amount
+                        else:
+                            self._pending_amounts.pop(entry.user_id, None)
+
+                if done < len(batch):
+                    # the rest stays queued and is retried on the next flush
+                    return
+
+    def _apply_each(self, batch: List[CreditLedgerEntry]) -> int:
+        """
+        Apply a failed batch entry by entry, dead-lettering the entries that
+        fail while the database is reachable. Returns how many entries from the
+        head of the batch are done.
+        """
+        for done, entry in enumerate(batch):
+            try:
+                Credits.add_credit_batch([entry])
+                self.stats["applied"] += 1
+            except Exception as err:
+                try:
+                    Credits.ping()
+                except Exception:
+                    # the database is down rather than the entry being bad
+                    return done
+                self._dead_letter(entry, err)
+        return len(batch)
+
+    def _dead_letter(self, entry: CreditLedgerEntry, err: Exception) -> None:
+        self.stats["dead_lettered"] += 1
+        logger.error(
+            "[credit_ledger] dropping credit change that can't be applied (%s): %s",
+            err,
+            entry.model_dump_json(),
+        )
+
+    def stop(self) -> None:
+        super().stop()
+        if self._pending:
+            logger.error(
+                "[credit_ledger] %d credit changes could not be applied on shutdown",
+                len(self._pending),
+            )
+
+
+class DirectCreditLedger:
+    """
+    Write-through ledger used when ENABLE_CREDIT_LEDGER is off
+    """
+
+    stats = {}
+    pending = 0
+
+    def add(self, form_data: AddCreditForm) -> None:
+        Credits.add_credit_by_user_id(form_data=form_data)
+
+    def get_balance(self, user_id: str) -> Decimal:
+        return Credits.init_credit_by_user_id(user_id=user_id).credit
+
+    def flush(self) -> None:
+        return None
+
+    def stop(self) -> None:
+        return None
+
+
+CREDIT_LEDGER = (
+    CreditLedger(
+        flush_interval=CREDIT_LEDGER_FLUSH_INTERVAL / 1000,
+        batch_size=CREDIT_LEDGER_BATCH_SIZE,
+        max_pending=CREDIT_LEDGER_MAX_PENDING,
+    )
+    if ENABLE_CREDIT_LEDGER
+    else DirectCreditLedger()
+)
@@ -1,8 +1,10 @@
+import asyncio
 import json
 import logging
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from decimal import Decimal
-from typing import List, Union, Tuple
+from typing import List, Optional, Union, Tuple
 
 import tiktoken
 from fastapi import HTTPException
@@ -16,8 +18,8 @@ from open_webui.config import (
     USAGE_CALCULATE_MINIMUM_COST,
     USAGE_CUSTOM_PRICE_CONFIG,
 )
-from open_webui.env import GLOBAL_LOG_LEVEL
-from open_webui.models.credits import AddCreditForm, Credits, SetCreditFormDetail
+from open_webui.env import GLOBAL_LOG_LEVEL, USAGE_TOKENIZER_POOL_SIZE
+from open_webui.models.credits import AddCreditForm, SetCreditFormDetail
 from open_webui.models.models import Models
 from open_webui.models.users import UserModel
 from open_webui.utils.credit.models import (
@@ -27,15 +29,129 @@ from open_webui.utils.credit.models import (
     ChatCompletionChunk,
     MessageItem,
 )
+from open_webui.utils.credit.ledger import CREDIT_LEDGER
 from open_webui.utils.credit.utils import (
     get_model_price,
     get_feature_price,
     calculate_image_token,
 )
+from open_webui.utils.misc import is_token_boundary
+from open_webui.utils.quota import CHAT_QUOTAS
 
 logger = logging.getLogger(__name__)
 logger.setLevel(GLOBAL_LOG_LEVEL)
 
+# tiktoken releases the GIL while encoding, so counting runs in parallel here
+# instead of blocking the event loop that relays the stream
+tokenizer_pool = ThreadPoolExecutor(
+    max_workers=USAGE_TOKENIZER_POOL_SIZE, thread_name_prefix="usage-tokenizer"
+)
+
+
+def find_token_boundary(text: str, start: int = 1) -> int:
+    """
+    Return the last index >= start where tiktoken's pre-tokenizer always splits
+    (see ``is_token_boundary``), or 0 if there is none. Text cut there encodes
+    to exactly the same tokens as the uncut text.
+    """
+    for idx in range(len(text) - 1, max(start, 1) - 1, -1):
+        if is_token_boundary(text, idx):
+            return idx
+    return 0
+
+
+class CompletionTokenCounter:
+    """
+    Counts completion tokens across streamed deltas.
+
+    Deltas are joined into a tail that is cut at pre-tokenizer boundaries, so
+    tokens split across chunks are counted once. Committed text is encoded in
+    ``tokenizer_pool`` in batches; only the short tail is encoded when the
+    count is read.
+    """
+
+    batch_size = 2048
+    # text without any boundary (e.g. CJK) is cut here, off by a token at most
+    max_tail_size = 8192
+
+    def __init__(self, encoder: Encoding) -> None:
+        self._encoder = encoder
+        self._tail = ""
+        self._batch: List[str] = []
+        self._batch_size = 0
+        self._futures: List[Future] = []
+        self._started = False
+
+    def add(self, content: str) -> None:
+        if not self._started:
+            # strip <think> to avoid empty token calculation
+            content = content.lstrip("<think>")
+            self._started = bool(content)
+        if not content:
+            return
+
+        start = len(self._tail)
+        self._tail += content
+        cut = find_token_boundary(self._tail, start)
+        if not cut and len(self._tail) > self.max_tail_size:
+            cut = len(self._tail) - self.max_tail_size // 2
+        if not cut:
+            return
+
+        self._batch.append(self._tail[:cut])
+        self._batch_size += cut
+        self._tail = self._tail[cut:]
+        if self._batch_size >= self.batch_size:
+            self._submit()
+
+    def _submit(self) -> None:
+        if not self._batch:
+            return
+        self._futures.append(tokenizer_pool.submit(self._count, self._batch))
+        self._batch = []
+        self._batch_size = 0
+
+    def _count(self, texts: List[str]) -> int:
+        return sum(len(self._encoder.encode_ordinary(text)) for text in texts)
+
+    async def wait(self) -> None:
+        """Submit the pending batch and wait for the pool without blocking."""
+        self._submit()
+        await asyncio.gather(*(asyncio.wrap_future(f) for f in self._futures))
+
+    @property
+    def tokens(self) -> int:
+        self._submit()
+        return sum(future.result() for future in self._futures) + len(
+            self._encoder.encode_ordinary(self._tail)
+        )
+
+
+class StreamUsageCounter:
+    """
+    Usage of a streamed completion without provider usage: the prompt is
+    tokenized once in the background, completion deltas incrementally.
+    """
+
+    def __init__(self, encoder: Encoding, prompt_tokens: Future) -> None:
+        self._prompt_tokens = prompt_tokens
+        self.completion = CompletionTokenCounter(encoder)
+
+    def add(self, content: str) -> None:
+        self.completion.add(content)
+
+    async def wait(self) -> None:
+        await asyncio.wrap_future(self._prompt_tokens)
+        await self.completion.wait()
+
+    @property
+    def prompt_tokens(self) -> int:
+        return self._prompt_tokens.result()
+
+    @property
+    def completion_tokens(self) -> int:
+        return self.completion.tokens
+
 
 class Calculator:
     """
@@ -65,6 +181,41 @@ class Calculator:
             return self.get_encoder(default_model_for_encoding)
         return self.get_encoder(model_id)
 
+    def count_prompt_tokens(
+        self, encoder: Encoding, model_id: str, messages: List[dict]
+    ) -> int:
+        prompt_tokens = 0
+        for message in [MessageItem.model_validate(message) for message in messages]:
+            if isinstance(message.content, str):
+                prompt_tokens += len(encoder.encode(message.content or ""))
+            if isinstance(message.content, list):
+                for item in message.content:
+                    item: MessageContent
+                    if item.type == "text":
+                        prompt_tokens += len(encoder.encode(item.text or ""))
+                    elif item.type == "image_url":
+                        prompt_tokens += calculate_image_token(model_id, item.image_url)
+        return prompt_tokens
+
+    def stream_counter(
+        self,
+        model_id: str,
+        messages: List[dict],
+        model_prefix_to_remove: str = "",
+        default_model_for_encoding: str = "gpt-4o",
+    ) -> StreamUsageCounter:
+        encoder = self.get_encoder(
+            model_id=model_id,
+            model_prefix_to_remove=model_prefix_to_remove,
+            default_model_for_encoding=default_model_for_encoding,
+        )
+        return StreamUsageCounter(
+            encoder=encoder,
+            prompt_tokens=tokenizer_pool.submit(
+                self.count_prompt_tokens, encoder, model_id, messages
+            ),
+        )
+
     def calculate_usage(
         self,
         cached_usage: CompletionUsage,
@@ -94,24 +245,9 @@ class Calculator:
             if cached_usage.prompt_tokens:
                 usage.prompt_tokens = cached_usage.prompt_tokens
             else:
-                for message in [
-                    MessageItem.model_validate(message) for message in messages
-                ]:
-                    if isinstance(message.content, str):
-                        usage.prompt_tokens += len(
-                            encoder.encode(message.content or "")
-                        )
-                    if isinstance(message.content, list):
-                        for item in message.content:
-                            item: MessageContent
-                            if item.type == "text":
-                                usage.prompt_tokens += len(
-                                    encoder.encode(item.text or "")
-                                )
-                            elif item.type == "image_url":
-                                usage.prompt_tokens += calculate_image_token(
-                                    model_id, item.image_url
-                                )
+                usage.prompt_tokens = self.count_prompt_tokens(
+                    encoder=encoder, model_id=model_id, messages=messages
+                )
 
             # completion tokens
             choices = response.choices
@@ -160,6 +296,7 @@ class CreditDeduct:
         is_embedding: bool = False,
     ) -> None:
         self.is_error = False
+        self.is_embedding = is_embedding
         self.empty_no_cost = not is_embedding and CREDIT_NO_CHARGE_EMPTY_RESPONSE.value
         self.remote_id = ""
         self.user = user
@@ -191,6 +328,7 @@ class CreditDeduct:
         }
         self.custom_fees = self.build_custom_fees(body)
         self.is_official_usage = False
+        self._stream_counter: Optional[StreamUsageCounter] = None
 
     def __enter__(self):
         return self
@@ -198,7 +336,8 @@ class CreditDeduct:
     def __exit__(self, exc_type, exc_val, exc_tb):
         if exc_val or self.is_error:
             return
-        Credits.add_credit_by_user_id(
+        self.collect_stream_usage()
+        CREDIT_LEDGER.add(
             form_data=AddCreditForm(
                 user_id=self.user.id,
                 amount=Decimal(-self.total_price),
@@ -233,6 +372,12 @@ class CreditDeduct:
                 ),
             )
         )
+        if not self.is_embedding:
+            CHAT_QUOTAS.record_tokens(
+                self.user.id,
+                self.model_id,
+                self.usage.prompt_tokens + self.usage.completion_tokens,
+            )
         logger.info(
             "[credit_deduct] user: %s; model: %s; tokens: %d %d; cost: %s",
             self.user.name,
@@ -348,6 +493,7 @@ class CreditDeduct:
 
     @property
     def usage_with_cost(self) -> dict:
+        self.collect_stream_usage()
         return {
             "total_cost": float(self.total_price),
             "cost_detail": {
@@ -489,8 +635,29 @@ class CreditDeduct:
         # record is
         self.remote_id = getattr(response, "id", "")
 
+        # use official usage
+        if response.usage is not None:
+            self.is_official_usage = True
+            self.usage = response.usage
+            return
+        if self.is_official_usage:
+            return
+
+        # count stream incrementally, collected once the stream ends
+        if self.is_stream:
+            if self._stream_counter is None:
+                self._stream_counter = calculator.stream_counter(
+                    model_id=self.model_id,
+                    messages=messages,
+                    model_prefix_to_remove=USAGE_CALCULATE_MODEL_PREFIX_TO_REMOVE.value,
+                    default_model_for_encoding=USAGE_DEFAULT_ENCODING_MODEL.value,
+                )
+            if response.choices:
+                self._stream_counter.add(response.choices[0].delta.content or "")
+            return
+
         # calculate
-        is_official_usage, usage = calculator.calculate_usage(
+        _, usage = calculator.calculate_usage(
             cached_usage=self.usage,
             model_id=self.model_id,
             messages=messages,
@@ -498,24 +665,31 @@ class CreditDeduct:
             model_prefix_to_remove=USAGE_CALCULATE_MODEL_PREFIX_TO_REMOVE.value,
             default_model_for_encoding=USAGE_DEFAULT_ENCODING_MODEL.value,
         )
+        self.usage = usage
 
-        # use official usage
-        if is_official_usage:
-            self.is_official_usage = True
-            self.usage = usage
-            return
-        if self.is_official_usage:
+    async def wait_stream_usage(self) -> None:
+        """
+        Wait for the tokenizer pool from async code, so reading the usage
+        afterwards doesn't block the event loop on ``future.result()``.
+        """
+        if self._stream_counter is None or self.is_official_usage:
             return
+        try:
+            await self._stream_counter.wait()
+        except Exception as e:
+            logger.warning("[credit_deduct_failed] count stream usage failed %s", e)
 
-        # use calculated usage
-        if self.is_stream:
-            self.usage.prompt_tokens = usage.prompt_tokens
-            self.usage.completion_tokens += usage.completion_tokens
+    def collect_stream_usage(self) -> None:
+        if self._stream_counter is None or self.is_official_usage:
+            return
+        try:
+            self.usage.prompt_tokens = self._stream_counter.prompt_tokens
+            self.usage.completion_tokens = self._stream_counter.completion_tokens
             self.usage.total_tokens = (
                 self.usage.prompt_tokens + self.usage.completion_tokens
             )
-            return
-        self.usage = usage
+        except Exception as e:
+            logger.warning("[credit_deduct_failed] count stream usage failed %s", e)
 
     def clean_response(
         self, response: Union[dict, bytes, str], default_response: dict
@@ -20,7 +20,7 @@ from open_webui.config import (
     USAGE_CALCULATE_DEFAULT_EMBEDDING_PRICE,
 )
 from open_webui.models.chats import Chats
-from open_webui.models.credits import Credits
+from open_webui.utils.credit.ledger import CREDIT_LEDGER
 from open_webui.models.models import Models, ModelModel
 
 
@@ -213,9 +213,9 @@ def check_credit_by_user_id(
         return
     # load credit
     metadata = form_data.get("metadata") or form_data
-    credit = Credits.init_credit_by_user_id(user_id=user_id)
+    credit = CREDIT_LEDGER.get_balance(user_id=user_id)
     # check for credit
-    if credit is None or credit.credit <= 0 or credit.credit < minimum_credit:
+    if credit <= 0 or credit < minimum_credit:
         if isinstance(metadata, dict) and metadata:
             chat_id = metadata.get("chat_id")
             message_id = metadata.get("message_id") or metadata.get("id")
@@ -0,0 +1,135 @@
+import logging
+import time
+from typing import Dict, Optional
+
+from open_webui.env import (
+    GLOBAL_LOG_LEVEL,
+    REDIS_KEY_PREFIX,
+    USER_LAST_ACTIVE_FLUSH_INTERVAL,
+)
+from open_webui.models.users import Users
+from open_webui.utils.background import BackgroundFlusher
+from open_webui.utils.redis import get_redis_client
+
+logger = logging.getLogger(__name__)
+logger.setLevel(GLOBAL_LOG_LEVEL)
+
+# users seen within this many seconds count as active, as in UsersTable
+ACTIVE_WINDOW = 180
+
+
+def _today_start(now: float) -> int:
+    now = int(now)
+    return now - now % 86400
+
+
+class LastActiveTracker(BackgroundFlusher):
+    """
+    Last Active Tracker
+
+    Records when users were last seen in memory and writes the timestamps to
+    the ``user`` table from a background thread in one bulk UPDATE every
+    ``flush_interval`` seconds (see ``UsersTable.update_last_active_by_ids``),
+    instead of a read-modify-write per request. With Redis the flushed
+    timestamps are also shared in a sorted set, seeded from the table once a
+    day, so the active user gauges count across workers without querying the
+    table. Without Redis the gauges query the table, which every worker writes.
+    """
+
+    worker_name = "last-active"
+
+    def __init__(self, flush_interval: float = 30.0, redis=None) -> None:
+        super().__init__(flush_interval)
+        self.redis = redis
+        self.key = f"{REDIS_KEY_PREFIX}:users:last_active"
+
+        # user id -> last seen, not yet written to the table
+        self._pending: Dict[str, int] = {}
+        self._today: Optional[int] = None
+
+        self.stats = {"touches": 0, "written": 0, "flushes": 0, "failures": 0}
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def touch(self, user_id: str, timestamp: Optional[int] = None) -> None:
+        timestamp = timestamp or int(time.time())
+        with self._lock:
+            if self._pending.get(user_id, 0) < timestamp:
+                self._pending[user_id] = timestamp
+            self.stats["touches"] += 1
+
+        if self.flush_interval <= 0:
+            self.flush()
+            return
+
+        self._ensure_worker()
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return
+
+            try:
+                Users.update_last_active_by_ids(batch)
+            except Exception as err:
+                # keep the timestamps queued; they are retried on the next flush
+                self.stats["failures"] += 1
+                logger.exception("[last_active] flush failed: %s", err)
+                with self._lock:
+                    for user_id, timestamp in batch.items():
+                        if self._pending.get(user_id, 0) < timestamp:
+                            self._pending[user_id] = timestamp
+                return
+
+            self.stats["written"] += len(batch)
+            self.stats["flushes"] += 1
+            self._share(batch)
+
+    def _share(self, last_active: Dict[str, int]) -> None:
+        if self.redis is None:
+            return
+        try:
+            pipe = self.redis.pipeline()
+            pipe.zadd(self.key, last_active, gt=True)
+            pipe.zremrangebyscore(self.key, "-inf", _today_start(time.time()) - 86400)
+            pipe.execute()
+        except Exception as err:
+            logger.warning("[last_active] failed to share timestamps: %s", err)
+
+    def _ensure_today(self, now: float) -> None:
+        """Seed the shared users seen today from the table once a day."""
+        today = _today_start(now)
+        if self._today == today:
+            return
+        last_active = Users.get_last_active_since(today)
+        self._today = today
+        if last_active:
+            self._share(last_active)
+
+    def count_since(self, since: int) -> int:
+        """Users in the shared sorted set last seen at ``since`` or later."""
+        self._ensure_today(time.time())
+        try:
+            return int(self.redis.zcount(self.key, since, "+inf"))
+        except Exception as err:
+            logger.warning("[last_active] failed to count users: %s", err)
+            return 0
+
+    def get_active_user_count(self) -> int:
+        if self.redis is None:
+            return Users.get_active_user_count()
+        return self.count_since(int(time.time()) - ACTIVE_WINDOW)
+
+    def get_num_users_active_today(self) -> int:
+        if self.redis is None:
+            return Users.get_num_users_active_today()
+        return self.count_since(_today_start(time.time()) + 1)
+
+
+LAST_ACTIVE_TRACKER = LastActiveTracker(
+    flush_interval=USER_LAST_ACTIVE_FLUSH_INTERVAL, redis=get_redis_client()
+)
@@ -31,6 +31,8 @@ from open_webui.models.chats import Chats
 from open_webui.models.folders import Folders
 from open_webui.models.users import Users
 from open_webui.socket.main import (
+    MESSAGE_EVENT_BUFFER,
+    REALTIME_CHAT_SAVER,
     get_event_call,
     get_event_emitter,
 )
@@ -127,6 +129,7 @@ from open_webui.env import (
     GLOBAL_LOG_LEVEL,
     ENABLE_CHAT_RESPONSE_BASE64_IMAGE_URL_CONVERSION,
     CHAT_RESPONSE_STREAM_DELTA_CHUNK_SIZE,
+    ENABLE_CHAT_RESPONSE_STREAM_CONTENT_DELTA,
     CHAT_RESPONSE_MAX_TOOL_CALL_RETRIES,
     BYPASS_MODEL_ACCESS_CONTROL,
     ENABLE_REALTIME_CHAT_SAVE,
@@ -400,138 +403,315 @@ def is_opening_code_block(content):
     return len(backtick_segments) > 1 and len(backtick_segments) % 2 == 0
 
 
+def _get_tool_outputs(output: list) -> dict:
+    # Collect function_call_output items by call_id for lookup
+    tool_outputs = {}
+    for item in output:
+        if item.get("type") == "function_call_output":
+            tool_outputs[item.get("call_id")] = item
+    return tool_outputs
+
+
+def _serialize_output_item(
+    content: str, output: list, idx: int, tool_outputs: dict
+) -> str:
+    """Render ``output[idx]`` after the already rendered ``content``."""
+    item = output[idx]
+    item_type = item.get("type", "")
+
+    if item_type == "message":
+        for content_part in item.get("content", []):
+            if "text" in content_part:
+                text = content_part.get("text", "").strip()
+                if text:
+                    content = f"{content}{text}\n"
+
+    elif item_type == "function_call":
+        # Render tool call inline with its result (if available)
+        if content and not content.endswith("\n"):
+            content += "\n"
+
+        call_id = item.get("call_id", "")
+        name = item.get("name", "")
+        arguments = item.get("arguments", "")
+
+        result_item = tool_outputs.get(call_id)
+        if result_item:
+            result_text = ""
+            for result_output in result_item.get("output", []):
+                if "text" in result_output:
+                    output_text = result_output.get("text", "")
+                    result_text += (
+                        str(output_text)
+                        if not isinstance(output_text, str)
+                        else output_text
+                    )
+            files = result_item.get("files")
+            embeds = result_item.get("embeds", "")
+
+            content += f'<details type="tool_calls" done="true" id="{call_id}" name="{name}" arguments="{html.escape(json.dumps(arguments))}" result="{html.escape(json.dumps(result_text, ensure_ascii=False))}" files="{html.escape(json.dumps(files)) if files else ""}" embeds="{html.escape(json.dumps(embeds))}">\n<summary>Tool Executed</summary>\n</details>\n'
+        else:
+            content += f'<details type="tool_calls" done="false" id="{call_id}" name="{name}" arguments="{html.escape(json.dumps(arguments))}">\n<summary>Executing...</summary>\n</details>\n'
+
+    elif item_type == "function_call_output":
+        # Already handled inline with function_call above
+        pass
+
+    elif item_type == "reasoning":
+        reasoning_content = ""
+        # Check for 'summary' (new structure) or 'content' (legacy/fallback)
+        source_list = item.get("summary", []) or item.get("content", [])
+        for content_part in source_list:
+            if "text" in content_part:
+                reasoning_content += content_part.get("text", "")
+            elif "summary" in content_part:  # Handle potential nested logic if any
+                pass
+
+        reasoning_content = reasoning_content.strip()
+
+        duration = item.get("duration")
+        status = item.get("status", "in_progress")
+
+        # Infer completion: if this reasoning item is NOT the last item,
+        # render as done (a subsequent item means reasoning is complete)
+        is_last_item = idx == len(output) - 1
+
+        if content and not content.endswith("\n"):
+            content += "\n"
+
+        display = html.escape(
+            "\n".join(
+                (f"> {line}" if not line.startswith(">") else line)
+                for line in reasoning_content.splitlines()
+            )
+        )
+
+        if status == "completed" or duration is not None or not is_last_item:
+            content = f'{content}<details type="reasoning" done="true" duration="{duration or 0}">\n<summary>Thought for {duration or 0} seconds</summary>\n{display}\n</details>\n'
+        else:
+            content = f'{content}<details type="reasoning" done="false">\n<summary>Thinking…</summary>\n{display}\n</details>\n'
+
+    elif item_type == "open_webui:code_interpreter":
+        content_stripped, original_whitespace = split_content_and_whitespace(content)
+        if is_opening_code_block(content_stripped):
+            content = content_stripped.rstrip("`").rstrip() + original_whitespace
+        else:
+            content = content_stripped + original_whitespace
+
+        if content and not content.endswith("\n"):
+            content += "\n"
+
+        # Render the code_interpreter item as a <details> block
+        # so the frontend Collapsible renders "Analyzing..."/"Analyzed".
+        code = item.get("code", "").strip()
+        lang = item.get("lang", "python")
+        status = item.get("status", "in_progress")
+        duration = item.get("duration")
+        is_last_item = idx == len(output) - 1
+
+        # Build inner content: code block
+        display = ""
+        if code:
+            display = f"```{lang}\n{code}\n```"
+
+        # Build output attribute as HTML-escaped JSON for CodeBlock.svelte
+        ci_output = item.get("output")
+        output_attr = ""
+        if ci_output:
+            if isinstance(ci_output, dict):
+                output_json = json.dumps(ci_output, ensure_ascii=False)
+            else:
+                output_json = json.dumps({"result": str(ci_output)}, ensure_ascii=False)
+            output_attr = f' output="{html.escape(output_json)}"'
+
+        if status == "completed" or duration is not None or not is_last_item:
+            content += f'<details type="code_interpreter" done="true" duration="{duration or 0}"{output_attr}>\n<summary>Analyzed</summary>\n{display}\n</details>\n'
+        else:
+            content += f'<details type="code_interpreter" done="false"{output_attr}>\n<summary>Analyzing…</summary>\n{display}\n</details>\n'
+
+    return content
+
+
 def serialize_output(output: list) -> str:
     """
     Convert OR-aligned output items to HTML for display.
     For LLM consumption, use convert_output_to_messages() instead.
     """
     content = ""
+    tool_outputs = _get_tool_outputs(output)
+    for idx in range(len(output)):
+        content = _serialize_output_item(content, output, idx, tool_outputs)
 
-    # First pass: collect function_call_output items by call_id for lookup
-    tool_outputs = {}
-    for item in output:
-        if item.get("type") == "function_call_output":
-            tool_outputs[item.get("call_id")] = item
+    return content.strip()
 
-    # Second pass: render items in order
-    for idx, item in enumerate(output):
-        item_type = item.get("type", "")
-
-        if item_type == "message":
-            for content_part in item.get("content", []):
-                if "text" in content_part:
-                    text = content_part.get("text", "").strip()
-                    if text:
-                        content = f"{content}{text}\n"
-
-        elif item_type == "function_call":
-            # Render tool call inline with its result (if available)
-            if content and not content.endswith("\n"):
-                content += "\n"
-
-            call_id = item.get("call_id", "")
-            name = item.get("name", "")
-            arguments = item.get("arguments", "")
-
-            result_item = tool_outputs.get(call_id)
-            if result_item:
-                result_text = ""
-                for result_output in result_item.get("output", []):
-                    if "text" in result_output:
-                        output_text = result_output.get("text", "")
-                        result_text += (
-                            str(output_text)
-                            if not isinstance(output_text, str)
-                            else output_text
-                        )
-                files = result_item.get("files")
-                embeds = result_item.get("embeds", "")
 
-                content += f'<details type="tool_calls" done="true" id="{call_id}" name="{name}" arguments="{html.escape(json.dumps(arguments))}" result="{html.escape(json.dumps(result_text, ensure_ascii=False))}" files="{html.escape(json.dumps(files)) if files else ""}" embeds="{html.escape(json.dumps(embeds))}">\n<summary>Tool Executed</summary>\n</details>\n'
-            else:
-                content += f'<details type="tool_calls" done="false" id="{call_id}" name="{name}" arguments="{html.escape(json.dumps(arguments))}">\n<summary>Executing...</summary>\n</details>\n'
+def _text_length(parts) -> int:
+    if not isinstance(parts, list):
+        return 0
+    return sum(
+        len(part.get("text") or "") if isinstance(part.get("text"), str) else 1
+        for part in parts
+        if isinstance(part, dict)
+    )
 
-        elif item_type == "function_call_output":
-            # Already handled inline with function_call above
-            pass
 
-        elif item_type == "reasoning":
-            reasoning_content = ""
-            # Check for 'summary' (new structure) or 'content' (legacy/fallback)
-            source_list = item.get("summary", []) or item.get("content", [])
-            for content_part in source_list:
-                if "text" in content_part:
-                    reasoning_content += content_part.get("text", "")
-                elif "summary" in content_part:  # Handle potential nested logic if any
-                    pass
+def _output_item_signature(item: dict, tool_outputs: dict) -> tuple:
+    """
+    Cheap fingerprint of what serialize_output() renders for ``item``. Output
+    items only grow while streaming, so lengths stand in for their text.
+    """
+    arguments = item.get("arguments")
+    result = tool_outputs.get(item.get("call_id"))
+    return (
+        item.get("status"),
+        item.get("duration"),
+        item.get("name"),
+        _text_length(item.get("content")),
+        _text_length(item.get("summary")),
+        len(item.get("code") or ""),
+        len(arguments) if isinstance(arguments, str) else id(arguments),
+        id(item.get("output")),
+        id(result),
+        _text_length(result.get("output")) if result else 0,
+    )
 
-            reasoning_content = reasoning_content.strip()
 
-            duration = item.get("duration")
-            status = item.get("status", "in_progress")
+class OutputSerializer:
+    """
+    Incremental serialize_output() for the output of one streamed response.
 
-            # Infer completion: if this reasoning item is NOT the last item,
-            # render as done (a subsequent item means reasoning is complete)
-            is_last_item = idx == len(output) - 1
+    Streamed text only lands in the last output item, so the HTML of the items
+    before it is kept and only the last item is rendered again on each call.
+    The kept items are checked by identity and signature, and rendering
+    resumes after the last one that is unchanged.
+    """
+
+    def __init__(self):
+        # (item, signature, length of _content after the item)
+        self._items: list[tuple[dict, tuple, int]] = []
+        self._content = ""
+
+    def _truncate(self, size: int) -> None:
+        # Code interpreter items edit the content before them, so the content
+        # of earlier items is only a prefix when none of the dropped ones is
+        if any(
+            item.get("type") == "open_webui:code_interpreter"
+            for item, _, _ in self._items[size:]
+        ):
+            size = 0
+        self._content = self._content[: self._items[size - 1][2]] if size else ""
+        del self._items[size:]
+
+    def serialize(self, output: list) -> str:
+        tool_outputs = _get_tool_outputs(output)
+        last = len(output) - 1
 
-            if content and not content.endswith("\n"):
-                content += "\n"
+        for idx, (item, signature, _) in enumerate(self._items):
+            if (
+                idx >= last
+                or output[idx] is not item
+                or _output_item_signature(item, tool_outputs) != signature
+            ):
+                self._truncate(idx)
+                break
 
-            display = html.escape(
-                "\n".join(
-                    (f"> {line}" if not line.startswith(">") else line)
-                    for line in reasoning_content.splitlines()
+        content = self._content
+        for idx in range(len(self._items), last):
+            content = _serialize_output_item(content, output, idx, tool_outputs)
+            self._items.append(
+                (
+                    output[idx],
+                    _output_item_signature(output[idx], tool_outputs),
+                    len(content),
                 )
             )
+        self._content = content
 
-            if status == "completed" or duration is not None or not is_last_item:
-                content = f'{content}<details type="reasoning" done="true" duration="{duration or 0}">\n<summary>Thought for {duration or 0} seconds</summary>\n{display}\n</details>\n'
-            else:
-                content = f'{content}<details type="reasoning" done="false">\n<summary>Thinking…</summary>\n{display}\n</details>\n'
+        if last >= 0:
+            content = _serialize_output_item(content, output, last, tool_outputs)
+        return content.strip()
 
-        elif item_type == "open_webui:code_interpreter":
-            content_stripped, original_whitespace = split_content_and_whitespace(
-                content
-            )
-            if is_opening_code_block(content_stripped):
-                content = content_stripped.rstrip("`").rstrip() + original_whitespace
-            else:
-                content = content_stripped + original_whitespace
-
-            if content and not content.endswith("\n"):
-                content += "\n"
-
-            # Render the code_interpreter item as a <details> block
-            # so the frontend Collapsible renders "Analyzing..."/"Analyzed".
-            code = item.get("code", "").strip()
-            lang = item.get("lang", "python")
-            status = item.get("status", "in_progress")
-            duration = item.get("duration")
-            is_last_item = idx == len(output) - 1
-
-            # Build inner content: code block
-            display = ""
-            if code:
-                display = f"```{lang}\n{code}\n```"
-
-            # Build output attribute as HTML-escaped JSON for CodeBlock.svelte
-            ci_output = item.get("output")
-            output_attr = ""
-            if ci_output:
-                if isinstance(ci_output, dict):
-                    output_json = json.dumps(ci_output, ensure_ascii=False)
-                else:
-                    output_json = json.dumps(
-                        {"result": str(ci_output)}, ensure_ascii=False
-                    )
-                output_attr = f' output="{html.escape(output_json)}"'
 
-            if status == "completed" or duration is not None or not is_last_item:
-                content += f'<details type="code_interpreter" done="true" duration="{duration or 0}"{output_attr}>\n<summary>Analyzed</summary>\n{display}\n</details>\n'
+def _common_prefix_length(a: str, b: str) -> int:
+    size = min(len(a), len(b))
+    if a[:size] == b[:size]:
+        return size
+
+    # Slice comparisons run in C, bisect instead of walking characters
+    low, high = 0, size - 1
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[:mid] == b[:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _utf16_length(text: str) -> int:
+    return len(text.encode("utf-16-le")) // 2
+
+
+class ContentDeltaEncoder:
+    """
+    Turns streamed ``{"content": ...}`` updates into ``content_delta`` updates
+    against the content the client already has: ``trim`` characters are cut
+    from its end and ``text`` is appended. ``length`` is the length of the
+    content the delta applies to, so a client that missed an update can ignore
+    deltas until the next full content. ``trim`` and ``length`` count UTF-16
+    code units, like JavaScript string lengths. Updates that carry anything
+    besides the content, e.g. the final one, or that would cut more than
+    ``max_trim`` characters are sent in full.
+    """
+
+    def __init__(self, max_trim: int = 256):
+        self.max_trim = max_trim
+        self.content = None
+
+    def update(self, event_type: str, data: dict) -> None:
+        # Other events that change the message content on the client
+        if event_type == "replace":
+            self.content = data.get("content", "")
+        elif event_type == "message" and self.content is not None:
+            self.content += data.get("content", "")
+
+    def encode(self, data: dict) -> dict:
+        content = data.get("content")
+        if not isinstance(content, str):
+            return data
+
+        previous, self.content = self.content, content
+        if previous is None or data.keys() != {"content"}:
+            return data
+
+        prefix = _common_prefix_length(previous, content)
+        trimmed = previous[prefix:]
+        if len(trimmed) > self.max_trim:
+            return data
+
+        return {
+            "content_delta": {
+                "length": _utf16_length(previous),
+                "trim": _utf16_length(trimmed),
+                "text": content[prefix:],
+            }
+        }
+
+
+def get_content_delta_emitter(event_emitter):
+    encoder = ContentDeltaEncoder()
+
+    async def __event_emitter__(event_data):
+        event_type = event_data.get("type")
+        data = event_data.get("data")
+        if isinstance(data, dict):
+            if event_type == "chat:completion":
+                event_data = {**event_data, "data": encoder.encode(data)}
             else:
-                content += f'<details type="code_interpreter" done="false"{output_attr}>\n<summary>Analyzing…</summary>\n{display}\n</details>\n'
+                encoder.update(event_type, data)
+        await event_emitter(event_data)
 
-    return content.strip()
+    return __event_emitter__
 
 
 def deep_merge(target, source):
@@ -2015,6 +2195,7 @@ def apply_params_to_form_data(form_data, model):
     open_webui_params = {
         "stream_response": bool,
         "stream_delta_chunk_size": int,
+        "stream_content_delta": bool,
         "function_calling": str,
         "reasoning_tags": list,
         "system": str,
@@ -3120,6 +3301,11 @@ async def non_streaming_chat_response_handler(response, ctx):
 
     if event_emitter:
         try:
+            # Persist buffered event updates before writing the final message
+            await MESSAGE_EVENT_BUFFER.flush(
+                metadata["chat_id"], metadata["message_id"]
+            )
+
             if "error" in response_data:
                 error = response_data.get("error")
 
@@ -3253,6 +3439,12 @@ async def streaming_chat_response_handler(response, ctx):
     event_emitter = ctx["event_emitter"]
     event_caller = ctx["event_caller"]
 
+    if event_emitter and (
+        ENABLE_CHAT_RESPONSE_STREAM_CONTENT_DELTA
+        or metadata.get("params", {}).get("stream_content_delta")
+    ):
+        event_emitter = get_content_delta_emitter(event_emitter)
+
     extra_params = {
         "__event_emitter__": event_emitter,
         "__event_call__": event_caller,
@@ -3529,6 +3721,9 @@ async def streaming_chat_response_handler(response, ctx):
 
                 return output, end_flag
 
+            await MESSAGE_EVENT_BUFFER.flush(
+                metadata["chat_id"], metadata["message_id"]
+            )
             message = Chats.get_message_by_id_and_message_id(
                 metadata["chat_id"], metadata["message_id"]
             )
@@ -3570,6 +3765,7 @@ async def streaming_chat_response_handler(response, ctx):
                     output = []
 
             usage = None
+            output_serializer = OutputSerializer()
 
             reasoning_tags_param = metadata.get("params", {}).get("reasoning_tags")
             DETECT_REASONING_TAGS = reasoning_tags_param is not False
@@ -3697,7 +3893,7 @@ async def streaming_chat_response_handler(response, ctx):
 
                                     processed_data = {
                                         "output": output,
-                                        "content": serialize_output(output),
+                                        "content": output_serializer.serialize(output),
                                     }
 
                                     # print(data)
@@ -3869,7 +4065,7 @@ async def streaming_chat_response_handler(response, ctx):
                                                 {
                                                     "type": "chat:completion",
                                                     "data": {
-                                                        "content": serialize_output(
+                                                        "content": output_serializer.serialize(
                                                             pending_output
                                                         ),
                                                     },
@@ -3943,7 +4139,11 @@ async def streaming_chat_response_handler(response, ctx):
                                                 }
                                             ]
 
-                                        data = {"content": serialize_output(output)}
+                                        data = {
+                                            "content": output_serializer.serialize(
+                                                output
+                                            )
+                                        }
 
                                     if value:
                                         if (
@@ -4126,18 +4326,24 @@ async def streaming_chat_response_handler(response, ctx):
                                                 break
 
                                         if ENABLE_REALTIME_CHAT_SAVE:
-                                            # Save message in the database
-                                            Chats.upsert_message_to_chat_by_id_and_message_id(
+                                            # Save message in the database,
+                                            # throttled per message
+                                            await REALTIME_CHAT_SAVER.save(
                                                 metadata["chat_id"],
                                                 metadata["message_id"],
-                                                {
-                                                    "content": serialize_output(output),
+                                                lambda: {
+                                                    "content": output_serializer.serialize(
+                                                        output
+                                                    ),
                                                     "output": output,
                                                 },
+                                                size=len(value),
                                             )
                                         else:
                                             data = {
-                                                "content": serialize_output(output),
+                                                "content": output_serializer.serialize(
+                                                    output
+                                                ),
                                             }
 
                                 if delta:
@@ -4252,7 +4458,7 @@ async def streaming_chat_response_handler(response, ctx):
                         {
                             "type": "chat:completion",
                             "data": {
-                                "content": serialize_output(output),
+                                "content": output_serializer.serialize(output),
                                 "output": output,
                             },
                         }
@@ -4531,7 +4737,7 @@ async def streaming_chat_response_handler(response, ctx):
                         {
                             "type": "chat:completion",
                             "data": {
-                                "content": serialize_output(output),
+                                "content": output_serializer.serialize(output),
                                 "output": output,
                             },
                         }
@@ -4577,7 +4783,7 @@ async def streaming_chat_response_handler(response, ctx):
                             {
                                 "type": "chat:completion",
                                 "data": {
-                                    "content": serialize_output(output),
+                                    "content": output_serializer.serialize(output),
                                     "output": output,
                                 },
                             }
@@ -4716,7 +4922,7 @@ async def streaming_chat_response_handler(response, ctx):
                             {
                                 "type": "chat:completion",
                                 "data": {
-                                    "content": serialize_output(output),
+                                    "content": output_serializer.serialize(output),
                                     "output": output,
                                 },
                             }
@@ -4753,30 +4959,33 @@ async def streaming_chat_response_handler(response, ctx):
                     if item.get("status") == "in_progress":
                         item["status"] = "completed"
 
+                await MESSAGE_EVENT_BUFFER.flush(
+                    metadata["chat_id"], metadata["message_id"]
+                )
+
                 title = Chats.get_chat_title_by_id(metadata["chat_id"])
                 data = {
                     "done": True,
-                    "content": serialize_output(output),
+                    "content": output_serializer.serialize(output),
                     "output": output,
                     "title": title,
                 }
 
-                if not ENABLE_REALTIME_CHAT_SAVE:
-                    # Save message in the database
-                    Chats.upsert_message_to_chat_by_id_and_message_id(
-                        metadata["chat_id"],
-                        metadata["message_id"],
-                        {
-                            "content": serialize_output(output),
-                            "output": output,
-                            **({"usage": usage} if usage else {}),
-                        },
+                final_message = {
+                    "content": output_serializer.serialize(output),
+                    "output": output,
+                    **({"usage": usage} if usage else {}),
+                }
+                if ENABLE_REALTIME_CHAT_SAVE:
+                    await REALTIME_CHAT_SAVER.finish(
+                        metadata["chat_id"], metadata["message_id"], final_message
                     )
-                elif usage:
+                else:
+                    # Save message in the database
                     Chats.upsert_message_to_chat_by_id_and_message_id(
                         metadata["chat_id"],
                         metadata["message_id"],
-                        {"usage": usage},
+                        final_message,
                     )
 
                 # Send a webhook notification if the user is not active
@@ -4806,16 +5015,28 @@ async def streaming_chat_response_handler(response, ctx):
             except asyncio.CancelledError:
                 log.warning("Task was cancelled!")
                 await event_emitter({"type": "chat:tasks:cancel"})
+                await asyncio.shield(
+                    MESSAGE_EVENT_BUFFER.flush(
+                        metadata["chat_id"], metadata["message_id"]
+                    )
+                )
 
-                if not ENABLE_REALTIME_CHAT_SAVE:
+                final_message = {
+                    "content": output_serializer.serialize(output),
+                    "output": output,
+                }
+                if ENABLE_REALTIME_CHAT_SAVE:
+                    await asyncio.shield(
+                        REALTIME_CHAT_SAVER.finish(
+                            metadata["chat_id"], metadata["message_id"], final_message
+                        )
+                    )
+                else:
                     # Save message in the database
                     Chats.upsert_message_to_chat_by_id_and_message_id(
                         metadata["chat_id"],
                         metadata["message_id"],
-                        {
-                            "content": serialize_output(output),
-                            "output": output,
-                        },
+                        final_message,
                     )
 
             if response.background is not None:
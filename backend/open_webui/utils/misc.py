@@ -13,6 +13,7 @@ import mimeparse
 
 import collections.abc
 from open_webui.env import CHAT_STREAM_RESPONSE_CHUNK_MAX_BUFFER_SIZE
+from open_webui.utils.session_pool import is_shared_session
 
 log = logging.getLogger(__name__)
 
@@ -517,6 +518,25 @@ def calculate_sha256_string(string):
     return hashed_string
 
 
+def is_token_boundary(text: str, idx: int) -> bool:
+    """
+    Whether tiktoken's pre-tokenizers (cl100k and o200k) always split ``text``
+    at ``idx``, so the text on either side encodes to the same tokens as the
+    whole text.
+
+    That is the case for a single space between two visible characters, and
+    for a visible character after a line break, except "/" which o200k joins
+    to the punctuation and line break before it (".\n/" is one piece).
+    """
+    char = text[idx]
+    prev = text[idx - 1]
+    if char == " ":
+        return (
+            idx + 1 < len(text) and not prev.isspace() and not text[idx + 1].isspace()
+        )
+    return prev in "\r\n" and not char.isspace() and char != "/"
+
+
 def validate_email_format(email: str) -> bool:
     if email.endswith("@localhost"):
         return True
@@ -866,8 +886,9 @@ async def cleanup_response(
     session: Optional[aiohttp.ClientSession],
 ):
     if response:
-        response.close()
-    if session:
+        # release() hands a fully read connection back to the keep-alive pool
+        response.release()
+    if session and not is_shared_session(session):
         await session.close()
 
 
@@ -895,6 +916,7 @@ async def stream_wrapper(
                 credit_deduct.run(response=chunk)
                 yield chunk
 
+            await credit_deduct.wait_stream_usage()
             yield credit_deduct.usage_message
     finally:
         await cleanup_response(response, session)
@@ -0,0 +1,158 @@
+"""
+Two-level cache for the model list.
+
+The merged catalogue built by ``get_all_models`` is kept for
+``MODELS_CATALOG_CACHE_TTL`` seconds, and the filtered ``/api/models``
+response is kept per user on top of it. Writes that change either level
+(models, functions, groups, connections, model config) invalidate the cache
+locally and are broadcast to the other workers over Redis pub/sub.
+"""
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from open_webui.env import (
+    MODELS_CATALOG_CACHE_TTL,
+    MODELS_VIEW_CACHE_MAX_SIZE,
+    REDIS_KEY_PREFIX,
+)
+
+log = logging.getLogger(__name__)
+
+REDIS_MODELS_CACHE_CHANNEL = f"{REDIS_KEY_PREFIX}:models:invalidate"
+
+# Non-GET requests under these paths change the catalogue or its filtering
+MODELS_CACHE_INVALIDATION_PATHS = (
+    "/api/v1/models/",
+    "/api/v1/functions/",
+    "/api/v1/pipelines/",
+    "/api/v1/configs/",
+    "/api/v1/evaluations/config",
+    "/openai/config/update",
+    "/ollama/config/update",
+    "/ollama/api/pull",
+    "/ollama/api/push",
+    "/ollama/api/create",
+    "/ollama/api/copy",
+    "/ollama/api/delete",
+)
+MODELS_VIEW_INVALIDATION_PATHS = ("/api/v1/groups/",)
+
+
+class ModelListCache:
+    def __init__(self, ttl: int = 60, max_views: int = 1000):
+        self.ttl = ttl
+        self.max_views = max_views
+
+        # bumped on every invalidation so builds that started earlier are dropped
+        self.version = 0
+        self._models = None
+        self._models_expires_at = 0.0
+        self._views: "OrderedDict[Hashable, tuple[Any, float]]" = OrderedDict()
+        self._lock = None
+
+        self.id = uuid.uuid4().hex
+        self.stats = {
+            "catalog_hits": 0,
+            "catalog_misses": 0,
+            "view_hits": 0,
+            "view_misses": 0,
+            "invalidations": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    @staticmethod
+    def hit_ratio(hits: int, misses: int) -> float:
+        return hits / (hits + misses) if hits + misses else 0.0
+
+    def get_models(self, record: bool = True) -> Optional[list]:
+        if not self.enabled:
+            return None
+        if self._models is not None and self._models_expires_at > time.monotonic():
+            self.stats["catalog_hits"] += record
+            return self._models
+        self.stats["catalog_misses"] += record
+        return None
+
+    def set_models(self, models: list, version: int) -> None:
+        if not self.enabled or version != self.version:
+            return
+        self._models = models
+        self._models_expires_at = time.monotonic() + self.ttl
+        # views were filtered from the previous catalogue
+        self._views.clear()
+
+    def get_view(self, key: Hashable) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        entry = self._views.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            self._views.move_to_end(key)
+            self.stats["view_hits"] += 1
+            return entry[0]
+        self.stats["view_misses"] += 1
+        return None
+
+    def set_view(self, key: Hashable, view: Any, version: int) -> None:
+        if not self.enabled or version != self.version:
+            return
+        self._views[key] = (view, time.monotonic() + self.ttl)
+        self._views.move_to_end(key)
+        while len(self._views) > self.max_views:
+            self._views.popitem(last=False)
+
+    def invalidate(self, views_only: bool = False) -> None:
+        self.version += 1
+        self.stats["invalidations"] += 1
+        self._views.clear()
+        if not views_only:
+            self._models = None
+
+    async def invalidate_all_workers(self, redis, views_only: bool = False) -> None:
+        self.invalidate(views_only=views_only)
+        if redis is None or not self.enabled:
+            return
+        message = json.dumps({"source": self.id, "views_only": views_only})
+        try:
+            # RedisCluster doesn't expose publish() directly
+            if hasattr(redis, "nodes_manager"):
+                await redis.execute_command(
+                    "PUBLISH", REDIS_MODELS_CACHE_CHANNEL, message
+                )
+            else:
+                await redis.publish(REDIS_MODELS_CACHE_CHANNEL, message)
+        except Exception as e:
+            log.warning(f"Failed to broadcast model cache invalidation: {e}")
+
+    async def listen(self, redis) -> None:
+        pubsub = redis.pubsub()
+        await pubsub.subscribe(REDIS_MODELS_CACHE_CHANNEL)
+
+        async for message in pubsub.listen():
+            if message["type"] != "message":
+                continue
+            try:
+                data = json.loads(message["data"])
+                if data.get("source") != self.id:
+                    self.invalidate(views_only=data.get("views_only", False))
+            except Exception as e:
+                log.exception(f"Error handling model cache invalidation: {e}")
+
+
+MODELS_CACHE = ModelListCache(
+    ttl=MODELS_CATALOG_CACHE_TTL, max_views=MODELS_VIEW_CACHE_MAX_SIZE
+)
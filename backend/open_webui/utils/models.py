@@ -23,6 +23,7 @@ from open_webui.utils.plugin import (
     get_function_module_from_cache,
 )
 from open_webui.utils.access_control import has_access
+from open_webui.utils.model_cache import MODELS_CACHE
 
 
 from open_webui.config import (
@@ -80,6 +81,29 @@ async def get_all_base_models(request: Request, user: UserModel = None):
 
 
 async def get_all_models(request, refresh: bool = False, user: UserModel = None):
+    if not MODELS_CACHE.enabled:
+        return await build_all_models(request, refresh=refresh, user=user)
+
+    if not refresh:
+        models = MODELS_CACHE.get_models()
+        if models is not None:
+            return models
+
+    # let one request rebuild the catalogue while concurrent ones wait for it
+    async with MODELS_CACHE.lock:
+        if not refresh:
+            models = MODELS_CACHE.get_models(record=False)
+            if models is not None:
+                return models
+
+        version = MODELS_CACHE.version
+        models = await build_all_models(request, refresh=refresh, user=user)
+        if models:
+            MODELS_CACHE.set_models(models, version)
+        return models
+
+
+async def build_all_models(request, refresh: bool = False, user: UserModel = None):
     if (
         request.app.state.MODELS
         and request.app.state.BASE_MODELS
@@ -0,0 +1,396 @@
+"""
+Concurrency and token-rate quotas for chat completions.
+
+A completion served by ``generate_chat_completion`` holds a lease on the
+concurrency quota of its user, of the user's groups with limits and of its
+model until the response has been consumed, and is refused with a 429 while one
+of them is full. The tokens counted by ``CreditDeduct`` are added to rolling
+one-minute windows of the same scopes, and completions are refused once one of
+them used up its tokens per minute.
+
+Leases are kept in Redis sorted sets scored by their expiry, so all workers
+share the quotas and the leases of a crashed worker stop counting after
+``CHAT_QUOTA_LEASE_TTL`` seconds. Streams renew their lease while they run.
+Without Redis the quotas apply per process.
+
+The Redis client and group lookups are synchronous, so async callers run
+``acquire`` and ``check`` with ``asyncio.to_thread``.
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from redis.exceptions import NoScriptError
+
+from open_webui.constants import ERROR_MESSAGES
+from open_webui.env import (
+    CHAT_QUOTA_GROUP_LIMITS,
+    CHAT_QUOTA_LEASE_TTL,
+    CHAT_QUOTA_MODEL_LIMITS,
+    CHAT_QUOTA_USER_MAX_CONCURRENT,
+    CHAT_QUOTA_USER_TOKENS_PER_MINUTE,
+    REDIS_KEY_PREFIX,
+)
+from open_webui.models.groups import Groups
+from open_webui.utils.rate_limit import RateLimiter
+from open_webui.utils.redis import get_redis_client
+
+log = logging.getLogger(__name__)
+
+TOKENS_WINDOW = 60
+TOKENS_BUCKET_SIZE = 10
+
+# KEYS: the lease sets of the scopes
+# ARGV: now, lease expiry, lease id, then the concurrency limit of every scope
+# Returns the 1-based index of the first full scope, or 0 after adding the lease
+ACQUIRE_SCRIPT = """
+for i, key in ipairs(KEYS) do
+    redis.call("ZREMRANGEBYSCORE", key, "-inf", ARGV[1])
+    if redis.call("ZCARD", key) >= tonumber(ARGV[i + 3]) then
+        return i
+    end
+end
+for _, key in ipairs(KEYS) do
+    redis.call("ZADD", key, ARGV[2], ARGV[3])
+    redis.call("EXPIREAT", key, math.ceil(tonumber(ARGV[2])))
+end
+return 0
+"""
+ACQUIRE_SCRIPT_SHA = hashlib.sha1(ACQUIRE_SCRIPT.encode()).hexdigest()
+
+
+@dataclass
+class QuotaScope:
+    name: str
+    max_concurrent: int = 0
+    tokens_per_minute: int = 0
+
+    @classmethod
+    def from_limits(cls, name: str, limits: dict) -> "QuotaScope":
+        return cls(
+            name,
+            int(limits.get("max_concurrent") or 0),
+            int(limits.get("tokens_per_minute") or 0),
+        )
+
+
+class QuotaLease:
+    """Concurrency slots held by one completion."""
+
+    def __init__(
+        self,
+        quotas: "ChatQuotas",
+        scopes: list[QuotaScope],
+        in_redis: bool = False,
+    ):
+        self.quotas = quotas
+        self.scopes = scopes
+        self.in_redis = in_redis
+        self.id = uuid.uuid4().hex
+        self.released = not scopes
+
+    def renew(self) -> None:
+        if not self.released:
+            self.quotas._renew(self)
+
+    def release(self) -> None:
+        if not self.released:
+            self.released = True
+            self.quotas._release(self)
+
+    def hold(self, response):
+        """Release the lease once ``response`` has been consumed."""
+        if self.released:
+            return response
+        if isinstance(response, StreamingResponse):
+            response.body_iterator = self._iterate(response.body_iterator)
+        else:
+            self.release()
+        return response
+
+    async def _iterate(self, body_iterator):
+        renewed_at = time.monotonic()
+        try:
+            async for chunk in body_iterator:
+                if time.monotonic() - renewed_at > self.quotas.lease_ttl / 2:
+                    await asyncio.to_thread(self.renew)
+                    renewed_at = time.monotonic()
+                yield chunk
+        finally:
+            await asyncio.to_thread(self.release)
+
+
+class ChatQuotas:
+    def __init__(
+        self,
+        redis,
+        user_max_concurrent: int = 0,
+        user_tokens_per_minute: int = 0,
+        model_limits: Optional[dict] = None,
+        group_limits: Optional[dict] = None,
+        lease_ttl: int = 600,
+    ):
+        self.r = redis
+        self.user_max_concurrent = user_max_concurrent
+        self.user_tokens_per_minute = user_tokens_per_minute
+        self.model_limits = model_limits or {}
+        self.group_limits = group_limits or {}
+        self.lease_ttl = lease_ttl
+
+        # in-process leases without Redis: scope -> lease id -> expiry
+        self._leases: dict[str, dict[str, float]] = {}
+        self._lock = threading.Lock()
+        self.active = 0
+
+        self.stats = {
+            "acquired": 0,
+            "released": 0,
+            "rejected_concurrency": 0,
+            "rejected_tokens": 0,
+            "tokens": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return bool(
+            self.user_max_concurrent
+            or self.user_tokens_per_minute
+            or self.model_limits
+            or self.group_limits
+        )
+
+    def _lease_key(self, scope: QuotaScope) -> str:
+        return f"{REDIS_KEY_PREFIX}:quota:concurrency:{{{scope.name}}}"
+
+    def _token_limiter(self, scope: QuotaScope) -> RateLimiter:
+        return RateLimiter(
+            self.r,
+            limit=scope.tokens_per_minute,
+            window=TOKENS_WINDOW,
+            bucket_size=TOKENS_BUCKET_SIZE,
+        )
+
+    def get_scopes(self, user_id: str, model_id: Optional[str]) -> list[QuotaScope]:
+        scopes = []
+        if self.user_max_concurrent or self.user_tokens_per_minute:
+            scopes.append(
+                QuotaScope(
+                    f"user:{user_id}",
+                    self.user_max_concurrent,
+                    self.user_tokens_per_minute,
+                )
+            )
+
+        if self.group_limits:
+            for group in Groups.get_groups_by_member_id(user_id):
+                limits = self.group_limits.get(group.id)
+                if limits:
+                    scopes.append(QuotaScope.from_limits(f"group:{group.id}", limits))
+
+        limits = self.model_limits.get(model_id)
+        if limits:
+            scopes.append(QuotaScope.from_limits(f"model:{model_id}", limits))
+        return scopes
+
+    def _reject(self, scope: QuotaScope, reason: str, retry_after: int):
+        log.info(f"Chat quota of {scope.name} exceeded: {reason}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=ERROR_MESSAGES.CHAT_QUOTA_EXCEEDED(reason),
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    def _check_tokens(self, scopes: list[QuotaScope]) -> None:
+        for scope in scopes:
+            if not scope.tokens_per_minute:
+                continue
+            limiter = self._token_limiter(scope)
+            if limiter.get_count(f"quota:tokens:{scope.name}") >= limiter.limit:
+                self.stats["rejected_tokens"] += 1
+                self._reject(
+                    scope,
+                    f"{scope.tokens_per_minute} tokens per minute",
+                    TOKENS_BUCKET_SIZE,
+                )
+
+    def _acquire_redis(self, lease: QuotaLease, now: float) -> int:
+        keys = [self._lease_key(scope) for scope in lease.scopes]
+        args = [now, now + self.lease_ttl, lease.id]
+        args.extend(scope.max_concurrent for scope in lease.scopes)
+
+        # Lease sets of different scopes may live on different cluster nodes
+        if hasattr(self.r, "nodes_manager") and len(keys) > 1:
+            for idx, (key, limit) in enumerate(zip(keys, args[3:]), start=1):
+                if self._run_acquire([key], [*args[:3], limit]):
+                    self._zrem(keys[: idx - 1], lease.id)
+                    return idx
+            return 0
+        return self._run_acquire(keys, args)
+
+    def _run_acquire(self, keys: list[str], args: list) -> int:
+        try:
+            return int(self.r.evalsha(ACQUIRE_SCRIPT_SHA, len(keys), *keys, *args))
+        except NoScriptError:
+            return int(self.r.eval(ACQUIRE_SCRIPT, len(keys), *keys, *args))
+
+    def _zrem(self, keys: list[str], lease_id: str) -> None:
+        pipe = self.r.pipeline()
+        for key in keys:
+            pipe.zrem(key, lease_id)
+        pipe.execute()
+
+    def _acquire_memory(self, lease: QuotaLease, now: float) -> int:
+        with self._lock:
+            for idx, scope in enumerate(lease.scopes, start=1):
+                leases = self._leases.get(scope.name, {})
+                for lease_id in [k for k, v in leases.items() if v <= now]:
+                    del leases[lease_id]
+                if len(leases) >= scope.max_concurrent:
+                    return idx
+
+            for scope in lease.scopes:
+                self._leases.setdefault(scope.name, {})[lease.id] = now + self.lease_ttl
+        return 0
+
+    def acquire(self, user, model_id: Optional[str]) -> QuotaLease:
+        """
+        Take a concurrency slot of every scope of ``user`` and ``model_id``,
+        raising a 429 if one of them is full or out of tokens.
+        """
+        if not self.enabled:
+            return QuotaLease(self, [])
+
+        scopes = self.get_scopes(user.id, model_id)
+        self._check_tokens(scopes)
+
+        lease = QuotaLease(self, [scope for scope in scopes if scope.max_concurrent])
+        if lease.released:
+            return lease
+
+        now = time.time()
+        if self.r is not None:
+            try:
+                idx = self._acquire_redis(lease, now)
+                lease.in_redis = True
+            except Exception as e:
+                log.warning(f"Failed to acquire chat quota in Redis: {e}")
+                idx = self._acquire_memory(lease, now)
+        else:
+            idx = self._acquire_memory(lease, now)
+
+        if idx:
+            lease.released = True
+            self.stats["rejected_concurrency"] += 1
+            scope = lease.scopes[idx - 1]
+            self._reject(scope, f"{scope.max_concurrent} concurrent requests", 1)
+
+        self.active += 1
+        self.stats["acquired"] += 1
+        return lease
+
+    def _count_leases(self, scopes: list[QuotaScope], now: float) -> list[int]:
+        if self.r is not None:
+            try:
+                pipe = self.r.pipeline()
+                for scope in scopes:
+                    pipe.zcount(self._lease_key(scope), f"({now}", "+inf")
+                return [int(count) for count in pipe.execute()]
+            except Exception as e:
+                log.warning(f"Failed to count chat quota leases in Redis: {e}")
+
+        with self._lock:
+            return [
+                sum(
+                    expires_at > now
+                    for expires_at in self._leases.get(scope.name, {}).values()
+                )
+                for scope in scopes
+            ]
+
+    def check(self, user, model_id: Optional[str]) -> None:
+        """Raise a 429 if ``acquire`` would currently be refused."""
+        if not self.enabled:
+            return
+
+        scopes = self.get_scopes(user.id, model_id)
+        self._check_tokens(scopes)
+
+        scopes = [scope for scope in scopes if scope.max_concurrent]
+        for scope, count in zip(scopes, self._count_leases(scopes, time.time())):
+            if count >= scope.max_concurrent:
+                self.stats["rejected_concurrency"] += 1
+                self._reject(scope, f"{scope.max_concurrent} concurrent requests", 1)
+
+    def _renew(self, lease: QuotaLease) -> None:
+        expires_at = time.time() + self.lease_ttl
+        try:
+            if lease.in_redis:
+                pipe = self.r.pipeline()
+                for scope in lease.scopes:
+                    key = self._lease_key(scope)
+                    pipe.zadd(key, {lease.id: expires_at}, xx=True)
+                    pipe.expireat(key, int(expires_at) + 1)
+                pipe.execute()
+            else:
+                with self._lock:
+                    for scope in lease.scopes:
+                        leases = self._leases.get(scope.name, {})
+                        if lease.id in leases:
+                            leases[lease.id] = expires_at
+        except Exception as e:
+            log.warning(f"Failed to renew chat quota lease: {e}")
+
+    def _release(self, lease: QuotaLease) -> None:
+        self.active -= 1
+        self.stats["released"] += 1
+        try:
+            if lease.in_redis:
+                self._zrem([self._lease_key(scope) for scope in lease.scopes], lease.id)
+            else:
+                with self._lock:
+                    for scope in lease.scopes:
+                        leases = self._leases.get(scope.name, {})
+                        leases.pop(lease.id, None)
+                        if not leases:
+                            self._leases.pop(scope.name, None)
+        except Exception as e:
+            log.warning(f"Failed to release chat quota lease: {e}")
+
+    def record_tokens(self, user_id: str, model_id: Optional[str], tokens: int):
+        """Add the tokens of a finished completion to the per-minute windows."""
+        if not self.enabled or tokens <= 0:
+            return
+        self.stats["tokens"] += tokens
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._record_tokens(user_id, model_id, tokens)
+        else:
+            # Called by CreditDeduct at the end of a stream, on the event loop
+            loop.run_in_executor(None, self._record_tokens, user_id, model_id, tokens)
+
+    def _record_tokens(self, user_id: str, model_id: Optional[str], tokens: int):
+        try:
+            for scope in self.get_scopes(user_id, model_id):
+                if scope.tokens_per_minute:
+                    self._token_limiter(scope).add(f"quota:tokens:{scope.name}", tokens)
+        except Exception as e:
+            log.warning(f"Failed to record chat quota tokens: {e}")
+
+
+CHAT_QUOTAS = ChatQuotas(
+    get_redis_client(),
+    user_max_concurrent=CHAT_QUOTA_USER_MAX_CONCURRENT,
+    user_tokens_per_minute=CHAT_QUOTA_USER_TOKENS_PER_MINUTE,
+    model_limits=CHAT_QUOTA_MODEL_LIMITS,
+    group_limits=CHAT_QUOTA_GROUP_LIMITS,
+    lease_ttl=CHAT_QUOTA_LEASE_TTL,
+)
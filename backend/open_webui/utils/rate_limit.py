@@ -1,6 +1,108 @@
+"""
+Rolling-window rate limiting.
+
+Events are counted per key in ``bucket_size`` second buckets that are kept for
+the ``window``. A check is refused once a key already holds ``limit`` events in
+its window. Every check is counted, refused or not, so repeated attempts keep a
+key locked out, e.g. a signin brute force. Limiters created with
+``count_refused=False`` are only counted when all limits checked together with
+``is_rate_limited`` pass, e.g. per user, per IP and per model.
+
+With Redis a check is a single Lua script call that reads and increments the
+buckets atomically. Redis Cluster runs the script once per key, as the buckets
+of different keys live on different slots. Without Redis, or when it fails,
+the buckets are counted in a bounded in-memory store whose keys expire with
+their window.
+"""
+
+import hashlib
+import threading
 import time
-from typing import Optional, Dict
-from open_webui.env import REDIS_KEY_PREFIX
+from collections import OrderedDict
+from typing import Optional, Sequence
+
+from redis.exceptions import NoScriptError
+
+from open_webui.env import RATE_LIMIT_MEMORY_MAX_KEYS, REDIS_KEY_PREFIX
+
+# KEYS: the buckets of every check, current bucket first
+# ARGV: number of checks, then bucket count, limit, TTL and count_refused (0/1)
+# of every check
+# Returns the 1-based index of the first exhausted check, or 0 if none is
+RATE_LIMIT_SCRIPT = """
+local checks = tonumber(ARGV[1])
+local exhausted = 0
+local offset = 0
+for i = 1, checks do
+    local buckets = tonumber(ARGV[i * 4 - 2])
+    local total = 0
+    local counts = redis.call("MGET", unpack(KEYS, offset + 1, offset + buckets))
+    for _, count in ipairs(counts) do
+        if count then
+            total = total + tonumber(count)
+        end
+    end
+    if total >= tonumber(ARGV[i * 4 - 1]) then
+        exhausted = i
+        break
+    end
+    offset = offset + buckets
+end
+offset = 0
+for i = 1, checks do
+    if exhausted == 0 or ARGV[i * 4 + 1] == "1" then
+        local key = KEYS[offset + 1]
+        if redis.call("INCR", key) == 1 then
+            redis.call("EXPIRE", key, tonumber(ARGV[i * 4]))
+        end
+    end
+    offset = offset + tonumber(ARGV[i * 4 - 2])
+end
+return exhausted
+"""
+RATE_LIMIT_SCRIPT_SHA = hashlib.sha1(RATE_LIMIT_SCRIPT.encode()).hexdigest()
+
+
+class MemoryBucketStore:
+    """Bucket counts per key, dropped when they expire or the store is full."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self.lock = threading.Lock()
+        # key -> (bucket -> count, expiry), least recently counted first
+        self._entries: "OrderedDict[str, tuple[dict[int, int], float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def count(self, key: str, min_bucket: int, now: float) -> int:
+        entry = self._entries.get(key)
+        if entry is None:
+            return 0
+        buckets, expires_at = entry
+        if expires_at <= now:
+            del self._entries[key]
+            return 0
+
+        for bucket in [bucket for bucket in buckets if bucket < min_bucket]:
+            del buckets[bucket]
+        return sum(buckets.values())
+
+    def incr(self, key: str, bucket: int, expires_at: float, amount: int = 1) -> None:
+        entry = self._entries.pop(key, None)
+        buckets = entry[0] if entry is not None else {}
+        buckets[bucket] = buckets.get(bucket, 0) + amount
+        self._entries[key] = (buckets, expires_at)
+
+        while len(self._entries) > self.max_keys:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.lock:
+            self._entries.clear()
+
+
+MEMORY_STORE = MemoryBucketStore(max_keys=RATE_LIMIT_MEMORY_MAX_KEYS)
 
 
 class RateLimiter:
@@ -9,9 +111,6 @@ class RateLimiter:
     Falls back to in-memory storage if Redis is not available.
     """
 
-    # In-memory fallback storage
-    _memory_store: Dict[str, Dict[int, int]] = {}
-
     def __init__(
         self,
         redis_client,
@@ -19,6 +118,7 @@ class RateLimiter:
         window: int,
         bucket_size: int = 60,
         enabled: bool = True,
+        count_refused: bool = True,
     ):
         """
         :param redis_client: Redis client instance or None
@@ -26,6 +126,7 @@ class RateLimiter:
         :param window: Time window in seconds
         :param bucket_size: Bucket resolution
         :param enabled: Turn on/off rate limiting globally
+        :param count_refused: Count refused checks too, so they extend the limit
         """
         self.r = redis_client
         self.limit = limit
@@ -33,12 +134,17 @@ class RateLimiter:
         self.bucket_size = bucket_size
         self.num_buckets = window // bucket_size
         self.enabled = enabled
+        self.count_refused = count_refused
 
     def _bucket_key(self, key: str, bucket_index: int) -> str:
-        return f"{REDIS_KEY_PREFIX}:ratelimit:{key.lower()}:{bucket_index}"
+        # The hash tag keeps the buckets of a key on one Redis Cluster slot
+        return f"{REDIS_KEY_PREFIX}:ratelimit:{{{key.lower()}}}:{bucket_index}"
 
-    def _current_bucket(self) -> int:
-        return int(time.time()) // self.bucket_size
+    def _bucket_keys(self, key: str, now: float) -> list[str]:
+        now_bucket = int(now) // self.bucket_size
+        return [
+            self._bucket_key(key, now_bucket - i) for i in range(self.num_buckets + 1)
+        ]
 
     def _redis_available(self) -> bool:
         return self.r is not None
@@ -48,16 +154,7 @@ class RateLimiter:
         Main rate-limit check.
         Gracefully handles missing or failing Redis.
         """
-        if not self.enabled:
-            return False
-
-        if self._redis_available():
-            try:
-                return self._is_limited_redis(key)
-            except Exception:
-                return self._is_limited_memory(key)
-        else:
-            return self._is_limited_memory(key)
+        return is_rate_limited([(self, key)])
 
     def get_count(self, key: str) -> int:
         if not self.enabled:
@@ -75,65 +172,128 @@ class RateLimiter:
         used = self.get_count(key)
         return max(0, self.limit - used)
 
-    def _is_limited_redis(self, key: str) -> bool:
-        now_bucket = self._current_bucket()
-        bucket_key = self._bucket_key(key, now_bucket)
-
-        attempts = self.r.incr(bucket_key)
-        if attempts == 1:
-            self.r.expire(bucket_key, self.window + self.bucket_size)
-
-        # Collect buckets
-        buckets = [
-            self._bucket_key(key, now_bucket - i) for i in range(self.num_buckets + 1)
-        ]
+    def add(self, key: str, amount: int = 1) -> None:
+        """Count ``amount`` events for ``key`` without checking the limit."""
+        if not self.enabled or amount <= 0:
+            return
 
-        counts = self.r.mget(buckets)
-        total = sum(int(c) for c in counts if c)
+        now = time.time()
+        now_bucket = int(now) // self.bucket_size
+        if self._redis_available():
+            try:
+                bucket_key = self._bucket_key(key, now_bucket)
+                pipe = self.r.pipeline()
+                pipe.incrby(bucket_key, amount)
+                pipe.expire(bucket_key, self.window + self.bucket_size)
+                pipe.execute()
+                return
+            except Exception:
+                pass
 
-        return total > self.limit
+        with MEMORY_STORE.lock:
+            MEMORY_STORE.incr(
+                key.lower(),
+                now_bucket,
+                now + self.window + self.bucket_size,
+                amount=amount,
+            )
 
     def _get_count_redis(self, key: str) -> int:
-        now_bucket = self._current_bucket()
-        buckets = [
-            self._bucket_key(key, now_bucket - i) for i in range(self.num_buckets + 1)
-        ]
-        counts = self.r.mget(buckets)
+        counts = self.r.mget(self._bucket_keys(key, time.time()))
         return sum(int(c) for c in counts if c)
 
-    def _is_limited_memory(self, key: str) -> bool:
-        now_bucket = self._current_bucket()
+    def _get_count_memory(self, key: str) -> int:
+        now = time.time()
+        min_bucket = int(now) // self.bucket_size - self.num_buckets
+        with MEMORY_STORE.lock:
+            return MEMORY_STORE.count(key.lower(), min_bucket, now)
 
-        # Init storage
-        if key not in self._memory_store:
-            self._memory_store[key] = {}
 
-        store = self._memory_store[key]
+def _run_script(redis, checks: Sequence[tuple[RateLimiter, str]], now: float) -> int:
+    keys, args = [], [len(checks)]
+    for limiter, key in checks:
+        keys.extend(limiter._bucket_keys(key, now))
+        args.extend(
+            [
+                limiter.num_buckets + 1,
+                limiter.limit,
+                limiter.window + limiter.bucket_size,
+                int(limiter.count_refused),
+            ]
+        )
 
-        # Increment bucket
-        store[now_bucket] = store.get(now_bucket, 0) + 1
+    try:
+        return int(redis.evalsha(RATE_LIMIT_SCRIPT_SHA, len(keys), *keys, *args))
+    except NoScriptError:
+        return int(redis.eval(RATE_LIMIT_SCRIPT, len(keys), *keys, *args))
 
-        # Drop expired buckets
-        min_bucket = now_bucket - self.num_buckets
-        expired = [b for b in store if b < min_bucket]
-        for b in expired:
-            del store[b]
 
-        # Count totals
-        total = sum(store.values())
-        return total > self.limit
+def _check_redis(redis, checks: Sequence[tuple[RateLimiter, str]], now: float) -> int:
+    """
+    Check and count all ``checks`` in one script call.
 
-    def _get_count_memory(self, key: str) -> int:
-        now_bucket = self._current_bucket()
-        if key not in self._memory_store:
-            return 0
+    Not atomic on Redis Cluster: the keys of different checks may live on
+    different nodes, so every check runs the script on its own. Checks before
+    an exhausted one have then already been counted, even with
+    ``count_refused=False``, and concurrent requests may interleave between
+    the calls.
+    """
+    if hasattr(redis, "nodes_manager"):
+        exhausted = 0
+        for idx, (limiter, key) in enumerate(checks, start=1):
+            if exhausted and not limiter.count_refused:
+                continue
+            if _run_script(redis, [(limiter, key)], now) and not exhausted:
+                exhausted = idx
+        return exhausted
+    return _run_script(redis, checks, now)
+
+
+def _check_memory(checks: Sequence[tuple[RateLimiter, str]], now: float) -> int:
+    exhausted = 0
+    with MEMORY_STORE.lock:
+        for idx, (limiter, key) in enumerate(checks, start=1):
+            min_bucket = int(now) // limiter.bucket_size - limiter.num_buckets
+            if MEMORY_STORE.count(key.lower(), min_bucket, now) >= limiter.limit:
+                exhausted = idx
+                break
+
+        for limiter, key in checks:
+            if exhausted and not limiter.count_refused:
+                continue
+            MEMORY_STORE.incr(
+                key.lower(),
+                int(now) // limiter.bucket_size,
+                now + limiter.window + limiter.bucket_size,
+            )
+    return exhausted
+
+
+def get_exhausted_limit(
+    checks: Sequence[tuple[RateLimiter, str]],
+) -> Optional[tuple[RateLimiter, str]]:
+    """
+    Count one event for every ``(limiter, key)`` check and return the first
+    check that had already reached its limit, or None. When one has, limiters
+    with ``count_refused=False`` are not counted.
+    """
+    checks = [(limiter, key) for limiter, key in checks if limiter.enabled]
+    if not checks:
+        return None
+
+    now = time.time()
+    # Limiters checked together share a Redis client
+    redis = checks[0][0].r
+    if redis is not None:
+        try:
+            idx = _check_redis(redis, checks, now)
+        except Exception:
+            idx = _check_memory(checks, now)
+    else:
+        idx = _check_memory(checks, now)
 
-        store = self._memory_store[key]
-        min_bucket = now_bucket - self.num_buckets
+    return checks[idx - 1] if idx else None
 
-        # Remove expired
-        expired = [b for b in store if b < min_bucket]
-        for b in expired:
-            del store[b]
 
-        return sum(store.values())
+def is_rate_limited(checks: Sequence[tuple[RateLimiter, str]]) -> bool:
+    return get_exhausted_limit(checks) is not None
@@ -183,6 +183,7 @@ async def convert_streaming_response_ollama_to_openai(ollama_streaming_response)
             credit_deduct.run(line)
             yield line
 
+        await credit_deduct.wait_stream_usage()
         yield credit_deduct.usage_message
 
     yield "data: [DONE]\n\n"
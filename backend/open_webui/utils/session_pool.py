@@ -0,0 +1,183 @@
+"""
+Application-lifetime aiohttp client sessions.
+
+Creating an ``aiohttp.ClientSession`` per request pays a TCP + TLS handshake to
+the same provider hosts on every call. Sessions handed out here are shared per
+event loop and connection config (timeout, trust_env, read buffer size) and all
+draw from a single keep-alive ``TCPConnector`` with DNS caching and per-host
+limits, so connections to each upstream origin are reused across requests.
+
+Shared sessions must never be closed by callers; use ``client_session`` as an
+``async with`` block, or pass sessions from ``get_client_session`` to
+``cleanup_response`` which only releases the response for shared sessions.
+"""
+
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import aiohttp
+
+from open_webui.env import (
+    AIOHTTP_CLIENT_DNS_CACHE_TTL,
+    AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT,
+    AIOHTTP_CLIENT_POOL_LIMIT,
+    AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST,
+    ENABLE_AIOHTTP_CLIENT_SESSION_POOL,
+)
+
+
+class ClientSessionPool:
+    def __init__(
+        self,
+        limit: int = 0,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: int = 60,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+
+        self.stats = {"connections_created": 0, "connections_reused": 0}
+
+        # Sessions and connectors are bound to the loop they were created on
+        self._connectors = weakref.WeakKeyDictionary()
+        self._sessions = weakref.WeakKeyDictionary()
+        self._shared = weakref.WeakSet()
+
+    @property
+    def reuse_ratio(self) -> float:
+        total = self.stats["connections_created"] + self.stats["connections_reused"]
+        return self.stats["connections_reused"] / total if total else 0.0
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_connection_create_end(session, context, params):
+            self.stats["connections_created"] += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            self.stats["connections_reused"] += 1
+
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    def _get_connector(self, loop) -> aiohttp.TCPConnector:
+        connector = self._connectors.get(loop)
+        if connector is None or connector.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_cache_ttl,
+            )
+            self._connectors[loop] = connector
+        return connector
+
+    def get(
+        self,
+        timeout: Optional[aiohttp.ClientTimeout] = None,
+        trust_env: bool = True,
+        read_bufsize: Optional[int] = None,
+    ) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        sessions = self._sessions.setdefault(loop, {})
+
+        # aiohttp's own default (300s total, 30s to connect), never unbounded
+        timeout = timeout or aiohttp.client.DEFAULT_TIMEOUT
+        key = (timeout, trust_env, read_bufsize)
+        session = sessions.get(key)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=self._get_connector(loop),
+                connector_owner=False,
+                timeout=timeout,
+                trust_env=trust_env,
+                # Never persist upstream cookies across users sharing a session
+                cookie_jar=aiohttp.DummyCookieJar(),
+                trace_configs=[self._trace_config()],
+                **({"read_bufsize": read_bufsize} if read_bufsize else {}),
+            )
+            sessions[key] = session
+            self._shared.add(session)
+        return session
+
+    def is_shared(self, session: aiohttp.ClientSession) -> bool:
+        return session in self._shared
+
+    async def close(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        for session in self._sessions.pop(loop, {}).values():
+            await session.close()
+
+        connector = self._connectors.pop(loop, None)
+        if connector is not None:
+            await connector.close()
+
+
+CLIENT_SESSION_POOL = ClientSessionPool(
+    limit=AIOHTTP_CLIENT_POOL_LIMIT,
+    limit_per_host=AIOHTTP_CLIENT_POOL_LIMIT_PER_HOST,
+    keepalive_timeout=AIOHTTP_CLIENT_KEEPALIVE_TIMEOUT,
+    dns_cache_ttl=AIOHTTP_CLIENT_DNS_CACHE_TTL,
+)
+
+
+def get_client_session(
+    timeout: Optional[aiohttp.ClientTimeout] = None,
+    trust_env: bool = True,
+    read_bufsize: Optional[int] = None,
+) -> aiohttp.ClientSession:
+    """
+    Return a session for upstream requests.
+
+    The session is shared unless pooling is disabled; either way release it
+    with ``cleanup_response`` rather than closing it directly.
+    """
+    if ENABLE_AIOHTTP_CLIENT_SESSION_POOL:
+        return CLIENT_SESSION_POOL.get(
+            timeout=timeout, trust_env=trust_env, read_bufsize=read_bufsize
+        )
+
+    return aiohttp.ClientSession(
+        timeout=timeout or aiohttp.client.DEFAULT_TIMEOUT,
+        trust_env=trust_env,
+        **({"read_bufsize": read_bufsize} if read_bufsize else {}),
+    )
+
+
+def is_shared_session(session: aiohttp.ClientSession) -> bool:
+    return CLIENT_SESSION_POOL.is_shared(session)
+
+
+@asynccontextmanager
+async def client_session(
+    timeout: Optional[aiohttp.ClientTimeout] = None,
+    trust_env: bool = True,
+    read_bufsize: Optional[int] = None,
+):
+    """
+    Drop-in for ``async with aiohttp.ClientSession(...)`` that leaves shared
+    sessions open on exit.
+    """
+    session = get_client_session(
+        timeout=timeout, trust_env=trust_env, read_bufsize=read_bufsize
+    )
+    try:
+        yield session
+    finally:
+        if not is_shared_session(session):
+            await session.close()
+
+
+async def close_client_sessions():
+    await CLIENT_SESSION_POOL.close()
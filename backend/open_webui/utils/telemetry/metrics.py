@@ -46,6 +46,17 @@ from open_webui.env import (
     OTEL_METRICS_EXPORTER_OTLP_INSECURE,
 )
 from open_webui.models.users import Users
+from open_webui.retrieval.embedding_cache import QUERY_EMBEDDING_CACHE
+from open_webui.retrieval.embedding_store import CHUNK_EMBEDDING_STORE
+from open_webui.socket.main import MESSAGE_EVENT_BUFFER, REALTIME_CHAT_SAVER
+from open_webui.storage.cache import STORAGE_FILE_CACHE
+from open_webui.utils.audit import AUDIT_SINK
+from open_webui.utils.credit.ledger import CREDIT_LEDGER
+from open_webui.utils.last_active import LAST_ACTIVE_TRACKER
+from open_webui.utils.model_cache import MODELS_CACHE
+from open_webui.utils.quota import CHAT_QUOTAS
+from open_webui.utils.session_pool import CLIENT_SESSION_POOL
+from open_webui.utils.user_cache import USER_CACHE
 
 _EXPORT_INTERVAL_MILLIS = 10_000  # 10 seconds
 
@@ -101,6 +112,39 @@ def _build_meter_provider(resource: Resource) -> MeterProvider:
         View(
             instrument_name="webui.users.active.today",
         ),
+        View(
+            instrument_name="webui.chat.message_events.*",
+        ),
+        View(
+            instrument_name="webui.chat.realtime_save.*",
+        ),
+        View(
+            instrument_name="webui.http.client.*",
+        ),
+        View(
+            instrument_name="webui.credit.ledger.*",
+        ),
+        View(
+            instrument_name="webui.models.cache.*",
+        ),
+        View(
+            instrument_name="webui.auth.user_cache.*",
+        ),
+        View(
+            instrument_name="webui.retrieval.embedding_cache.*",
+        ),
+        View(
+            instrument_name="webui.retrieval.chunk_embeddings.*",
+        ),
+        View(
+            instrument_name="webui.storage.cache.*",
+        ),
+        View(
+            instrument_name="webui.chat.quota.*",
+        ),
+        View(
+            instrument_name="webui.audit.*",
+        ),
     ]
 
     provider = MeterProvider(
@@ -134,7 +178,7 @@ def setup_metrics(app: FastAPI, resource: Resource) -> None:
     ) -> Sequence[metrics.Observation]:
         return [
             metrics.Observation(
-                value=Users.get_active_user_count(),
+                value=LAST_ACTIVE_TRACKER.get_active_user_count(),
             )
         ]
 
@@ -167,7 +211,9 @@ def setup_metrics(app: FastAPI, resource: Resource) -> None:
     def observe_users_active_today(
         options: metrics.CallbackOptions,
     ) -> Sequence[metrics.Observation]:
-        return [metrics.Observation(value=Users.get_num_users_active_today())]
+        return [
+            metrics.Observation(value=LAST_ACTIVE_TRACKER.get_num_users_active_today())
+        ]
 
     meter.create_observable_gauge(
         name="webui.users.active.today",
@@ -176,6 +222,308 @@ def setup_metrics(app: FastAPI, resource: Resource) -> None:
         callbacks=[observe_users_active_today],
     )
 
+    def observe_stat(stats: dict, key: str):
+        def callback(
+            options: metrics.CallbackOptions,
+        ) -> Sequence[metrics.Observation]:
+            return [metrics.Observation(value=stats.get(key, 0))]
+
+        return callback
+
+    meter.create_observable_counter(
+        name="webui.chat.message_events.flushes",
+        description="Coalesced message event writes flushed to the database",
+        unit="1",
+        callbacks=[observe_stat(MESSAGE_EVENT_BUFFER.stats, "flushes")],
+    )
+    meter.create_observable_counter(
+        name="webui.chat.message_events.bytes_written",
+        description="Serialized size of message updates flushed to the database",
+        unit="By",
+        callbacks=[observe_stat(MESSAGE_EVENT_BUFFER.stats, "bytes_written")],
+    )
+    meter.create_observable_counter(
+        name="webui.chat.message_events.received",
+        description="Message events received for persistence",
+        unit="1",
+        callbacks=[observe_stat(MESSAGE_EVENT_BUFFER.stats, "events")],
+    )
+
+    for key, description in [
+        ("saves", "Streamed deltas handed to the realtime chat save"),
+        ("writes", "Realtime chat saves written to the database"),
+        ("completions", "Final states of streamed messages written"),
+        ("failures", "Realtime chat saves that failed"),
+    ]:
+        meter.create_observable_counter(
+            name=f"webui.chat.realtime_save.{key}",
+            description=description,
+            unit="1",
+            callbacks=[observe_stat(REALTIME_CHAT_SAVER.stats, key)],
+        )
+    meter.create_observable_counter(
+        name="webui.chat.realtime_save.bytes_written",
+        description="Serialized size of realtime chat saves",
+        unit="By",
+        callbacks=[observe_stat(REALTIME_CHAT_SAVER.stats, "bytes_written")],
+    )
+
+    def observe_connection_reuse_ratio(
+        options: metrics.CallbackOptions,
+    ) -> Sequence[metrics.Observation]:
+        return [metrics.Observation(value=CLIENT_SESSION_POOL.reuse_ratio)]
+
+    meter.create_observable_counter(
+        name="webui.http.client.connections.created",
+        description="Upstream connections opened by the shared client session pool",
+        unit="1",
+        callbacks=[observe_stat(CLIENT_SESSION_POOL.stats, "connections_created")],
+    )
+    meter.create_observable_counter(
+        name="webui.http.client.connections.reused",
+        description="Upstream requests served on a pooled keep-alive connection",
+        unit="1",
+        callbacks=[observe_stat(CLIENT_SESSION_POOL.stats, "connections_reused")],
+    )
+    meter.create_observable_gauge(
+        name="webui.http.client.connections.reuse_ratio",
+        description="Share of upstream requests served on a reused connection",
+        unit="1",
+        callbacks=[observe_connection_reuse_ratio],
+    )
+
+    def observe_credit_ledger_pending(
+        options: metrics.CallbackOptions,
+    ) -> Sequence[metrics.Observation]:
+        return [metrics.Observation(value=CREDIT_LEDGER.pending)]
+
+    meter.create_observable_gauge(
+        name="webui.credit.ledger.pending",
+        description="Credit changes queued and not yet committed",
+        unit="1",
+        callbacks=[observe_credit_ledger_pending],
+    )
+    meter.create_observable_counter(
+        name="webui.credit.ledger.applied",
+        description="Credit changes committed by the ledger",
+        unit="1",
+        callbacks=[observe_stat(CREDIT_LEDGER.stats, "applied")],
+    )
+    meter.create_observable_counter(
+        name="webui.credit.ledger.batches",
+        description="Batched credit transactions committed by the ledger",
+        unit="1",
+        callbacks=[observe_stat(CREDIT_LEDGER.stats, "batches")],
+    )
+    meter.create_observable_counter(
+        name="webui.credit.ledger.failures",
+        description="Credit ledger flushes that failed and were retried",
+        unit="1",
+        callbacks=[observe_stat(CREDIT_LEDGER.stats, "failures")],
+    )
+    meter.create_observable_counter(
+        name="webui.credit.ledger.dead_lettered",
+        description="Credit changes dropped because they could not be applied",
+        unit="1",
+        callbacks=[observe_stat(CREDIT_LEDGER.stats, "dead_lettered")],
+    )
+
+    def observe_models_cache_hit_ratio(level: str):
+        def callback(
+            options: metrics.CallbackOptions,
+        ) -> Sequence[metrics.Observation]:
+            return [
+                metrics.Observation(
+                    value=MODELS_CACHE.hit_ratio(
+                        MODELS_CACHE.stats[f"{level}_hits"],
+                        MODELS_CACHE.stats[f"{level}_misses"],
+                    ),
+                    attributes={"level": level},
+                )
+            ]
+
+        return callback
+
+    for level in ["catalog", "view"]:
+        meter.create_observable_counter(
+            name=f"webui.models.cache.{level}.hits",
+            description=f"Model list {level} cache hits",
+            unit="1",
+            callbacks=[observe_stat(MODELS_CACHE.stats, f"{level}_hits")],
+        )
+        meter.create_observable_counter(
+            name=f"webui.models.cache.{level}.misses",
+            description=f"Model list {level} cache misses",
+            unit="1",
+            callbacks=[observe_stat(MODELS_CACHE.stats, f"{level}_misses")],
+        )
+    meter.create_observable_gauge(
+        name="webui.models.cache.hit_ratio",
+        description="Share of model list lookups served from cache",
+        unit="1",
+        callbacks=[
+            observe_models_cache_hit_ratio("catalog"),
+            observe_models_cache_hit_ratio("view"),
+        ],
+    )
+    meter.create_observable_counter(
+        name="webui.models.cache.invalidations",
+        description="Model list cache invalidations, including other workers'",
+        unit="1",
+        callbacks=[observe_stat(MODELS_CACHE.stats, "invalidations")],
+    )
+
+    for key, description in [
+        ("hits", "Authenticated users served from the user cache"),
+        ("misses", "Authenticated users loaded from the database"),
+        ("invalidations", "User cache invalidations, including other workers'"),
+    ]:
+        meter.create_observable_counter(
+            name=f"webui.auth.user_cache.{key}",
+            description=description,
+            unit="1",
+            callbacks=[observe_stat(USER_CACHE.stats, key)],
+        )
+
+    def observe_user_cache_size(
+        options: metrics.CallbackOptions,
+    ) -> Sequence[metrics.Observation]:
+        return [metrics.Observation(value=len(USER_CACHE))]
+
+    meter.create_observable_gauge(
+        name="webui.auth.user_cache.size",
+        description="Users cached by this worker",
+        unit="1",
+        callbacks=[observe_user_cache_size],
+    )
+
+    for key, description in [
+        ("hits", "Embedding lookups served from cache"),
+        ("misses", "Embedding lookups sent to the provider"),
+        ("redis_hits", "Embedding cache hits loaded from Redis"),
+        ("saved_calls", "Embedding requests answered without a provider call"),
+        ("evictions", "Embeddings evicted from the in-memory cache"),
+    ]:
+        meter.create_observable_counter(
+            name=f"webui.retrieval.embedding_cache.{key}",
+            description=description,
+            unit="1",
+            callbacks=[observe_stat(QUERY_EMBEDDING_CACHE.stats, key)],
+        )
+
+    def observe_embedding_cache_size(
+        options: metrics.CallbackOptions,
+    ) -> Sequence[metrics.Observation]:
+        return [metrics.Observation(value=QUERY_EMBEDDING_CACHE.size)]
+
+    meter.create_observable_gauge(
+        name="webui.retrieval.embedding_cache.size",
+        description="Embeddings held in the in-memory cache",
+        unit="1",
+        callbacks=[observe_embedding_cache_size],
+    )
+
+    for key, description in [
+        ("lookups", "Chunk embeddings looked up in the embedding store"),
+        ("hits", "Chunk embeddings reused from the embedding store"),
+        ("stored", "Chunk embeddings written to the embedding store"),
+        ("evictions", "Chunk embeddings evicted from the embedding store"),
+    ]:
+        meter.create_observable_counter(
+            name=f"webui.retrieval.chunk_embeddings.{key}",
+            description=description,
+            unit="1",
+            callbacks=[observe_stat(CHUNK_EMBEDDING_STORE.stats, key)],
+        )
+
+    def observe_chunk_embeddings_saved_ratio(
+        options: metrics.CallbackOptions,
+    ) -> Sequence[metrics.Observation]:
+        return [metrics.Observation(value=CHUNK_EMBEDDING_STORE.saved_ratio)]
+
+    meter.create_observable_gauge(
+        name="webui.retrieval.chunk_embeddings.saved_ratio",
+        description="Share of chunk embeddings served without a provider call",
+        unit="1",
+        callbacks=[observe_chunk_embeddings_saved_ratio],
+    )
+
+    for key, description in [
+        ("hits", "Remote file reads served from the local copy"),
+        ("misses", "Remote file reads that downloaded the file"),
+        ("evictions", "Local copies of remote files evicted for space"),
+        ("invalidations", "Local copies of remote files dropped on deletion"),
+    ]:
+        meter.create_observable_counter(
+            name=f"webui.storage.cache.{key}",
+            description=description,
+            unit="1",
+            callbacks=[observe_stat(STORAGE_FILE_CACHE.stats, key)],
+        )
+
+    def observe_storage_cache_size(
+        options: metrics.CallbackOptions,
+    ) -> Sequence[metrics.Observation]:
+        return [metrics.Observation(value=STORAGE_FILE_CACHE.size)]
+
+    meter.create_observable_gauge(
+        name="webui.storage.cache.size",
+        description="Bytes of remote files cached on local disk",
+        unit="By",
+        callbacks=[observe_storage_cache_size],
+    )
+
+    for key, description in [
+        ("acquired", "Chat completions admitted by the quotas"),
+        ("released", "Chat completions that released their quota lease"),
+        ("rejected_concurrency", "Chat completions refused for concurrency"),
+        ("rejected_tokens", "Chat completions refused for tokens per minute"),
+        ("tokens", "Tokens counted against the chat quotas"),
+    ]:
+        meter.create_observable_counter(
+            name=f"webui.chat.quota.{key}",
+            description=description,
+            unit="1",
+            callbacks=[observe_stat(CHAT_QUOTAS.stats, key)],
+        )
+
+    def observe_chat_quota_active(
+        options: metrics.CallbackOptions,
+    ) -> Sequence[metrics.Observation]:
+        return [metrics.Observation(value=CHAT_QUOTAS.active)]
+
+    meter.create_observable_gauge(
+        name="webui.chat.quota.active",
+        description="Chat completions of this worker holding a quota lease",
+        unit="1",
+        callbacks=[observe_chat_quota_active],
+    )
+
+    for key, description in [
+        ("enqueued", "Audit entries queued for writing"),
+        ("written", "Audit entries written by the audit sink"),
+        ("dropped", "Audit entries dropped because the queue was full"),
+        ("failures", "Audit entries that failed to be written"),
+    ]:
+        meter.create_observable_counter(
+            name=f"webui.audit.{key}",
+            description=description,
+            unit="1",
+            callbacks=[observe_stat(AUDIT_SINK.stats, key)],
+        )
+
+    def observe_audit_queue_size(
+        options: metrics.CallbackOptions,
+    ) -> Sequence[metrics.Observation]:
+        return [metrics.Observation(value=AUDIT_SINK.pending)]
+
+    meter.create_observable_gauge(
+        name="webui.audit.queue_size",
+        description="Audit entries waiting to be written",
+        unit="1",
+        callbacks=[observe_audit_queue_size],
+    )
+
     # FastAPI middleware
     @app.middleware("http")
     async def _metrics_middleware(request: Request, call_next):
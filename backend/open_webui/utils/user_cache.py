@@ -0,0 +1,172 @@
+"""
+Per-process cache of authenticated users.
+
+Every authenticated request used to load its user from the database. Users are
+now kept for ``USER_CACHE_TTL`` seconds by id, and API keys are mapped to their
+user by their SHA-256 hash so raw keys are not kept in memory. Writes to a user
+(role, status, settings, profile, API key, deletion) invalidate the entry
+locally and are broadcast to the other workers over Redis pub/sub; without
+Redis the TTL bounds how long other workers serve the previous state.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Optional
+
+from open_webui.env import REDIS_KEY_PREFIX, USER_CACHE_MAX_SIZE, USER_CACHE_TTL
+
+if TYPE_CHECKING:
+    from open_webui.models.users import UserModel
+
+log = logging.getLogger(__name__)
+
+REDIS_USER_CACHE_CHANNEL = f"{REDIS_KEY_PREFIX}:users:invalidate"
+
+
+def _hash_api_key(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+class UserCache:
+    def __init__(self, ttl: float = 10, max_size: int = 10000):
+        self.ttl = ttl
+        self.max_size = max_size
+
+        # bumped on every invalidation so loads that started earlier are dropped
+        self.version = 0
+        self._users: "OrderedDict[str, tuple[UserModel, float]]" = OrderedDict()
+        # hashed API key -> (user id, expiry)
+        self._api_keys: "OrderedDict[str, tuple[str, float]]" = OrderedDict()
+        # Writes happen in threadpool workers as well as on the event loop
+        self._lock = threading.Lock()
+
+        # sync client used to publish invalidations, set on startup
+        self.redis = None
+        self.id = uuid.uuid4().hex
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def __len__(self) -> int:
+        return len(self._users)
+
+    def _get(self, user_id: str, now: float) -> Optional["UserModel"]:
+        entry = self._users.get(user_id)
+        if entry is None or entry[1] <= now:
+            return None
+        self._users.move_to_end(user_id)
+        # Callers may modify the user they get
+        return entry[0].model_copy()
+
+    def _set(self, user: "UserModel", version: int, now: float) -> None:
+        if version != self.version:
+            return
+        self._users[user.id] = (user, now + self.ttl)
+        self._users.move_to_end(user.id)
+        while len(self._users) > self.max_size:
+            self._users.popitem(last=False)
+
+    def get_user_by_id(
+        self, user_id: str, load: Callable[[str], Optional["UserModel"]]
+    ) -> Optional["UserModel"]:
+        if not self.enabled:
+            return load(user_id)
+
+        now = time.monotonic()
+        with self._lock:
+            user = self._get(user_id, now)
+            if user is not None:
+                self.stats["hits"] += 1
+                return user
+            self.stats["misses"] += 1
+            version = self.version
+
+        user = load(user_id)
+        if user is not None:
+            with self._lock:
+                self._set(user, version, now)
+        return user
+
+    def get_user_by_api_key(
+        self, api_key: str, load: Callable[[str], Optional["UserModel"]]
+    ) -> Optional["UserModel"]:
+        if not self.enabled:
+            return load(api_key)
+
+        key = _hash_api_key(api_key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._api_keys.get(key)
+            if entry is not None and entry[1] > now:
+                user = self._get(entry[0], now)
+                if user is not None:
+                    self._api_keys.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return user
+            self.stats["misses"] += 1
+            version = self.version
+
+        user = load(api_key)
+        if user is not None:
+            with self._lock:
+                if version == self.version:
+                    self._api_keys[key] = (user.id, now + self.ttl)
+                    self._api_keys.move_to_end(key)
+                    while len(self._api_keys) > self.max_size:
+                        self._api_keys.popitem(last=False)
+                self._set(user, version, now)
+        return user
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """Drop ``user_id``, or every cached user when it is None."""
+        with self._lock:
+            self.version += 1
+            self.stats["invalidations"] += 1
+            if user_id is None:
+                self._users.clear()
+                self._api_keys.clear()
+                return
+
+            self._users.pop(user_id, None)
+            for key in [
+                key for key, entry in self._api_keys.items() if entry[0] == user_id
+            ]:
+                del self._api_keys[key]
+
+    def invalidate_all_workers(self, user_id: Optional[str] = None) -> None:
+        self.invalidate(user_id)
+        if self.redis is None or not self.enabled:
+            return
+        message = json.dumps({"source": self.id, "user_id": user_id})
+        try:
+            # RedisCluster doesn't expose publish() directly
+            if hasattr(self.redis, "nodes_manager"):
+                self.redis.execute_command("PUBLISH", REDIS_USER_CACHE_CHANNEL, message)
+            else:
+                self.redis.publish(REDIS_USER_CACHE_CHANNEL, message)
+        except Exception as e:
+            log.warning(f"Failed to broadcast user cache invalidation: {e}")
+
+    async def listen(self, redis) -> None:
+        pubsub = redis.pubsub()
+        await pubsub.subscribe(REDIS_USER_CACHE_CHANNEL)
+
+        async for message in pubsub.listen():
+            if message["type"] != "message":
+                continue
+            try:
+                data = json.loads(message["data"])
+                if data.get("source") != self.id:
+                    self.invalidate(data.get("user_id"))
+            except Exception as e:
+                log.exception(f"Error handling user cache invalidation: {e}")
+
+
+USER_CACHE = UserCache(ttl=USER_CACHE_TTL, max_size=USER_CACHE_MAX_SIZE)
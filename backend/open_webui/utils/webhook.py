@@ -4,6 +4,7 @@ import aiohttp
 
 from open_webui.config import WEBUI_FAVICON_URL
 from open_webui.env import AIOHTTP_CLIENT_TIMEOUT, VERSION
+from open_webui.utils.session_pool import client_session
 
 log = logging.getLogger(__name__)
 
@@ -54,7 +55,7 @@ async def post_webhook(name: str, url: str, message: str, event_data: dict) -> b
             payload = {**event_data}
 
         log.debug(f"payload: {payload}")
-        async with aiohttp.ClientSession(
+        async with client_session(
             trust_env=True, timeout=aiohttp.ClientTimeout(total=AIOHTTP_CLIENT_TIMEOUT)
         ) as session:
             async with session.post(url, json=payload) as r: